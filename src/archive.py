@@ -0,0 +1,511 @@
+"""
+原始貼文封存 — 以日期分區、壓縮的 NDJSON 區段保存 pipeline 的每篇輸入與判斷結果。
+
+巡邏結束後原始爬取資料就消失了，只剩下過濾/重複的篇數。
+封存後可離線調整過濾規則（filter_replay.py）與稽核，不必重新爬取。
+
+- 只附加：每批紀錄壓縮成獨立的 gzip member / zstd frame 附加到區段檔，
+  寫到一半崩潰只會損失最後一批，先前的內容仍可讀取
+- 日期分區：<root>/YYYY-MM-DD/seg_<時間>_<pid>_<隨機>.ndjson.gz|.zst，
+  每個 PostArchive 寫自己的區段檔，多個行程同時封存不會互相干擾
+- 索引：<root>/index.json 記錄每個區段的日期、筆數、大小與時間範圍，
+  更新時以 fcntl 檔案鎖保護
+- 背景寫入：record() 只把紀錄放進佇列，序列化、壓縮與寫檔都在背景執行緒進行；
+  佇列滿時捨棄並計數，pipeline 主迴圈不會因 I/O 阻塞
+
+每行格式：
+    {"ts": "2026-10-19T15:30:00", "run_id": "...", "decision": "filtered",
+     "reason": "exclude", "terms": ["團購"], "post": {...}}
+
+用法：
+    python3 src/archive.py --list
+    python3 src/archive.py --dump --since 2026-10-01 --decision filtered
+    python3 src/archive.py --rebuild-index
+"""
+
+import gzip
+import io
+import logging
+import os
+import queue
+import re
+import tempfile
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, IO, Iterable, Iterator, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows：不支援檔案鎖，退回無鎖更新
+    fcntl = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+import fast_json
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ARCHIVE_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "data", "archive"
+)
+INDEX_FILENAME = "index.json"
+LOCK_FILENAME = ".index.lock"
+INDEX_VERSION = 1
+
+COMPRESSION_SUFFIXES = {"gzip": ".ndjson.gz", "zstd": ".ndjson.zst"}
+DEFAULT_COMPRESSION = "zstd" if zstandard is not None else "gzip"
+
+# pipeline 的判斷結果
+DECISIONS = ("passed", "filtered", "junk", "author", "duplicate", "invalid")
+
+# 單一區段檔的紀錄數上限，超過時換新檔
+DEFAULT_SEGMENT_MAX_RECORDS = 50000
+# 佇列中尚未寫入的紀錄上限，超過時捨棄新紀錄
+DEFAULT_MAX_QUEUE = 100000
+# 背景執行緒最長多久寫一次
+DEFAULT_FLUSH_INTERVAL = 1.0
+# 每次寫入最多處理的紀錄數
+WRITE_BATCH_SIZE = 5000
+
+_SEGMENT_NAME_RE = re.compile(r"^seg_[0-9A-Za-z_-]+\.ndjson\.(gz|zst)$")
+_DATE_DIR_RE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+
+# 佇列結束標記
+_STOP = object()
+
+
+def _compress(data: bytes, compression: str) -> bytes:
+    if compression == "zstd":
+        return zstandard.ZstdCompressor(level=3).compress(data)
+    return gzip.compress(data, compresslevel=6)
+
+
+def _open_segment(path: str) -> IO[str]:
+    """以文字模式開啟區段檔（支援多個 gzip member / zstd frame）。"""
+    if path.endswith(".zst"):
+        if zstandard is None:
+            raise RuntimeError("讀取 .zst 封存需要安裝 zstandard")
+        raw = open(path, "rb")
+        reader = zstandard.ZstdDecompressor().stream_reader(raw, read_across_frames=True,
+                                                            closefd=True)
+        return io.TextIOWrapper(reader, encoding="utf-8")
+    return gzip.open(path, "rt", encoding="utf-8")
+
+
+def _atomic_write(path: str, data: bytes) -> None:
+    """寫入同目錄暫存檔、fsync 後 os.replace 到目標路徑。"""
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp_")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+class PostArchive:
+    """
+    貼文封存（附加寫入，背景執行緒負責 I/O）
+
+    record() 是執行緒安全的；呼叫後不應再修改傳入的 post。
+    使用完畢務必 close()（或使用 with），否則佇列中的紀錄不會寫入。
+    """
+
+    def __init__(self, root_dir: str = DEFAULT_ARCHIVE_DIR,
+                 compression: str = DEFAULT_COMPRESSION,
+                 run_id: Optional[str] = None,
+                 segment_max_records: int = DEFAULT_SEGMENT_MAX_RECORDS,
+                 max_queue: int = DEFAULT_MAX_QUEUE,
+                 flush_interval: float = DEFAULT_FLUSH_INTERVAL):
+        """
+        初始化封存並啟動背景寫入執行緒
+
+        Args:
+            root_dir: 封存根目錄。
+            compression: "gzip" 或 "zstd"（未安裝 zstandard 時退回 gzip）。
+            run_id: 寫入每筆紀錄的巡邏 run ID（可為 None）。
+            segment_max_records: 單一區段檔的紀錄數上限。
+            max_queue: 尚未寫入的紀錄上限（超過時捨棄並計入 dropped）。
+            flush_interval: 背景執行緒最長寫入間隔（秒）。
+
+        Raises:
+            ValueError: 不支援的壓縮格式。
+        """
+        if compression not in COMPRESSION_SUFFIXES:
+            raise ValueError(f"Unsupported compression: {compression}")
+        if compression == "zstd" and zstandard is None:
+            logger.warning("zstandard 未安裝，改用 gzip 壓縮")
+            compression = "gzip"
+
+        self.root_dir = root_dir
+        self.compression = compression
+        self.run_id = run_id
+        self.segment_max_records = max(1, segment_max_records)
+        self.flush_interval = flush_interval
+        self.index_path = os.path.join(root_dir, INDEX_FILENAME)
+
+        self.recorded = 0
+        self.written = 0
+        self.dropped = 0
+
+        # 日期 -> 目前寫入中的區段索引項目
+        self._segments: Dict[str, Dict] = {}
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max(1, max_queue))
+        self._closed = False
+        self._writer = threading.Thread(target=self._run, name="post-archive-writer",
+                                        daemon=True)
+        self._writer.start()
+
+    # ========== Public API ==========
+
+    def record(self, post: Dict, decision: str, reason: Optional[str] = None,
+               terms: Optional[Iterable[str]] = None) -> bool:
+        """
+        將一篇貼文與其判斷結果放入寫入佇列（不做任何 I/O）。
+
+        Args:
+            post: 原始輸入貼文。
+            decision: 判斷結果（見 DECISIONS）。
+            reason: 原因代碼（例如 "exclude"、"too_short"、"missing_fields"）。
+            terms: 造成此判斷的詞（例如命中的排除詞）。
+
+        Returns:
+            bool: True = 已排入佇列，False = 已關閉或佇列已滿而捨棄。
+        """
+        if self._closed:
+            return False
+        try:
+            self._queue.put_nowait(
+                (time.time(), post, decision, reason, sorted(terms) if terms else None)
+            )
+        except queue.Full:
+            self.dropped += 1
+            if self.dropped == 1:
+                logger.warning("封存佇列已滿，開始捨棄紀錄")
+            return False
+        self.recorded += 1
+        return True
+
+    def flush(self) -> None:
+        """等待佇列中所有紀錄寫入完成。"""
+        self._queue.join()
+
+    def close(self) -> None:
+        """寫入剩餘紀錄並停止背景執行緒（可重複呼叫）。"""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_STOP)
+        self._writer.join()
+        if self.dropped:
+            logger.warning("封存共捨棄 %d 筆紀錄（佇列已滿）", self.dropped)
+
+    def __enter__(self) -> "PostArchive":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    # ========== Background writer ==========
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            batch = []
+            if item is _STOP:
+                stopping = True
+            else:
+                batch.append(item)
+            # 累積 flush_interval 內的紀錄一次寫入，避免產生大量細碎的壓縮區塊
+            deadline = time.monotonic() + self.flush_interval
+            while not stopping and len(batch) < WRITE_BATCH_SIZE:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                else:
+                    batch.append(item)
+            try:
+                if batch:
+                    self._write_batch(batch)
+            except Exception as e:
+                logger.error("封存寫入失敗（%d 筆）: %s", len(batch), e)
+            finally:
+                for _ in range(len(batch) + (1 if stopping else 0)):
+                    self._queue.task_done()
+
+    def _new_segment(self, date: str) -> Dict:
+        stamp = datetime.now().strftime("%Y%m%dT%H%M%S")
+        name = f"seg_{stamp}_{os.getpid()}_{uuid.uuid4().hex[:8]}"
+        return {
+            "path": f"{date}/{name}{COMPRESSION_SUFFIXES[self.compression]}",
+            "date": date,
+            "records": 0,
+            "size": 0,
+            "first_ts": None,
+            "last_ts": None,
+        }
+
+    def _write_batch(self, batch: List[Tuple]) -> None:
+        """依日期分組、序列化後以一個壓縮區塊附加到各日期的區段檔，並更新索引。"""
+        by_date: Dict[str, List[Tuple[str, bytes]]] = {}
+        for ts, post, decision, reason, terms in batch:
+            dt = datetime.fromtimestamp(ts)
+            iso = dt.isoformat(timespec="seconds")
+            line = fast_json.dumps_bytes({
+                "ts": iso,
+                "run_id": self.run_id,
+                "decision": decision,
+                "reason": reason,
+                "terms": terms,
+                "post": post,
+            })
+            by_date.setdefault(iso[:10], []).append((iso, line))
+
+        touched = []
+        for date, lines in by_date.items():
+            while lines:
+                segment = self._segments.get(date)
+                if segment is None or segment["records"] >= self.segment_max_records:
+                    segment = self._new_segment(date)
+                    self._segments[date] = segment
+                room = self.segment_max_records - segment["records"]
+                chunk, lines = lines[:room], lines[room:]
+
+                data = _compress(b"\n".join(line for _, line in chunk) + b"\n",
+                                 self.compression)
+                path = os.path.join(self.root_dir, segment["path"])
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with open(path, "ab") as f:
+                    f.write(data)
+
+                segment["records"] += len(chunk)
+                segment["size"] += len(data)
+                segment["first_ts"] = segment["first_ts"] or chunk[0][0]
+                segment["last_ts"] = chunk[-1][0]
+                if segment not in touched:
+                    touched.append(segment)
+
+        self.written += len(batch)
+        self._update_index(touched)
+
+    # ========== Index ==========
+
+    def _update_index(self, segments: List[Dict]) -> None:
+        with _locked(self.root_dir):
+            entries = _read_index(self.index_path)
+            if entries is None:
+                entries = _scan_segments(self.root_dir)
+            by_path = {entry["path"]: entry for entry in entries}
+            for segment in segments:
+                by_path[segment["path"]] = dict(segment)
+            _write_index(self.index_path, list(by_path.values()))
+
+
+# ========== Index helpers ==========
+
+@contextmanager
+def _locked(root_dir: str) -> Iterator[None]:
+    """取得 index 的排他鎖（跨行程）。"""
+    os.makedirs(root_dir, exist_ok=True)
+    if fcntl is None:
+        yield
+        return
+    lock_path = os.path.join(root_dir, LOCK_FILENAME)
+    with open(lock_path, "a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _read_index(index_path: str) -> Optional[List[Dict]]:
+    try:
+        with open(index_path, "r", encoding="utf-8") as f:
+            index = fast_json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, fast_json.JSONDecodeError) as e:
+        logger.warning("封存索引損毀，將重建: %s", e)
+        return None
+    if not isinstance(index, dict) or not isinstance(index.get("segments"), list):
+        return None
+    return index["segments"]
+
+
+def _write_index(index_path: str, entries: List[Dict]) -> None:
+    entries.sort(key=lambda e: (e.get("date") or "", e.get("path") or ""))
+    payload = fast_json.dumps_bytes({"version": INDEX_VERSION, "segments": entries})
+    _atomic_write(index_path, payload)
+
+
+def _scan_segments(root_dir: str) -> List[Dict]:
+    """掃描目錄建立索引項目（僅在索引不存在或損毀時使用，不解壓縮）。"""
+    entries = []
+    try:
+        dates = sorted(name for name in os.listdir(root_dir) if _DATE_DIR_RE.match(name))
+    except FileNotFoundError:
+        return entries
+    for date in dates:
+        for name in sorted(os.listdir(os.path.join(root_dir, date))):
+            if not _SEGMENT_NAME_RE.match(name):
+                continue
+            try:
+                size = os.path.getsize(os.path.join(root_dir, date, name))
+            except OSError:
+                continue
+            entries.append({
+                "path": f"{date}/{name}",
+                "date": date,
+                "records": None,
+                "size": size,
+                "first_ts": None,
+                "last_ts": None,
+            })
+    return entries
+
+
+def list_segments(root_dir: str = DEFAULT_ARCHIVE_DIR, since: Optional[str] = None,
+                  until: Optional[str] = None) -> List[Dict]:
+    """
+    列出封存區段（依日期排序），不掃描目錄。
+
+    Args:
+        root_dir: 封存根目錄。
+        since: 起始日期（含，YYYY-MM-DD）。
+        until: 結束日期（含，YYYY-MM-DD）。
+
+    Returns:
+        List[Dict]: 每筆含 path（相對 root_dir）、date、records、size、first_ts、last_ts。
+    """
+    entries = _read_index(os.path.join(root_dir, INDEX_FILENAME))
+    if entries is None:
+        entries = _scan_segments(root_dir)
+    return [
+        entry for entry in entries
+        if (since is None or entry["date"] >= since)
+        and (until is None or entry["date"] <= until)
+    ]
+
+
+def rebuild_index(root_dir: str = DEFAULT_ARCHIVE_DIR) -> int:
+    """重新掃描目錄並重寫索引（逐檔計算筆數與時間範圍），回傳區段數。"""
+    entries = _scan_segments(root_dir)
+    for entry in entries:
+        count, first_ts, last_ts = 0, None, None
+        for record in _iter_segment(os.path.join(root_dir, entry["path"])):
+            count += 1
+            first_ts = first_ts or record.get("ts")
+            last_ts = record.get("ts")
+        entry.update(records=count, first_ts=first_ts, last_ts=last_ts)
+
+    with _locked(root_dir):
+        _write_index(os.path.join(root_dir, INDEX_FILENAME), entries)
+    return len(entries)
+
+
+# ========== Reading ==========
+
+def _iter_segment(path: str) -> Iterator[Dict]:
+    """讀取單一區段檔；結尾不完整（寫入中崩潰）或無法解析的行會略過。"""
+    try:
+        with _open_segment(path) as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    record = fast_json.loads(line)
+                except fast_json.JSONDecodeError:
+                    continue
+                if isinstance(record, dict):
+                    yield record
+    except (OSError, EOFError, RuntimeError) as e:
+        logger.warning("區段檔讀取中斷 %s: %s", path, e)
+
+
+def iter_archive(root_dir: str = DEFAULT_ARCHIVE_DIR, since: Optional[str] = None,
+                 until: Optional[str] = None,
+                 decisions: Optional[Iterable[str]] = None) -> Iterator[Dict]:
+    """
+    串流讀取封存紀錄。
+
+    Args:
+        root_dir: 封存根目錄。
+        since: 起始日期（含，YYYY-MM-DD）。
+        until: 結束日期（含，YYYY-MM-DD）。
+        decisions: 只回傳這些判斷結果的紀錄（None 則全部）。
+
+    Yields:
+        Dict: 封存紀錄（ts、run_id、decision、reason、terms、post）。
+    """
+    wanted = set(decisions) if decisions else None
+    for entry in list_segments(root_dir, since, until):
+        for record in _iter_segment(os.path.join(root_dir, entry["path"])):
+            if wanted is None or record.get("decision") in wanted:
+                yield record
+
+
+def iter_archived_posts(root_dir: str = DEFAULT_ARCHIVE_DIR, since: Optional[str] = None,
+                        until: Optional[str] = None,
+                        decisions: Optional[Iterable[str]] = None) -> Iterator[Dict]:
+    """串流讀取封存的原始貼文（可直接交給 filter_replay.replay_filters 的 posts 參數）。"""
+    for record in iter_archive(root_dir, since, until, decisions):
+        post = record.get("post")
+        if isinstance(post, dict):
+            yield post
+
+
+if __name__ == '__main__':
+    import argparse
+    import sys
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+    parser = argparse.ArgumentParser(
+        description="原始貼文封存工具 - 列出區段、輸出紀錄或重建索引"
+    )
+    parser.add_argument("--dir", default=DEFAULT_ARCHIVE_DIR, help="封存根目錄")
+    parser.add_argument("--since", help="起始日期（YYYY-MM-DD）")
+    parser.add_argument("--until", help="結束日期（YYYY-MM-DD）")
+    parser.add_argument("--list", action="store_true", help="列出區段")
+    parser.add_argument("--dump", action="store_true", help="以 NDJSON 輸出紀錄")
+    parser.add_argument("--decision", action="append", choices=DECISIONS,
+                        help="只輸出指定判斷結果（可重複）")
+    parser.add_argument("--rebuild-index", action="store_true", help="掃描目錄重建索引")
+
+    args = parser.parse_args()
+
+    if args.rebuild_index:
+        print(f"索引已重建: {rebuild_index(args.dir)} 個區段")
+    if args.dump:
+        for record in iter_archive(args.dir, args.since, args.until, args.decision):
+            sys.stdout.write(fast_json.dumps(record) + "\n")
+    if args.list or not (args.rebuild_index or args.dump):
+        for entry in list_segments(args.dir, args.since, args.until):
+            records = entry["records"] if entry["records"] is not None else "?"
+            print(f"{entry['date']}  {records:>8}  {entry['size']:>10}  {entry['path']}")
@@ -0,0 +1,400 @@
+"""
+作者登記表 — 每位作者的近期發文量、歷史分析結果與允許/封鎖名單。
+
+同一關鍵字常被少數帳號反覆洗版，這些貼文通過過濾後全部送 AI 分析，
+浪費 token 也擠掉其他作者的貼文。pipeline 在去重前後加入作者檢查：
+
+1. 封鎖名單（deny）或歷史上全部判定為無關的作者 → 直接排除
+2. 每位作者每次 run 最多 max_posts_per_run 篇（允許名單與出過大魚的作者不受限）
+
+作者統計存在 SQLite，初始化時一次載入記憶體，之後的查詢都是 dict 查詢（O(1)），
+run 結束時以單一交易寫回。寫回的是本次的增量（UPSERT 累加，近期發文量在 SQL 中衰減後相加），
+平行執行的多個 pipeline / report_generator 不會互相覆蓋統計。分析結果由 report_generator.py 回報：
+pipeline 放行的貼文先記為待定（標記 run ID），出現在 analyzed_posts 的記為相關或大魚，
+其餘（AI 判定 IRRELEVANT 未放入結果）記為無關。只結算同一 run 的待定貼文，
+平行執行的其他 agent 的待定貼文不受影響；重複回報也不會重複計入。
+
+run ID 由 --run-id 或環境變數 MONITOR_RUN_ID 指定（web backend 為每個 agent 設定），
+pipeline.py 與 report_generator.py 須使用相同的值。
+
+設定（filters.yml；沒有 authors 區段時不檢查作者、也不建立資料庫）：
+    authors:
+      max_posts_per_run: 5
+      allow: []
+      deny: []
+      auto_deny_after: 10    # 無關次數達此值且從未相關時自動封鎖（0 停用）
+
+用法：
+    python3 src/authors.py --db data/authors.db --top 20
+    python3 src/authors.py --db data/authors.db --show someone
+"""
+
+import logging
+import os
+import re
+import sqlite3
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_AUTHOR_DB = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "data", "authors.db"
+)
+DEFAULT_MAX_POSTS_PER_RUN = 5
+DEFAULT_AUTO_DENY_AFTER = 10
+
+# 近期發文量的半衰期（秒）
+RECENT_HALF_LIFE = 7 * 24 * 3600
+# 待定貼文超過此時間仍未回報分析結果時捨棄（不視為無關）
+PENDING_MAX_AGE = 24 * 3600
+
+# pipeline.py 與 report_generator.py 共用的 run ID 環境變數
+RUN_ID_ENV = "MONITOR_RUN_ID"
+
+# 作者排除原因
+REASON_DENIED = "denied"
+REASON_RATE_LIMITED = "rate_limited"
+
+_LINK_AUTHOR_RE = re.compile(r"/@([^/?#]+)/post/")
+
+_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS authors (
+        author TEXT PRIMARY KEY,
+        recent REAL NOT NULL DEFAULT 0,
+        updated_at REAL NOT NULL DEFAULT 0,
+        seen INTEGER NOT NULL DEFAULT 0,
+        passed INTEGER NOT NULL DEFAULT 0,
+        relevant INTEGER NOT NULL DEFAULT 0,
+        big_fish INTEGER NOT NULL DEFAULT 0,
+        irrelevant INTEGER NOT NULL DEFAULT 0
+    );
+    CREATE TABLE IF NOT EXISTS pending_posts (
+        link TEXT PRIMARY KEY,
+        author TEXT NOT NULL,
+        created_at REAL NOT NULL,
+        run_id TEXT NOT NULL DEFAULT ''
+    );
+"""
+
+_COLUMNS = ("author", "recent", "updated_at", "seen", "passed", "relevant", "big_fish", "irrelevant")
+_COUNTERS = ("seen", "passed", "relevant", "big_fish", "irrelevant")
+
+# 以增量寫回：計數相加，近期發文量先衰減到寫入時間再相加
+_UPSERT = (
+    f"INSERT INTO authors ({', '.join(_COLUMNS)}) VALUES ({', '.join('?' * len(_COLUMNS))}) "
+    "ON CONFLICT(author) DO UPDATE SET "
+    "recent = recent_decay(recent, updated_at, excluded.updated_at) + excluded.recent, "
+    "updated_at = MAX(updated_at, excluded.updated_at), "
+    + ", ".join(f"{c} = {c} + excluded.{c}" for c in _COUNTERS)
+)
+
+
+def author_key(post: Dict) -> Optional[str]:
+    """
+    取得貼文作者的比對鍵（小寫、去除 @）。
+
+    author 欄位缺少時，從 link 的 /@username/post/ 取得。
+
+    Returns:
+        Optional[str]: 無法判斷作者時回傳 None。
+    """
+    author = post.get("author")
+    if not isinstance(author, str) or not author.strip():
+        match = _LINK_AUTHOR_RE.search(post.get("link") or "")
+        if not match:
+            return None
+        author = match.group(1)
+    return author.strip().lstrip("@").lower() or None
+
+
+@dataclass
+class AuthorStats:
+    """單一作者的累計統計。"""
+
+    author: str
+    recent: float = 0.0       # 近期發文量（依 RECENT_HALF_LIFE 衰減）
+    updated_at: float = 0.0
+    seen: int = 0             # 進入作者檢查的篇數
+    passed: int = 0           # 放行送分析的篇數
+    relevant: int = 0         # 分析後放入戰報的篇數（不含大魚）
+    big_fish: int = 0         # 分析後為大魚的篇數
+    irrelevant: int = 0       # 分析後判定無關的篇數
+
+    def recent_at(self, now: float) -> float:
+        """now 時間點的近期發文量。"""
+        return _decay(self.recent, self.updated_at, now)
+
+
+def _decay(recent: float, updated_at: float, now: float) -> float:
+    """updated_at 時的近期發文量 recent 衰減到 now 的值（SQL 中註冊為 recent_decay）。"""
+    if recent <= 0 or now <= updated_at:
+        return recent
+    return recent * 0.5 ** ((now - updated_at) / RECENT_HALF_LIFE)
+
+
+class AuthorRegistry:
+    """
+    作者登記表（SQLite + 記憶體快取）。
+
+    db_path 為 None 時只使用記憶體（名單與每次 run 上限仍然有效，不保存統計）。
+    """
+
+    def __init__(self, db_path: Optional[str] = None, config: Optional[Dict] = None,
+                 run_id: Optional[str] = None):
+        """
+        Args:
+            db_path: SQLite 資料庫路徑。
+            config: filters.yml 的 authors 區段。
+            run_id: 待定貼文所屬的 run ID（None 時只與同樣未指定 run ID 的呼叫互相結算）。
+        """
+        config = config or {}
+        self.max_posts_per_run = int(config.get("max_posts_per_run", DEFAULT_MAX_POSTS_PER_RUN))
+        self.auto_deny_after = int(config.get("auto_deny_after", DEFAULT_AUTO_DENY_AFTER))
+        self.allow = {author_key({"author": a}) for a in config.get("allow") or []} - {None}
+        self.deny = {author_key({"author": a}) for a in config.get("deny") or []} - {None}
+
+        self.run_id = run_id or ""
+        self.db_path = db_path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._cache: Dict[str, AuthorStats] = {}
+        self._deltas: Dict[str, AuthorStats] = {}   # 尚未寫回的增量
+        self._pending: List[Tuple[str, str, float, str]] = []
+        self._run_counts: Dict[str, int] = {}
+
+        if db_path:
+            db_dir = os.path.dirname(db_path)
+            if db_dir:
+                os.makedirs(db_dir, exist_ok=True)
+            self._conn = sqlite3.connect(db_path)
+            self._conn.create_function("recent_decay", 3, _decay)
+            self._conn.executescript(_SCHEMA)
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(pending_posts)")}
+            if "run_id" not in columns:
+                with self._conn:
+                    self._conn.execute(
+                        "ALTER TABLE pending_posts ADD COLUMN run_id TEXT NOT NULL DEFAULT ''"
+                    )
+            for row in self._conn.execute(f"SELECT {', '.join(_COLUMNS)} FROM authors"):
+                self._cache[row[0]] = AuthorStats(*row)
+            logger.debug("AuthorRegistry loaded %d authors from %s", len(self._cache), db_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    def get(self, author: Optional[str]) -> Optional[AuthorStats]:
+        """作者統計（不存在時回傳 None）。"""
+        return self._cache.get(author) if author else None
+
+    def _changes(self, author: str) -> Tuple[AuthorStats, AuthorStats]:
+        """作者的 (快取統計, 待寫回增量)，兩者須做相同的變更。"""
+        stats = self._cache.get(author)
+        if stats is None:
+            stats = self._cache[author] = AuthorStats(author)
+        delta = self._deltas.get(author)
+        if delta is None:
+            delta = self._deltas[author] = AuthorStats(author)
+        return stats, delta
+
+    def _count(self, author: str, counter: str) -> None:
+        for stats in self._changes(author):
+            setattr(stats, counter, getattr(stats, counter) + 1)
+
+    def is_denied(self, author: Optional[str]) -> bool:
+        """作者是否被封鎖（名單或歷史全部無關）。"""
+        if not author or author in self.allow:
+            return False
+        if author in self.deny:
+            return True
+        stats = self._cache.get(author)
+        return (self.auto_deny_after > 0 and stats is not None
+                and stats.irrelevant >= self.auto_deny_after
+                and stats.relevant == 0 and stats.big_fish == 0)
+
+    def is_exempt(self, author: Optional[str]) -> bool:
+        """不受每次 run 上限限制（允許名單或出過大魚）。"""
+        if author in self.allow:
+            return True
+        stats = self._cache.get(author) if author else None
+        return stats is not None and stats.big_fish > 0
+
+    def check(self, author: Optional[str]) -> Optional[str]:
+        """
+        檢查作者是否可放行一篇貼文，並計入本次 run 的發文量。
+
+        Returns:
+            Optional[str]: 排除原因（REASON_DENIED / REASON_RATE_LIMITED），可放行時回傳 None。
+        """
+        if not author:
+            return None
+        if self.is_denied(author):
+            return REASON_DENIED
+        count = self._run_counts.get(author, 0) + 1
+        self._run_counts[author] = count
+        now = time.time()
+        for stats in self._changes(author):
+            stats.recent = stats.recent_at(now) + 1
+            stats.updated_at = now
+            stats.seen += 1
+        if self.max_posts_per_run > 0 and count > self.max_posts_per_run \
+                and not self.is_exempt(author):
+            return REASON_RATE_LIMITED
+        return None
+
+    def record_passed(self, author: Optional[str], link: Optional[str]) -> None:
+        """記錄放行送分析的貼文（分析結果待 record_outcomes 回報）。"""
+        if not author:
+            return
+        self._count(author, "passed")
+        if link:
+            self._pending.append((link, author, time.time(), self.run_id))
+
+    def record_outcomes(self, analyzed: Iterable[Tuple[Dict, bool]]) -> Dict[str, int]:
+        """
+        回報 AI 分析結果並結算本 run 的待定貼文。
+
+        只計入仍為待定的貼文（依 link 比對），結算後即移除，重複回報不會重複計入。
+
+        Args:
+            analyzed: (貼文, 是否為大魚) 序列，即戰報中的 analyzed_posts。
+                未出現在其中的本 run 待定貼文視為無關。
+
+        Returns:
+            Dict[str, int]: {"relevant", "big_fish", "irrelevant"} 各結算篇數。
+        """
+        counts = {"relevant": 0, "big_fish": 0, "irrelevant": 0}
+        pending = self._take_pending()
+        for post, is_big_fish in analyzed:
+            author = pending.pop(post.get("link"), None)
+            if author is None:
+                continue
+            outcome = "big_fish" if is_big_fish else "relevant"
+            self._count(author, outcome)
+            counts[outcome] += 1
+
+        for author in pending.values():
+            self._count(author, "irrelevant")
+            counts["irrelevant"] += 1
+        self.flush()
+        return counts
+
+    def _take_pending(self) -> Dict[str, str]:
+        """
+        取出並移除本 run 的待定貼文。
+
+        超過 PENDING_MAX_AGE 的待定貼文（不論 run）一併捨棄，不視為無關。
+
+        Returns:
+            Dict[str, str]: link → 作者。
+        """
+        cutoff = time.time() - PENDING_MAX_AGE
+        if self._conn is None:
+            taken = {link: author for link, author, created_at, run_id in self._pending
+                     if run_id == self.run_id and created_at >= cutoff}
+            self._pending = [p for p in self._pending if p[3] != self.run_id]
+            return taken
+
+        self.flush()
+        with self._conn:
+            rows = self._conn.execute(
+                "SELECT link, author FROM pending_posts WHERE run_id = ? AND created_at >= ?",
+                (self.run_id, cutoff)
+            ).fetchall()
+            self._conn.execute(
+                "DELETE FROM pending_posts WHERE run_id = ? OR created_at < ?",
+                (self.run_id, cutoff)
+            )
+        return dict(rows)
+
+    def flush(self) -> None:
+        """
+        將統計增量與待定貼文以單一交易寫回 SQLite。
+
+        計數以 UPSERT 累加到資料庫目前的值（不是覆寫載入時的快照），
+        寫回後重新載入這些作者的統計，快取也包含其他行程同時寫入的結果。
+        """
+        if self._conn is None:
+            self._deltas.clear()
+            self._pending.clear()
+            return
+        if not self._deltas and not self._pending:
+            return
+        now = time.time()
+        rows = [
+            (author, delta.recent_at(now), max(now, delta.updated_at))
+            + tuple(getattr(delta, c) for c in _COUNTERS)
+            for author, delta in self._deltas.items()
+        ]
+        with self._conn:
+            self._conn.executemany(_UPSERT, rows)
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO pending_posts (link, author, created_at, run_id) "
+                "VALUES (?, ?, ?, ?)",
+                self._pending
+            )
+        for author in self._deltas:
+            row = self._conn.execute(
+                f"SELECT {', '.join(_COLUMNS)} FROM authors WHERE author = ?", (author,)
+            ).fetchone()
+            self._cache[author] = AuthorStats(*row)
+        self._deltas.clear()
+        self._pending.clear()
+
+    def top(self, limit: int = 20) -> List[AuthorStats]:
+        """近期發文量最多的作者。"""
+        now = time.time()
+        return sorted(self._cache.values(), key=lambda s: -s.recent_at(now))[:limit]
+
+    def close(self) -> None:
+        """寫回變更並關閉連線。"""
+        if self._conn is not None:
+            self.flush()
+            self._conn.close()
+            self._conn = None
+
+
+def registry_from_config(filter_config: Optional[Dict],
+                         db_path: Optional[str] = None,
+                         run_id: Optional[str] = None) -> Optional[AuthorRegistry]:
+    """
+    由 filters.yml 設定建立作者登記表。
+
+    Returns:
+        AuthorRegistry | None: 沒有 authors 區段時回傳 None。
+    """
+    section = (filter_config or {}).get("authors")
+    if not isinstance(section, dict):
+        return None
+    return AuthorRegistry(db_path, section, run_id)
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="作者登記表 - 查看作者發文量與分析結果統計")
+    parser.add_argument("--db", default=DEFAULT_AUTHOR_DB, help="作者資料庫路徑")
+    parser.add_argument("--top", type=int, metavar="N", help="列出近期發文量最多的 N 位作者")
+    parser.add_argument("--show", metavar="AUTHOR", help="顯示單一作者統計")
+    args = parser.parse_args()
+
+    with AuthorRegistry(args.db) as registry:
+        if args.show:
+            stats = registry.get(author_key({"author": args.show}))
+            if stats is None:
+                print(f"找不到作者 {args.show}")
+            else:
+                for name in _COLUMNS:
+                    print(f"{name}: {getattr(stats, name)}")
+        else:
+            now = time.time()
+            for stats in registry.top(args.top or 20):
+                print(f"{stats.author}\t近期 {stats.recent_at(now):.1f}\t放行 {stats.passed}\t"
+                      f"相關 {stats.relevant}\t大魚 {stats.big_fish}\t無關 {stats.irrelevant}")
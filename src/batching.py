@@ -0,0 +1,132 @@
+"""
+分析批次規劃 — 依估計 token 數把 passed_posts 分成適合一次送 AI 分析的批次。
+
+逐篇或隨意分批分析時，每批大小不一，處理量難以預估，
+可能是大魚的貼文也未必先被分析。這裡：
+
+1. 以字元類別估算每篇 token 數：中日韓文字約每字 1 token，
+   ASCII 約每 4 字元 1 token，另加每篇固定開銷（作者、連結、JSON 欄位）
+2. 依優先度排序：含白名單關鍵字（priority_keyword）的貼文最先，
+   其次是有評分加成（bonus_applied）的貼文，同優先度維持原順序
+3. 依序裝入批次，超過 token 上限或篇數上限時換下一批
+   （單篇超過上限時自成一批）
+
+pipeline 依此重新排列 passed_posts，批次以 [start, end) 區間輸出，
+第一批即為最可能出現大魚的貼文。
+
+環境變數：
+    ANALYSIS_BATCH_TOKENS     每批 token 上限（預設 6000）
+    ANALYSIS_BATCH_MAX_POSTS  每批篇數上限（預設 20）
+"""
+
+import os
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+DEFAULT_BATCH_TOKENS = 6000
+DEFAULT_BATCH_MAX_POSTS = 20
+
+# 每篇貼文在 prompt 中的固定開銷（欄位名稱、作者、分隔）
+POST_OVERHEAD_TOKENS = 30
+# ASCII 字元平均每 token 的字元數
+ASCII_CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: Optional[str]) -> int:
+    """
+    估算文字的 token 數（中日韓與其他非 ASCII 字元每字 1 token，ASCII 每 4 字元 1 token）。
+
+    Args:
+        text: 要估算的文字（None 視為空字串）。
+
+    Returns:
+        int: 估計 token 數。
+    """
+    if not text:
+        return 0
+    ascii_chars = len(text.encode("ascii", "ignore"))
+    non_ascii = len(text) - ascii_chars
+    return non_ascii + -(-ascii_chars // ASCII_CHARS_PER_TOKEN)
+
+
+def estimate_post_tokens(post: Dict) -> int:
+    """估算單篇貼文送分析時的 token 數（內容 + 連結 + 固定開銷）。"""
+    return (estimate_tokens(post.get("content"))
+            + estimate_tokens(post.get("link"))
+            + POST_OVERHEAD_TOKENS)
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return max(1, int(os.environ.get(name, default)))
+    except (ValueError, TypeError):
+        return default
+
+
+def get_batch_limits() -> Tuple[int, int]:
+    """從環境變數取得 (每批 token 上限, 每批篇數上限)。"""
+    return (_env_int("ANALYSIS_BATCH_TOKENS", DEFAULT_BATCH_TOKENS),
+            _env_int("ANALYSIS_BATCH_MAX_POSTS", DEFAULT_BATCH_MAX_POSTS))
+
+
+def post_priority(post: Dict) -> int:
+    """貼文的分析優先度：白名單關鍵字 2、評分加成 1，可相加。"""
+    return 2 * bool(post.get("priority_keyword")) + bool(post.get("bonus_applied"))
+
+
+@dataclass(frozen=True)
+class Batch:
+    """一個分析批次：排序後貼文列表的 [start, end) 區間。"""
+
+    start: int
+    end: int
+    estimated_tokens: int
+    priority_posts: int     # 批次中優先貼文的篇數
+
+    def to_dict(self) -> Dict:
+        return {
+            "start": self.start,
+            "end": self.end,
+            "count": self.end - self.start,
+            "estimated_tokens": self.estimated_tokens,
+            "priority_posts": self.priority_posts,
+        }
+
+
+def plan_batches(
+    posts: Sequence[Dict],
+    max_tokens: int = DEFAULT_BATCH_TOKENS,
+    max_posts: int = DEFAULT_BATCH_MAX_POSTS,
+    priority: Optional[Callable[[Dict], int]] = None,
+) -> Tuple[List[Dict], List[Batch]]:
+    """
+    依優先度排序貼文並分成批次。
+
+    Args:
+        posts: 要分析的貼文。
+        max_tokens: 每批估計 token 上限。
+        max_posts: 每批篇數上限。
+        priority: 回傳貼文優先度的函式（越大越先分析，0 為一般貼文；預設 post_priority）。
+
+    Returns:
+        Tuple[List[Dict], List[Batch]]: (排序後的貼文, 批次列表)。
+    """
+    priority = priority or post_priority
+    ranked = sorted(
+        ((priority(post), i, post) for i, post in enumerate(posts)),
+        key=lambda item: (-item[0], item[1]),
+    )
+    ordered = [post for _, _, post in ranked]
+
+    batches: List[Batch] = []
+    start = tokens = urgent = 0
+    for i, (rank, _, post) in enumerate(ranked):
+        cost = estimate_post_tokens(post)
+        if i > start and (tokens + cost > max_tokens or i - start >= max_posts):
+            batches.append(Batch(start, i, tokens, urgent))
+            start, tokens, urgent = i, 0, 0
+        tokens += cost
+        urgent += rank > 0
+    if ranked:
+        batches.append(Batch(start, len(ranked), tokens, urgent))
+    return ordered, batches
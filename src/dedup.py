@@ -1,10 +1,39 @@
+import hashlib
 import logging
 import os
+import re
 import sqlite3
 from typing import Optional
 
+from normalize import normalize_text
+
 logger = logging.getLogger(__name__)
 
+# 內容指紋忽略的字元（空白、標點、表情符號）
+_FINGERPRINT_STRIP_RE = re.compile(r"[\W_]+")
+
+
+def content_fingerprint(text: Optional[str], normalized: bool = False) -> Optional[str]:
+    """
+    貼文內容的指紋，用於找出換個連結重發的相同內容。
+
+    內容先經 normalize.py 正規化（全形/半形、零寬字元、中文字間空白），
+    再移除空白與標點並轉小寫，只差在這些變體的貼文會得到相同指紋。
+
+    Args:
+        text: 貼文內容。
+        normalized: text 是否已正規化（例如 pipeline 過濾時的比對文字，可省去重算）。
+
+    Returns:
+        Optional[str]: 指紋（hex），內容沒有文字時回傳 None。
+    """
+    if not normalized:
+        text = normalize_text(text)
+    text = _FINGERPRINT_STRIP_RE.sub("", text or "").lower()
+    if not text:
+        return None
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
 
 class DedupManager:
     """
@@ -50,6 +79,14 @@ class DedupManager:
             ON processed_posts(processed_at)
         """)
 
+        # 內容指紋（見 content_fingerprint）
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS processed_contents (
+                fingerprint TEXT PRIMARY KEY,
+                processed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+
         conn.commit()
         conn.close()
         logger.debug("Database and table ensured")
@@ -127,6 +164,63 @@ class DedupManager:
             logger.error("Failed to check post_id %s: %s", post_id, e)
             return False
 
+    def add_content(self, fingerprint: Optional[str]) -> bool:
+        """
+        新增已處理的內容指紋
+
+        Args:
+            fingerprint: content_fingerprint 的結果
+
+        Returns:
+            bool: True = 新增成功，False = 新增失敗（重複或無效）
+        """
+        if not fingerprint:
+            return False
+
+        try:
+            conn = sqlite3.connect(self.db_path)
+            with conn:
+                conn.execute(
+                    "INSERT INTO processed_contents (fingerprint) VALUES (?)",
+                    (fingerprint,)
+                )
+            conn.close()
+            return True
+
+        except sqlite3.IntegrityError:
+            logger.debug("Duplicate content fingerprint: %s", fingerprint)
+            return False
+
+        except Exception as e:
+            logger.error("Failed to add content fingerprint %s: %s", fingerprint, e)
+            return False
+
+    def is_content_processed(self, fingerprint: Optional[str]) -> bool:
+        """
+        檢查內容指紋是否已處理過
+
+        Args:
+            fingerprint: content_fingerprint 的結果
+
+        Returns:
+            bool: True = 已處理過，False = 未處理
+        """
+        if not fingerprint:
+            return False
+
+        try:
+            conn = sqlite3.connect(self.db_path)
+            result = conn.execute(
+                "SELECT 1 FROM processed_contents WHERE fingerprint = ? LIMIT 1",
+                (fingerprint,)
+            ).fetchone()
+            conn.close()
+            return result is not None
+
+        except Exception as e:
+            logger.error("Failed to check content fingerprint %s: %s", fingerprint, e)
+            return False
+
     def get_processed_count(self) -> int:
         """
         取得已處理貼文總數
@@ -158,6 +252,7 @@ class DedupManager:
 
             cursor.execute("DELETE FROM processed_posts")
             deleted_count = cursor.rowcount
+            cursor.execute("DELETE FROM processed_contents")
 
             conn.commit()
             conn.close()
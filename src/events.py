@@ -0,0 +1,189 @@
+"""
+結構化事件通道 — 以 JSONL 檔案回報進度事件與最終結果給 web backend。
+
+backend 啟動 agent 時會設定環境變數 MONITOR_EVENTS_FILE，
+agent、pipeline.py 與 report_generator.py 將事件逐行附加到該檔案，
+backend 再以 EventFileReader 增量讀取，不必逐行用 regex 解析 stdout。
+未設定 MONITOR_EVENTS_FILE 時，所有 emit 呼叫皆為 no-op。
+
+每行格式：{"type": "<事件類型>", "data": {...}}
+
+用法：
+    python3 src/events.py keyword_progress --data '{"keyword": "內湖", "current": 1, "total": 2}'
+    python3 src/events.py status --data '{"message": "抽取到 12 篇"}'
+    python3 src/events.py post --input /tmp/threads_batch.json   # 單篇或貼文陣列
+    python3 src/events.py result --input /tmp/threads_analysis.json
+"""
+
+import logging
+import os
+import sys
+from typing import Dict, List, Optional
+
+import fast_json
+
+logger = logging.getLogger(__name__)
+
+EVENTS_FILE_ENV = "MONITOR_EVENTS_FILE"
+
+# 進度事件（會轉送給前端）、單篇分析結果事件與最終結果事件
+PROGRESS_EVENT_TYPES = ("status", "keyword_progress", "pipeline_stats")
+POST_EVENT_TYPE = "post"
+RESULT_EVENT_TYPE = "result"
+EVENT_TYPES = PROGRESS_EVENT_TYPES + (POST_EVENT_TYPE, RESULT_EVENT_TYPE)
+
+
+def get_events_path() -> Optional[str]:
+    """取得事件檔路徑（環境變數 MONITOR_EVENTS_FILE），未設定時回傳 None。"""
+    return os.environ.get(EVENTS_FILE_ENV) or None
+
+
+def emit_event(event_type: str, data: Dict, path: Optional[str] = None) -> bool:
+    """
+    附加一筆事件到事件檔。
+
+    每筆事件以單次 O_APPEND 寫入，多個行程同時寫入同一檔案時不會交錯。
+
+    Args:
+        event_type: 事件類型（見 EVENT_TYPES）。
+        data: 事件內容（可 JSON 序列化的字典）。
+        path: 事件檔路徑（None 則讀取環境變數 MONITOR_EVENTS_FILE）。
+
+    Returns:
+        bool: True = 已寫入，False = 未設定事件檔或寫入失敗。
+    """
+    if event_type not in EVENT_TYPES:
+        logger.warning("Unknown event type: %s", event_type)
+        return False
+
+    if path is None:
+        path = get_events_path()
+    if not path:
+        return False
+
+    payload = fast_json.dumps_bytes({"type": event_type, "data": data}) + b"\n"
+
+    try:
+        fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+        try:
+            view = memoryview(payload)
+            while view:
+                written = os.write(fd, view)
+                view = view[written:]
+        finally:
+            os.close(fd)
+    except OSError as e:
+        logger.error("Failed to write event to %s: %s", path, e)
+        return False
+
+    return True
+
+
+class EventFileReader:
+    """
+    事件檔增量讀取器
+
+    記住上次讀取的位移，每次 read_new() 只讀新附加的內容；
+    尚未寫完（沒有換行結尾）的最後一行會保留到下次再解析。
+    """
+
+    def __init__(self, path: str):
+        """
+        初始化讀取器
+
+        Args:
+            path: 事件檔路徑（檔案可以尚未存在）
+        """
+        self.path = path
+        self._offset = 0
+        self._partial = b""
+
+    def read_new(self) -> List[Dict]:
+        """
+        讀取自上次呼叫以來新增的完整事件。
+
+        Returns:
+            List[Dict]: 事件列表（格式錯誤或類型不明的行會被略過）。
+        """
+        try:
+            with open(self.path, 'rb') as f:
+                f.seek(self._offset)
+                chunk = f.read()
+        except FileNotFoundError:
+            return []
+        except OSError as e:
+            logger.error("Failed to read events from %s: %s", self.path, e)
+            return []
+
+        if not chunk:
+            return []
+
+        self._offset += len(chunk)
+        buffer = self._partial + chunk
+        lines = buffer.split(b"\n")
+        self._partial = lines.pop()
+
+        events = []
+        for raw in lines:
+            if not raw.strip():
+                continue
+            try:
+                event = fast_json.loads(raw)
+            except (UnicodeDecodeError, fast_json.JSONDecodeError) as e:
+                logger.warning("Skipping malformed event line: %s", e)
+                continue
+            if (
+                not isinstance(event, dict)
+                or event.get("type") not in EVENT_TYPES
+                or not isinstance(event.get("data"), dict)
+            ):
+                logger.warning("Skipping invalid event: %r", raw[:100])
+                continue
+            events.append(event)
+
+        return events
+
+
+if __name__ == '__main__':
+    import argparse
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+    parser = argparse.ArgumentParser(
+        description="結構化事件工具 - 附加事件到 MONITOR_EVENTS_FILE"
+    )
+    parser.add_argument("type", choices=EVENT_TYPES, help="事件類型")
+    parser.add_argument("--data", help="事件內容（JSON 物件字串）")
+    parser.add_argument("--input", help="從 JSON 檔案讀取事件內容")
+
+    args = parser.parse_args()
+
+    try:
+        if args.input:
+            with open(args.input, 'r', encoding='utf-8') as f:
+                data = fast_json.load(f)
+        else:
+            data = fast_json.loads(args.data or "{}")
+    except (fast_json.JSONDecodeError, FileNotFoundError) as e:
+        print(f"錯誤: 無法讀取事件內容 - {e}", file=sys.stderr)
+        sys.exit(2)
+
+    # post 事件可一次傳入整批已分析貼文，逐篇寫入
+    if args.type == POST_EVENT_TYPE and isinstance(data, list):
+        items = data
+    else:
+        items = [data]
+
+    if not all(isinstance(item, dict) for item in items):
+        print("錯誤: 事件內容必須是 JSON 物件", file=sys.stderr)
+        sys.exit(2)
+
+    if not get_events_path():
+        # 非 web dashboard 啟動（未設定事件檔）時安靜略過
+        sys.exit(0)
+
+    ok = all([emit_event(args.type, item) for item in items])
+    sys.exit(0 if ok else 1)
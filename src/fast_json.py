@@ -0,0 +1,92 @@
+"""
+快速 JSON 序列化層 — 有安裝 orjson 時使用 orjson，否則退回標準庫 json。
+
+src/ 的 CLI 與 web backend 一律透過這個模組讀寫 JSON，
+輸出格式與 json.dumps(..., ensure_ascii=False) 相容（UTF-8、不跳脫中文）。
+
+用法：
+    from fast_json import dumps, loads
+    text = dumps(data)              # 緊湊輸出
+    text = dumps(data, indent=True) # 2 格縮排
+"""
+
+import json
+from typing import IO, Any, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# orjson.JSONDecodeError 是 json.JSONDecodeError 的子類別，捕捉這個即可涵蓋兩種實作
+JSONDecodeError = json.JSONDecodeError
+
+
+def has_orjson() -> bool:
+    """目前是否使用 orjson。"""
+    return orjson is not None
+
+
+def dumps_bytes(obj: Any, indent: bool = False) -> bytes:
+    """
+    將物件序列化為 UTF-8 bytes。
+
+    Args:
+        obj: 可 JSON 序列化的物件。
+        indent: True 則以 2 格縮排輸出。
+
+    Returns:
+        bytes: UTF-8 編碼的 JSON。
+    """
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, option=option)
+    return dumps(obj, indent=indent).encode("utf-8")
+
+
+def dumps(obj: Any, indent: bool = False) -> str:
+    """
+    將物件序列化為 JSON 字串（不跳脫非 ASCII 字元）。
+
+    Args:
+        obj: 可 JSON 序列化的物件。
+        indent: True 則以 2 格縮排輸出。
+
+    Returns:
+        str: JSON 字串。
+    """
+    if orjson is not None:
+        return dumps_bytes(obj, indent=indent).decode("utf-8")
+    if indent:
+        return json.dumps(obj, ensure_ascii=False, indent=2)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+
+def loads(data: Union[str, bytes, bytearray, memoryview]) -> Any:
+    """
+    解析 JSON 字串或 bytes。
+
+    Raises:
+        JSONDecodeError: 內容不是合法的 JSON。
+        TypeError: data 型別不正確（例如 None）。
+    """
+    if not isinstance(data, (str, bytes, bytearray, memoryview)):
+        # orjson 對錯誤型別拋 JSONDecodeError，統一成標準庫的 TypeError
+        raise TypeError(f"JSON 輸入必須是 str 或 bytes，收到 {type(data).__name__}")
+    if orjson is not None:
+        return orjson.loads(data)
+    if isinstance(data, memoryview):
+        data = data.tobytes()
+    return json.loads(data)
+
+
+def load(fp: IO) -> Any:
+    """從檔案物件讀取並解析 JSON（文字或二進位模式皆可）。"""
+    return loads(fp.read())
+
+
+def dump(obj: Any, fp: IO[str], indent: bool = False) -> None:
+    """將物件序列化後寫入文字模式的檔案物件。"""
+    fp.write(dumps(obj, indent=indent))
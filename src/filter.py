@@ -1,10 +1,213 @@
 import logging
 import os
+import tempfile
 import yaml
-from typing import Dict, List, Optional
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows：不支援檔案鎖，退回無鎖更新
+    fcntl = None
+
+import fast_json
+
+from filter_rules import compile_rules
+from matcher import KeywordMatcher
+from normalize import normalizer_from_config
 
 logger = logging.getLogger(__name__)
 
+# 判斷動作
+ACTION_KEEP = "keep"
+ACTION_FILTER = "filter"
+
+# 原因代碼
+REASON_EMPTY = "empty"                  # 內容為 None 或空字串
+REASON_TOO_SHORT = "too_short"          # 短於 min_content_length
+REASON_PRIORITY_KEEP = "priority_keep"  # 命中排除詞或規則，但因白名單保留
+REASON_EXCLUDE = "exclude"              # 命中硬性排除詞
+REASON_EXCLUDE_RULE = "exclude_rule"    # 命中 exclude_rules（matched_terms 為規則名稱）
+REASON_NO_MATCH = "no_match"            # 都沒命中，保留
+
+
+@dataclass(frozen=True)
+class FilterDecision:
+    """單篇內容的過濾判斷：動作、原因代碼與造成判斷的詞（依設定檔順序）。"""
+
+    action: str
+    reason: str
+    matched_terms: Tuple[str, ...] = ()
+
+    @property
+    def filtered(self) -> bool:
+        """True = 應該過濾（丟棄）。"""
+        return self.action == ACTION_FILTER
+
+
+@dataclass
+class FilterCounters:
+    """
+    過濾判斷的彙總計數。
+
+    取代逐篇、逐詞的 logger 呼叫：迴圈內只累加計數，結束後輸出一次摘要。
+    """
+
+    reasons: Dict[str, int] = field(default_factory=dict)
+    terms: Dict[str, int] = field(default_factory=dict)
+
+    def add(self, decision: FilterDecision) -> None:
+        """累加一篇的判斷結果。"""
+        self.reasons[decision.reason] = self.reasons.get(decision.reason, 0) + 1
+        for term in decision.matched_terms:
+            self.terms[term] = self.terms.get(term, 0) + 1
+
+    def summary(self, max_terms: int = 10) -> str:
+        """一行摘要：各原因篇數與命中最多的詞。"""
+        reasons = ", ".join(f"{reason}={count}" for reason, count in
+                            sorted(self.reasons.items(), key=lambda kv: -kv[1]))
+        top = sorted(self.terms.items(), key=lambda kv: -kv[1])[:max_terms]
+        if not top:
+            return reasons
+        return f"{reasons}; " + ", ".join(f"{term}×{count}" for term, count in top)
+
+
+# 自適應排序：歷史上最常命中的排除詞先檢查
+HOT_TERMS_MAX = 8
+HOT_MIN_RATE = 0.001   # 命中率至少千分之一才列為優先檢查
+STATS_DECAY = 0.9      # 每次更新時既有統計的衰減係數，讓舊的命中模式逐漸淡出
+STATS_VERSION = 1
+
+
+@dataclass
+class FilterHitStats:
+    """
+    跨 run 持久化的排除詞命中統計（JSON 檔）。
+
+    compile_filter_config 依此決定 should_filter 優先檢查哪些排除詞；
+    只影響檢查順序，不影響判斷結果。
+    """
+
+    evaluated: float = 0.0    # 通過長度檢查的篇數
+    excluded: float = 0.0     # 命中排除詞或排除規則的篇數（含被白名單救回）
+    terms: Dict[str, float] = field(default_factory=dict)
+
+    @classmethod
+    def load(cls, path: Optional[str]) -> "FilterHitStats":
+        """讀取統計檔；不存在或損毀時回傳空統計。"""
+        if not path:
+            return cls()
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = fast_json.load(f)
+        except FileNotFoundError:
+            return cls()
+        except (OSError, fast_json.JSONDecodeError) as e:
+            logger.warning("過濾統計檔損毀，忽略: %s", e)
+            return cls()
+        if not isinstance(data, dict) or not isinstance(data.get("terms"), dict):
+            return cls()
+        return cls(evaluated=float(data.get("evaluated", 0)),
+                   excluded=float(data.get("excluded", 0)),
+                   terms={str(k): float(v) for k, v in data["terms"].items()})
+
+    def add(self, counters: FilterCounters, decay: float = 1.0) -> None:
+        """以衰減係數縮放既有統計後，併入一次 run 的 FilterCounters。"""
+        reasons = counters.reasons
+        self.evaluated = self.evaluated * decay + sum(
+            count for reason, count in reasons.items()
+            if reason not in (REASON_EMPTY, REASON_TOO_SHORT)
+        )
+        self.excluded = self.excluded * decay + sum(
+            reasons.get(reason, 0)
+            for reason in (REASON_EXCLUDE, REASON_EXCLUDE_RULE, REASON_PRIORITY_KEEP)
+        )
+        terms = {term: count * decay for term, count in self.terms.items()}
+        for term, count in counters.terms.items():
+            terms[term] = terms.get(term, 0.0) + count
+        # 衰減到幾乎為 0 的詞不再保留
+        self.terms = {term: count for term, count in terms.items() if count >= 0.01}
+
+    def hot_terms(self, limit: int = HOT_TERMS_MAX,
+                  min_rate: float = HOT_MIN_RATE) -> List[str]:
+        """命中率最高的詞（由高到低）。"""
+        if self.evaluated <= 0:
+            return []
+        ranked = sorted(self.terms.items(), key=lambda kv: (-kv[1], kv[0]))
+        return [term for term, count in ranked[:limit] if count / self.evaluated >= min_rate]
+
+    def to_dict(self) -> Dict:
+        return {
+            "version": STATS_VERSION,
+            "evaluated": round(self.evaluated, 3),
+            "excluded": round(self.excluded, 3),
+            "terms": {term: round(count, 3) for term, count in
+                      sorted(self.terms.items(), key=lambda kv: -kv[1])},
+        }
+
+    def save(self, path: str) -> None:
+        """原子寫入統計檔（暫存檔 + os.replace）。"""
+        directory = os.path.dirname(path) or "."
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp_")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(fast_json.dumps_bytes(self.to_dict(), indent=True))
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+
+
+def update_hit_stats(path: str, counters: FilterCounters,
+                     decay: float = STATS_DECAY) -> FilterHitStats:
+    """
+    將一次 run 的計數併入統計檔。
+
+    讀取、合併、寫回期間持有檔案鎖，平行的 agent 同時更新也不會互相覆蓋。
+
+    Args:
+        path: 統計檔路徑。
+        counters: 本次 run 的 FilterCounters。
+        decay: 既有統計的衰減係數。
+
+    Returns:
+        FilterHitStats: 更新後的統計。
+    """
+    with _locked(path):
+        stats = FilterHitStats.load(path)
+        stats.add(counters, decay)
+        stats.save(path)
+    return stats
+
+
+@contextmanager
+def _locked(path: str) -> Iterator[None]:
+    """取得統計檔的排他鎖（跨行程，鎖檔為 <path>.lock）。"""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    if fcntl is None:
+        yield
+        return
+    with open(path + ".lock", "a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _identity(text: str) -> str:
+    return text
+
+
+_EMPTY = FilterDecision(ACTION_FILTER, REASON_EMPTY)
+_TOO_SHORT = FilterDecision(ACTION_FILTER, REASON_TOO_SHORT)
+_NO_MATCH = FilterDecision(ACTION_KEEP, REASON_NO_MATCH)
+
 
 def load_filter_config(config_path: str) -> Dict:
     """
@@ -29,58 +232,223 @@ def load_filter_config(config_path: str) -> Dict:
     return config
 
 
-def should_filter_content(content: Optional[str], config: Dict) -> bool:
+def evaluate_content(content: Optional[str], config: Dict) -> FilterDecision:
     """
-    判斷內容是否應該被過濾
+    判斷內容是否應該被過濾，並說明原因
 
-    過濾邏輯：
+    過濾邏輯（白名單優先）：
     1. 檢查內容長度（太短則過濾）
-    2. 檢查白名單關鍵字（優先級最高，有則保留）
-    3. 檢查硬性排除詞（有則過濾）
-    4. 都沒匹配則保留
+    2. 檢查硬性排除詞與 exclude_rules 組合規則，都沒命中則保留
+    3. 命中時檢查白名單關鍵字（有則保留，原因為 priority_keep）
+    4. 否則過濾
+
+    白名單只在命中排除條件時才有作用，因此先檢查排除條件，
+    大部分沒有命中的貼文不需比對白名單；結果與先查白名單完全相同。
+    命中的詞在同一次比對中收集，不需另外掃描。
+    設定 normalize_text 時，內容與關鍵字都先正規化再比對（見 normalize.py）；
+    長度檢查仍以原始內容為準。
+    大量內容請改用 compile_filter_config（exclude_rules 只需編譯一次）。
 
     Args:
         content: 要檢查的內容
         config: 過濾設定字典
 
     Returns:
-        bool: True = 應該過濾（丟棄），False = 應該保留
+        FilterDecision: 動作、原因代碼與命中的白名單詞、排除詞或規則名稱
     """
     # 處理 None 或空字串
     if not content:
-        logger.debug("Content is None or empty, filtering")
-        return True
+        return _EMPTY
 
     # 1. 檢查內容長度
-    min_length = config.get('min_content_length', 0)
-    if len(content) < min_length:
-        logger.debug("Content too short (%d < %d), filtering", len(content), min_length)
-        return True
-
-    # 2. 檢查白名單（優先級最高）
-    priority_keywords = config.get('priority_keep_keywords', [])
-    for keyword in priority_keywords:
-        if keyword in content:
-            logger.info("Content contains priority keyword '%s', keeping", keyword)
-            return False  # 保留
-
-    # 3. 檢查硬性排除詞
-    hard_exclude = config.get('hard_exclude', [])
+    if len(content) < config.get('min_content_length', 0):
+        return _TOO_SHORT
+
+    normalize = normalizer_from_config(config)
+    if normalize is None:
+        text = content
+        normalize = _identity
+    else:
+        text = normalize(content)
+
+    # 2. 檢查硬性排除詞（跳過太短的排除詞，避免誤判）與組合規則
     min_exclude_length = config.get('min_exclude_word_length', 0)
+    excluded = [
+        word for word in config.get('hard_exclude', []) or []
+        if len(word) >= min_exclude_length and normalize(word) in text
+    ]
+    rules: Tuple[str, ...] = ()
+    if not excluded and config.get('exclude_rules'):
+        rules = compile_rules(config['exclude_rules'], normalizer_from_config(config)).match(text)
+    if not excluded and not rules:
+        return _NO_MATCH
+
+    # 3. 檢查白名單（優先級最高）
+    priority = [kw for kw in config.get('priority_keep_keywords', []) or [] if normalize(kw) in text]
+    if priority:
+        return FilterDecision(ACTION_KEEP, REASON_PRIORITY_KEEP, tuple(dict.fromkeys(priority)))
+
+    # 4. 過濾
+    if excluded:
+        return FilterDecision(ACTION_FILTER, REASON_EXCLUDE, tuple(dict.fromkeys(excluded)))
+    return FilterDecision(ACTION_FILTER, REASON_EXCLUDE_RULE, rules)
+
+
+def should_filter_content(content: Optional[str], config: Dict) -> bool:
+    """
+    判斷內容是否應該被過濾（只需要結果時使用，原因見 evaluate_content）
+
+    Args:
+        content: 要檢查的內容
+        config: 過濾設定字典
+
+    Returns:
+        bool: True = 應該過濾（丟棄），False = 應該保留
+    """
+    return evaluate_content(content, config).filtered
+
+
+class CompiledFilter:
+    """
+    預先編譯的過濾設定。
+
+    白名單與排除詞各建一個 KeywordMatcher，每篇內容只需各比對一次，
+    判斷結果與 should_filter_content 完全相同。大量貼文（pipeline、回放工具）
+    應先以 compile_filter_config 編譯一次再重複使用。
+
+    設定啟用 normalize_text 時，關鍵字在編譯時正規化，內容在比對前正規化；
+    命中詞一律回報設定檔中的原始寫法。exclude_rules 也在此時編譯（見 filter_rules.py），
+    格式錯誤會立即拋出 ValueError。
+
+    檢查順序依成本與命中率安排（判斷結果不變）：長度 → 歷史上最常命中的排除詞
+    （hot_terms，逐一 `in`）→ 其餘排除詞 → 組合規則 → 只有命中排除條件時才查白名單。
+    """
+
+    def __init__(self, config: Dict, hot_terms: Optional[Iterable[str]] = None):
+        config = config or {}
+        self.min_content_length = config.get('min_content_length', 0)
+        self.priority_keep_keywords: List[str] = list(config.get('priority_keep_keywords', []) or [])
+
+        min_exclude_length = config.get('min_exclude_word_length', 0)
+        hard_exclude = list(config.get('hard_exclude', []) or [])
+        # 太短的排除詞在編譯時就略過（同 should_filter_content）
+        self.hard_exclude: List[str] = [w for w in hard_exclude if len(w) >= min_exclude_length]
+        self.skipped_exclude: List[str] = [w for w in hard_exclude if len(w) < min_exclude_length]
+
+        self.normalize = normalizer_from_config(config)
+        normalize = self.normalize or _identity
+        self._priority = KeywordMatcher(normalize(kw) for kw in self.priority_keep_keywords)
+        self._exclude = KeywordMatcher(normalize(kw) for kw in self.hard_exclude)
+
+        # should_filter 先逐一檢查 hot_terms，沒命中才用其餘排除詞的比對器
+        valid = set(self.hard_exclude)
+        self.hot_terms: List[str] = [t for t in dict.fromkeys(hot_terms or ()) if t in valid]
+        hot = set(self.hot_terms)
+        self._hot = [normalize(t) for t in self.hot_terms]
+        self._cold = KeywordMatcher(normalize(kw) for kw in self.hard_exclude if kw not in hot)
+        self._rules = compile_rules(config.get('exclude_rules'), self.normalize)
+
+    def match_text(self, content: Optional[str]) -> str:
+        """比對用文字（未啟用正規化時即為原始內容）。"""
+        if self.normalize is None:
+            return content or ""
+        return self.normalize(content)
 
-    for exclude_word in hard_exclude:
-        # 跳過太短的排除詞（避免誤判）
-        if len(exclude_word) < min_exclude_length:
-            logger.debug("Skipping exclude word '%s' (too short)", exclude_word)
-            continue
+    def is_too_short(self, content: Optional[str]) -> bool:
+        """內容為空或短於 min_content_length。"""
+        return not content or len(content) < self.min_content_length
 
-        if exclude_word in content:
-            logger.info("Content contains exclude word '%s', filtering", exclude_word)
-            return True  # 過濾
+    @staticmethod
+    def _terms(matcher: KeywordMatcher, terms: List[str], text: str) -> Tuple[str, ...]:
+        """命中的原始詞（依設定檔順序、不重複）。"""
+        return tuple(dict.fromkeys(terms[i] for i in sorted(matcher.find_indices(text))))
 
-    # 4. 都沒匹配，保留
-    logger.debug("Content passed all filters, keeping")
-    return False
+    def priority_hits(self, content: str) -> Set[str]:
+        """內容中出現的白名單關鍵字。"""
+        return set(self._terms(self._priority, self.priority_keep_keywords,
+                               self.match_text(content)))
+
+    def has_priority(self, text: str) -> bool:
+        """比對用文字（match_text 的結果）是否含白名單關鍵字。"""
+        return self._priority.matches_any(text)
+
+    def exclude_hits(self, content: str) -> Set[str]:
+        """內容中出現的（有效）排除詞。"""
+        return set(self._terms(self._exclude, self.hard_exclude, self.match_text(content)))
+
+    def rule_hits(self, content: str) -> Tuple[str, ...]:
+        """內容命中的 exclude_rules 規則名稱（依設定檔順序）。"""
+        return self._rules.match(self.match_text(content))
+
+    def should_filter(self, content: Optional[str]) -> bool:
+        """
+        判斷內容是否應該被過濾（同 should_filter_content）。
+
+        Returns:
+            bool: True = 應該過濾（丟棄），False = 應該保留
+        """
+        if self.is_too_short(content):
+            return True
+        text = self.match_text(content)
+        for term in self._hot:
+            if term in text:
+                break
+        else:
+            if not self._cold.matches_any(text) and not self._rules.matches_any(text):
+                return False
+        # 命中排除條件：白名單優先
+        return not self._priority.matches_any(text)
+
+    def evaluate(self, content: Optional[str], text: Optional[str] = None) -> FilterDecision:
+        """
+        判斷內容並說明原因（同 evaluate_content）。
+
+        檢查順序同 should_filter：hot_terms 命中即停，其餘排除詞只判斷有無；
+        確定會因排除詞過濾後，才完整比對一次排除詞作為說明。
+        沒命中排除條件時不查白名單。
+
+        Args:
+            content: 原始內容（長度檢查用）。
+            text: 已由 match_text 取得的比對文字（None 則自動計算）。
+        """
+        if not content:
+            return _EMPTY
+        if len(content) < self.min_content_length:
+            return _TOO_SHORT
+        if text is None:
+            text = self.match_text(content)
+        excluded = any(term in text for term in self._hot) or self._cold.matches_any(text)
+        rules = () if excluded else self._rules.match(text)
+        if not excluded and not rules:
+            return _NO_MATCH
+        priority = self._terms(self._priority, self.priority_keep_keywords, text)
+        if priority:
+            return FilterDecision(ACTION_KEEP, REASON_PRIORITY_KEEP, priority)
+        if excluded:
+            return FilterDecision(ACTION_FILTER, REASON_EXCLUDE,
+                                  self._terms(self._exclude, self.hard_exclude, text))
+        return FilterDecision(ACTION_FILTER, REASON_EXCLUDE_RULE, rules)
+
+
+def compile_filter_config(config: Dict,
+                          hit_stats: Optional[FilterHitStats] = None) -> CompiledFilter:
+    """
+    編譯過濾設定，供大量內容重複判斷。
+
+    Args:
+        config: load_filter_config 回傳的設定字典
+        hit_stats: 歷史命中統計（提供時最常命中的排除詞會優先檢查）
+
+    Returns:
+        CompiledFilter: 編譯後的過濾器
+    """
+    hot_terms = hit_stats.hot_terms() if hit_stats is not None else None
+    compiled = CompiledFilter(config, hot_terms=hot_terms)
+    if compiled.skipped_exclude:
+        logger.debug("Skipping exclude words (too short): %s", compiled.skipped_exclude)
+    if compiled.hot_terms:
+        logger.debug("Hot exclude words checked first: %s", compiled.hot_terms)
+    return compiled
 
 
 if __name__ == '__main__':
@@ -103,14 +471,17 @@ if __name__ == '__main__':
 
     try:
         config = load_filter_config(args.config)
-        should_filter = should_filter_content(args.content, config)
+        decision = evaluate_content(args.content, config)
+        detail = f"原因: {decision.reason}"
+        if decision.matched_terms:
+            detail += f"（{', '.join(decision.matched_terms)}）"
 
-        if should_filter:
+        if decision.filtered:
             print("FILTERED 內容被過濾（應該丟棄）")
-            sys.exit(0)
         else:
             print("PASS 內容通過過濾（應該保留）")
-            sys.exit(0)
+        print(detail)
+        sys.exit(0)
 
     except FileNotFoundError as e:
         print(f"錯誤: {e}", file=sys.stderr)
@@ -0,0 +1,474 @@
+"""
+過濾規則回放工具 — 以封存的 pipeline 輸入驗證 filters.yml 的修改影響。
+
+串流讀取封存的原始貼文（JSON / NDJSON，可 gzip / zstd 壓縮，
+或 archive.py 的封存目錄），以 CompiledFilter
+對候選設定逐篇判斷，並以多個 process 平行處理，最後彙整：
+1. 每個 hard_exclude 詞與 exclude_rules 規則排除了幾篇、每個 priority_keep_keywords 詞救回了幾篇
+2. 設定啟用 preclassify 時，垃圾預分類各原因排除了幾篇（與 pipeline 相同，白名單救回的貼文不判斷）
+3. 被過濾的篇數與估計省下的 AI 分析 token / 成本
+4. 若提供基準設定：與基準相比新增過濾、不再過濾的篇數
+
+用法：
+    python3 src/filter_replay.py --candidate config/filters.new.yml data/archive/
+    python3 src/filter_replay.py --candidate new.yml --archive data/archive --since 2026-10-01
+    python3 src/filter_replay.py --candidate new.yml --baseline config/filters.yml inputs/*.ndjson --json
+"""
+
+import gzip
+import io
+import logging
+import os
+import sys
+from dataclasses import dataclass, field
+from typing import Dict, IO, Iterable, Iterator, List, Optional, Union
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+import fast_json
+from archive import iter_archived_posts
+from filter import CompiledFilter, compile_filter_config, load_filter_config
+from parallel import bounded_imap
+from preclassify import (
+    DEFAULT_KEYWORDS_CONFIG, JunkClassifier, classifier_from_config, load_monitored_keywords,
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FILTER_CONFIG_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "config", "filters.yml"
+)
+
+# 每批送給 worker 的貼文數
+DEFAULT_BATCH_SIZE = 1000
+
+# AI 分析成本估算：中文約每字 1 token，另加每篇固定的 prompt/輸出開銷
+TOKENS_PER_CHAR = 1.0
+ANALYSIS_OVERHEAD_TOKENS = 300
+DEFAULT_COST_PER_1K_TOKENS = 0.003
+
+ARCHIVE_SUFFIXES = (".json", ".jsonl", ".ndjson")
+COMPRESSED_SUFFIXES = (".gz", ".zst")
+
+
+@dataclass
+class FilterReplayStats:
+    """回放統計（可由多個批次合併）。"""
+
+    total: int = 0
+    too_short: int = 0        # 空內容或短於 min_content_length
+    removed: int = 0          # 命中排除詞或排除規則而被過濾
+    rescued: int = 0          # 命中排除詞或排除規則但因白名單保留
+    junk: int = 0             # 垃圾預分類排除
+    passed: int = 0           # 保留（含 rescued）
+    filtered_chars: int = 0   # 被過濾貼文的總字數（估算成本用）
+    removed_terms: Dict[str, int] = field(default_factory=dict)
+    rescued_terms: Dict[str, int] = field(default_factory=dict)
+    junk_reasons: Dict[str, int] = field(default_factory=dict)
+    newly_filtered: int = 0   # 基準保留、候選過濾
+    newly_passed: int = 0     # 基準過濾、候選保留
+    invalid: int = 0          # 無法解析的 NDJSON 行
+
+    @property
+    def filtered(self) -> int:
+        """被過濾（不送 AI 分析）的總篇數。"""
+        return self.too_short + self.removed + self.junk
+
+    def merge(self, other: "FilterReplayStats") -> None:
+        """併入另一批的統計。"""
+        self.total += other.total
+        self.too_short += other.too_short
+        self.removed += other.removed
+        self.rescued += other.rescued
+        self.junk += other.junk
+        self.passed += other.passed
+        self.filtered_chars += other.filtered_chars
+        self.newly_filtered += other.newly_filtered
+        self.newly_passed += other.newly_passed
+        self.invalid += other.invalid
+        for term, count in other.removed_terms.items():
+            self.removed_terms[term] = self.removed_terms.get(term, 0) + count
+        for term, count in other.rescued_terms.items():
+            self.rescued_terms[term] = self.rescued_terms.get(term, 0) + count
+        for reason, count in other.junk_reasons.items():
+            self.junk_reasons[reason] = self.junk_reasons.get(reason, 0) + count
+
+    def estimated_tokens_saved(self) -> int:
+        """被過濾貼文省下的估計 AI 分析 token 數。"""
+        return int(self.filtered_chars * TOKENS_PER_CHAR
+                   + self.filtered * ANALYSIS_OVERHEAD_TOKENS)
+
+    def estimated_cost_saved(self, cost_per_1k_tokens: float = DEFAULT_COST_PER_1K_TOKENS) -> float:
+        """被過濾貼文省下的估計 AI 分析成本。"""
+        return round(self.estimated_tokens_saved() / 1000 * cost_per_1k_tokens, 4)
+
+    def to_dict(self, config: Optional[Dict] = None,
+                cost_per_1k_tokens: float = DEFAULT_COST_PER_1K_TOKENS) -> Dict:
+        """
+        轉為可 JSON 序列化的字典。
+
+        Args:
+            config: 候選設定；提供時會列出所有詞（包含 0 次命中的詞）。
+        """
+        removed_terms = dict(self.removed_terms)
+        rescued_terms = dict(self.rescued_terms)
+        if config:
+            for term in config.get("hard_exclude", []) or []:
+                removed_terms.setdefault(term, 0)
+            for i, rule in enumerate(config.get("exclude_rules", []) or []):
+                if isinstance(rule, dict):
+                    removed_terms.setdefault(str(rule.get("name") or f"rule_{i}"), 0)
+            for term in config.get("priority_keep_keywords", []) or []:
+                rescued_terms.setdefault(term, 0)
+        return {
+            "total": self.total,
+            "too_short": self.too_short,
+            "removed": self.removed,
+            "rescued": self.rescued,
+            "junk": self.junk,
+            "passed": self.passed,
+            "newly_filtered": self.newly_filtered,
+            "newly_passed": self.newly_passed,
+            "invalid": self.invalid,
+            "removed_terms": dict(sorted(removed_terms.items(), key=lambda kv: -kv[1])),
+            "rescued_terms": dict(sorted(rescued_terms.items(), key=lambda kv: -kv[1])),
+            "junk_reasons": dict(sorted(self.junk_reasons.items(), key=lambda kv: -kv[1])),
+            "estimated_tokens_saved": self.estimated_tokens_saved(),
+            "estimated_cost_saved": self.estimated_cost_saved(cost_per_1k_tokens),
+        }
+
+
+def _strip_compression(name: str) -> str:
+    for suffix in COMPRESSED_SUFFIXES:
+        if name.endswith(suffix):
+            return name[:-len(suffix)]
+    return name
+
+
+def _open_text(path: str) -> IO[str]:
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8")
+    if path.endswith(".zst"):
+        if zstandard is None:
+            raise OSError("讀取 .zst 檔案需要安裝 zstandard")
+        reader = zstandard.ZstdDecompressor().stream_reader(
+            open(path, "rb"), read_across_frames=True, closefd=True)
+        return io.TextIOWrapper(reader, encoding="utf-8")
+    return open(path, "r", encoding="utf-8")
+
+
+def _posts_from_json(data) -> List[Dict]:
+    """JSON 檔可為貼文列表，或含 posts / passed_posts / analyzed_posts 的字典。"""
+    if isinstance(data, dict):
+        for key in ("posts", "passed_posts", "analyzed_posts"):
+            if isinstance(data.get(key), list):
+                data = data[key]
+                break
+    if not isinstance(data, list):
+        return []
+    return [post for post in data if isinstance(post, dict)]
+
+
+def iter_archive_files(paths: Iterable[str]) -> Iterator[str]:
+    """展開輸入路徑：檔案直接回傳，目錄則遞迴找出 JSON/NDJSON（含 .gz / .zst）檔案。"""
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, files in os.walk(path):
+                dirs.sort()
+                for name in sorted(files):
+                    if _strip_compression(name).endswith(ARCHIVE_SUFFIXES):
+                        yield os.path.join(root, name)
+        else:
+            yield path
+
+
+def iter_archive_records(paths: Iterable[str]) -> Iterator[Union[str, Dict]]:
+    """
+    串流讀取封存內容，不解析 NDJSON。
+
+    NDJSON（.jsonl / .ndjson）逐行回傳原始字串，解析交給 worker process，
+    主 process 只負責讀檔；.json 檔以整個檔案為單位解析後回傳貼文字典。
+
+    Yields:
+        str | Dict: NDJSON 原始行，或 .json 檔中的貼文。
+    """
+    for path in iter_archive_files(paths):
+        base = _strip_compression(path)
+        try:
+            with _open_text(path) as f:
+                if base.endswith(".json"):
+                    yield from _posts_from_json(fast_json.load(f))
+                    continue
+                for line in f:
+                    if line.strip():
+                        yield line
+        except (OSError, EOFError, fast_json.JSONDecodeError) as e:
+            logger.warning("略過無法讀取的檔案 %s: %s", path, e)
+
+
+def _parse_record(record: Union[str, Dict]) -> Optional[Dict]:
+    """
+    將 iter_archive_records 的項目轉為貼文；無法解析時回傳 None。
+
+    archive.py 的封存紀錄（貼文放在 post 欄位）會取出原始貼文。
+    """
+    if isinstance(record, dict):
+        post = record
+    else:
+        try:
+            post = fast_json.loads(record)
+        except fast_json.JSONDecodeError:
+            return None
+        if not isinstance(post, dict):
+            return None
+    if "decision" in post and isinstance(post.get("post"), dict):
+        return post["post"]
+    return post
+
+
+def iter_archive_posts(paths: Iterable[str]) -> Iterator[Dict]:
+    """
+    串流讀取封存的貼文（NDJSON 逐行讀取，無法解析的行會略過）。
+
+    Yields:
+        Dict: 貼文（至少含 content）。
+    """
+    for record in iter_archive_records(paths):
+        post = _parse_record(record)
+        if post is None:
+            logger.warning("略過無法解析的行: %.80s", record)
+            continue
+        yield post
+
+
+def _batched(items: Iterable, size: int) -> Iterator[List]:
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _junk_reason(content: Optional[str], compiled: CompiledFilter,
+                 classifier: Optional[JunkClassifier]) -> Optional[str]:
+    """保留的內容經垃圾預分類的結果（與 pipeline 相同，白名單救回的內容不判斷）。"""
+    if classifier is None or compiled.exclude_hits(content) or compiled.rule_hits(content):
+        return None
+    return classifier.classify(compiled.match_text(content))
+
+
+def _classifier(config: Dict, compiled: CompiledFilter,
+                keywords: Iterable[str]) -> Optional[JunkClassifier]:
+    """依設定建立預分類器，監控關鍵字以與過濾相同的方式正規化。"""
+    return classifier_from_config(config, [compiled.match_text(kw) for kw in keywords])
+
+
+def evaluate_batch(contents: List[Optional[str]], candidate: CompiledFilter,
+                   baseline: Optional[CompiledFilter] = None,
+                   classifier: Optional[JunkClassifier] = None,
+                   baseline_classifier: Optional[JunkClassifier] = None) -> FilterReplayStats:
+    """
+    以候選過濾器判斷一批內容並統計。
+
+    Args:
+        contents: 貼文內容列表。
+        candidate: 候選設定編譯後的過濾器。
+        baseline: 基準過濾器（None 則不比較）。
+        classifier: 候選設定的垃圾預分類器（None 則不判斷）。
+        baseline_classifier: 基準設定的垃圾預分類器。
+
+    Returns:
+        FilterReplayStats: 這一批的統計。
+    """
+    stats = FilterReplayStats()
+    for content in contents:
+        stats.total += 1
+        filtered = True
+
+        if candidate.is_too_short(content):
+            stats.too_short += 1
+        else:
+            excludes = candidate.exclude_hits(content).union(candidate.rule_hits(content))
+            priorities = candidate.priority_hits(content) if excludes else None
+            junk = classifier.classify(candidate.match_text(content)) \
+                if classifier is not None and not excludes else None
+            if excludes and not priorities:
+                stats.removed += 1
+                for term in excludes:
+                    stats.removed_terms[term] = stats.removed_terms.get(term, 0) + 1
+            elif junk is not None:
+                stats.junk += 1
+                stats.junk_reasons[junk] = stats.junk_reasons.get(junk, 0) + 1
+            else:
+                filtered = False
+                stats.passed += 1
+                if excludes:
+                    stats.rescued += 1
+                    for term in priorities:
+                        stats.rescued_terms[term] = stats.rescued_terms.get(term, 0) + 1
+
+        if filtered:
+            stats.filtered_chars += len(content or "")
+
+        if baseline is not None:
+            was_filtered = (baseline.should_filter(content)
+                            or _junk_reason(content, baseline, baseline_classifier) is not None)
+            if filtered and not was_filtered:
+                stats.newly_filtered += 1
+            elif was_filtered and not filtered:
+                stats.newly_passed += 1
+    return stats
+
+
+# Worker process 內的過濾器與預分類器（由 initializer 編譯一次）
+_worker_filters: Dict[str, Optional[Union[CompiledFilter, JunkClassifier]]] = {}
+
+
+def _init_worker(candidate_config: Dict, baseline_config: Optional[Dict],
+                 keywords: List[str]) -> None:
+    candidate = compile_filter_config(candidate_config)
+    _worker_filters["candidate"] = candidate
+    _worker_filters["classifier"] = _classifier(candidate_config, candidate, keywords)
+    _worker_filters["baseline"] = _worker_filters["baseline_classifier"] = None
+    if baseline_config is not None:
+        baseline = compile_filter_config(baseline_config)
+        _worker_filters["baseline"] = baseline
+        _worker_filters["baseline_classifier"] = _classifier(baseline_config, baseline, keywords)
+
+
+def _evaluate_worker_batch(records: List[Union[str, Dict]]) -> FilterReplayStats:
+    posts = [_parse_record(record) for record in records]
+    contents = [post.get("content") for post in posts if post is not None]
+    stats = evaluate_batch(contents, _worker_filters["candidate"], _worker_filters["baseline"],
+                           _worker_filters["classifier"], _worker_filters["baseline_classifier"])
+    stats.invalid = len(posts) - len(contents)
+    return stats
+
+
+def replay_filters(paths: Iterable[str], candidate_config: Dict,
+                   baseline_config: Optional[Dict] = None,
+                   workers: Optional[int] = None,
+                   batch_size: int = DEFAULT_BATCH_SIZE,
+                   posts: Optional[Iterable[Dict]] = None,
+                   keywords: Iterable[str] = ()) -> FilterReplayStats:
+    """
+    以候選過濾設定回放封存的貼文。
+
+    Args:
+        paths: 封存檔案或目錄。
+        candidate_config: 候選過濾設定（load_filter_config 格式）。
+        baseline_config: 基準設定（None 則不比較）。
+        workers: process 數（None 為 CPU 數，1 則在目前 process 執行）。
+        batch_size: 每批送給 worker 的貼文數。
+        posts: 直接提供貼文來源（取代 paths，例如 archive.iter_archived_posts）。
+        keywords: 監控關鍵字（預分類遇到含關鍵字的內容時不判斷外語，見 preclassify.py）。
+
+    Returns:
+        FilterReplayStats: 彙整統計。
+    """
+    records = posts if posts is not None else iter_archive_records(paths)
+
+    stats = FilterReplayStats()
+    results = bounded_imap(
+        _evaluate_worker_batch,
+        _batched(records, batch_size),
+        workers=workers,
+        initializer=_init_worker,
+        initargs=(candidate_config, baseline_config, list(keywords)),
+        ordered=False,
+    )
+    for batch_stats in results:
+        stats.merge(batch_stats)
+    return stats
+
+
+def format_stats(stats: FilterReplayStats, config: Dict, max_items: int = 20,
+                 cost_per_1k_tokens: float = DEFAULT_COST_PER_1K_TOKENS,
+                 with_baseline: bool = False) -> str:
+    """將回放結果格式化為文字報告。"""
+    data = stats.to_dict(config, cost_per_1k_tokens)
+    lines = [
+        f"回放 {stats.total} 篇：過短 {stats.too_short}、排除 {stats.removed}、"
+        f"垃圾 {stats.junk}、保留 {stats.passed}（其中白名單救回 {stats.rescued}）",
+        f"估計省下 {data['estimated_tokens_saved']:,} tokens"
+        f"（約 ${data['estimated_cost_saved']:.2f}）",
+    ]
+    if stats.invalid:
+        lines.append(f"略過無法解析的行 {stats.invalid} 筆")
+    if with_baseline:
+        lines.append(f"與基準相比：新增過濾 {stats.newly_filtered}、不再過濾 {stats.newly_passed}")
+
+    sections = [("排除詞/規則命中（被排除篇數）", data["removed_terms"]),
+                ("白名單命中（救回篇數）", data["rescued_terms"])]
+    if data["junk_reasons"]:
+        sections.append(("垃圾預分類（各原因篇數）", data["junk_reasons"]))
+    for title, terms in sections:
+        lines.append("")
+        lines.append(f"== {title} ==")
+        for term, count in list(terms.items())[:max_items]:
+            lines.append(f"{term}: {count}")
+        if len(terms) > max_items:
+            lines.append(f"...（另有 {len(terms) - max_items} 個詞）")
+        unused = [term for term, count in terms.items() if count == 0]
+        if unused:
+            lines.append(f"未命中：{', '.join(unused)}")
+    return "\n".join(lines)
+
+
+if __name__ == '__main__':
+    import argparse
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+    parser = argparse.ArgumentParser(
+        description="過濾規則回放 - 以封存貼文評估候選 filters.yml"
+    )
+    parser.add_argument("inputs", nargs="*", help="封存檔案或目錄（JSON / NDJSON，可 .gz / .zst）")
+    parser.add_argument("--archive", help="archive.py 的封存根目錄（取代 inputs，依索引讀取）")
+    parser.add_argument("--since", help="搭配 --archive：起始日期（YYYY-MM-DD）")
+    parser.add_argument("--until", help="搭配 --archive：結束日期（YYYY-MM-DD）")
+    parser.add_argument("--candidate", default=DEFAULT_FILTER_CONFIG_PATH,
+                        help="候選過濾設定檔路徑（預設為目前的 config/filters.yml）")
+    parser.add_argument("--baseline", help="基準過濾設定檔路徑（提供時比較判斷差異）")
+    parser.add_argument("--keywords-config", default=DEFAULT_KEYWORDS_CONFIG,
+                        help="監控關鍵字設定檔（預分類遇到含關鍵字的內容時不判斷外語）")
+    parser.add_argument("--workers", type=int, help="平行 process 數（預設為 CPU 數）")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE,
+                        help="每批貼文數")
+    parser.add_argument("--cost-per-1k-tokens", type=float, default=DEFAULT_COST_PER_1K_TOKENS,
+                        help="每 1000 token 的 AI 分析成本（美元）")
+    parser.add_argument("--max-items", type=int, default=20, help="每類最多列出幾個詞")
+    parser.add_argument("--json", action="store_true", help="以 JSON 輸出完整結果")
+
+    args = parser.parse_args()
+    if not args.inputs and not args.archive:
+        parser.error("需提供封存檔案/目錄或 --archive")
+
+    try:
+        candidate = load_filter_config(args.candidate)
+        baseline = load_filter_config(args.baseline) if args.baseline else None
+    except FileNotFoundError as e:
+        print(f"錯誤: {e}", file=sys.stderr)
+        sys.exit(2)
+
+    posts = iter_archived_posts(args.archive, args.since, args.until) if args.archive else None
+    result = replay_filters(args.inputs, candidate, baseline,
+                            workers=args.workers, batch_size=args.batch_size, posts=posts,
+                            keywords=load_monitored_keywords(args.keywords_config))
+
+    if args.json:
+        print(fast_json.dumps(result.to_dict(candidate, args.cost_per_1k_tokens), indent=True))
+    else:
+        print(format_stats(result, candidate, max_items=args.max_items,
+                           cost_per_1k_tokens=args.cost_per_1k_tokens,
+                           with_baseline=baseline is not None))
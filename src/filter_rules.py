@@ -0,0 +1,239 @@
+"""
+組合排除規則 — filters.yml 的 exclude_rules（正規表示式、鄰近、AND/NOT 組合）。
+
+hard_exclude 只能列舉固定詞組，變體多時只能一一列出。exclude_rules 的每條規則
+可組合以下條件（同一條規則的所有條件都成立才算命中）：
+
+    exclude_rules:
+      - name: "加LINE導購"
+        regex: "加\\s*(line|賴)\\s*(好友|私訊)"
+        ignore_case: true
+      - name: "預購匯款"
+        near: "預購 NEAR/20 匯款"      # 兩詞間隔不超過 20 字（不分先後）
+      - name: "代購非新聞"
+        all: ["代購", "私訊"]           # 全部出現
+        any: ["優惠", "折扣"]           # 至少一個出現
+        none: ["新聞", "記者"]          # 都不能出現
+
+所有規則在載入時編譯成一個引擎，每篇內容只掃描一次：
+1. 規則中的所有詞組合併成一個 KeywordMatcher，一次找出出現的詞
+2. 所有 regex 合併成一個交替式（alternation）作為預先篩選，
+   沒有任何 regex 可能命中時不再逐條比對
+3. 依出現的詞與預篩結果找出候選規則，只對候選規則做集合運算、
+   鄰近距離與個別 regex 等低成本的後續檢查
+
+規則數增加不會讓每篇的掃描次數增加。
+"""
+
+import re
+from dataclasses import dataclass
+from typing import Callable, Dict, FrozenSet, List, Optional, Pattern, Set, Tuple
+
+from matcher import KeywordMatcher
+
+_NEAR_RE = re.compile(r"^\s*(.+?)\s+NEAR/(\d+)\s+(.+?)\s*$")
+
+RULE_KEYS = frozenset({"name", "regex", "ignore_case", "near", "all", "any", "none"})
+
+
+@dataclass(frozen=True)
+class FilterRule:
+    """一條編譯後的組合規則（詞組均已正規化）。"""
+
+    name: str
+    regex: Optional[Pattern] = None
+    near: Optional[Tuple[str, str, int]] = None
+    all_terms: FrozenSet[str] = frozenset()
+    any_terms: FrozenSet[str] = frozenset()
+    none_terms: FrozenSet[str] = frozenset()
+
+    def triggers(self) -> FrozenSet[str]:
+        """
+        命中此規則的必要詞：其中至少一個出現才需要檢查這條規則。
+
+        空集合表示規則只靠 regex 觸發。
+        """
+        if self.near is not None:
+            return frozenset({self.near[0]})
+        if self.all_terms:
+            return frozenset({min(self.all_terms)})
+        return self.any_terms
+
+
+def _occurrences(text: str, term: str) -> List[int]:
+    positions = []
+    start = text.find(term)
+    while start != -1:
+        positions.append(start)
+        start = text.find(term, start + 1)
+    return positions
+
+
+def _is_near(text: str, first: str, second: str, distance: int) -> bool:
+    """first 與 second 的某一組出現位置間隔不超過 distance 字（不分先後，重疊也算）。"""
+    second_positions = _occurrences(text, second)
+    for i in _occurrences(text, first):
+        for j in second_positions:
+            gap = j - (i + len(first)) if i <= j else i - (j + len(second))
+            if gap <= distance:
+                return True
+    return False
+
+
+def _parse_near(name: str, spec: str, normalize: Callable[[str], str]) -> Tuple[str, str, int]:
+    match = _NEAR_RE.match(spec) if isinstance(spec, str) else None
+    if not match:
+        raise ValueError(f"Invalid NEAR expression in rule '{name}': {spec!r} "
+                         "(expected 'A NEAR/n B')")
+    first, distance, second = match.groups()
+    return normalize(first), normalize(second), int(distance)
+
+
+def _term_set(name: str, key: str, value, normalize: Callable[[str], str]) -> FrozenSet[str]:
+    if value is None:
+        return frozenset()
+    if isinstance(value, str):
+        value = [value]
+    if not isinstance(value, list) or not all(isinstance(v, str) and v for v in value):
+        raise ValueError(f"Rule '{name}': '{key}' must be a list of non-empty strings")
+    return frozenset(normalize(v) for v in value)
+
+
+def compile_rule(spec: Dict, index: int = 0,
+                 normalize: Optional[Callable[[str], str]] = None) -> FilterRule:
+    """
+    編譯一條規則設定。
+
+    Args:
+        spec: exclude_rules 中的一項。
+        index: 規則序號（未命名時用於預設名稱）。
+        normalize: 詞組與 regex 比對前的正規化函式（須與內容相同）。
+
+    Raises:
+        ValueError: 規則格式錯誤（未知欄位、無效 regex 或 NEAR 語法、沒有任何正向條件）。
+    """
+    if not isinstance(spec, dict):
+        raise ValueError(f"exclude_rules[{index}] must be a mapping")
+    name = str(spec.get("name") or f"rule_{index}")
+    unknown = set(spec) - RULE_KEYS
+    if unknown:
+        raise ValueError(f"Rule '{name}': unknown keys {sorted(unknown)}")
+    normalize = normalize or (lambda text: text)
+
+    regex = None
+    if spec.get("regex") is not None:
+        flags = re.IGNORECASE if spec.get("ignore_case") else 0
+        try:
+            regex = re.compile(spec["regex"], flags)
+        except (re.error, TypeError) as e:
+            raise ValueError(f"Invalid regex in rule '{name}': {e}") from e
+
+    rule = FilterRule(
+        name=name,
+        regex=regex,
+        near=_parse_near(name, spec["near"], normalize) if spec.get("near") is not None else None,
+        all_terms=_term_set(name, "all", spec.get("all"), normalize),
+        any_terms=_term_set(name, "any", spec.get("any"), normalize),
+        none_terms=_term_set(name, "none", spec.get("none"), normalize),
+    )
+    if rule.regex is None and rule.near is None and not rule.all_terms and not rule.any_terms:
+        raise ValueError(f"Rule '{name}' needs at least one of regex, near, all, any")
+    return rule
+
+
+class RuleEngine:
+    """編譯後的 exclude_rules：一次掃描找出所有命中的規則。"""
+
+    def __init__(self, rules: List[FilterRule]):
+        self.rules = rules
+
+        terms: Set[str] = set()
+        self._by_trigger: Dict[str, List[int]] = {}
+        self._regex_only: List[int] = []
+        for i, rule in enumerate(rules):
+            terms |= rule.all_terms | rule.any_terms | rule.none_terms
+            if rule.near is not None:
+                terms.update(rule.near[:2])
+            triggers = rule.triggers()
+            if not triggers:
+                self._regex_only.append(i)
+            for term in triggers:
+                self._by_trigger.setdefault(term, []).append(i)
+        self._terms = KeywordMatcher(sorted(terms))
+
+        # 所有 regex 合併成一個交替式預先篩選；無法合併時（例如含反向參照）逐條比對
+        patterns = [rule.regex for rule in rules if rule.regex is not None]
+        self._prefilter: Optional[Pattern] = None
+        if patterns:
+            combined = "|".join(
+                f"(?{'i' if p.flags & re.IGNORECASE else ''}:{p.pattern})" for p in patterns
+            )
+            try:
+                self._prefilter = re.compile(combined)
+            except re.error:
+                self._prefilter = None
+
+    def __len__(self) -> int:
+        return len(self.rules)
+
+    def _check(self, rule: FilterRule, text: str, present: Set[str]) -> bool:
+        if rule.all_terms and not rule.all_terms <= present:
+            return False
+        if rule.any_terms and present.isdisjoint(rule.any_terms):
+            return False
+        if rule.none_terms and not present.isdisjoint(rule.none_terms):
+            return False
+        if rule.near is not None:
+            first, second, distance = rule.near
+            if first not in present or second not in present:
+                return False
+            if not _is_near(text, first, second, distance):
+                return False
+        if rule.regex is not None and not rule.regex.search(text):
+            return False
+        return True
+
+    def _candidates(self, text: str) -> Tuple[Set[str], List[int]]:
+        present = self._terms.find(text)
+        candidates: Set[int] = set()
+        for term in present:
+            candidates.update(self._by_trigger.get(term, ()))
+        if self._regex_only:
+            if self._prefilter is None or self._prefilter.search(text):
+                candidates.update(self._regex_only)
+        return present, sorted(candidates)
+
+    def match(self, text: str) -> Tuple[str, ...]:
+        """命中的規則名稱（依設定檔順序）。"""
+        if not self.rules or not text:
+            return ()
+        present, candidates = self._candidates(text)
+        return tuple(dict.fromkeys(
+            self.rules[i].name for i in candidates if self._check(self.rules[i], text, present)
+        ))
+
+    def matches_any(self, text: str) -> bool:
+        """是否命中任一規則。"""
+        if not self.rules or not text:
+            return False
+        present, candidates = self._candidates(text)
+        return any(self._check(self.rules[i], text, present) for i in candidates)
+
+
+def compile_rules(specs: Optional[List[Dict]],
+                  normalize: Optional[Callable[[str], str]] = None) -> RuleEngine:
+    """
+    編譯 filters.yml 的 exclude_rules。
+
+    Args:
+        specs: 規則設定列表（None 或空列表表示沒有規則）。
+        normalize: 正規化函式（與比對內容使用相同設定）。
+
+    Raises:
+        ValueError: 任一規則格式錯誤。
+    """
+    if specs is None:
+        specs = []
+    if not isinstance(specs, list):
+        raise ValueError("exclude_rules must be a list")
+    return RuleEngine([compile_rule(spec, i, normalize) for i, spec in enumerate(specs)])
@@ -1,166 +1,208 @@
+import atexit
 import logging
-import requests
-from typing import List, Union
+import threading
+from typing import Dict, List, Optional, Tuple, Union
 
 LINE_MESSAGING_API_URL: str = "https://api.line.me/v2/bot/message/push"
 LINE_BROADCAST_API_URL: str = "https://api.line.me/v2/bot/message/broadcast"
+LINE_MULTICAST_API_URL: str = "https://api.line.me/v2/bot/message/multicast"
 TIMEOUT_SECONDS = 10
 MAX_MESSAGE_LENGTH = 5000
+MAX_MULTICAST_RECIPIENTS = 500  # multicast 每次請求的收件人上限
+MAX_MESSAGES_PER_REQUEST = 5    # 每次請求最多 5 個 message 物件（泡泡）
 
 logger = logging.getLogger(__name__)
 
+# (token, outbox 路徑) → 共用的 NotificationDispatcher（連線池與執行緒池跨呼叫重用）
+_dispatchers: Dict[Tuple[str, str], "NotificationDispatcher"] = {}
+_dispatchers_lock = threading.Lock()
 
-def send_line_message(channel_access_token: str, to_user_id: str, message: str) -> bool:
-    """
-    使用 LINE Messaging API 發送訊息到指定用戶。
 
-    Args:
-        channel_access_token: LINE Messaging API 的 Channel Access Token。
-        to_user_id: 接收訊息的 LINE 用戶 ID。
-        message: 要發送的訊息內容。
+def _get_dispatcher(channel_access_token: str, outbox_db: Optional[str] = None):
+    """
+    取得 token 與 outbox 對應的共用派送器（第一次使用時建立，程式結束時關閉）。
 
-    Returns:
-        bool: 如果訊息發送成功，則返回 True，否則返回 False。
+    Raises:
+        ValueError: token 為空或含有非法字元。
     """
-    # Input validation for token
-    if not channel_access_token or not isinstance(channel_access_token, str):
-        logger.error("Channel access token is empty or invalid")
-        return False
+    # notify_dispatcher 匯入本模組的常數，須在函式內匯入以避免循環匯入
+    from notify_dispatcher import NotificationDispatcher, default_outbox_db
+
+    key = (channel_access_token, outbox_db or default_outbox_db())
+    with _dispatchers_lock:
+        dispatcher = _dispatchers.get(key)
+        if dispatcher is None:
+            dispatcher = NotificationDispatcher(channel_access_token, db_path=key[1])
+            if not _dispatchers:
+                atexit.register(close_dispatchers)
+            _dispatchers[key] = dispatcher
+    return dispatcher
+
+
+def close_dispatchers() -> None:
+    """關閉所有共用派送器（等待發送中的請求完成；未送達的保留在 outbox）。"""
+    with _dispatchers_lock:
+        dispatchers = list(_dispatchers.values())
+        _dispatchers.clear()
+    atexit.unregister(close_dispatchers)
+    for dispatcher in dispatchers:
+        dispatcher.close()
+
+
+def _dispatch(channel_access_token: str, kind: str, message: Union[str, List[str]],
+              recipient: Optional[Union[str, List[str]]] = None,
+              outbox_db: Optional[str] = None, ordered: bool = False) -> bool:
+    """
+    經由共用的 NotificationDispatcher 發送：每個請求先寫入 outbox，送達後才刪除。
 
-    # Check for invalid characters in token (potential header injection)
-    if any(c in channel_access_token for c in '\r\n\t '):
-        logger.error("Channel access token contains invalid characters")
-        return False
+    token、收件人與訊息的驗證都由派送器統一處理；超過 MAX_MESSAGE_LENGTH 的訊息
+    拆成多個泡泡，每 MAX_MESSAGES_PER_REQUEST 個一次請求，多個請求並行發送。
+    ordered 時依序逐筆發送（分頁訊息），任一筆未送達即停止。
 
-    # Input validation for user_id
-    if not to_user_id or not isinstance(to_user_id, str):
-        logger.error("User ID is empty or invalid")
-        return False
+    重試用盡仍未送達的請求（ordered 時含其後尚未發送的請求）留在 outbox，
+    可用 notify_dispatcher.py --flush 補送。
 
-    # Check for invalid characters in user_id
-    if any(c in to_user_id for c in '\r\n\t '):
-        logger.error("User ID contains invalid characters")
+    Returns:
+        bool: 全部請求都送達時返回 True，否則返回 False。
+    """
+    try:
+        dispatcher = _get_dispatcher(channel_access_token, outbox_db)
+    except ValueError as exc:
+        logger.error("%s", exc)
         return False
 
-    # Input validation for message
-    if not message or not isinstance(message, str):
-        logger.error("Message is empty or invalid")
+    futures = dispatcher.send(kind, message, recipient, ordered=ordered)
+    results = [future.result() for future in futures]
+    if not all(results):
+        logger.error("LINE %s not delivered; undelivered requests kept in outbox %s",
+                     kind, dispatcher.db_path)
         return False
+    return True
 
-    if len(message) > MAX_MESSAGE_LENGTH:
-        logger.error("Message too long (max %d chars, got %d)", MAX_MESSAGE_LENGTH, len(message))
-        return False
 
-    headers = {
-        'Content-Type': 'application/json',
-        'Authorization': f'Bearer {channel_access_token}'
-    }
-
-    payload = {
-        'to': to_user_id,
-        'messages': [
-            {
-                'type': 'text',
-                'text': message
-            }
-        ]
-    }
+def send_line_message(channel_access_token: str, to_user_id: str,
+                      message: Union[str, List[str]],
+                      outbox_db: Optional[str] = None, ordered: bool = False) -> bool:
+    """
+    使用 LINE Messaging API 發送訊息到指定用戶。
 
-    try:
-        response = requests.post(
-            LINE_MESSAGING_API_URL,
-            headers=headers,
-            json=payload,
-            timeout=TIMEOUT_SECONDS,
-            verify=True
-        )
-        response.raise_for_status()  # 如果響應狀態碼指示錯誤，則引發 HTTPError
+    Args:
+        channel_access_token: LINE Messaging API 的 Channel Access Token。
+        to_user_id: 接收訊息的 LINE 用戶 ID。
+        message: 要發送的訊息內容，或依序發送的多則訊息
+                 （如 report_generator 的分頁訊息，每 5 則一次請求；過長的訊息拆成多個泡泡）。
+        outbox_db: outbox 資料庫路徑（預設 $NOTIFY_OUTBOX_DB 或 data/notify_outbox.db）。
+        ordered: 依序逐筆發送多個請求（如分頁訊息）；預設並行發送。
 
-        logger.info("LINE message sent successfully to user %s", to_user_id)
-        return True
+    Returns:
+        bool: 如果訊息發送成功，則返回 True，否則返回 False。
+    """
+    from notify_dispatcher import KIND_PUSH
 
-    except requests.exceptions.HTTPError as exc:
-        logger.error("LINE message failed - HTTP error: %s", exc)
-        return False
-    except requests.exceptions.ConnectionError as exc:
-        logger.error("LINE message failed - Connection error: %s", exc)
-        return False
-    except requests.exceptions.Timeout as exc:
-        logger.error("LINE message failed - Timeout after %d seconds: %s", TIMEOUT_SECONDS, exc)
-        return False
-    except requests.exceptions.RequestException as exc:
-        logger.error("LINE message failed - Request error: %s", exc)
+    if not _dispatch(channel_access_token, KIND_PUSH, message, to_user_id, outbox_db, ordered):
         return False
+    logger.info("LINE message sent successfully to user %s", to_user_id)
+    return True
 
 
-def send_line_broadcast(channel_access_token: str, message: str) -> bool:
+def send_line_broadcast(channel_access_token: str, message: Union[str, List[str]],
+                        outbox_db: Optional[str] = None, ordered: bool = False) -> bool:
     """
     使用 LINE Messaging API 廣播訊息給所有好友。
 
     Args:
         channel_access_token: LINE Messaging API 的 Channel Access Token。
-        message: 要發送的訊息內容。
+        message: 要發送的訊息內容，或依序發送的多則訊息
+                 （每 5 則一次請求；過長的訊息拆成多個泡泡）。
+        outbox_db: outbox 資料庫路徑（預設 $NOTIFY_OUTBOX_DB 或 data/notify_outbox.db）。
+        ordered: 依序逐筆發送多個請求（如分頁訊息）；預設並行發送。
 
     Returns:
         bool: 如果訊息廣播成功，則返回 True，否則返回 False。
     """
-    # Input validation for token
-    if not channel_access_token or not isinstance(channel_access_token, str):
-        logger.error("Channel access token is empty or invalid")
-        return False
+    from notify_dispatcher import KIND_BROADCAST
 
-    if any(c in channel_access_token for c in '\r\n\t '):
-        logger.error("Channel access token contains invalid characters")
+    if not _dispatch(channel_access_token, KIND_BROADCAST, message, outbox_db=outbox_db,
+                     ordered=ordered):
         return False
+    logger.info("LINE broadcast message sent successfully to all friends")
+    return True
 
-    # Input validation for message
-    if not message or not isinstance(message, str):
-        logger.error("Message is empty or invalid")
-        return False
 
-    if len(message) > MAX_MESSAGE_LENGTH:
-        logger.error("Message too long (max %d chars, got %d)", MAX_MESSAGE_LENGTH, len(message))
-        return False
+def split_message_bubbles(message: str, max_length: int = MAX_MESSAGE_LENGTH) -> List[str]:
+    """
+    將過長的訊息拆成多個不超過 max_length 的泡泡。
 
-    headers = {
-        'Content-Type': 'application/json',
-        'Authorization': f'Bearer {channel_access_token}'
-    }
+    優先在換行處切開；單行超過上限時才硬切。只走訪一次，
+    以累計長度判斷，不會反覆 join。
 
-    payload = {
-        'messages': [
-            {
-                'type': 'text',
-                'text': message
-            }
-        ]
-    }
+    Args:
+        message: 原始訊息。
+        max_length: 每個泡泡的字元上限。
 
-    try:
-        response = requests.post(
-            LINE_BROADCAST_API_URL,
-            headers=headers,
-            json=payload,
-            timeout=TIMEOUT_SECONDS,
-            verify=True
-        )
-        response.raise_for_status()
+    Returns:
+        List[str]: 泡泡文字列表（不含空白泡泡）。
+    """
+    if len(message) <= max_length:
+        return [message]
+
+    bubbles: List[str] = []
+    current: List[str] = []
+    current_len = 0
+
+    def flush():
+        nonlocal current, current_len
+        text = "\n".join(current)
+        if text.strip():
+            bubbles.append(text)
+        current = []
+        current_len = 0
+
+    for line in message.split("\n"):
+        while len(line) > max_length:
+            if current:
+                flush()
+            bubbles.append(line[:max_length])
+            line = line[max_length:]
+        added = len(line) + (1 if current else 0)
+        if current and current_len + added > max_length:
+            flush()
+            added = len(line)
+        current.append(line)
+        current_len += added
+
+    if current:
+        flush()
+    return bubbles
+
+
+def send_line_multicast(channel_access_token: str, to_user_ids: List[str],
+                        message: Union[str, List[str]],
+                        outbox_db: Optional[str] = None, ordered: bool = False) -> bool:
+    """
+    使用 LINE Multicast API 一次發送訊息給多位用戶。
 
-        logger.info("LINE broadcast message sent successfully to all friends")
-        return True
+    收件人依 MAX_MULTICAST_RECIPIENTS 分組，訊息依 MAX_MESSAGES_PER_REQUEST
+    打包成多個泡泡；過長的訊息會拆成多個泡泡而不是被拒絕。
+    N 位收件人只需 ceil(N / 500) × ceil(泡泡數 / 5) 次請求。
 
-    except requests.exceptions.HTTPError as exc:
-        logger.error("LINE broadcast failed - HTTP error: %s", exc)
-        return False
-    except requests.exceptions.ConnectionError as exc:
-        logger.error("LINE broadcast failed - Connection error: %s", exc)
-        return False
-    except requests.exceptions.Timeout as exc:
-        logger.error("LINE broadcast failed - Timeout after %d seconds: %s", TIMEOUT_SECONDS, exc)
-        return False
-    except requests.exceptions.RequestException as exc:
-        logger.error("LINE broadcast failed - Request error: %s", exc)
+    Args:
+        channel_access_token: LINE Messaging API 的 Channel Access Token。
+        to_user_ids: 接收訊息的 LINE 用戶 ID 列表（重複的 ID 只發一次）。
+        message: 訊息內容，或已分好的多則訊息。
+        outbox_db: outbox 資料庫路徑（預設 $NOTIFY_OUTBOX_DB 或 data/notify_outbox.db）。
+        ordered: 依序逐筆發送多個請求（如分頁訊息）；預設並行發送。
+
+    Returns:
+        bool: 全部請求都成功時返回 True，否則返回 False。
+    """
+    from notify_dispatcher import KIND_MULTICAST
+
+    if not _dispatch(channel_access_token, KIND_MULTICAST, message, to_user_ids, outbox_db,
+                     ordered):
         return False
+    logger.info("LINE multicast sent to %d users", len(set(to_user_ids)))
+    return True
 
 
 def send_notification_message(
@@ -168,7 +210,8 @@ def send_notification_message(
     to_user_id: str,
     keywords: Union[List[str], str],
     summary: str,
-    report_url: str
+    report_url: str,
+    outbox_db: Optional[str] = None
 ) -> bool:
     """
     發送格式化的 Threads 監控通知訊息。
@@ -179,6 +222,7 @@ def send_notification_message(
         keywords: 關鍵字列表或單一關鍵字字串。
         summary: 摘要內容。
         report_url: 完整報告的連結。
+        outbox_db: outbox 資料庫路徑（預設 $NOTIFY_OUTBOX_DB 或 data/notify_outbox.db）。
 
     Returns:
         bool: 如果訊息發送成功，則返回 True，否則返回 False。
@@ -214,7 +258,7 @@ def send_notification_message(
 {report_url}"""
 
     # Send using the base function
-    return send_line_message(channel_access_token, to_user_id, message)
+    return send_line_message(channel_access_token, to_user_id, message, outbox_db=outbox_db)
 
 
 if __name__ == '__main__':
@@ -242,18 +286,40 @@ if __name__ == '__main__':
         epilog="安全提示: 請使用環境變數 LINE_CHANNEL_ACCESS_TOKEN 和 LINE_USER_ID 提供認證資訊，避免在命令列中暴露敏感資訊。"
     )
     parser.add_argument("--message", help="要發送的純文字訊息")
+    parser.add_argument("--messages-file",
+                        help="JSON 訊息列表檔（如 report_generator.py --line-messages-out 的輸出），依序發送，每 5 則一次請求")
     parser.add_argument("--broadcast", action="store_true",
                         help="廣播模式：發送給所有好友（不需要 LINE_USER_ID）")
+    parser.add_argument("--multicast", action="store_true",
+                        help="群發模式：發送給 LINE_USER_IDS（逗號分隔）中的所有用戶，過長訊息自動拆成多個泡泡")
     parser.add_argument("--notification", action="store_true",
                         help="發送格式化監控通知（需搭配 --keywords, --summary, --report-url）")
     parser.add_argument("--keywords", help="監控關鍵字（逗號分隔）")
     parser.add_argument("--summary", help="監控摘要內容")
     parser.add_argument("--report-url", help="完整報告連結或本地路徑")
+    parser.add_argument("--outbox-db",
+                        help="outbox 資料庫路徑（預設 $NOTIFY_OUTBOX_DB 或 data/notify_outbox.db）；"
+                             "未送達的訊息保留在此，可用 notify_dispatcher.py --flush 補送")
 
     args = parser.parse_args()
 
+    if args.messages_file:
+        import fast_json
+        try:
+            with open(args.messages_file, 'r', encoding='utf-8') as f:
+                args.message = fast_json.load(f)
+        except (fast_json.JSONDecodeError, FileNotFoundError) as e:
+            print(f"錯誤: 無法讀取訊息列表 - {e}", file=sys.stderr)
+            sys.exit(2)
+        if not isinstance(args.message, list):
+            print("錯誤: 訊息列表檔必須是 JSON 字串陣列", file=sys.stderr)
+            sys.exit(2)
+
     if not args.message and not args.notification:
-        parser.error("請指定 --message 或 --notification 模式")
+        parser.error("請指定 --message、--messages-file 或 --notification 模式")
+
+    # 分頁訊息須依序送達
+    ordered = bool(args.messages_file)
 
     # 從環境變數獲取 token（安全做法）
     channel_token = os.environ.get("LINE_CHANNEL_ACCESS_TOKEN")
@@ -266,7 +332,31 @@ if __name__ == '__main__':
         )
         sys.exit(1)
 
-    if args.broadcast:
+    if args.multicast:
+        # 群發模式：發給 LINE_USER_IDS 中的所有用戶
+        user_ids = [u.strip() for u in os.environ.get("LINE_USER_IDS", "").split(",") if u.strip()]
+        if not user_ids:
+            print(
+                "錯誤: 缺少 LINE User ID 列表。請設定環境變數 LINE_USER_IDS（逗號分隔）。",
+                file=sys.stderr
+            )
+            sys.exit(1)
+
+        if args.notification:
+            if not args.keywords or not args.summary or not args.report_url:
+                parser.error("--notification 模式需要 --keywords, --summary, --report-url")
+            keywords_list = [k.strip() for k in args.keywords.split(",")]
+            multicast_message = (
+                f"🔔 Threads 監控通知\n\n"
+                f"關鍵字: {', '.join(keywords_list)}\n\n"
+                f"摘要:\n{args.summary}\n\n"
+                f"完整報告:\n{args.report_url}"
+            )
+        else:
+            multicast_message = args.message
+        success = send_line_multicast(channel_token, user_ids, multicast_message,
+                                      outbox_db=args.outbox_db, ordered=ordered)
+    elif args.broadcast:
         # 廣播模式：發給所有好友，不需要 user_id
         if args.notification:
             if not args.keywords or not args.summary or not args.report_url:
@@ -279,9 +369,11 @@ if __name__ == '__main__':
                 f"摘要:\n{args.summary}\n\n"
                 f"完整報告:\n{args.report_url}"
             )
-            success = send_line_broadcast(channel_token, formatted_message)
+            success = send_line_broadcast(channel_token, formatted_message,
+                                          outbox_db=args.outbox_db)
         else:
-            success = send_line_broadcast(channel_token, args.message)
+            success = send_line_broadcast(channel_token, args.message, outbox_db=args.outbox_db,
+                                          ordered=ordered)
     else:
         # Push 模式：發給指定用戶，需要 user_id
         user_id = os.environ.get("LINE_USER_ID")
@@ -298,14 +390,17 @@ if __name__ == '__main__':
                 parser.error("--notification 模式需要 --keywords, --summary, --report-url")
             keywords_list = [k.strip() for k in args.keywords.split(",")]
             success = send_notification_message(
-                channel_token, user_id, keywords_list, args.summary, args.report_url
+                channel_token, user_id, keywords_list, args.summary, args.report_url,
+                outbox_db=args.outbox_db
             )
         else:
-            success = send_line_message(channel_token, user_id, args.message)
+            success = send_line_message(channel_token, user_id, args.message,
+                                        outbox_db=args.outbox_db, ordered=ordered)
 
     if success:
         print("LINE 訊息發送成功！")
         sys.exit(0)
     else:
-        print("LINE 訊息發送失敗。", file=sys.stderr)
+        print("LINE 訊息發送失敗。暫時性錯誤未送達的訊息保留在 outbox，"
+              "可用 python3 src/notify_dispatcher.py --flush 補送。", file=sys.stderr)
         sys.exit(1)
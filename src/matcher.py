@@ -0,0 +1,75 @@
+"""
+多關鍵字比對器 — 一次找出文字中出現的所有關鍵字。
+
+語意與逐一執行 `keyword in text` 完全相同（包含重疊、互為前綴的關鍵字），
+但關鍵字多時只需檢查可能命中的少數候選：
+1. 依關鍵字首字建立索引
+2. 以 set(text) 與索引取交集（C 層級運算），只對首字出現在文字中的關鍵字做 `in` 比對
+
+關鍵字很少時，直接逐一 `in` 比對反而最快，因此自動切換。
+
+用法：
+    from matcher import KeywordMatcher
+    matcher = KeywordMatcher(["內湖", "內湖科技園區", "湖區"])
+    matcher.find("內湖科技園區塞車")  # {"內湖", "內湖科技園區"}
+"""
+
+from typing import Dict, FrozenSet, Iterable, List, Set
+
+# 不重複關鍵字少於此數時逐一比對，否則使用首字索引
+INDEX_THRESHOLD = 64
+
+
+class KeywordMatcher:
+    """預先建立索引的多關鍵字比對器。"""
+
+    def __init__(self, keywords: Iterable[str]):
+        """
+        Args:
+            keywords: 關鍵字列表（可重複，順序即索引）。
+        """
+        self.keywords: List[str] = list(keywords)
+
+        # 關鍵字 -> 在 keywords 中的所有索引（同一字串可能重複出現）
+        self._indices: Dict[str, List[int]] = {}
+        for index, keyword in enumerate(self.keywords):
+            self._indices.setdefault(keyword, []).append(index)
+
+        # 空字串在任何文字中都成立（同 "" in text）
+        self._always: FrozenSet[str] = frozenset(kw for kw in self._indices if not kw)
+        self._unique: List[str] = [kw for kw in self._indices if kw]
+
+        self._by_first: Dict[str, List[str]] = {}
+        if len(self._unique) >= INDEX_THRESHOLD:
+            for kw in self._unique:
+                self._by_first.setdefault(kw[0], []).append(kw)
+        self._first_chars: FrozenSet[str] = frozenset(self._by_first)
+
+    def _candidates(self, text: str) -> Iterable[str]:
+        """可能出現在 text 中的關鍵字（不含空字串）。"""
+        if not self._by_first:
+            return self._unique
+        by_first = self._by_first
+        return [kw for ch in self._first_chars.intersection(text) for kw in by_first[ch]]
+
+    def find(self, text: str) -> Set[str]:
+        """
+        找出文字中出現的所有關鍵字。
+
+        Returns:
+            Set[str]: 出現的關鍵字（等同 {kw for kw in keywords if kw in text}）。
+        """
+        found = {kw for kw in self._candidates(text) if kw in text}
+        if self._always:
+            found |= self._always
+        return found
+
+    def find_indices(self, text: str) -> Set[int]:
+        """找出文字中出現的關鍵字在 keywords 中的索引。"""
+        return {i for kw in self.find(text) for i in self._indices[kw]}
+
+    def matches_any(self, text: str) -> bool:
+        """文字中是否出現任一關鍵字。"""
+        if self._always:
+            return True
+        return any(kw in text for kw in self._candidates(text))
@@ -0,0 +1,126 @@
+"""
+文字正規化 — 讓關鍵字比對不受全形/半形、插入空白、零寬字元與簡繁體影響。
+
+垃圾貼文常以這些變體躲過 `in` 子字串比對（例如「限 時 特 價」、「限<零寬空白>時特價」、
+「ｌｉｎｅ」、「限时特价」），每漏掉一篇就多一次 AI 分析成本。
+
+正規化步驟（只用於比對，不修改貼文本身）：
+1. 移除零寬字元（ZWSP、ZWJ、BOM、軟連字號等）
+2. Unicode NFKC（全形英數/標點轉半形、相容字元轉標準字元）
+3. 移除 CJK 字元之間的空白（「限 時 特 價」→「限時特價」）
+4. 可選：簡體轉繁體（有安裝 opencc 時使用 s2t，否則使用內建常用字對照表）
+
+結果以 lru_cache 快取，同一篇內容在過濾、評分等步驟重複正規化不需重算。
+關鍵字也必須以相同選項正規化後才能與正規化後的內容比對。
+
+設定（filters.yml / scoring.yml）：
+    normalize_text: true   # 啟用 1–3
+    fold_script: true      # 另外啟用 4
+
+用法：
+    python3 src/normalize.py "限 時 特 价"
+"""
+
+import functools
+import re
+import unicodedata
+from typing import Callable, Dict, Iterable, List, Optional
+
+try:
+    import opencc
+except ImportError:
+    opencc = None
+
+# 快取的正規化結果數
+NORMALIZE_CACHE_SIZE = 8192
+
+# 零寬與不可見的格式字元
+_ZERO_WIDTH = dict.fromkeys(map(ord, "\u00ad\u180e\u200b\u200c\u200d\u2060\u2061\u2062\u2063\u2064\ufeff"))
+
+_CJK = "\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff"
+_CJK_SPACE_RE = re.compile(rf"(?<=[{_CJK}])\s+(?=[{_CJK}])")
+
+# 內建簡轉繁對照（opencc 未安裝時使用）：只收常用且一對一的字，
+# 一簡對多繁的字（发、干、后、里、台、面、系、于、松…）不轉換以免誤判
+_S2T_SIMPLIFIED = (
+    "价优时购买卖车预楼盘报赚钱费运现货库单团销级质额贷联络讯网这个们说话请认识让给对会为过还进开关门问间题东"
+    "业产实际应该经济资证险诈骗贪检调诉违罚杀伤医药师学长书员议选举党国区县乡镇铁桥灯电视节庆广场园华饭馆鸡鱼鲜"
+    "红绿蓝黄汤样点击链码扫领奖赠礼约职简条递况龄数转赛马线号载图宝贝账户热补贴农权审续帮办处须亲爱总统务军队听"
+    "见观览维护环气温灾难风灭烟饮轻紧张计设备厂营项态临"
+)
+_S2T_TRADITIONAL = (
+    "價優時購買賣車預樓盤報賺錢費運現貨庫單團銷級質額貸聯絡訊網這個們說話請認識讓給對會為過還進開關門問間題東"
+    "業產實際應該經濟資證險詐騙貪檢調訴違罰殺傷醫藥師學長書員議選舉黨國區縣鄉鎮鐵橋燈電視節慶廣場園華飯館雞魚鮮"
+    "紅綠藍黃湯樣點擊鏈碼掃領獎贈禮約職簡條遞況齡數轉賽馬線號載圖寶貝帳戶熱補貼農權審續幫辦處須親愛總統務軍隊聽"
+    "見觀覽維護環氣溫災難風滅煙飲輕緊張計設備廠營項態臨"
+)
+_S2T_TABLE = str.maketrans(_S2T_SIMPLIFIED, _S2T_TRADITIONAL)
+
+_opencc_converter = None
+
+
+def _fold_to_traditional(text: str) -> str:
+    """簡體轉繁體（優先使用 opencc）。"""
+    global _opencc_converter
+    if opencc is not None:
+        if _opencc_converter is None:
+            _opencc_converter = opencc.OpenCC("s2t")
+        return _opencc_converter.convert(text)
+    return text.translate(_S2T_TABLE)
+
+
+@functools.lru_cache(maxsize=NORMALIZE_CACHE_SIZE)
+def _normalize(text: str, fold_script: bool) -> str:
+    if text.isascii():
+        # 純 ASCII：NFKC 與 CJK 空白處理都不會改變內容
+        return text
+    text = text.translate(_ZERO_WIDTH)
+    text = unicodedata.normalize("NFKC", text)
+    text = _CJK_SPACE_RE.sub("", text)
+    if fold_script:
+        text = _fold_to_traditional(text)
+    return text
+
+
+def normalize_text(text: Optional[str], fold_script: bool = False) -> str:
+    """
+    正規化文字供關鍵字比對使用（結果有快取）。
+
+    Args:
+        text: 原始文字（None 視為空字串）。
+        fold_script: 是否將簡體轉為繁體。
+
+    Returns:
+        str: 正規化後的文字。
+    """
+    if not text:
+        return ""
+    return _normalize(text, fold_script)
+
+
+def normalize_terms(terms: Iterable[str], fold_script: bool = False) -> List[str]:
+    """以相同選項正規化關鍵字列表（順序與長度不變）。"""
+    return [normalize_text(term, fold_script) for term in terms]
+
+
+def normalizer_from_config(config: Optional[Dict]) -> Optional[Callable[[Optional[str]], str]]:
+    """
+    依設定檔的 normalize_text / fold_script 取得正規化函式。
+
+    Returns:
+        Callable | None: 未啟用時回傳 None。
+    """
+    if not config or not config.get("normalize_text"):
+        return None
+    return functools.partial(normalize_text, fold_script=bool(config.get("fold_script")))
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="文字正規化 - 顯示比對用的正規化結果")
+    parser.add_argument("text", help="要正規化的文字")
+    parser.add_argument("--no-fold", action="store_true", help="不做簡轉繁")
+    args = parser.parse_args()
+
+    print(normalize_text(args.text, fold_script=not args.no_fold))
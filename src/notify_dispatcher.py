@@ -0,0 +1,557 @@
+"""
+LINE 通知派送器 — 連線池、並行發送、自動重試與持久化 outbox。
+
+逐則以 requests.post 發送時每次都建立新連線、失敗即放棄；
+事件高峰時連續數十則推播會被逐一的 TLS 握手拖慢，暫時性錯誤也會讓警報遺失。
+NotificationDispatcher 改為（line_notify 的 send_line_* 也經由它發送，同一 token 共用一個派送器）：
+
+- 共用 requests.Session（HTTPAdapter 連線池），以執行緒池並行發送
+- 遇到 429 / 5xx / 連線錯誤時以指數退避重試，429 會遵守 Retry-After
+- 每則訊息先寫入 SQLite outbox，送達後才刪除；重試用盡的訊息保留為
+  pending，重新啟動後可用 flush() 補送
+
+outbox 路徑預設為 data/notify_outbox.db，可用環境變數 NOTIFY_OUTBOX_DB 覆寫。
+
+用法：
+    python3 src/notify_dispatcher.py --pending   # 顯示待送訊息數
+    python3 src/notify_dispatcher.py --flush     # 補送 outbox 中所有待送訊息
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, List, Optional, Tuple, Union
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import fast_json
+from line_notify import (
+    LINE_BROADCAST_API_URL,
+    LINE_MESSAGING_API_URL,
+    LINE_MULTICAST_API_URL,
+    MAX_MESSAGES_PER_REQUEST,
+    MAX_MULTICAST_RECIPIENTS,
+    TIMEOUT_SECONDS,
+    split_message_bubbles,
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_OUTBOX_DB = "data/notify_outbox.db"
+OUTBOX_DB_ENV = "NOTIFY_OUTBOX_DB"
+DEFAULT_MAX_WORKERS = 8
+DEFAULT_MAX_RETRIES = 4
+BACKOFF_BASE_SECONDS = 1.0
+MAX_BACKOFF_SECONDS = 60.0
+RETRYABLE_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+STATUS_PENDING = "pending"
+STATUS_FAILED = "failed"
+
+KIND_PUSH = "push"
+KIND_BROADCAST = "broadcast"
+KIND_MULTICAST = "multicast"
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    解析 Retry-After 標頭（秒數或 HTTP 日期）。
+
+    Args:
+        value: 標頭原始值。
+
+    Returns:
+        float 或 None: 需等待的秒數，無法解析時回傳 None。
+    """
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+def default_outbox_db() -> str:
+    """outbox 資料庫路徑（環境變數 NOTIFY_OUTBOX_DB，預設 data/notify_outbox.db）。"""
+    return os.environ.get(OUTBOX_DB_ENV) or DEFAULT_OUTBOX_DB
+
+
+def _has_invalid_chars(value: str) -> bool:
+    """檢查是否含有可能造成 header injection 的字元。"""
+    return any(c in value for c in '\r\n\t ')
+
+
+class NotificationDispatcher:
+    """
+    LINE 通知派送器
+
+    所有發送都先寫入 outbox（SQLite），再交由執行緒池以共用連線池發送。
+    每次資料庫操作都開關連線，可安全地在多個執行緒中使用。
+    """
+
+    def __init__(self, channel_access_token: str,
+                 db_path: str = DEFAULT_OUTBOX_DB,
+                 max_workers: int = DEFAULT_MAX_WORKERS,
+                 max_retries: int = DEFAULT_MAX_RETRIES,
+                 backoff_base: float = BACKOFF_BASE_SECONDS,
+                 max_backoff: float = MAX_BACKOFF_SECONDS,
+                 push_url: str = LINE_MESSAGING_API_URL,
+                 broadcast_url: str = LINE_BROADCAST_API_URL,
+                 multicast_url: str = LINE_MULTICAST_API_URL,
+                 timeout: float = TIMEOUT_SECONDS):
+        """
+        初始化派送器
+
+        Args:
+            channel_access_token: LINE Messaging API 的 Channel Access Token。
+            db_path: outbox SQLite 資料庫路徑。
+            max_workers: 並行發送的執行緒數（同時也是連線池大小）。
+            max_retries: 首次失敗後的最大重試次數。
+            backoff_base: 指數退避的基準秒數（第 n 次重試等待 base * 2^n）。
+            max_backoff: 單次等待的上限秒數（含 Retry-After）。
+            push_url: Push API 網址。
+            broadcast_url: Broadcast API 網址。
+            multicast_url: Multicast API 網址。
+            timeout: 單次請求逾時秒數。
+
+        Raises:
+            ValueError: token 為空或含有非法字元。
+        """
+        if not channel_access_token or not isinstance(channel_access_token, str):
+            raise ValueError("Channel access token is empty or invalid")
+        if _has_invalid_chars(channel_access_token):
+            raise ValueError("Channel access token contains invalid characters")
+
+        self.db_path = db_path
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+        self._urls = {
+            KIND_PUSH: push_url,
+            KIND_BROADCAST: broadcast_url,
+            KIND_MULTICAST: multicast_url,
+        }
+
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=max_workers)
+        self._session.mount("https://", adapter)
+        self._session.mount("http://", adapter)
+        self._session.headers.update({
+            'Content-Type': 'application/json',
+            'Authorization': f'Bearer {channel_access_token}',
+        })
+
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="line-notify"
+        )
+        self._in_flight: Dict[int, Future] = {}
+        self._lock = threading.Lock()
+
+        self._ensure_database()
+        logger.info("NotificationDispatcher initialized with outbox: %s", db_path)
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def _ensure_database(self):
+        """確保資料庫和 outbox 資料表存在"""
+        db_dir = os.path.dirname(self.db_path)
+        if db_dir and not os.path.exists(db_dir):
+            os.makedirs(db_dir)
+            logger.info("Created directory: %s", db_dir)
+
+        conn = self._connect()
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS outbox (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                kind TEXT NOT NULL,
+                recipient TEXT,
+                messages TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'pending',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                last_error TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_outbox_status
+            ON outbox(status)
+        """)
+        conn.commit()
+        conn.close()
+
+    # ========== Outbox ==========
+
+    def enqueue(self, kind: str, messages: List[Dict],
+                recipient: Optional[Union[str, List[str]]] = None) -> Optional[int]:
+        """
+        將一則請求寫入 outbox（尚未發送）。
+
+        Args:
+            kind: KIND_PUSH、KIND_BROADCAST 或 KIND_MULTICAST。
+            messages: LINE message 物件列表。
+            recipient: push 的接收者 ID、multicast 的接收者 ID 列表（broadcast 為 None）。
+
+        Returns:
+            int 或 None: outbox ID，輸入無效時回傳 None。
+        """
+        if kind not in self._urls:
+            logger.error("Unknown notification kind: %s", kind)
+            return None
+        if not self._valid_recipient(kind, recipient):
+            return None
+        if kind == KIND_MULTICAST:
+            recipient = fast_json.dumps(recipient)
+        if not messages:
+            logger.error("Messages are empty")
+            return None
+
+        conn = self._connect()
+        try:
+            cursor = conn.execute(
+                "INSERT INTO outbox (kind, recipient, messages) VALUES (?, ?, ?)",
+                (kind, recipient, fast_json.dumps(messages)),
+            )
+            conn.commit()
+            return cursor.lastrowid
+        finally:
+            conn.close()
+
+    def pending_count(self) -> int:
+        """outbox 中待送的訊息數。"""
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                "SELECT COUNT(*) FROM outbox WHERE status = ?", (STATUS_PENDING,)
+            ).fetchone()
+            return row[0]
+        finally:
+            conn.close()
+
+    def _load(self, outbox_id: int) -> Optional[Tuple[str, Optional[str], str]]:
+        conn = self._connect()
+        try:
+            return conn.execute(
+                "SELECT kind, recipient, messages FROM outbox WHERE id = ? AND status = ?",
+                (outbox_id, STATUS_PENDING),
+            ).fetchone()
+        finally:
+            conn.close()
+
+    def _mark_sent(self, outbox_id: int):
+        conn = self._connect()
+        try:
+            conn.execute("DELETE FROM outbox WHERE id = ?", (outbox_id,))
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _record_attempt(self, outbox_id: int, attempts: int, error: str,
+                        status: str = STATUS_PENDING):
+        conn = self._connect()
+        try:
+            conn.execute(
+                "UPDATE outbox SET attempts = attempts + ?, last_error = ?, status = ?, "
+                "updated_at = CURRENT_TIMESTAMP WHERE id = ?",
+                (attempts, error, status, outbox_id),
+            )
+            conn.commit()
+        finally:
+            conn.close()
+
+    # ========== Sending ==========
+
+    def send(self, kind: str, message: Union[str, List[str]],
+             recipient: Optional[Union[str, List[str]]] = None,
+             ordered: bool = False) -> List[Future]:
+        """
+        非同步發送單則或多則文字訊息。
+
+        超過 MAX_MESSAGE_LENGTH 的訊息拆成多個泡泡，每 MAX_MESSAGES_PER_REQUEST
+        個打包成一筆 outbox 請求；multicast 的收件人依 MAX_MULTICAST_RECIPIENTS
+        分組（重複的 ID 只發一次）。所有請求都先寫入 outbox 再發送，
+        未送達的請求留在 outbox 中等待 flush()。
+
+        Args:
+            kind: KIND_PUSH、KIND_BROADCAST 或 KIND_MULTICAST。
+            message: 訊息內容，或依序發送的多則訊息。
+            recipient: push 的接收者 ID、multicast 的接收者 ID 列表（broadcast 為 None）。
+            ordered: 依序逐筆發送（如分頁訊息），任一筆未送達即停止，
+                     其餘請求保留在 outbox；此時只回傳一個 Future。
+
+        Returns:
+            List[Future[bool]]: 每筆請求一個 Future；輸入無效時為單一個 False。
+        """
+        texts = self._bubbles(message)
+        if texts is None:
+            return [_done(False)]
+        if kind == KIND_MULTICAST and isinstance(recipient, list):
+            recipient = list(dict.fromkeys(recipient))
+        if kind not in self._urls or not self._valid_recipient(kind, recipient):
+            return [_done(False)]
+
+        if kind == KIND_MULTICAST:
+            recipients = [recipient[i:i + MAX_MULTICAST_RECIPIENTS]
+                          for i in range(0, len(recipient), MAX_MULTICAST_RECIPIENTS)]
+        else:
+            recipients = [recipient]
+        messages = [{'type': 'text', 'text': text} for text in texts]
+        outbox_ids = [
+            self.enqueue(kind, messages[i:i + MAX_MESSAGES_PER_REQUEST], recipient=group)
+            for group in recipients
+            for i in range(0, len(messages), MAX_MESSAGES_PER_REQUEST)
+        ]
+        if ordered and len(outbox_ids) > 1:
+            return [self._submit_sequence(outbox_ids)]
+        return [self.submit(outbox_id) for outbox_id in outbox_ids]
+
+    def send_push(self, to_user_id: str, message: Union[str, List[str]]) -> Future:
+        """
+        非同步發送 push 訊息給指定用戶（過長訊息拆成多個泡泡依序發送）。
+
+        Returns:
+            Future[bool]: 完成時為 True（全部送達）或 False。
+        """
+        return self.send(KIND_PUSH, message, to_user_id, ordered=True)[0]
+
+    def send_broadcast(self, message: Union[str, List[str]]) -> Future:
+        """
+        非同步廣播訊息給所有好友（過長訊息拆成多個泡泡依序發送）。
+
+        Returns:
+            Future[bool]: 完成時為 True（全部送達）或 False。
+        """
+        return self.send(KIND_BROADCAST, message, ordered=True)[0]
+
+    def send_multicast(self, to_user_ids: List[str],
+                       message: Union[str, List[str]]) -> List[Future]:
+        """
+        非同步群發訊息給多位用戶（過長訊息拆成多個泡泡）。
+
+        Returns:
+            List[Future[bool]]: 每筆請求一個 Future。
+        """
+        return self.send(KIND_MULTICAST, message, to_user_ids)
+
+    def submit(self, outbox_id: Optional[int]) -> Future:
+        """
+        排程發送一筆 outbox 訊息；同一筆已在發送中時回傳既有的 Future。
+
+        Args:
+            outbox_id: enqueue() 回傳的 ID（None 直接視為失敗）。
+
+        Returns:
+            Future[bool]: 完成時為 True（已送達）或 False。
+        """
+        if outbox_id is None:
+            return _done(False)
+        with self._lock:
+            future = self._in_flight.get(outbox_id)
+            if future is None:
+                future = self._executor.submit(self._deliver, outbox_id)
+                self._in_flight[outbox_id] = future
+                future.add_done_callback(lambda _f: self._forget(outbox_id))
+        return future
+
+    def _submit_sequence(self, outbox_ids: List[int]) -> Future:
+        """排程依序發送多筆 outbox 訊息，共用一個 Future。"""
+        with self._lock:
+            future = self._executor.submit(self._deliver_sequence, outbox_ids)
+            for outbox_id in outbox_ids:
+                self._in_flight[outbox_id] = future
+            future.add_done_callback(
+                lambda _f: [self._forget(outbox_id) for outbox_id in outbox_ids]
+            )
+        return future
+
+    def flush(self) -> Tuple[int, int]:
+        """
+        補送 outbox 中所有待送訊息並等待完成。
+
+        Returns:
+            Tuple[int, int]: (送達數, 仍未送達數)。
+        """
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                "SELECT id FROM outbox WHERE status = ? ORDER BY id", (STATUS_PENDING,)
+            ).fetchall()
+        finally:
+            conn.close()
+
+        futures = [self.submit(row[0]) for row in rows]
+        sent = sum(1 for f in futures if f.result())
+        if futures:
+            logger.info("Outbox flush: %d sent, %d remaining", sent, len(futures) - sent)
+        return sent, len(futures) - sent
+
+    def close(self, wait: bool = True):
+        """關閉執行緒池與連線池（未送達的訊息保留在 outbox）。"""
+        self._executor.shutdown(wait=wait)
+        self._session.close()
+
+    def __enter__(self) -> "NotificationDispatcher":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _forget(self, outbox_id: int):
+        with self._lock:
+            self._in_flight.pop(outbox_id, None)
+
+    @staticmethod
+    def _valid_recipient(kind: str, recipient: Optional[Union[str, List[str]]]) -> bool:
+        if kind == KIND_PUSH:
+            if not recipient or not isinstance(recipient, str):
+                logger.error("User ID is empty or invalid")
+                return False
+            if _has_invalid_chars(recipient):
+                logger.error("User ID contains invalid characters")
+                return False
+        elif kind == KIND_MULTICAST:
+            if not recipient or not isinstance(recipient, list):
+                logger.error("Recipient list is empty or invalid")
+                return False
+            if not all(u and isinstance(u, str) and not _has_invalid_chars(u) for u in recipient):
+                logger.error("User ID is empty or contains invalid characters")
+                return False
+        return True
+
+    @staticmethod
+    def _bubbles(message: Union[str, List[str]]) -> Optional[List[str]]:
+        """驗證單則或多則訊息並將過長者拆成泡泡；無效時記錄錯誤並回傳 None。"""
+        texts = message if isinstance(message, list) else [message]
+        if not texts or not all(text and isinstance(text, str) for text in texts):
+            logger.error("Message is empty or invalid")
+            return None
+        return [bubble for text in texts for bubble in split_message_bubbles(text)]
+
+    def _backoff(self, retry: int, retry_after: Optional[float] = None) -> float:
+        """第 retry 次重試前的等待秒數（Retry-After 優先）。"""
+        if retry_after is not None:
+            return min(retry_after, self.max_backoff)
+        return min(self.backoff_base * (2 ** retry), self.max_backoff)
+
+    def _deliver_sequence(self, outbox_ids: List[int]) -> bool:
+        """依序發送多筆 outbox 訊息；任一筆未送達即停止，其餘保留在 outbox。"""
+        for outbox_id in outbox_ids:
+            if not self._deliver(outbox_id):
+                return False
+        return True
+
+    def _deliver(self, outbox_id: int) -> bool:
+        """發送一筆 outbox 訊息，必要時重試；在執行緒池中執行。"""
+        row = self._load(outbox_id)
+        if row is None:
+            # 已由其他派送器送達或標記為失敗
+            return False
+        kind, recipient, messages_json = row
+        payload = {'messages': fast_json.loads(messages_json)}
+        if kind == KIND_PUSH:
+            payload['to'] = recipient
+        elif kind == KIND_MULTICAST:
+            payload['to'] = fast_json.loads(recipient)
+        url = self._urls[kind]
+
+        error = ""
+        for attempt in range(self.max_retries + 1):
+            retry_after = None
+            try:
+                response = self._session.post(url, json=payload, timeout=self.timeout)
+            except (requests.exceptions.ConnectionError,
+                    requests.exceptions.Timeout) as exc:
+                error = f"{type(exc).__name__}: {exc}"
+            except requests.exceptions.RequestException as exc:
+                error = f"{type(exc).__name__}: {exc}"
+                logger.error("LINE %s %d failed - Request error: %s", kind, outbox_id, exc)
+                self._record_attempt(outbox_id, attempt + 1, error, STATUS_FAILED)
+                return False
+            else:
+                status = response.status_code
+                if status < 400:
+                    self._mark_sent(outbox_id)
+                    logger.info("LINE %s %d sent (attempt %d)", kind, outbox_id, attempt + 1)
+                    return True
+                error = f"HTTP {status}: {response.text[:200]}"
+                if status not in RETRYABLE_STATUS_CODES:
+                    logger.error("LINE %s %d rejected - %s", kind, outbox_id, error)
+                    self._record_attempt(outbox_id, attempt + 1, error, STATUS_FAILED)
+                    return False
+                retry_after = parse_retry_after(response.headers.get('Retry-After'))
+
+            if attempt < self.max_retries:
+                delay = self._backoff(attempt, retry_after)
+                logger.warning("LINE %s %d attempt %d failed (%s), retrying in %.1fs",
+                               kind, outbox_id, attempt + 1, error, delay)
+                time.sleep(delay)
+
+        logger.error("LINE %s %d failed after %d attempts: %s; kept in outbox",
+                     kind, outbox_id, self.max_retries + 1, error)
+        self._record_attempt(outbox_id, self.max_retries + 1, error)
+        return False
+
+
+def _done(value) -> Future:
+    """回傳已完成的 Future。"""
+    future: Future = Future()
+    future.set_result(value)
+    return future
+
+
+if __name__ == '__main__':
+    import argparse
+    import sys
+
+    # 自動載入 .env 檔案（支援 OpenClaw exec 環境）
+    try:
+        from dotenv import load_dotenv
+        env_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.env')
+        load_dotenv(env_path)
+    except ImportError:
+        pass  # python-dotenv 未安裝時跳過
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+    parser = argparse.ArgumentParser(
+        description="LINE 通知派送器 - 補送 outbox 中未送達的訊息"
+    )
+    parser.add_argument("--db", default=default_outbox_db(),
+                        help="outbox 資料庫路徑（預設 $NOTIFY_OUTBOX_DB 或 data/notify_outbox.db）")
+    parser.add_argument("--flush", action="store_true", help="補送所有待送訊息")
+    parser.add_argument("--pending", action="store_true", help="顯示待送訊息數")
+
+    args = parser.parse_args()
+
+    channel_token = os.environ.get("LINE_CHANNEL_ACCESS_TOKEN")
+    if not channel_token:
+        print("錯誤: 缺少 LINE Channel Access Token。請設定環境變數 LINE_CHANNEL_ACCESS_TOKEN。",
+              file=sys.stderr)
+        sys.exit(1)
+
+    with NotificationDispatcher(channel_token, db_path=args.db) as dispatcher:
+        if args.flush:
+            sent, remaining = dispatcher.flush()
+            print(f"已送達 {sent} 則，仍待送 {remaining} 則")
+            sys.exit(0 if remaining == 0 else 1)
+        else:
+            print(f"待送訊息: {dispatcher.pending_count()} 則")
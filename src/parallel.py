@@ -0,0 +1,73 @@
+"""
+多 process 串流處理輔助工具。
+
+multiprocessing.Pool.imap 的 feeder 執行緒會盡快讀完整個輸入，
+輸入是大型資料庫或封存檔時會把全部資料載入記憶體。
+bounded_imap 以 semaphore 限制「已送出但尚未取回結果」的項目數，
+讓輸入維持串流讀取。
+
+用法：
+    for result in bounded_imap(work, iter_rows(), workers=4):
+        ...
+"""
+
+import multiprocessing
+import os
+import threading
+from typing import Any, Callable, Iterable, Iterator, Optional, Tuple
+
+# 每個 worker 最多預先讀取的項目數
+PREFETCH_PER_WORKER = 8
+
+
+def _bounded(items: Iterable, slots: threading.Semaphore,
+             stop: threading.Event) -> Iterator:
+    """
+    每送出一筆就佔用一個名額，結果被取回時釋放。
+
+    stop 被設定時停止送出（主迴圈發生例外時，讓 Pool 的 feeder 執行緒可以結束）。
+    """
+    for item in items:
+        while not slots.acquire(timeout=0.1):
+            if stop.is_set():
+                return
+        yield item
+
+
+def bounded_imap(func: Callable, items: Iterable, workers: Optional[int] = None,
+                 initializer: Optional[Callable] = None, initargs: Tuple = (),
+                 chunksize: int = 1, ordered: bool = True) -> Iterator[Any]:
+    """
+    以多個 process 對串流輸入套用 func，限制預先讀取量。
+
+    Args:
+        func: 可 pickle 的模組層級函式。
+        items: 輸入項目（可為產生器，會在 Pool 的 feeder 執行緒中迭代）。
+        workers: process 數（None 為 CPU 數；1 則在目前 process 依序執行）。
+        initializer: 每個 worker 啟動時呼叫一次（例如載入設定）。
+        initargs: initializer 的參數。
+        chunksize: 每個 worker 一次領取的項目數。
+        ordered: False 則依完成順序回傳（imap_unordered）。
+
+    Yields:
+        func 的回傳值。
+    """
+    workers = workers or os.cpu_count() or 1
+
+    if workers == 1:
+        if initializer is not None:
+            initializer(*initargs)
+        for item in items:
+            yield func(item)
+        return
+
+    slots = threading.Semaphore(workers * max(chunksize, PREFETCH_PER_WORKER))
+    stop = threading.Event()
+    with multiprocessing.Pool(workers, initializer=initializer, initargs=initargs) as pool:
+        imap = pool.imap if ordered else pool.imap_unordered
+        try:
+            for result in imap(func, _bounded(items, slots, stop), chunksize=chunksize):
+                slots.release()
+                yield result
+        finally:
+            stop.set()
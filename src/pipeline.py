@@ -1,5 +1,5 @@
 """
-批次處理 pipeline — 一次完成 filter + dedup + scoring。
+批次處理 pipeline — 一次完成 filter + preclassify + authors + dedup + scoring + batching。
 
 取代逐篇呼叫 filter.py / dedup.py 的方式，
 將所有貼文以 JSON 輸入，一次處理完畢輸出結果。
@@ -10,12 +10,13 @@
 """
 
 import copy
-import json
 import logging
 import os
 import sys
 from typing import Dict, List, Optional
 
+import fast_json
+
 logger = logging.getLogger(__name__)
 
 # 預設路徑
@@ -23,6 +24,9 @@ _PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 DEFAULT_FILTER_CONFIG = os.path.join(_PROJECT_ROOT, "config", "filters.yml")
 DEFAULT_DEDUP_DB = os.path.join(_PROJECT_ROOT, "data", "processed_posts.db")
 DEFAULT_SCORING_CONFIG = os.path.join(_PROJECT_ROOT, "config", "scoring.yml")
+DEFAULT_KEYWORDS_CONFIG = os.path.join(_PROJECT_ROOT, "config", "keywords.yml")
+DEFAULT_FILTER_STATS = os.path.join(_PROJECT_ROOT, "data", "filter_stats.json")
+DEFAULT_AUTHOR_DB = os.path.join(_PROJECT_ROOT, "data", "authors.db")
 DEFAULT_MIN_VALID_POSTS = 10
 
 
@@ -40,9 +44,16 @@ def process_posts(
     dedup_db_path: str = DEFAULT_DEDUP_DB,
     scoring_config_path: str = DEFAULT_SCORING_CONFIG,
     min_valid_posts: Optional[int] = None,
+    archive=None,
+    filter_stats_path: Optional[str] = None,
+    author_db_path: Optional[str] = None,
+    run_id: Optional[str] = None,
+    batch_tokens: Optional[int] = None,
+    batch_max_posts: Optional[int] = None,
+    keywords_config_path: str = DEFAULT_KEYWORDS_CONFIG,
 ) -> Dict:
     """
-    批次處理貼文：filter → dedup → scoring。
+    批次處理貼文：filter → preclassify → authors → dedup → scoring → batching。
 
     Args:
         posts: 貼文列表，每篇至少含 content, author, link。
@@ -50,23 +61,49 @@ def process_posts(
         dedup_db_path: SQLite 去重資料庫路徑。
         scoring_config_path: scoring.yml 路徑。
         min_valid_posts: 最少需要的有效貼文數（None 則讀取環境變數 MIN_VALID_POSTS，預設 10）。
+        archive: archive.PostArchive；提供時記錄每篇輸入貼文與判斷結果（由呼叫端負責 close）。
+        filter_stats_path: 排除詞命中統計檔；提供時依歷史命中率安排檢查順序，
+            結束後併入本次計數（判斷結果不受影響）。
+        author_db_path: 作者登記表 SQLite 路徑；filters.yml 有 authors 區段時
+            保存作者統計（None 則只套用名單與每次 run 上限）。
+        run_id: 放行貼文在作者登記表中所屬的 run ID（report_generator.py 以相同的值結算）。
+        batch_tokens: 每個分析批次的估計 token 上限（None 則讀取環境變數 ANALYSIS_BATCH_TOKENS）。
+        batch_max_posts: 每個分析批次的篇數上限（None 則讀取環境變數 ANALYSIS_BATCH_MAX_POSTS）。
+        keywords_config_path: keywords.yml 路徑；垃圾預分類遇到含監控關鍵字的內容時不判斷外語。
 
     Returns:
         Dict: {
-            passed_posts, filtered_count, duplicate_count,
+            passed_posts, filtered_count, junk_count, author_count, duplicate_count,
             new_count, total_input, summary,
-            needs_more, min_valid_posts
+            needs_more, min_valid_posts,
+            filter_reasons（各過濾原因代碼的篇數）,
+            junk_reasons（各垃圾原因代碼的篇數）,
+            author_reasons（各作者排除原因的篇數）,
+            batches（分析批次，passed_posts 的 [start, end) 區間與估計 token 數）
         }
+
+        passed_posts 依分析優先度排序（白名單關鍵字、評分加成在前）。
     """
-    from filter import load_filter_config, should_filter_content
-    from dedup import DedupManager
+    from filter import (
+        REASON_PRIORITY_KEEP, FilterCounters, FilterHitStats, compile_filter_config,
+        load_filter_config, update_hit_stats,
+    )
+    from dedup import DedupManager, content_fingerprint
+    from preclassify import classifier_from_config, load_monitored_keywords
+    from authors import REASON_DENIED, author_key, registry_from_config
+    from batching import get_batch_limits, plan_batches
     from scoring import load_scoring_config, apply_scoring_bonus
+    from normalize import normalizer_from_config
 
     if min_valid_posts is None:
         min_valid_posts = _get_min_valid_posts()
 
     total_input = len(posts)
     filtered_count = 0
+    junk_count = 0
+    junk_reasons: Dict[str, int] = {}
+    author_count = 0
+    author_reasons: Dict[str, int] = {}
     duplicate_count = 0
     passed_posts = []
 
@@ -76,10 +113,28 @@ def process_posts(
     except FileNotFoundError:
         logger.warning("過濾設定檔不存在: %s，跳過過濾", filter_config_path)
         filter_config = {}
+    hit_stats = FilterHitStats.load(filter_stats_path) if filter_stats_path else None
+    compiled_filter = compile_filter_config(filter_config, hit_stats)
+    filter_counters = FilterCounters()
+    classifier = classifier_from_config(filter_config)
+    if classifier is not None:
+        # 監控關鍵字以與過濾相同的方式正規化（預分類比對的是正規化後的內容）
+        keywords = load_monitored_keywords(keywords_config_path)
+        classifier.keywords = [compiled_filter.match_text(kw) for kw in keywords]
+    authors = registry_from_config(filter_config, author_db_path, run_id)
 
     dedup = DedupManager(dedup_db_path)
+    content_dedup = bool(filter_config.get("content_dedup"))
     scoring_config = load_scoring_config(scoring_config_path)
 
+    # 評分加成規則（關鍵字依 scoring.yml 的正規化設定處理，與戰報的 bonus_detail 一致）
+    score_normalize = normalizer_from_config(scoring_config)
+    bonus_rules = [
+        (rule.get("name", "unknown"),
+         [score_normalize(kw) if score_normalize else kw for kw in rule.get("keywords", [])])
+        for rule in scoring_config.get("bonus_rules", [])
+    ]
+
     for post in posts:
         # 深複製，不修改原始資料
         p = copy.deepcopy(post)
@@ -89,39 +144,115 @@ def process_posts(
         link = p.get("link")
         if not content or not link:
             filtered_count += 1
+            if archive is not None:
+                archive.record(post, "invalid", "missing_fields")
             continue
 
+        # 比對用文字（正規化每篇只做一次，過濾與內容指紋共用）
+        text = compiled_filter.match_text(content)
+
         # 步驟 1: 過濾
-        if should_filter_content(content, filter_config):
+        decision = compiled_filter.evaluate(content, text)
+        filter_counters.add(decision)
+        if decision.filtered:
             filtered_count += 1
+            if archive is not None:
+                archive.record(post, "filtered", decision.reason, decision.matched_terms)
+            continue
+
+        # 步驟 2: 垃圾預分類（白名單救回的貼文不判斷）
+        if classifier is not None and decision.reason != REASON_PRIORITY_KEEP:
+            junk = classifier.classify(text)
+            if junk is not None:
+                junk_count += 1
+                junk_reasons[junk] = junk_reasons.get(junk, 0) + 1
+                if archive is not None:
+                    archive.record(post, "junk", junk)
+                continue
+
+        # 步驟 3: 作者封鎖名單
+        author = author_key(p) if authors is not None else None
+        if author is not None and authors.is_denied(author):
+            author_count += 1
+            author_reasons[REASON_DENIED] = author_reasons.get(REASON_DENIED, 0) + 1
+            if archive is not None:
+                archive.record(post, "author", REASON_DENIED)
             continue
 
-        # 步驟 2: 去重
+        # 步驟 4: 去重（連結；啟用 content_dedup 時另比對正規化後的內容指紋）
         if dedup.is_processed(link):
             duplicate_count += 1
+            if archive is not None:
+                archive.record(post, "duplicate", "seen_link")
             continue
+        fingerprint = None
+        if content_dedup:
+            fingerprint = content_fingerprint(text, normalized=compiled_filter.normalize is not None)
+            if dedup.is_content_processed(fingerprint):
+                duplicate_count += 1
+                if archive is not None:
+                    archive.record(post, "duplicate", "seen_content")
+                continue
+
+        # 步驟 5: 每位作者每次 run 的上限（不加入去重資料庫，下次 run 仍可處理）
+        if author is not None:
+            limited = authors.check(author)
+            if limited is not None:
+                author_count += 1
+                author_reasons[limited] = author_reasons.get(limited, 0) + 1
+                if archive is not None:
+                    archive.record(post, "author", limited)
+                continue
+            authors.record_passed(author, link)
 
         # 新貼文 → 加入去重資料庫
         dedup.add_post(link)
+        dedup.add_content(fingerprint)
 
-        # 步驟 3: 評分加成（只加 bonus 到 content 層級，不需要完整 analysis）
+        # 步驟 6: 評分加成（只加 bonus 到 content 層級，不需要完整 analysis）
+        bonus_text = score_normalize(content) if score_normalize else content
         bonus_applied = []
-        for rule in scoring_config.get("bonus_rules", []):
-            keywords = rule.get("keywords", [])
+        for name, keywords in bonus_rules:
             for kw in keywords:
-                if kw in content:
-                    bonus_applied.append(rule.get("name", "unknown"))
+                if kw in bonus_text:
+                    bonus_applied.append(name)
                     break
 
         p["bonus_applied"] = bonus_applied
+        p["priority_keyword"] = compiled_filter.has_priority(text)
         passed_posts.append(p)
+        if archive is not None:
+            archive.record(post, "passed", decision.reason, decision.matched_terms)
 
     dedup.close()
+    if authors is not None:
+        authors.close()
+    if filter_counters.reasons:
+        logger.info("過濾判斷統計: %s", filter_counters.summary())
+        if filter_stats_path:
+            try:
+                update_hit_stats(filter_stats_path, filter_counters)
+            except OSError as e:
+                logger.warning("無法更新過濾統計檔 %s: %s", filter_stats_path, e)
+    if junk_reasons:
+        logger.info("垃圾預分類統計: %s", junk_reasons)
+    if author_reasons:
+        logger.info("作者限制統計: %s", author_reasons)
+
+    # 步驟 7: 依優先度與估計 token 數分成分析批次
+    default_tokens, default_max_posts = get_batch_limits()
+    passed_posts, batches = plan_batches(
+        passed_posts,
+        max_tokens=batch_tokens or default_tokens,
+        max_posts=batch_max_posts or default_max_posts,
+    )
 
     new_count = len(passed_posts)
     summary = (
         f"掃描 {total_input} 篇 → "
         f"過濾 {filtered_count} 篇 → "
+        f"垃圾 {junk_count} 篇 → "
+        f"作者限制 {author_count} 篇 → "
         f"重複 {duplicate_count} 篇 → "
         f"有效 {new_count} 篇"
     )
@@ -131,18 +262,26 @@ def process_posts(
     return {
         "passed_posts": passed_posts,
         "filtered_count": filtered_count,
+        "junk_count": junk_count,
+        "author_count": author_count,
         "duplicate_count": duplicate_count,
         "new_count": new_count,
         "total_input": total_input,
         "summary": summary,
         "needs_more": needs_more,
         "min_valid_posts": min_valid_posts,
+        "filter_reasons": dict(filter_counters.reasons),
+        "junk_reasons": junk_reasons,
+        "author_reasons": author_reasons,
+        "batches": [batch.to_dict() for batch in batches],
     }
 
 
 if __name__ == '__main__':
     import argparse
 
+    from authors import RUN_ID_ENV
+
     try:
         from dotenv import load_dotenv
         env_path = os.path.join(_PROJECT_ROOT, '.env')
@@ -162,6 +301,23 @@ if __name__ == '__main__':
     parser.add_argument("--filter-config", default=DEFAULT_FILTER_CONFIG)
     parser.add_argument("--dedup-db", default=DEFAULT_DEDUP_DB)
     parser.add_argument("--scoring-config", default=DEFAULT_SCORING_CONFIG)
+    parser.add_argument("--keywords-config", default=DEFAULT_KEYWORDS_CONFIG)
+    parser.add_argument("--archive-dir", default=os.environ.get("PIPELINE_ARCHIVE_DIR"),
+                        help="封存每篇輸入貼文與判斷結果的目錄（預設讀取 PIPELINE_ARCHIVE_DIR，未設定則不封存）")
+    parser.add_argument("--run-id", default=os.environ.get(RUN_ID_ENV),
+                        help=f"寫入封存紀錄與作者待定貼文的 run ID（預設讀取 {RUN_ID_ENV}）")
+    parser.add_argument("--filter-stats",
+                        default=os.environ.get("FILTER_STATS_PATH", DEFAULT_FILTER_STATS),
+                        help="排除詞命中統計檔（依歷史命中率安排檢查順序；設為空字串停用）")
+    parser.add_argument("--author-db",
+                        default=os.environ.get("AUTHOR_DB_PATH", DEFAULT_AUTHOR_DB),
+                        help="作者登記表（每位作者發文量與分析結果統計；設為空字串停用保存）")
+    parser.add_argument("--batch-tokens", type=int,
+                        help="每個分析批次的估計 token 上限（預設讀取 ANALYSIS_BATCH_TOKENS，6000）")
+    parser.add_argument("--batch-max-posts", type=int,
+                        help="每個分析批次的篇數上限（預設讀取 ANALYSIS_BATCH_MAX_POSTS，20）")
+    parser.add_argument("--compact", action="store_true",
+                        help="輸出緊湊 JSON（不縮排，供程式讀取時較快）")
 
     args = parser.parse_args()
 
@@ -169,10 +325,10 @@ if __name__ == '__main__':
     try:
         if args.input:
             with open(args.input, 'r', encoding='utf-8') as f:
-                posts = json.load(f)
+                posts = fast_json.load(f)
         else:
-            posts = json.load(sys.stdin)
-    except (json.JSONDecodeError, FileNotFoundError) as e:
+            posts = fast_json.load(sys.stdin)
+    except (fast_json.JSONDecodeError, FileNotFoundError) as e:
         print(f"錯誤: 無法讀取輸入 - {e}", file=sys.stderr)
         sys.exit(2)
 
@@ -180,14 +336,41 @@ if __name__ == '__main__':
         print("錯誤: 輸入必須是 JSON 陣列", file=sys.stderr)
         sys.exit(2)
 
+    archive = None
+    if args.archive_dir:
+        from archive import PostArchive
+        archive = PostArchive(args.archive_dir, run_id=args.run_id)
+
     # 處理
-    result = process_posts(
-        posts,
-        filter_config_path=args.filter_config,
-        dedup_db_path=args.dedup_db,
-        scoring_config_path=args.scoring_config,
-    )
+    try:
+        result = process_posts(
+            posts,
+            filter_config_path=args.filter_config,
+            dedup_db_path=args.dedup_db,
+            scoring_config_path=args.scoring_config,
+            archive=archive,
+            filter_stats_path=args.filter_stats or None,
+            author_db_path=args.author_db or None,
+            run_id=args.run_id,
+            batch_tokens=args.batch_tokens,
+            batch_max_posts=args.batch_max_posts,
+            keywords_config_path=args.keywords_config,
+        )
+    finally:
+        if archive is not None:
+            archive.close()
+
+    # 結構化事件（由 web backend 啟動時才會寫入）
+    from events import emit_event
+    emit_event("pipeline_stats", {
+        "scanned": result["total_input"],
+        "filtered": result["filtered_count"],
+        "junk": result["junk_count"],
+        "author_limited": result["author_count"],
+        "duplicated": result["duplicate_count"],
+        "valid": result["new_count"],
+    })
 
     # 輸出 JSON 結果
-    print(json.dumps(result, ensure_ascii=False, indent=2))
+    print(fast_json.dumps(result, indent=not args.compact))
     sys.exit(0)
@@ -0,0 +1,230 @@
+"""
+垃圾貼文預分類 — 在送 AI 分析前，以字元統計排除明顯無關的貼文。
+
+長度超過 min_content_length 的純表情符號、只有連結、外語、重複字灌水貼文
+會通過排除詞過濾，卻仍消耗 AI 分析的 token。這裡只用一次字元計數
+（collections.Counter，C 實作）算出以下特徵，每篇只需數微秒：
+
+- letters：網址以外的文字字元數（只有連結：附上網址但幾乎沒有說明文字）
+- url_ratio：網址字元佔全文比例（僅供檢視，不作為判斷依據）
+- symbol_ratio：非文字、非數字字元（表情符號、標點）佔非空白字元比例
+- cjk_ratio：中日韓漢字佔所有文字字元比例（外語；內容含監控關鍵字時不判斷）
+- repeat_ratio：最常出現的單一字元佔非空白字元比例（重複字）
+- entropy：字元分布的 Shannon entropy（bits/字，重複片語灌水時很低）
+
+網址的比例不作為依據：新聞連結加一句評論的貼文網址佔比很高，卻正是要監控的內容。
+中英夾雜的貼文漢字比例也可能很低，因此內容含監控關鍵字（config/keywords.yml）時不判斷外語。
+
+門檻在 filters.yml 的 preclassify 區段設定：
+
+    preclassify:
+      enabled: true
+      min_letters_with_url: 4
+      max_symbol_ratio: 0.5
+      min_cjk_ratio: 0.15
+      min_letters_for_language: 10
+      max_repeat_ratio: 0.4
+      min_entropy: 2.5
+
+用法：
+    python3 src/preclassify.py --content "哈哈哈哈哈哈哈哈哈哈哈哈哈哈哈"
+"""
+
+import logging
+import math
+import os
+import re
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_KEYWORDS_CONFIG = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "config", "keywords.yml"
+)
+
+# 判斷為垃圾的原因代碼
+JUNK_LINK_ONLY = "link_only"
+JUNK_SYMBOLS = "symbols"
+JUNK_FOREIGN = "foreign_language"
+JUNK_REPETITIVE = "repetitive"
+JUNK_LOW_ENTROPY = "low_entropy"
+
+DEFAULT_THRESHOLDS = {
+    "min_letters_with_url": 4,
+    "max_symbol_ratio": 0.5,
+    "min_cjk_ratio": 0.15,
+    "min_letters_for_language": 10,
+    "max_repeat_ratio": 0.4,
+    "min_entropy": 2.5,
+}
+
+_URL_RE = re.compile(r"(?:https?://|www\.)\S+", re.IGNORECASE)
+
+
+def _is_cjk(ch: str) -> bool:
+    code = ord(ch)
+    return 0x4E00 <= code <= 0x9FFF or 0x3400 <= code <= 0x4DBF or 0xF900 <= code <= 0xFAFF
+
+
+@dataclass(frozen=True)
+class TextFeatures:
+    """單篇內容的字元統計特徵。"""
+
+    chars: int            # 非空白字元數（不含網址）
+    url_ratio: float      # 網址字元佔全文比例（0 表示沒有網址）
+    symbol_ratio: float
+    cjk_ratio: float
+    letters: int          # 文字字元數（漢字、拉丁字母、假名等，不含網址）
+    repeat_ratio: float
+    entropy: float
+
+
+def extract_features(text: str) -> TextFeatures:
+    """
+    計算內容的字元統計特徵。
+
+    Args:
+        text: 貼文內容（建議使用 normalize.py 正規化後的文字）。
+
+    Returns:
+        TextFeatures: 各項比例與 entropy。
+    """
+    total = len(text)
+    url_chars = 0
+    if "://" in text or "www." in text.lower():
+        url_chars = sum(len(m) for m in _URL_RE.findall(text))
+        text = _URL_RE.sub(" ", text)
+
+    counts = Counter(text)
+    for space in [ch for ch in counts if ch.isspace()]:
+        del counts[space]
+    chars = sum(counts.values())
+    if not chars:
+        return TextFeatures(0, url_chars / total if total else 0.0, 0.0, 0.0, 0, 0.0, 0.0)
+
+    letters = cjk = digits = 0
+    entropy = 0.0
+    for ch, count in counts.items():
+        if ch.isalpha():
+            letters += count
+            if _is_cjk(ch):
+                cjk += count
+        elif ch.isdigit():
+            digits += count
+        p = count / chars
+        entropy -= p * math.log2(p)
+
+    return TextFeatures(
+        chars=chars,
+        url_ratio=url_chars / total,
+        symbol_ratio=(chars - letters - digits) / chars,
+        cjk_ratio=cjk / letters if letters else 0.0,
+        letters=letters,
+        repeat_ratio=max(counts.values()) / chars,
+        entropy=entropy,
+    )
+
+
+class JunkClassifier:
+    """依 filters.yml 的 preclassify 門檻判斷貼文是否為垃圾。"""
+
+    def __init__(self, config: Optional[Dict] = None, keywords: Iterable[str] = ()):
+        """
+        Args:
+            config: filters.yml 的 preclassify 區段（None 則使用預設門檻並啟用）。
+            keywords: 監控關鍵字（須與比對內容以相同方式正規化）；內容含任一關鍵字時不判斷外語。
+        """
+        config = config or {}
+        self.enabled = bool(config.get("enabled", True))
+        thresholds = dict(DEFAULT_THRESHOLDS)
+        thresholds.update({k: v for k, v in config.items() if k in DEFAULT_THRESHOLDS})
+        self.min_letters_with_url = int(thresholds["min_letters_with_url"])
+        self.max_symbol_ratio = float(thresholds["max_symbol_ratio"])
+        self.min_cjk_ratio = float(thresholds["min_cjk_ratio"])
+        self.min_letters_for_language = int(thresholds["min_letters_for_language"])
+        self.max_repeat_ratio = float(thresholds["max_repeat_ratio"])
+        self.min_entropy = float(thresholds["min_entropy"])
+        self.keywords = [kw for kw in keywords if kw]
+
+    def classify(self, text: Optional[str]) -> Optional[str]:
+        """
+        判斷內容是否為垃圾。
+
+        Returns:
+            Optional[str]: 垃圾原因代碼（JUNK_*），不是垃圾或未啟用時回傳 None。
+        """
+        if not self.enabled or not text:
+            return None
+        features = extract_features(text)
+        if not features.chars or (features.url_ratio > 0
+                                  and features.letters < self.min_letters_with_url):
+            return JUNK_LINK_ONLY
+        if features.symbol_ratio >= self.max_symbol_ratio:
+            return JUNK_SYMBOLS
+        if (features.letters >= self.min_letters_for_language
+                and features.cjk_ratio < self.min_cjk_ratio
+                and not any(kw in text for kw in self.keywords)):
+            return JUNK_FOREIGN
+        if features.repeat_ratio >= self.max_repeat_ratio:
+            return JUNK_REPETITIVE
+        if features.entropy < self.min_entropy:
+            return JUNK_LOW_ENTROPY
+        return None
+
+
+def load_monitored_keywords(config_path: str = DEFAULT_KEYWORDS_CONFIG) -> List[str]:
+    """
+    讀取 keywords.yml 列出的所有監控關鍵字（含未啟用的）。
+
+    Returns:
+        List[str]: 關鍵字列表；檔案不存在或格式錯誤時回傳空列表。
+    """
+    import yaml
+
+    try:
+        with open(config_path, 'r', encoding='utf-8') as f:
+            config = yaml.safe_load(f) or {}
+    except (OSError, yaml.YAMLError) as e:
+        logger.warning("無法讀取關鍵字設定 %s: %s", config_path, e)
+        return []
+    entries = config.get("keywords") if isinstance(config, dict) else None
+    return [entry["keyword"] for entry in entries or []
+            if isinstance(entry, dict) and isinstance(entry.get("keyword"), str)]
+
+
+def classifier_from_config(filter_config: Optional[Dict],
+                           keywords: Iterable[str] = ()) -> Optional[JunkClassifier]:
+    """
+    由 filters.yml 設定建立分類器。
+
+    Args:
+        filter_config: filters.yml 設定。
+        keywords: 監控關鍵字（見 JunkClassifier；也可之後設定 classifier.keywords）。
+
+    Returns:
+        JunkClassifier | None: 沒有 preclassify 區段或 enabled: false 時回傳 None。
+    """
+    section = (filter_config or {}).get("preclassify")
+    if not isinstance(section, dict):
+        return None
+    classifier = JunkClassifier(section, keywords)
+    return classifier if classifier.enabled else None
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="垃圾貼文預分類 - 顯示字元統計特徵與判斷結果")
+    parser.add_argument("--content", required=True, help="要檢查的內容")
+    parser.add_argument("--keywords-config", default=DEFAULT_KEYWORDS_CONFIG,
+                        help="監控關鍵字設定檔（內容含其中關鍵字時不判斷外語）")
+    args = parser.parse_args()
+
+    features = extract_features(args.content)
+    for name, value in features.__dict__.items():
+        print(f"{name}: {value:.3f}" if isinstance(value, float) else f"{name}: {value}")
+    reason = JunkClassifier(keywords=load_monitored_keywords(args.keywords_config)).classify(args.content)
+    print(f"JUNK {reason}" if reason else "PASS")
@@ -1,16 +1,33 @@
+import hashlib
 import logging
 import os
-import json
+import re
+import sqlite3
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from dataclasses import dataclass
 from datetime import datetime
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, Optional, Tuple, Union
 
-from scoring import load_scoring_config, apply_scoring_to_posts
+import fast_json
+from report_store import ReportStore
+from scoring import load_scoring_config, apply_scoring_bonus, apply_scoring_to_posts
 
 logger = logging.getLogger(__name__)
 
 MAX_LINE_MESSAGE_LENGTH = 5000
 MAX_TELEGRAM_MESSAGE_LENGTH = 4096
 DEFAULT_REPORTS_DIR = "data/reports"
+GIST_CACHE_FILENAME = ".gist_cache.json"
+DEFAULT_GIST_CACHE_PATH = os.path.join(DEFAULT_REPORTS_DIR, GIST_CACHE_FILENAME)
+GITHUB_API_URL_ENV = "GITHUB_API_URL"
+DEFAULT_GITHUB_API_URL = "https://api.github.com"
+GIST_TIMEOUT_SECONDS = 15
+# 等待背景上傳的上限：PATCH 失敗時改為 POST，最多兩次請求
+GIST_WAIT_SECONDS = GIST_TIMEOUT_SECONDS * 2
+DEFAULT_AUTHOR_DB = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "authors.db"
+)
 
 REQUIRED_TOP_KEYS = ["analyzed_posts", "stats", "keywords", "timestamp"]
 REQUIRED_POST_KEYS = ["id", "content", "link"]
@@ -77,6 +94,15 @@ def _get_effective_importance(post: Dict) -> int:
     return analysis.get("adjusted_importance", analysis.get("importance", 0))
 
 
+def _is_big_fish(post: Dict) -> bool:
+    """判斷單篇貼文是否為大魚（判斷標準見 identify_big_fish）。"""
+    importance = _get_effective_importance(post)
+    if importance >= 9:
+        return True
+    categories = post.get("analysis", {}).get("categories", [])
+    return len(categories) >= 3 and importance >= 8
+
+
 def identify_big_fish(posts: List[Dict]) -> List[Dict]:
     """
     識別大魚（重大議題）貼文。
@@ -91,17 +117,7 @@ def identify_big_fish(posts: List[Dict]) -> List[Dict]:
     Returns:
         List[Dict]: 大魚貼文列表（依有效分數降序排列）。
     """
-    big_fish = []
-    for post in posts:
-        analysis = post.get("analysis", {})
-        importance = _get_effective_importance(post)
-        categories = analysis.get("categories", [])
-
-        if importance >= 9:
-            big_fish.append(post)
-        elif len(categories) >= 3 and importance >= 8:
-            big_fish.append(post)
-
+    big_fish = [post for post in posts if _is_big_fish(post)]
     big_fish.sort(key=_get_effective_importance, reverse=True)
     return big_fish
 
@@ -137,6 +153,111 @@ def compute_category_stats(categorized: Dict[str, List[Dict]]) -> List[Dict]:
     return stats
 
 
+@dataclass
+class ReportModel:
+    """
+    預先計算好的戰報模型，由所有渲染函式共用。
+
+    一次走訪貼文即算出有效分數、大魚、類別分組與統計；
+    排序結果以貼文索引保存，渲染時不再重新分類、排序或計算分數。
+    """
+
+    posts: List[Dict]
+    stats: Dict
+    keywords: List[str]
+    timestamp: str
+    importance: List               # 每篇的有效分數（adjusted_importance 優先）
+    big_fish: List[int]            # 大魚索引，依有效分數降序
+    other_posts: List[int]         # 非大魚索引，依原始 importance 降序
+    categorized: Dict[str, List[int]]  # 類別 -> 索引，依有效分數降序
+    category_stats: List[Dict]
+
+    def big_fish_posts(self) -> List[Dict]:
+        """大魚貼文列表（同 identify_big_fish）。"""
+        return [self.posts[i] for i in self.big_fish]
+
+    def big_fish_ids(self) -> List[str]:
+        """大魚貼文 ID 列表，供 API 以 ID 參照 posts 而不重複內嵌。"""
+        return [str(self.posts[i].get("id", "")) for i in self.big_fish]
+
+
+def _assemble_report_model(data: Dict, posts: List[Dict], importance: List,
+                           base_importance: List, buckets: Dict[str, List[int]],
+                           big_fish: List[int], categorized_ids: set) -> ReportModel:
+    """由已收集的索引資料排序並組成 ReportModel。"""
+    by_importance = importance.__getitem__
+    # sorted(..., reverse=True) 為穩定排序，同分時維持原順序（與舊版行為一致）
+    big_fish_sorted = sorted(big_fish, key=by_importance, reverse=True)
+    big_fish_set = set(big_fish)
+    other_posts = sorted(
+        (i for i in range(len(posts)) if i not in big_fish_set),
+        key=base_importance.__getitem__, reverse=True,
+    )
+    categorized = {
+        name: sorted(indices, key=by_importance, reverse=True)
+        for name, indices in buckets.items()
+    }
+
+    category_stats = []
+    if buckets:
+        total_unique = len(categorized_ids) if categorized_ids else 1
+        for name, indices in buckets.items():
+            count = len(indices)
+            percentage = round(count / total_unique * 100, 1)
+            category_stats.append({"name": name, "count": count, "percentage": percentage})
+        category_stats.sort(key=lambda s: s["count"], reverse=True)
+
+    return ReportModel(
+        posts=posts,
+        stats=data.get("stats", {}),
+        keywords=data.get("keywords", []),
+        timestamp=data.get("timestamp", datetime.now().isoformat()),
+        importance=importance,
+        big_fish=big_fish_sorted,
+        other_posts=other_posts,
+        categorized=categorized,
+        category_stats=category_stats,
+    )
+
+
+def build_report_model(data: Dict) -> ReportModel:
+    """
+    一次走訪貼文，建立所有渲染函式共用的 ReportModel。
+
+    Args:
+        data: 完整的監控資料字典。
+
+    Returns:
+        ReportModel: 預先計算好的戰報模型。
+    """
+    posts = data.get("analyzed_posts", [])
+    importance = []
+    base_importance = []
+    buckets: Dict[str, List[int]] = {}
+    categorized_ids = set()
+    big_fish = []
+
+    for i, post in enumerate(posts):
+        analysis = post.get("analysis", {})
+        base = analysis.get("importance", 0)
+        eff = analysis.get("adjusted_importance", base)
+        categories = analysis.get("categories", [])
+        importance.append(eff)
+        base_importance.append(base)
+
+        for category in categories:
+            buckets.setdefault(category, []).append(i)
+        if categories:
+            categorized_ids.add(post.get("id", ""))
+
+        if eff >= 9 or (len(categories) >= 3 and eff >= 8):
+            big_fish.append(i)
+
+    return _assemble_report_model(
+        data, posts, importance, base_importance, buckets, big_fish, categorized_ids
+    )
+
+
 def generate_markdown_report(data: Dict) -> str:
     """
     從監控資料生成完整的 Markdown 格式戰報。
@@ -147,22 +268,31 @@ def generate_markdown_report(data: Dict) -> str:
     Returns:
         str: Markdown 格式的完整戰報。
     """
-    posts = data.get("analyzed_posts", [])
-    stats = data.get("stats", {})
-    keywords = data.get("keywords", [])
-    timestamp = data.get("timestamp", datetime.now().isoformat())
+    return render_markdown_report(build_report_model(data))
+
+
+def render_markdown_report(model: ReportModel) -> str:
+    """
+    從 ReportModel 渲染完整的 Markdown 格式戰報。
+
+    Args:
+        model: 預先計算好的戰報模型。
 
-    categorized = classify_posts_by_category(posts)
-    big_fish = identify_big_fish(posts)
-    category_stats = compute_category_stats(categorized)
+    Returns:
+        str: Markdown 格式的完整戰報。
+    """
+    posts = model.posts
+    stats = model.stats
+    importance = model.importance
+    big_fish = model.big_fish
 
     lines = []
 
     # Header
     lines.append("# Threads 輿情戰報")
     lines.append("")
-    lines.append(f"**生成時間**: {timestamp}")
-    lines.append(f"**監控關鍵字**: {', '.join(keywords)}")
+    lines.append(f"**生成時間**: {model.timestamp}")
+    lines.append(f"**監控關鍵字**: {', '.join(model.keywords)}")
     lines.append(f"**有效貼文數**: {len(posts)} 篇")
     lines.append("")
     lines.append("---")
@@ -189,12 +319,12 @@ def generate_markdown_report(data: Dict) -> str:
     lines.append("")
 
     # Category distribution
-    if category_stats:
+    if model.category_stats:
         lines.append("### 議題分布")
         lines.append("")
         lines.append("| 類別 | 數量 | 百分比 |")
         lines.append("|------|------|--------|")
-        for cs in category_stats:
+        for cs in model.category_stats:
             lines.append(f"| {cs['name']} | {cs['count']} | {cs['percentage']}% |")
         lines.append("")
 
@@ -205,14 +335,14 @@ def generate_markdown_report(data: Dict) -> str:
     if big_fish:
         lines.append("## 大魚警報（重大議題）")
         lines.append("")
-        for i, fish in enumerate(big_fish, 1):
+        for i, idx in enumerate(big_fish, 1):
+            fish = posts[idx]
             analysis = fish.get("analysis", {})
             cats = analysis.get("categories", [])
             cat_label = "][".join(cats)
-            eff = _get_effective_importance(fish)
             lines.append(f"### {i}. [{cat_label}] {analysis.get('summary', '')}")
             lines.append("")
-            eff_imp = _get_effective_importance(fish)
+            eff_imp = importance[idx]
             base_imp = analysis.get('importance', 'N/A')
             bonus_detail = analysis.get('bonus_detail', [])
             if bonus_detail:
@@ -242,25 +372,19 @@ def generate_markdown_report(data: Dict) -> str:
         lines.append("---")
         lines.append("")
 
-    # Detailed category sections
+    # Detailed category sections（索引已依有效分數降序排好）
     lines.append("## 各類別詳情")
     lines.append("")
 
-    for cs in category_stats:
+    for cs in model.category_stats:
         cat_name = cs["name"]
-        cat_posts = categorized.get(cat_name, [])
-        # 按有效分數降序
-        cat_posts_sorted = sorted(
-            cat_posts,
-            key=_get_effective_importance,
-            reverse=True
-        )
-        lines.append(f"### {cat_name}（{len(cat_posts_sorted)} 篇）")
+        cat_indices = model.categorized.get(cat_name, [])
+        lines.append(f"### {cat_name}（{len(cat_indices)} 篇）")
         lines.append("")
-        for j, post in enumerate(cat_posts_sorted, 1):
+        for j, idx in enumerate(cat_indices, 1):
+            post = posts[idx]
             a = post.get("analysis", {})
-            imp = _get_effective_importance(post)
-            lines.append(f"{j}. [{imp}/10] {a.get('summary', post.get('content', '')[:60])}")
+            lines.append(f"{j}. [{importance[idx]}/10] {a.get('summary', post.get('content', '')[:60])}")
             lines.append(f"   - @{post.get('author', 'unknown')} | "
                          f"[原文]({post.get('link', '')})")
             lines.append("")
@@ -286,55 +410,71 @@ def generate_line_summary(data: Dict, report_url: Optional[str] = None) -> str:
     Returns:
         str: 適合 LINE 發送的純文字摘要（含 URL）。
     """
-    posts = data.get("analyzed_posts", [])
-    stats = data.get("stats", {})
-    keywords = data.get("keywords", [])
-    big_fish = identify_big_fish(posts)
+    return render_line_summary(build_report_model(data), report_url)
 
-    parts = []
 
-    # Header
-    parts.append("🔔 Threads 監控通知")
-    parts.append(f"📊 掃描 {stats.get('total_searched', 'N/A')} 筆 → 有效 {len(posts)} 筆")
-    parts.append(f"🔑 關鍵字: {', '.join(keywords)}")
-    parts.append("")
+def _line_fish_lines(model: ReportModel, idx: int) -> List[str]:
+    fish = model.posts[idx]
+    a = fish.get("analysis", {})
+    return [f"[{model.importance[idx]}/10] {a.get('summary', '')}",
+            f"→ {fish.get('link', '')}"]
+
+
+def _line_entry_lines(model: ReportModel, idx: int) -> List[str]:
+    post = model.posts[idx]
+    a = post.get("analysis", {})
+    cats = a.get("categories", [])
+    cat_label = "/".join(cats) if cats else "其他"
+    return [f"• [{cat_label}] {a.get('summary', post.get('content', '')[:40])}",
+            f"  → {post.get('link', '')}"]
+
+
+def _line_header_lines(model: ReportModel) -> List[str]:
+    return [
+        "🔔 Threads 監控通知",
+        f"📊 掃描 {model.stats.get('total_searched', 'N/A')} 筆 → 有效 {len(model.posts)} 筆",
+        f"🔑 關鍵字: {', '.join(model.keywords)}",
+        "",
+    ]
+
+
+def render_line_summary(model: ReportModel, report_url: Optional[str] = None) -> str:
+    """
+    從 ReportModel 渲染 LINE 摘要（含貼文 URL）。
+
+    Args:
+        model: 預先計算好的戰報模型。
+        report_url: 完整戰報的連結（如 Gist URL）。
+
+    Returns:
+        str: 適合 LINE 發送的純文字摘要（含 URL）。
+    """
+    parts = _line_header_lines(model)
 
     # Big fish
-    if big_fish:
-        parts.append(f"🐟 大魚警報（{len(big_fish)} 則）:")
-        for fish in big_fish:
-            a = fish.get("analysis", {})
-            eff = _get_effective_importance(fish)
-            parts.append(f"[{eff}/10] {a.get('summary', '')}")
-            parts.append(f"→ {fish.get('link', '')}")
+    if model.big_fish:
+        parts.append(f"🐟 大魚警報（{len(model.big_fish)} 則）:")
+        for idx in model.big_fish:
+            parts.extend(_line_fish_lines(model, idx))
         parts.append("")
 
-    # Other posts (non-big-fish)
-    big_fish_ids = {f["id"] for f in big_fish}
-    other_posts = [p for p in posts if p["id"] not in big_fish_ids]
-    other_posts.sort(
-        key=lambda p: p.get("analysis", {}).get("importance", 0), reverse=True
-    )
-
-    if other_posts:
+    # Other posts (non-big-fish, 已依原始 importance 降序)
+    if model.other_posts:
         parts.append("📋 其他重點:")
-        current_text = "\n".join(parts)
+        # 以累計長度代替每次重新 join（len("\n".join(parts))）
+        current_len = sum(len(p) for p in parts) + len(parts) - 1
 
-        for post in other_posts:
-            a = post.get("analysis", {})
-            cats = a.get("categories", [])
-            cat_label = "/".join(cats) if cats else "其他"
-            entry = f"• [{cat_label}] {a.get('summary', post.get('content', '')[:40])}"
-            url_line = f"  → {post.get('link', '')}"
-            candidate = f"{entry}\n{url_line}"
+        for idx in model.other_posts:
+            entry, url_line = _line_entry_lines(model, idx)
+            candidate_len = len(entry) + 1 + len(url_line)
 
             # 檢查長度限制
-            if len(current_text) + len(candidate) + 2 > MAX_LINE_MESSAGE_LENGTH - 50:
+            if current_len + candidate_len + 2 > MAX_LINE_MESSAGE_LENGTH - 50:
                 parts.append("...更多內容見完整報告")
                 break
             parts.append(entry)
             parts.append(url_line)
-            current_text = "\n".join(parts)
+            current_len += candidate_len + 1
 
     # 報告連結
     if report_url:
@@ -344,6 +484,138 @@ def generate_line_summary(data: Dict, report_url: Optional[str] = None) -> str:
     return "\n".join(parts)
 
 
+def _split_block(block: List[str], limit: int) -> List[List[str]]:
+    """
+    將單獨一則也放不下的區塊在行邊界切開，單行過長時在字元邊界硬切。
+
+    Args:
+        block: 區塊的行列表。
+        limit: 每段的長度上限（每行長度加一個換行）。
+
+    Returns:
+        List[List[str]]: 依序排列的分段，每段都不超過 limit。
+    """
+    width = max(1, limit - 1)
+    pieces: List[List[str]] = []
+    piece: List[str] = []
+    piece_len = 0
+    for line in block:
+        for start in range(0, max(len(line), 1), width):
+            chunk = line[start:start + width]
+            if piece and piece_len + len(chunk) + 1 > limit:
+                pieces.append(piece)
+                piece, piece_len = [], 0
+            piece.append(chunk)
+            piece_len += len(chunk) + 1
+    if piece:
+        pieces.append(piece)
+    return pieces
+
+
+def _paginate(blocks: List[List[str]], max_length: int, continuation: str) -> List[str]:
+    """
+    將不可拆開的區塊（行列表）依序裝進多則訊息。
+
+    以累計長度判斷，每個區塊只處理一次；區塊不會被切開，
+    因此單篇貼文的摘要與連結一定在同一則訊息中。
+    唯一的例外是單獨一則也放不下的區塊（如極長的摘要），
+    改在行或字元邊界切成多段，接續在後面的訊息中。
+    超過一則時，第二則起以 continuation 開頭，並在每則結尾加上頁碼。
+
+    Args:
+        blocks: 區塊列表，每個區塊是必須放在同一則訊息的行。
+        max_length: 每則訊息（不含頁碼）的字元上限。
+        continuation: 第二則起的開頭行。
+
+    Returns:
+        List[str]: 訊息列表。
+    """
+    pages: List[List[str]] = []
+    lines: List[str] = []
+    length = -1  # len("\n".join(lines))，空列表時為 -1
+    # 接續頁扣掉開頭行後可用的長度
+    limit = max_length - len(continuation)
+
+    for block in blocks:
+        block_len = sum(len(line) for line in block) + len(block)
+        if block_len <= limit:
+            pieces = [(block, block_len)]
+        else:
+            pieces = [(piece, sum(len(line) for line in piece) + len(piece))
+                      for piece in _split_block(block, limit)]
+        for piece, piece_len in pieces:
+            if lines and length + piece_len > max_length:
+                pages.append(lines)
+                lines = [continuation]
+                length = len(continuation)
+            lines.extend(piece)
+            length += piece_len
+
+    if lines:
+        pages.append(lines)
+
+    total = len(pages)
+    if total == 1:
+        return ["\n".join(pages[0])]
+    return ["\n".join(page) + f"\n（{i}/{total}）" for i, page in enumerate(pages, 1)]
+
+
+def generate_line_messages(data: Dict, report_url: Optional[str] = None) -> List[str]:
+    """
+    從監控資料生成 LINE 通知訊息列表（完整列出所有貼文，不截斷）。
+
+    每則不超過 MAX_LINE_MESSAGE_LENGTH 字元，單篇貼文不會被拆到兩則。
+
+    Args:
+        data: 完整的監控資料字典。
+        report_url: 完整戰報的連結（如 Gist URL）。
+
+    Returns:
+        List[str]: 依序發送的 LINE 訊息。
+    """
+    return render_line_messages(build_report_model(data), report_url)
+
+
+def render_line_messages(model: ReportModel, report_url: Optional[str] = None) -> List[str]:
+    """
+    從 ReportModel 渲染 LINE 通知訊息列表（完整列出所有貼文，不截斷）。
+
+    Args:
+        model: 預先計算好的戰報模型。
+        report_url: 完整戰報的連結（如 Gist URL）。
+
+    Returns:
+        List[str]: 依序發送的 LINE 訊息。
+    """
+    return _paginate_line_messages(_line_message_blocks(model), report_url)
+
+
+def _line_message_blocks(model: ReportModel) -> List[List[str]]:
+    """LINE 分頁訊息中與戰報連結無關的區塊。"""
+    blocks = [_line_header_lines(model)]
+
+    if model.big_fish:
+        title = [f"🐟 大魚警報（{len(model.big_fish)} 則）:"]
+        for idx in model.big_fish:
+            blocks.append(title + _line_fish_lines(model, idx))
+            title = []
+        blocks[-1].append("")
+
+    if model.other_posts:
+        title = ["📋 其他重點:"]
+        for idx in model.other_posts:
+            blocks.append(title + _line_entry_lines(model, idx))
+            title = []
+    return blocks
+
+
+def _paginate_line_messages(blocks: List[List[str]], report_url: Optional[str]) -> List[str]:
+    """在區塊最後補上戰報連結並分頁（不修改 blocks）。"""
+    if report_url:
+        blocks = blocks + [["", f"📄 完整戰報: {report_url}"]]
+    return _paginate(blocks, MAX_LINE_MESSAGE_LENGTH - 50, "🔔 Threads 監控通知（續）")
+
+
 def generate_telegram_summary(data: Dict, report_url: Optional[str] = None) -> str:
     """
     從監控資料生成 Telegram 通知用的 Markdown 格式文字（含貼文 URL）。
@@ -357,58 +629,71 @@ def generate_telegram_summary(data: Dict, report_url: Optional[str] = None) -> s
     Returns:
         str: 適合 Telegram 發送的 Markdown 文字（含 URL）。
     """
-    posts = data.get("analyzed_posts", [])
-    stats = data.get("stats", {})
-    keywords = data.get("keywords", [])
-    big_fish = identify_big_fish(posts)
+    return render_telegram_summary(build_report_model(data), report_url)
 
-    parts = []
 
-    # Header
-    parts.append("📊 *Threads 輿情戰報*")
-    parts.append("")
-    parts.append(f"掃描 {stats.get('total_searched', 'N/A')} 筆 → 有效 {len(posts)} 筆")
-    parts.append(f"關鍵字: {', '.join(keywords)}")
-    parts.append("")
+def _telegram_header_lines(model: ReportModel) -> List[str]:
+    return [
+        "📊 *Threads 輿情戰報*",
+        "",
+        f"掃描 {model.stats.get('total_searched', 'N/A')} 筆 → 有效 {len(model.posts)} 筆",
+        f"關鍵字: {', '.join(model.keywords)}",
+        "",
+    ]
+
+
+def _telegram_fish_lines(model: ReportModel, idx: int) -> List[str]:
+    fish = model.posts[idx]
+    a = fish.get("analysis", {})
+    return [f"*[{model.importance[idx]}/10]* {a.get('summary', '')}",
+            f"[查看原文]({fish.get('link', '')})",
+            ""]
+
+
+def _telegram_entry(model: ReportModel, idx: int) -> str:
+    post = model.posts[idx]
+    a = post.get("analysis", {})
+    cats = a.get("categories", [])
+    cat_label = "/".join(cats) if cats else "其他"
+    summary_text = a.get("summary", post.get("content", "")[:40])
+    return f"• [{cat_label}] {summary_text} [原文]({post.get('link', '')})"
+
+
+def render_telegram_summary(model: ReportModel, report_url: Optional[str] = None) -> str:
+    """
+    從 ReportModel 渲染 Telegram 摘要（Markdown 格式，含貼文 URL）。
+
+    Args:
+        model: 預先計算好的戰報模型。
+        report_url: 完整戰報的連結（如 Gist URL）。
+
+    Returns:
+        str: 適合 Telegram 發送的 Markdown 文字（含 URL）。
+    """
+    parts = _telegram_header_lines(model)
 
     # Big fish
-    if big_fish:
-        parts.append(f"🚨 *發現 {len(big_fish)} 個重大議題*")
+    if model.big_fish:
+        parts.append(f"🚨 *發現 {len(model.big_fish)} 個重大議題*")
         parts.append("")
-        for fish in big_fish:
-            a = fish.get("analysis", {})
-            link = fish.get("link", "")
-            summary_text = a.get("summary", "")
-            eff = _get_effective_importance(fish)
-            parts.append(f"*[{eff}/10]* {summary_text}")
-            parts.append(f"[查看原文]({link})")
-            parts.append("")
-
-    # Other posts
-    big_fish_ids = {f["id"] for f in big_fish}
-    other_posts = [p for p in posts if p["id"] not in big_fish_ids]
-    other_posts.sort(
-        key=lambda p: p.get("analysis", {}).get("importance", 0), reverse=True
-    )
+        for idx in model.big_fish:
+            parts.extend(_telegram_fish_lines(model, idx))
 
-    if other_posts:
+    # Other posts（已依原始 importance 降序）
+    if model.other_posts:
         parts.append("📋 *其他重點*")
         parts.append("")
-        current_text = "\n".join(parts)
+        # 以累計長度代替每次重新 join（len("\n".join(parts))）
+        current_len = sum(len(p) for p in parts) + len(parts) - 1
 
-        for post in other_posts:
-            a = post.get("analysis", {})
-            cats = a.get("categories", [])
-            cat_label = "/".join(cats) if cats else "其他"
-            summary_text = a.get("summary", post.get("content", "")[:40])
-            link = post.get("link", "")
-            entry = f"• [{cat_label}] {summary_text} [原文]({link})"
+        for idx in model.other_posts:
+            entry = _telegram_entry(model, idx)
 
-            if len(current_text) + len(entry) + 2 > MAX_TELEGRAM_MESSAGE_LENGTH - 30:
+            if current_len + len(entry) + 2 > MAX_TELEGRAM_MESSAGE_LENGTH - 30:
                 parts.append("_...更多內容見完整報告_")
                 break
             parts.append(entry)
-            current_text = "\n".join(parts)
+            current_len += len(entry) + 1
 
     # 報告連結
     if report_url:
@@ -418,20 +703,351 @@ def generate_telegram_summary(data: Dict, report_url: Optional[str] = None) -> s
     return "\n".join(parts)
 
 
-def upload_to_gist(report_content: str, filename: str = "report.md",
-                   description: str = "Threads 輿情戰報") -> Optional[str]:
+def generate_telegram_messages(data: Dict, report_url: Optional[str] = None) -> List[str]:
     """
-    將戰報上傳到 GitHub Gist，回傳公開 URL。
+    從監控資料生成 Telegram 通知訊息列表（完整列出所有貼文，不截斷）。
 
-    使用環境變數 GITHUB_GIST_TOKEN 進行認證。
+    每則不超過 MAX_TELEGRAM_MESSAGE_LENGTH 字元，單篇貼文不會被拆到兩則。
 
     Args:
-        report_content: 報告內容。
-        filename: Gist 檔案名稱。
-        description: Gist 描述。
+        data: 完整的監控資料字典。
+        report_url: 完整戰報的連結（如 Gist URL）。
 
     Returns:
-        str 或 None: Gist URL，失敗時回傳 None。
+        List[str]: 依序發送的 Telegram 訊息（Markdown）。
+    """
+    return render_telegram_messages(build_report_model(data), report_url)
+
+
+def render_telegram_messages(model: ReportModel, report_url: Optional[str] = None) -> List[str]:
+    """
+    從 ReportModel 渲染 Telegram 通知訊息列表（完整列出所有貼文，不截斷）。
+
+    Args:
+        model: 預先計算好的戰報模型。
+        report_url: 完整戰報的連結（如 Gist URL）。
+
+    Returns:
+        List[str]: 依序發送的 Telegram 訊息（Markdown）。
+    """
+    return _paginate_telegram_messages(_telegram_message_blocks(model), report_url)
+
+
+def _telegram_message_blocks(model: ReportModel) -> List[List[str]]:
+    """Telegram 分頁訊息中與戰報連結無關的區塊。"""
+    blocks = [_telegram_header_lines(model)]
+
+    if model.big_fish:
+        title = [f"🚨 *發現 {len(model.big_fish)} 個重大議題*", ""]
+        for idx in model.big_fish:
+            blocks.append(title + _telegram_fish_lines(model, idx))
+            title = []
+
+    if model.other_posts:
+        title = ["📋 *其他重點*", ""]
+        for idx in model.other_posts:
+            blocks.append(title + [_telegram_entry(model, idx)])
+            title = []
+    return blocks
+
+
+def _paginate_telegram_messages(blocks: List[List[str]],
+                                report_url: Optional[str]) -> List[str]:
+    """在區塊最後補上戰報連結並分頁（不修改 blocks）。"""
+    if report_url:
+        blocks = blocks + [["", f"📄 [完整戰報]({report_url})"]]
+    return _paginate(blocks, MAX_TELEGRAM_MESSAGE_LENGTH - 30, "📊 *Threads 輿情戰報*（續）")
+
+
+def _same_post(post: Dict, original: Dict) -> bool:
+    """除 id 外內容相同即視為同一篇（平行模式合併時 id 可能被加上後綴）。"""
+    if post is original or post == original:
+        return True
+    return (post.get("id") != original.get("id")
+            and {**post, "id": original.get("id")} == original)
+
+
+class ReportBuilder:
+    """
+    增量戰報建構器
+
+    貼文逐篇加入時即更新有效分數、類別分組、大魚索引與類別計數，
+    監控途中可隨時產出部分戰報；結束時直接由累積的狀態組成 ReportModel，
+    不需重新分類或重新計算分數。
+    """
+
+    def __init__(self, keywords: Optional[List[str]] = None,
+                 stats: Optional[Dict] = None,
+                 timestamp: Optional[str] = None,
+                 scoring_config: Optional[Dict] = None):
+        """
+        初始化建構器
+
+        Args:
+            keywords: 監控關鍵字。
+            stats: pipeline 統計資料。
+            timestamp: 報告時間戳（ISO 8601），None 則渲染時使用當前時間。
+            scoring_config: 評分設定；有 bonus_rules 時每篇加入時即套用加分。
+        """
+        self.keywords: List[str] = list(keywords or [])
+        self.stats: Dict = dict(stats or {})
+        self.timestamp = timestamp
+        self.scoring_config = scoring_config
+        self.posts: List[Dict] = []
+        self._importance: List = []
+        self._base_importance: List = []
+        self._buckets: Dict[str, List[int]] = {}
+        self._categorized_ids: set = set()
+        self._big_fish: List[int] = []
+        self._originals: List[Dict] = []
+        self._seqs: Dict[Tuple, Optional[int]] = {}
+        self._model: Optional[ReportModel] = None
+        self._rendered: Dict[Tuple, Union[str, List[str]]] = {}
+
+    @classmethod
+    def from_data(cls, data: Dict, scoring_config: Optional[Dict] = None) -> "ReportBuilder":
+        """由完整的監控資料建立建構器（一次走訪全部貼文）。"""
+        builder = cls(
+            keywords=data.get("keywords", []),
+            stats=data.get("stats", {}),
+            timestamp=data.get("timestamp"),
+            scoring_config=scoring_config,
+        )
+        for post in data.get("analyzed_posts", []):
+            builder.add_post(post)
+        return builder
+
+    @property
+    def post_count(self) -> int:
+        """已加入的貼文數。"""
+        return len(self.posts)
+
+    def add_post(self, post: Dict, source: Optional[str] = None) -> Optional[Dict]:
+        """
+        加入一篇已分析的貼文並更新所有統計狀態。
+
+        Args:
+            post: 已分析的貼文（含 analysis 欄位）。
+            source: 貼文來源（平行模式的 agent），與貼文 id 組成比對用的鍵。
+
+        Returns:
+            Dict 或 None: 該貼文為大魚時回傳（加分後的）貼文，否則 None。
+        """
+        # 保留加分前的貼文，才能與最終結果的原始貼文比對
+        self._register((source, post.get("id", "")), len(self.posts))
+        self._originals.append(post)
+        if self.scoring_config and self.scoring_config.get("bonus_rules"):
+            post = apply_scoring_bonus(post, self.scoring_config)
+
+        self.posts.append(post)
+        self._invalidate()
+        return self._index(len(self.posts) - 1, post)
+
+    def _index(self, seq: int, post: Dict) -> Optional[Dict]:
+        """將第 seq 篇（已加分的）貼文加入分數、類別與大魚狀態。"""
+        analysis = post.get("analysis", {})
+        base = analysis.get("importance", 0)
+        eff = analysis.get("adjusted_importance", base)
+        self._importance.append(eff)
+        self._base_importance.append(base)
+
+        categories = analysis.get("categories", [])
+        for category in categories:
+            self._buckets.setdefault(category, []).append(seq)
+        if categories:
+            self._categorized_ids.add(post.get("id", ""))
+
+        if _is_big_fish(post):
+            # 依加入順序記錄，排序只在 _assemble_report_model 做一次
+            self._big_fish.append(seq)
+            return post
+        return None
+
+    def update_meta(self, stats: Optional[Dict] = None,
+                    keywords: Optional[List[str]] = None,
+                    timestamp: Optional[str] = None) -> None:
+        """更新報告的統計、關鍵字或時間戳（None 表示不變）。"""
+        if stats is not None:
+            self.stats = dict(stats)
+        if keywords is not None:
+            self.keywords = list(keywords)
+        if timestamp is not None:
+            self.timestamp = timestamp
+        self._invalidate()
+
+    def matches(self, posts: List[Dict], keys: Optional[List[Tuple]] = None) -> bool:
+        """
+        檢查給定列表的每篇貼文是否都已在建構器中累積。
+
+        Args:
+            posts: 最終結果的貼文列表。
+            keys: 每篇貼文加入時的 (source, id) 鍵；None 表示 (None, 貼文 id)。
+        """
+        return self._resolve(posts, keys) is not None
+
+    def adopt(self, posts: List[Dict], keys: Optional[List[Tuple]] = None) -> bool:
+        """
+        以最終結果的貼文列表取代累積順序（須 matches）。
+
+        依加入時的鍵找回已加分的貼文：順序不同、部分貼文被合併剔除或
+        id 被改名（平行模式）時只重建索引，不重新加分或分類。
+
+        Returns:
+            bool: 不匹配時回傳 False 且狀態不變。
+        """
+        seqs = self._resolve(posts, keys)
+        if seqs is None:
+            return False
+        if seqs == list(range(len(self.posts))):
+            return True
+
+        scored = []
+        for post, seq in zip(posts, seqs):
+            kept = self.posts[seq]
+            if kept.get("id") != post.get("id"):
+                kept = {**kept, "id": post.get("id")}
+            scored.append(kept)
+
+        self.posts = scored
+        self._originals = list(posts)
+        self._seqs = {}
+        for seq, post in enumerate(posts):
+            self._register((None, post.get("id", "")), seq)
+        self._importance = []
+        self._base_importance = []
+        self._buckets = {}
+        self._categorized_ids = set()
+        self._big_fish = []
+        self._invalidate()
+        for seq, post in enumerate(scored):
+            self._index(seq, post)
+        return True
+
+    def _register(self, key: Tuple, seq: int) -> None:
+        # 重複的鍵無法分辨是哪一篇，標記為 None 使比對失敗
+        self._seqs[key] = None if key in self._seqs else seq
+
+    def _resolve(self, posts: List[Dict],
+                 keys: Optional[List[Tuple]]) -> Optional[List[int]]:
+        """將貼文對應到加入順序；任一篇找不到、內容不同或重複時回傳 None。"""
+        if keys is None:
+            keys = [(None, post.get("id", "")) for post in posts]
+        if len(keys) != len(posts):
+            return None
+        seqs = []
+        for post, key in zip(posts, keys):
+            seq = self._seqs.get(key)
+            if seq is None or not _same_post(post, self._originals[seq]):
+                return None
+            seqs.append(seq)
+        if len(set(seqs)) != len(seqs):
+            return None
+        return seqs
+
+    def model(self) -> ReportModel:
+        """由累積的狀態組成 ReportModel；狀態未變時直接回傳快取。"""
+        if self._model is None:
+            self._model = _assemble_report_model(
+                self.to_data(), self.posts, self._importance,
+                self._base_importance, self._buckets, self._big_fish,
+                self._categorized_ids,
+            )
+        return self._model
+
+    def big_fish(self) -> List[Dict]:
+        """大魚貼文列表，依有效分數降序（同 identify_big_fish）。"""
+        return self.model().big_fish_posts()
+
+    def category_stats(self) -> List[Dict]:
+        """各類別統計（同 compute_category_stats）。"""
+        return self.model().category_stats
+
+    def to_data(self) -> Dict:
+        """輸出目前累積的完整監控資料字典。"""
+        return {
+            "timestamp": self.timestamp or datetime.now().isoformat(),
+            "keywords": self.keywords,
+            "analyzed_posts": self.posts,
+            "stats": self.stats,
+        }
+
+    def render_markdown(self) -> str:
+        """渲染（目前為止的）Markdown 戰報；狀態未變時直接回傳快取。"""
+        key = ("markdown",)
+        if key not in self._rendered:
+            self._rendered[key] = render_markdown_report(self.model())
+        return self._rendered[key]
+
+    def render_line_summary(self, report_url: Optional[str] = None) -> str:
+        """渲染 LINE 摘要；狀態未變時直接回傳快取。"""
+        key = ("line", report_url)
+        if key not in self._rendered:
+            self._rendered[key] = render_line_summary(self.model(), report_url)
+        return self._rendered[key]
+
+    def render_telegram_summary(self, report_url: Optional[str] = None) -> str:
+        """渲染 Telegram 摘要；狀態未變時直接回傳快取。"""
+        key = ("telegram", report_url)
+        if key not in self._rendered:
+            self._rendered[key] = render_telegram_summary(self.model(), report_url)
+        return self._rendered[key]
+
+    def render_line_messages(self, report_url: Optional[str] = None) -> List[str]:
+        """渲染分頁的 LINE 訊息列表；狀態未變時直接回傳快取。"""
+        key = ("line_messages", report_url)
+        if key not in self._rendered:
+            self._rendered[key] = _paginate_line_messages(
+                self._blocks("line_blocks", _line_message_blocks), report_url
+            )
+        return self._rendered[key]
+
+    def render_telegram_messages(self, report_url: Optional[str] = None) -> List[str]:
+        """渲染分頁的 Telegram 訊息列表；狀態未變時直接回傳快取。"""
+        key = ("telegram_messages", report_url)
+        if key not in self._rendered:
+            self._rendered[key] = _paginate_telegram_messages(
+                self._blocks("telegram_blocks", _telegram_message_blocks), report_url
+            )
+        return self._rendered[key]
+
+    def prepare_messages(self) -> None:
+        """
+        預先建立分頁訊息中與戰報連結無關的區塊。
+
+        等待 Gist 上傳時先呼叫，連結到手後 render_*_messages() 只需補上連結並分頁。
+        """
+        self._blocks("line_blocks", _line_message_blocks)
+        self._blocks("telegram_blocks", _telegram_message_blocks)
+
+    def _blocks(self, name: str, build) -> List[List[str]]:
+        key = (name,)
+        if key not in self._rendered:
+            self._rendered[key] = build(self.model())
+        return self._rendered[key]
+
+    def _invalidate(self) -> None:
+        self._model = None
+        self._rendered.clear()
+
+
+def _gist_api_base() -> str:
+    """GitHub API 位址（可用 GITHUB_API_URL 覆寫，例如 GitHub Enterprise 或測試用 stub）。"""
+    return os.environ.get(GITHUB_API_URL_ENV, DEFAULT_GITHUB_API_URL).rstrip("/")
+
+
+def _gist_request(method: str, path: str, payload: Dict,
+                  api_base: Optional[str] = None) -> Optional[Dict]:
+    """
+    呼叫 GitHub Gist API。
+
+    Args:
+        method: "POST"（建立）或 "PATCH"（更新）。
+        path: API 路徑（如 "/gists" 或 "/gists/<id>"）。
+        payload: 請求內容。
+        api_base: API 位址（None 使用 _gist_api_base()）。
+
+    Returns:
+        Dict 或 None: API 回應，失敗時回傳 None。
     """
     import requests
 
@@ -445,6 +1061,37 @@ def upload_to_gist(report_content: str, filename: str = "report.md",
         "Accept": "application/vnd.github+json",
     }
 
+    try:
+        response = requests.request(
+            method,
+            f"{(api_base or _gist_api_base()).rstrip('/')}{path}",
+            headers=headers,
+            json=payload,
+            timeout=GIST_TIMEOUT_SECONDS
+        )
+        response.raise_for_status()
+        return response.json()
+
+    except (requests.exceptions.RequestException, ValueError) as e:
+        logger.error("Gist %s %s 失敗: %s", method, path, e)
+        return None
+
+
+def upload_to_gist(report_content: str, filename: str = "report.md",
+                   description: str = "Threads 輿情戰報") -> Optional[str]:
+    """
+    將戰報上傳到 GitHub Gist，回傳公開 URL。
+
+    使用環境變數 GITHUB_GIST_TOKEN 進行認證。
+
+    Args:
+        report_content: 報告內容。
+        filename: Gist 檔案名稱。
+        description: Gist 描述。
+
+    Returns:
+        str 或 None: Gist URL，失敗時回傳 None。
+    """
     payload = {
         "description": description,
         "public": True,
@@ -453,60 +1100,211 @@ def upload_to_gist(report_content: str, filename: str = "report.md",
         }
     }
 
-    try:
-        response = requests.post(
-            "https://api.github.com/gists",
-            headers=headers,
-            json=payload,
-            timeout=15
-        )
-        response.raise_for_status()
-        gist_url = response.json().get("html_url", "")
-        logger.info("Gist 上傳成功: %s", gist_url)
+    result = _gist_request("POST", "/gists", payload)
+    if result is None:
+        return None
+    gist_url = result.get("html_url", "")
+    logger.info("Gist 上傳成功: %s", gist_url)
+    return gist_url
+
+
+# 每次產生都不同、不代表內容變動的行（計算內容雜湊時排除）
+_VOLATILE_LINE_RE = re.compile(r"^\*\*生成時間\*\*:.*$", re.MULTILINE)
+
+
+def _content_hash(report_content: str) -> str:
+    """戰報內容的 SHA-256（不含生成時間）。"""
+    stable = _VOLATILE_LINE_RE.sub("", report_content)
+    return hashlib.sha256(stable.encode("utf-8")).hexdigest()
+
+
+class GistPublisher:
+    """
+    背景 Gist 發布器
+
+    - 依內容 SHA-256（不含生成時間）判斷：與上次發布內容相同時直接沿用既有 URL，不再上傳
+    - 每組關鍵字對應一個滾動更新的 Gist：第一次建立，之後以 PATCH 更新
+      （舊檔名改為新檔名，Gist 只保留最新戰報，歷史版本由 Gist revision 保存）
+    - submit() 在背景執行緒上傳，呼叫端可同時進行摘要生成；用完以 close()
+      或 with 區塊釋放執行緒
+
+    快取檔（JSON）格式：{key: {"gist_id", "url", "filename", "hash"}}
+    """
+
+    def __init__(self, cache_path: str = DEFAULT_GIST_CACHE_PATH,
+                 api_base: Optional[str] = None):
+        """
+        初始化發布器
+
+        Args:
+            cache_path: 內容雜湊快取檔路徑。
+            api_base: GitHub API 位址（None 使用 GITHUB_API_URL 或預設值）。
+        """
+        self.cache_path = cache_path
+        self.api_base = api_base
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    @staticmethod
+    def cache_key(keywords: List[str]) -> str:
+        """關鍵字組合對應的快取鍵（與順序無關）。"""
+        return ",".join(sorted(k.strip() for k in keywords)) or "_default"
+
+    def _load_cache(self) -> Dict:
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                cache = fast_json.load(f)
+            return cache if isinstance(cache, dict) else {}
+        except FileNotFoundError:
+            return {}
+        except (OSError, fast_json.JSONDecodeError) as e:
+            logger.warning("Gist 快取讀取失敗，將重新建立: %s", e)
+            return {}
+
+    def _save_cache(self, cache: Dict) -> None:
+        cache_dir = os.path.dirname(self.cache_path)
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+        tmp_path = f"{self.cache_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            fast_json.dump(cache, f, indent=True)
+        os.replace(tmp_path, self.cache_path)
+
+    def publish(self, report_content: str, filename: str,
+                description: str, key: str) -> Optional[str]:
+        """
+        發布戰報（同步）。內容未變時沿用既有 URL，否則更新或建立 Gist。
+
+        Args:
+            report_content: 報告內容。
+            filename: Gist 檔案名稱。
+            description: Gist 描述。
+            key: 滾動 Gist 的快取鍵（見 cache_key()）。
+
+        Returns:
+            str 或 None: Gist URL，失敗時回傳 None。
+        """
+        content_hash = _content_hash(report_content)
+
+        # 鎖只保護快取檔的讀寫，網路請求期間不持有
+        with self._lock:
+            entry = self._load_cache().get(key) or {}
+        if entry.get("hash") == content_hash and entry.get("url"):
+            logger.info("Gist 內容未變，沿用: %s", entry["url"])
+            return entry["url"]
+
+        result = None
+        if entry.get("gist_id"):
+            old_filename = entry.get("filename") or filename
+            payload = {
+                "description": description,
+                "files": {
+                    old_filename: {"filename": filename, "content": report_content}
+                }
+            }
+            result = _gist_request("PATCH", f"/gists/{entry['gist_id']}",
+                                   payload, api_base=self.api_base)
+            if result is None:
+                logger.warning("Gist %s 更新失敗，改為建立新 Gist", entry["gist_id"])
+
+        if result is None:
+            payload = {
+                "description": description,
+                "public": True,
+                "files": {filename: {"content": report_content}}
+            }
+            result = _gist_request("POST", "/gists", payload, api_base=self.api_base)
+            if result is None:
+                return None
+
+        gist_url = result.get("html_url", "")
+        with self._lock:
+            cache = self._load_cache()
+            cache[key] = {
+                "gist_id": result.get("id", entry.get("gist_id")),
+                "url": gist_url,
+                "filename": filename,
+                "hash": content_hash,
+            }
+            try:
+                self._save_cache(cache)
+            except OSError as e:
+                logger.warning("Gist 快取寫入失敗: %s", e)
+
+        logger.info("Gist 發布成功: %s", gist_url)
         return gist_url
 
-    except requests.exceptions.RequestException as e:
-        logger.error("Gist 上傳失敗: %s", e)
-        return None
+    def submit(self, report_content: str, filename: str,
+               description: str, key: str) -> Future:
+        """
+        在背景執行緒發布戰報。
+
+        Returns:
+            Future[Optional[str]]: 完成時為 Gist URL 或 None。
+        """
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=1, thread_name_prefix="gist-upload"
+                )
+        return self._executor.submit(
+            self.publish, report_content, filename, description, key
+        )
+
+    def close(self, wait: bool = True) -> None:
+        """
+        關閉背景執行緒。
+
+        Args:
+            wait: 是否等待進行中的上傳完成（False 時上傳仍會在背景完成並寫入快取）。
+        """
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
+
+    def __enter__(self) -> "GistPublisher":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
 
 
 def save_report(report_content: str, reports_dir: str = DEFAULT_REPORTS_DIR,
-                timestamp: Optional[str] = None) -> str:
+                timestamp: Optional[str] = None,
+                run_id: Optional[str] = None,
+                keywords: Optional[List[str]] = None,
+                compression: Optional[str] = None) -> str:
     """
-    將戰報儲存為 Markdown 檔案。
+    將戰報儲存為 Markdown 檔案（原子寫入，並更新報告索引）。
+
+    檔名為 report_YYYYMMDD_HHMMSS_<run_id>.md，同一秒內的多個 run 不會互相覆蓋。
 
     Args:
         report_content: Markdown 格式的戰報內容。
         reports_dir: 儲存目錄。
         timestamp: 可選的時間戳（ISO 8601），預設使用當前時間。
+        run_id: 監控 run ID（None 則自動產生）。
+        keywords: 監控關鍵字（記錄於索引）。
+        compression: None、"gzip" 或 "zstd"（預設讀取 REPORT_COMPRESSION 環境變數）。
 
     Returns:
         str: 儲存的檔案路徑。
     """
-    os.makedirs(reports_dir, exist_ok=True)
-
-    if timestamp:
-        try:
-            dt = datetime.fromisoformat(timestamp.replace("Z", "+00:00"))
-        except (ValueError, AttributeError):
-            dt = datetime.now()
-    else:
-        dt = datetime.now()
-
-    filename = f"report_{dt.strftime('%Y%m%d_%H%M%S')}.md"
-    filepath = os.path.join(reports_dir, filename)
-
-    with open(filepath, 'w', encoding='utf-8') as f:
-        f.write(report_content)
-
-    logger.info("報告已儲存: %s", filepath)
-    return filepath
+    if compression is None:
+        compression = os.environ.get("REPORT_COMPRESSION") or None
+    store = ReportStore(reports_dir, compression=compression)
+    return store.save(report_content, run_id=run_id, timestamp=timestamp,
+                      keywords=keywords)
 
 
 def generate_all_outputs(data: Dict, reports_dir: str = DEFAULT_REPORTS_DIR,
                          upload_gist: bool = False,
-                         scoring_config_path: Optional[str] = None
-                         ) -> Optional[Dict[str, str]]:
+                         scoring_config_path: Optional[str] = None,
+                         builder: Optional[ReportBuilder] = None,
+                         run_id: Optional[str] = None,
+                         post_keys: Optional[List[Tuple]] = None,
+                         ) -> Optional[Dict]:
     """
     一次性生成所有輸出並儲存報告檔案。可選上傳 Gist。
     會自動套用 config/scoring.yml 的加分規則。
@@ -516,54 +1314,86 @@ def generate_all_outputs(data: Dict, reports_dir: str = DEFAULT_REPORTS_DIR,
         reports_dir: 報告儲存目錄。
         upload_gist: 是否上傳到 GitHub Gist。
         scoring_config_path: 評分設定檔路徑（None 使用預設）。
+        builder: 監控途中已逐篇累積（並已加分）的 ReportBuilder；
+                 其貼文與 data 相同時直接沿用，不再重新加分與分類。
+        run_id: 監控 run ID，用於報告檔名（None 則自動產生）。
+        post_keys: 每篇貼文加入 builder 時的 (source, id) 鍵（見 ReportBuilder.adopt）。
 
     Returns:
-        Dict[str, str] 或 None: 包含所有輸出的字典，資料無效時回傳 None。
+        Dict 或 None: 包含所有輸出的字典（line_messages / telegram_messages
+        為不截斷的分頁訊息列表），資料無效時回傳 None。
     """
     valid, error = validate_monitoring_data(data)
     if not valid:
         logger.error("資料驗證失敗: %s", error)
         return None
 
-    # 套用自訂加分規則
-    if scoring_config_path:
-        scoring_config = load_scoring_config(scoring_config_path)
+    if builder is not None and builder.adopt(data["analyzed_posts"], post_keys):
+        builder.update_meta(
+            stats=data.get("stats", {}),
+            keywords=data.get("keywords", []),
+            timestamp=data.get("timestamp"),
+        )
+        data = builder.to_data()
     else:
-        scoring_config = load_scoring_config()
+        # 套用自訂加分規則
+        if scoring_config_path:
+            scoring_config = load_scoring_config(scoring_config_path)
+        else:
+            scoring_config = load_scoring_config()
 
-    if scoring_config["bonus_rules"]:
-        scored_posts = apply_scoring_to_posts(data["analyzed_posts"], scoring_config)
-        data = {**data, "analyzed_posts": scored_posts}
-        logger.info("已套用 %d 條加分規則", len(scoring_config["bonus_rules"]))
+        if scoring_config["bonus_rules"]:
+            scored_posts = apply_scoring_to_posts(data["analyzed_posts"], scoring_config)
+            data = {**data, "analyzed_posts": scored_posts}
+            logger.info("已套用 %d 條加分規則", len(scoring_config["bonus_rules"]))
+
+        builder = ReportBuilder.from_data(data)
 
-    markdown_report = generate_markdown_report(data)
+    markdown_report = builder.render_markdown()
 
     report_path = save_report(
         markdown_report,
         reports_dir=reports_dir,
-        timestamp=data.get("timestamp")
+        timestamp=data.get("timestamp"),
+        run_id=run_id,
+        keywords=data.get("keywords", []),
     )
 
-    # 上傳 Gist（可選）
+    # 上傳 Gist（可選）：在背景上傳，同時先建立分頁訊息中與連結無關的區塊；
+    # 連結只影響最後一行，上傳完成後只需補上連結並分頁。
+    # 逾時則不附連結，上傳仍在背景完成並寫入快取，下次同內容直接沿用
     gist_url = None
     if upload_gist:
         filename = os.path.basename(report_path)
         ts = data.get("timestamp", "")[:10]
-        keywords = ", ".join(data.get("keywords", []))
-        gist_url = upload_to_gist(
-            markdown_report,
-            filename=filename,
-            description=f"Threads 輿情戰報 - {keywords} ({ts})"
-        )
-
-    line_summary = generate_line_summary(data, report_url=gist_url)
-    telegram_summary = generate_telegram_summary(data, report_url=gist_url)
+        keywords = data.get("keywords", [])
+        publisher = GistPublisher(cache_path=os.path.join(reports_dir, GIST_CACHE_FILENAME))
+        try:
+            gist_future = publisher.submit(
+                markdown_report,
+                filename=filename,
+                description=f"Threads 輿情戰報 - {', '.join(keywords)} ({ts})",
+                key=GistPublisher.cache_key(keywords),
+            )
+            builder.prepare_messages()
+            gist_url = gist_future.result(timeout=GIST_WAIT_SECONDS)
+        except FutureTimeoutError:
+            logger.warning("Gist 上傳超過 %d 秒，本次摘要不附連結", GIST_WAIT_SECONDS)
+        except Exception as e:
+            logger.error("Gist 上傳失敗: %s", e)
+        finally:
+            publisher.close(wait=False)
+
+    line_summary = builder.render_line_summary(report_url=gist_url)
+    telegram_summary = builder.render_telegram_summary(report_url=gist_url)
 
     return {
         "report_path": report_path,
         "markdown_report": markdown_report,
         "line_summary": line_summary,
         "telegram_summary": telegram_summary,
+        "line_messages": builder.render_line_messages(report_url=gist_url),
+        "telegram_messages": builder.render_telegram_messages(report_url=gist_url),
         "gist_url": gist_url,
     }
 
@@ -572,6 +1402,8 @@ if __name__ == '__main__':
     import argparse
     import sys
 
+    from authors import RUN_ID_ENV
+
     # 自動載入 .env 檔案（支援 OpenClaw exec 環境）
     try:
         from dotenv import load_dotenv
@@ -596,6 +1428,17 @@ if __name__ == '__main__':
                         help="上傳戰報到 GitHub Gist 並在摘要中附上連結")
     parser.add_argument("--scoring-config", default=None,
                         help="評分設定檔路徑（預設 config/scoring.yml）")
+    parser.add_argument("--line-messages-out", default=None,
+                        help="將分頁的 LINE 訊息列表（不截斷）寫入 JSON 檔，供 line_notify.py --messages-file 發送")
+    parser.add_argument("--telegram-messages-out", default=None,
+                        help="將分頁的 Telegram 訊息列表（不截斷）寫入 JSON 檔")
+    parser.add_argument("--compact", action="store_true",
+                        help="分頁訊息 JSON 檔以緊湊格式輸出（不縮排）")
+    parser.add_argument("--author-db", default=os.environ.get("AUTHOR_DB_PATH", DEFAULT_AUTHOR_DB),
+                        help="作者登記表路徑（檔案存在時回報各作者貼文的分析結果，"
+                             "即 filters.yml 啟用 authors 時由 pipeline.py 建立；設為空字串停用）")
+    parser.add_argument("--run-id", default=os.environ.get(RUN_ID_ENV),
+                        help=f"結算作者待定貼文的 run ID，須與 pipeline.py 相同（預設讀取 {RUN_ID_ENV}）")
 
     args = parser.parse_args()
 
@@ -603,10 +1446,10 @@ if __name__ == '__main__':
     try:
         if args.input:
             with open(args.input, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+                data = fast_json.load(f)
         else:
-            data = json.load(sys.stdin)
-    except (json.JSONDecodeError, FileNotFoundError) as e:
+            data = fast_json.load(sys.stdin)
+    except (fast_json.JSONDecodeError, FileNotFoundError) as e:
         print(f"錯誤: 無法讀取輸入資料 - {e}", file=sys.stderr)
         sys.exit(2)
 
@@ -616,6 +1459,10 @@ if __name__ == '__main__':
         print(f"錯誤: 資料驗證失敗 - {error}", file=sys.stderr)
         sys.exit(1)
 
+    # 將最終結果送到結構化事件通道（由 web backend 啟動時才會寫入）
+    from events import emit_event
+    emit_event("result", data)
+
     # 套用加分規則
     scoring_config = load_scoring_config(args.scoring_config) if args.scoring_config else load_scoring_config()
     if scoring_config["bonus_rules"]:
@@ -623,19 +1470,36 @@ if __name__ == '__main__':
         data = {**data, "analyzed_posts": scored_posts}
         logger.info("已套用 %d 條加分規則", len(scoring_config["bonus_rules"]))
 
+    # 回報分析結果到作者登記表（大魚 / 相關 / 本 run 未放入結果的待定貼文視為無關）
+    if args.author_db and os.path.exists(args.author_db):
+        from authors import AuthorRegistry
+        try:
+            with AuthorRegistry(args.author_db, run_id=args.run_id) as registry:
+                outcomes = registry.record_outcomes(
+                    (post, _is_big_fish(post)) for post in data["analyzed_posts"]
+                )
+            logger.info("作者分析結果: %s", outcomes)
+        except sqlite3.Error as e:
+            logger.warning("無法更新作者登記表 %s: %s", args.author_db, e)
+
     # Generate
-    if args.output_format == "line":
+    if args.output_format in ("line", "telegram"):
         gist_url = None
         if args.gist:
             report = generate_markdown_report(data)
-            gist_url = upload_to_gist(report)
-        print(generate_line_summary(data, report_url=gist_url))
-    elif args.output_format == "telegram":
-        gist_url = None
-        if args.gist:
-            report = generate_markdown_report(data)
-            gist_url = upload_to_gist(report)
-        print(generate_telegram_summary(data, report_url=gist_url))
+            publisher = GistPublisher(
+                cache_path=os.path.join(args.output_dir, GIST_CACHE_FILENAME)
+            )
+            gist_url = publisher.publish(
+                report,
+                filename="report.md",
+                description="Threads 輿情戰報",
+                key=GistPublisher.cache_key(data.get("keywords", [])),
+            )
+        if args.output_format == "line":
+            print(generate_line_summary(data, report_url=gist_url))
+        else:
+            print(generate_telegram_summary(data, report_url=gist_url))
     elif args.output_format == "markdown":
         report = generate_markdown_report(data)
         path = save_report(report, reports_dir=args.output_dir,
@@ -655,6 +1519,12 @@ if __name__ == '__main__':
             print()
             print("=== Telegram 摘要 ===")
             print(outputs["telegram_summary"])
+            for path, key in ((args.line_messages_out, "line_messages"),
+                              (args.telegram_messages_out, "telegram_messages")):
+                if path:
+                    with open(path, 'w', encoding='utf-8') as f:
+                        fast_json.dump(outputs[key], f, indent=not args.compact)
+                    print(f"\n{len(outputs[key])} 則分頁訊息已寫入: {path}")
         else:
             print("錯誤: 生成報告失敗", file=sys.stderr)
             sys.exit(1)
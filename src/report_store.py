@@ -0,0 +1,359 @@
+"""
+戰報檔案儲存 — 原子寫入、以 run ID 命名、可選壓縮、自動清理與索引檔。
+
+- 寫入：先寫到同目錄的暫存檔、fsync 後再 os.replace，程式中途崩潰不會留下半個檔案
+- 命名：report_YYYYMMDD_HHMMSS_<run_id>.md，同一秒內的多個巡邏不會互相覆蓋
+- 壓縮：gzip（標準庫）或 zstd（需安裝 zstandard，未安裝時退回 gzip）
+- 清理：超過保存天數或總大小上限時，由舊到新刪除
+- 索引：index.json 記錄所有報告，web backend 列出報告時不必掃描目錄；
+  更新時以 fcntl 檔案鎖保護，多個行程同時寫入也不會遺失紀錄
+
+用法：
+    python3 src/report_store.py --list
+    python3 src/report_store.py --evict
+    python3 src/report_store.py --rebuild-index
+"""
+
+import gzip
+import logging
+import os
+import re
+import tempfile
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows：不支援檔案鎖，退回無鎖更新
+    fcntl = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+import fast_json
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_REPORTS_DIR = "data/reports"
+INDEX_FILENAME = "index.json"
+LOCK_FILENAME = ".index.lock"
+INDEX_VERSION = 1
+
+COMPRESSION_SUFFIXES = {None: "", "gzip": ".gz", "zstd": ".zst"}
+
+# 清理策略（環境變數可覆寫；設為 0 表示不限制）
+DEFAULT_MAX_AGE_DAYS = float(os.environ.get("REPORT_MAX_AGE_DAYS", "90"))
+DEFAULT_MAX_TOTAL_MB = float(os.environ.get("REPORT_MAX_TOTAL_MB", "500"))
+
+_REPORT_NAME_RE = re.compile(r"^report_(\d{8}_\d{6})(?:_([0-9A-Za-z-]+))?\.md(\.gz|\.zst)?$")
+
+
+def _parse_timestamp(timestamp: Optional[str]) -> datetime:
+    """解析 ISO 8601 時間戳，無效或未提供時使用當前時間。"""
+    if timestamp:
+        try:
+            return datetime.fromisoformat(timestamp.replace("Z", "+00:00"))
+        except (ValueError, AttributeError):
+            pass
+    return datetime.now()
+
+
+def _compress(data: bytes, compression: Optional[str]) -> bytes:
+    if compression == "gzip":
+        return gzip.compress(data, compresslevel=6)
+    if compression == "zstd":
+        return zstandard.ZstdCompressor(level=3).compress(data)
+    return data
+
+
+def _decompress(data: bytes, filename: str) -> bytes:
+    if filename.endswith(".gz"):
+        return gzip.decompress(data)
+    if filename.endswith(".zst"):
+        if zstandard is None:
+            raise RuntimeError("讀取 .zst 報告需要安裝 zstandard")
+        return zstandard.ZstdDecompressor().decompressobj().decompress(data)
+    return data
+
+
+class ReportStore:
+    """
+    戰報檔案儲存
+
+    所有寫入都是原子的；index.json 的讀改寫在檔案鎖內進行。
+    """
+
+    def __init__(self, reports_dir: str = DEFAULT_REPORTS_DIR,
+                 compression: Optional[str] = None,
+                 max_age_days: Optional[float] = DEFAULT_MAX_AGE_DAYS,
+                 max_total_bytes: Optional[int] = int(DEFAULT_MAX_TOTAL_MB * 1024 * 1024)):
+        """
+        初始化報告儲存
+
+        Args:
+            reports_dir: 報告目錄。
+            compression: None（純文字 .md）、"gzip" 或 "zstd"。
+            max_age_days: 報告保存天數上限（None 或 0 表示不限制）。
+            max_total_bytes: 報告總大小上限（None 或 0 表示不限制）。
+
+        Raises:
+            ValueError: 不支援的壓縮格式。
+        """
+        if compression not in COMPRESSION_SUFFIXES:
+            raise ValueError(f"Unsupported compression: {compression}")
+        if compression == "zstd" and zstandard is None:
+            logger.warning("zstandard 未安裝，改用 gzip 壓縮")
+            compression = "gzip"
+
+        self.reports_dir = reports_dir
+        self.compression = compression
+        self.max_age_days = max_age_days or None
+        self.max_total_bytes = max_total_bytes or None
+        self.index_path = os.path.join(reports_dir, INDEX_FILENAME)
+
+    # ========== Index ==========
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        """取得 index 的排他鎖（跨行程）。"""
+        os.makedirs(self.reports_dir, exist_ok=True)
+        if fcntl is None:
+            yield
+            return
+        lock_path = os.path.join(self.reports_dir, LOCK_FILENAME)
+        with open(lock_path, "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _read_index(self) -> Optional[List[Dict]]:
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                index = fast_json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, fast_json.JSONDecodeError) as e:
+            logger.warning("報告索引損毀，將重建: %s", e)
+            return None
+        if not isinstance(index, dict) or not isinstance(index.get("reports"), list):
+            return None
+        return index["reports"]
+
+    def _write_index(self, entries: List[Dict]) -> None:
+        payload = fast_json.dumps_bytes({"version": INDEX_VERSION, "reports": entries})
+        self._atomic_write(self.index_path, payload)
+
+    def _scan_entries(self) -> List[Dict]:
+        """掃描目錄建立索引項目（僅在索引不存在或損毀時使用）。"""
+        entries = []
+        try:
+            names = os.listdir(self.reports_dir)
+        except FileNotFoundError:
+            return entries
+        for name in names:
+            match = _REPORT_NAME_RE.match(name)
+            if not match:
+                continue
+            path = os.path.join(self.reports_dir, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            stamp = datetime.strptime(match.group(1), "%Y%m%d_%H%M%S")
+            entries.append({
+                "filename": name,
+                "run_id": match.group(2),
+                "timestamp": stamp.isoformat(),
+                "created_at": stat.st_mtime,
+                "size": stat.st_size,
+                "compression": {".gz": "gzip", ".zst": "zstd"}.get(match.group(3)),
+                "keywords": [],
+            })
+        entries.sort(key=lambda e: e["created_at"])
+        return entries
+
+    def _load_entries(self) -> List[Dict]:
+        entries = self._read_index()
+        if entries is None:
+            entries = self._scan_entries()
+        return entries
+
+    def rebuild_index(self) -> int:
+        """重新掃描目錄並重寫索引，回傳報告數。"""
+        with self._locked():
+            entries = self._scan_entries()
+            self._write_index(entries)
+        return len(entries)
+
+    def list_reports(self) -> List[Dict]:
+        """
+        列出索引中的報告（最新的在前），不掃描目錄。
+
+        Returns:
+            List[Dict]: 每筆含 filename、run_id、timestamp、created_at、
+            size、compression、keywords。
+        """
+        return list(reversed(self._load_entries()))
+
+    # ========== Read / Write ==========
+
+    def _atomic_write(self, path: str, data: bytes) -> None:
+        """寫入同目錄暫存檔、fsync 後 os.replace 到目標路徑。"""
+        directory = os.path.dirname(path) or "."
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp_")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+
+    def build_filename(self, run_id: str, timestamp: Optional[str] = None) -> str:
+        """報告檔名：report_YYYYMMDD_HHMMSS_<run_id>.md[.gz|.zst]。"""
+        dt = _parse_timestamp(timestamp)
+        safe_id = re.sub(r"[^0-9A-Za-z-]", "", run_id) or uuid.uuid4().hex
+        suffix = COMPRESSION_SUFFIXES[self.compression]
+        return f"report_{dt.strftime('%Y%m%d_%H%M%S')}_{safe_id}.md{suffix}"
+
+    def save(self, report_content: str, run_id: Optional[str] = None,
+             timestamp: Optional[str] = None,
+             keywords: Optional[List[str]] = None) -> str:
+        """
+        原子地儲存一份報告、更新索引並執行清理。
+
+        Args:
+            report_content: Markdown 格式的戰報內容。
+            run_id: 監控 run ID（None 則自動產生）。
+            timestamp: 報告時間戳（ISO 8601），預設使用當前時間。
+            keywords: 監控關鍵字（記錄於索引）。
+
+        Returns:
+            str: 儲存的檔案路徑。
+        """
+        run_id = run_id or uuid.uuid4().hex[:12]
+        filename = self.build_filename(run_id, timestamp)
+        path = os.path.join(self.reports_dir, filename)
+
+        data = _compress(report_content.encode("utf-8"), self.compression)
+        self._atomic_write(path, data)
+
+        entry = {
+            "filename": filename,
+            "run_id": run_id,
+            "timestamp": _parse_timestamp(timestamp).isoformat(),
+            "created_at": time.time(),
+            "size": len(data),
+            "compression": self.compression,
+            "keywords": list(keywords or []),
+        }
+
+        with self._locked():
+            entries = [e for e in self._load_entries() if e.get("filename") != filename]
+            entries.append(entry)
+            entries, removed = self._apply_eviction(entries)
+            self._write_index(entries)
+
+        self._remove_files(removed)
+        logger.info("報告已儲存: %s", path)
+        return path
+
+    def load(self, filename: str) -> str:
+        """
+        讀取報告內容（自動解壓縮）。
+
+        Args:
+            filename: 報告檔名（不可含路徑）。
+
+        Raises:
+            ValueError: 檔名不合法。
+            FileNotFoundError: 報告不存在。
+        """
+        if os.path.basename(filename) != filename or not _REPORT_NAME_RE.match(filename):
+            raise ValueError(f"Invalid report filename: {filename}")
+        with open(os.path.join(self.reports_dir, filename), "rb") as f:
+            data = f.read()
+        return _decompress(data, filename).decode("utf-8")
+
+    # ========== Eviction ==========
+
+    def _apply_eviction(self, entries: List[Dict]):
+        """依保存天數與總大小決定要刪除的報告（由舊到新）。"""
+        removed = []
+        if self.max_age_days:
+            cutoff = time.time() - self.max_age_days * 86400
+            kept = []
+            for entry in entries:
+                (removed if entry.get("created_at", 0) < cutoff else kept).append(entry)
+            entries = kept
+
+        if self.max_total_bytes:
+            total = sum(e.get("size", 0) for e in entries)
+            # 至少保留最新的一份
+            while total > self.max_total_bytes and len(entries) > 1:
+                oldest = entries.pop(0)
+                total -= oldest.get("size", 0)
+                removed.append(oldest)
+
+        return entries, removed
+
+    def _remove_files(self, entries: List[Dict]) -> None:
+        for entry in entries:
+            path = os.path.join(self.reports_dir, entry["filename"])
+            try:
+                os.unlink(path)
+                logger.info("已清理舊報告: %s", entry["filename"])
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.warning("清理報告失敗 %s: %s", path, e)
+
+    def evict(self) -> List[str]:
+        """立即執行清理，回傳被刪除的檔名。"""
+        with self._locked():
+            entries, removed = self._apply_eviction(self._load_entries())
+            self._write_index(entries)
+        self._remove_files(removed)
+        return [e["filename"] for e in removed]
+
+
+if __name__ == '__main__':
+    import argparse
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+    parser = argparse.ArgumentParser(
+        description="戰報檔案儲存工具 - 列出、清理報告或重建索引"
+    )
+    parser.add_argument("--dir", default=DEFAULT_REPORTS_DIR, help="報告目錄")
+    parser.add_argument("--list", action="store_true", help="列出所有報告")
+    parser.add_argument("--evict", action="store_true", help="依保存天數與總大小清理舊報告")
+    parser.add_argument("--rebuild-index", action="store_true", help="掃描目錄重建索引")
+
+    args = parser.parse_args()
+    store = ReportStore(args.dir)
+
+    if args.rebuild_index:
+        print(f"索引已重建: {store.rebuild_index()} 份報告")
+    if args.evict:
+        removed = store.evict()
+        print(f"已清理 {len(removed)} 份報告")
+    if args.list or not (args.rebuild_index or args.evict):
+        for entry in store.list_reports():
+            print(f"{entry['timestamp']}  {entry['size']:>8}  {entry['filename']}")
@@ -3,21 +3,29 @@
 
 加分邏輯：
 1. 讀取 YAML 設定檔中的 bonus_rules
-2. 對每篇貼文的 content + summary 進行關鍵字比對
+2. 對每篇貼文的 content + summary 進行關鍵字比對（設定 normalize_text 時先正規化，見 normalize.py）
 3. 每條規則最多觸發一次（同規則的多個關鍵字不重複加分）
 4. 多條規則可同時觸發，分數累加
 5. 最終分數不超過 max_score 上限
 
+批次模式（score_batch / apply_scoring_to_posts）：
+- 以 KeywordMatcher 一次掃描每篇文字，建立「貼文 × 規則」命中矩陣
+- 每篇只加總命中規則的加分，結果與逐篇計算完全相同
+
 用法：
     python3 src/scoring.py --input data.json [--config config/scoring.yml]
 """
 
 import copy
-import json
 import logging
 import os
 import sys
-from typing import Dict, List
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+import fast_json
+from matcher import KeywordMatcher
+from normalize import normalizer_from_config
 
 logger = logging.getLogger(__name__)
 
@@ -37,31 +45,38 @@ def load_scoring_config(config_path: str = DEFAULT_SCORING_CONFIG_PATH) -> Dict:
         config_path: YAML 設定檔路徑。
 
     Returns:
-        Dict: 包含 bonus_rules 和 max_score 的設定字典。
+        Dict: 包含 bonus_rules、max_score、normalize_text 和 fold_script 的設定字典。
               檔案不存在時回傳空規則。
     """
     import yaml
 
     if not os.path.exists(config_path):
         logger.warning("評分設定檔不存在: %s，使用空規則", config_path)
-        return {"bonus_rules": [], "max_score": DEFAULT_MAX_SCORE}
+        return _empty_config()
 
     try:
         with open(config_path, 'r', encoding='utf-8') as f:
             config = yaml.safe_load(f)
     except Exception as e:
         logger.error("讀取評分設定失敗: %s", e)
-        return {"bonus_rules": [], "max_score": DEFAULT_MAX_SCORE}
+        return _empty_config()
 
     if not isinstance(config, dict):
-        return {"bonus_rules": [], "max_score": DEFAULT_MAX_SCORE}
+        return _empty_config()
 
     return {
         "bonus_rules": config.get("bonus_rules", []),
         "max_score": config.get("max_score", DEFAULT_MAX_SCORE),
+        "normalize_text": bool(config.get("normalize_text", False)),
+        "fold_script": bool(config.get("fold_script", False)),
     }
 
 
+def _empty_config() -> Dict:
+    return {"bonus_rules": [], "max_score": DEFAULT_MAX_SCORE,
+            "normalize_text": False, "fold_script": False}
+
+
 def apply_scoring_bonus(post: Dict, config: Dict) -> Dict:
     """
     對單篇貼文套用加分規則，回傳新的 post（不修改原始資料）。
@@ -80,10 +95,9 @@ def apply_scoring_bonus(post: Dict, config: Dict) -> Dict:
     analysis = result.get("analysis", {})
     base_importance = analysis.get("importance", 0)
 
-    # 建立比對文字（content + summary）
-    content = post.get("content", "")
-    summary = post.get("analysis", {}).get("summary", "")
-    match_text = f"{content} {summary}"
+    # 建立比對文字（content + summary，設定啟用時先正規化）
+    normalize = normalizer_from_config(config)
+    match_text = _match_text(post, normalize)
 
     bonus_total = 0
     bonus_detail = []
@@ -96,7 +110,7 @@ def apply_scoring_bonus(post: Dict, config: Dict) -> Dict:
         # 同一規則只要有任一關鍵字命中就觸發，不重複加分
         matched = False
         for kw in keywords:
-            if kw in match_text:
+            if (normalize(kw) if normalize else kw) in match_text:
                 matched = True
                 break
 
@@ -124,9 +138,90 @@ def apply_scoring_bonus(post: Dict, config: Dict) -> Dict:
     return result
 
 
+@dataclass
+class BatchScores:
+    """批次評分結果（不含貼文本身），供寫回貼文或做規則 what-if 分析。"""
+
+    rule_names: List[str]
+    bonuses: List[Any]
+    hits: List[List[int]]       # 每篇貼文命中的規則索引（依規則順序）
+    base: List[Any]             # 每篇的原始 importance
+    totals: List[Any]           # 每篇的加分總和
+    adjusted: List[Any]         # 每篇的 adjusted_importance（已套用 max_score）
+
+    def bonus_detail(self, index: int) -> List[Dict]:
+        """第 index 篇貼文的 bonus_detail（同 apply_scoring_bonus）。"""
+        return [
+            {"rule_name": self.rule_names[r], "bonus": self.bonuses[r]}
+            for r in self.hits[index]
+        ]
+
+    def rule_hit_counts(self) -> List[int]:
+        """每條規則命中的貼文數。"""
+        counts = [0] * len(self.rule_names)
+        for rules in self.hits:
+            for r in rules:
+                counts[r] += 1
+        return counts
+
+
+def _match_text(post: Dict, normalize: Optional[Callable] = None) -> str:
+    """比對用文字：content + analysis.summary（分別正規化，避免跨欄位拼出關鍵字）。"""
+    content = post.get("content", "")
+    summary = post.get("analysis", {}).get("summary", "")
+    if normalize is not None:
+        content, summary = normalize(content), normalize(summary)
+    return f"{content} {summary}"
+
+
+def score_batch(posts: List[Dict], config: Dict) -> BatchScores:
+    """
+    對整批貼文計算加分，結果與逐篇 apply_scoring_bonus 完全一致。
+
+    Args:
+        posts: 貼文列表（不會被修改）。
+        config: 評分設定（含 bonus_rules, max_score）。
+
+    Returns:
+        BatchScores: 命中矩陣與每篇的加分結果。
+    """
+    rules = config.get("bonus_rules", [])
+    rule_names = [rule.get("name", "unknown") for rule in rules]
+    bonuses = [rule.get("bonus", 0) for rule in rules]
+    max_score = config.get("max_score", DEFAULT_MAX_SCORE)
+
+    # 所有規則的關鍵字攤平成一個比對器，再對應回規則索引
+    normalize = normalizer_from_config(config)
+    keyword_rules: Dict[str, set] = {}
+    for r, rule in enumerate(rules):
+        for kw in rule.get("keywords", []):
+            if normalize is not None:
+                kw = normalize(kw)
+            keyword_rules.setdefault(kw, set()).add(r)
+    matcher = KeywordMatcher(keyword_rules)
+
+    hits = []
+    for post in posts:
+        found = matcher.find(_match_text(post, normalize))
+        hits.append(sorted(set().union(*(keyword_rules[kw] for kw in found))))
+    base = [post.get("analysis", {}).get("importance", 0) for post in posts]
+
+    # 依規則順序逐一相加，與 apply_scoring_bonus 的加總順序（及浮點結果）一致
+    totals = []
+    for rule_ids in hits:
+        total = 0
+        for r in rule_ids:
+            total += bonuses[r]
+        totals.append(total)
+
+    adjusted = [min(b + t, max_score) for b, t in zip(base, totals)]
+    return BatchScores(rule_names=rule_names, bonuses=bonuses, hits=hits,
+                       base=base, totals=totals, adjusted=adjusted)
+
+
 def apply_scoring_to_posts(posts: List[Dict], config: Dict) -> List[Dict]:
     """
-    對所有貼文批次套用加分規則。
+    對所有貼文批次套用加分規則（使用 score_batch）。
 
     Args:
         posts: 貼文列表。
@@ -135,7 +230,16 @@ def apply_scoring_to_posts(posts: List[Dict], config: Dict) -> List[Dict]:
     Returns:
         List[Dict]: 加分後的貼文列表（新建立，不修改原始資料）。
     """
-    return [apply_scoring_bonus(post, config) for post in posts]
+    scores = score_batch(posts, config)
+    results = []
+    for i, post in enumerate(posts):
+        result = copy.deepcopy(post)
+        analysis = result.get("analysis", {})
+        analysis["adjusted_importance"] = scores.adjusted[i]
+        analysis["bonus_detail"] = scores.bonus_detail(i)
+        result["analysis"] = analysis
+        results.append(result)
+    return results
 
 
 if __name__ == '__main__':
@@ -153,6 +257,8 @@ if __name__ == '__main__':
     parser.add_argument("--config", default=DEFAULT_SCORING_CONFIG_PATH,
                         help="評分設定檔路徑")
     parser.add_argument("--output", help="輸出 JSON 檔案路徑（省略則輸出到 stdout）")
+    parser.add_argument("--compact", action="store_true",
+                        help="輸出緊湊 JSON（不縮排）")
 
     args = parser.parse_args()
 
@@ -163,8 +269,8 @@ if __name__ == '__main__':
     # 載入資料
     try:
         with open(args.input, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-    except (json.JSONDecodeError, FileNotFoundError) as e:
+            data = fast_json.load(f)
+    except (fast_json.JSONDecodeError, FileNotFoundError) as e:
         print(f"錯誤: 無法讀取輸入資料 - {e}", file=sys.stderr)
         sys.exit(2)
 
@@ -177,7 +283,7 @@ if __name__ == '__main__':
 
     if args.output:
         with open(args.output, 'w', encoding='utf-8') as f:
-            json.dump(scored_data, f, ensure_ascii=False, indent=2)
+            fast_json.dump(scored_data, f, indent=not args.compact)
         print(f"已輸出: {args.output}")
     else:
         # 輸出摘要到 stdout
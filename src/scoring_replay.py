@@ -0,0 +1,334 @@
+"""
+評分規則回放工具 — 以歷史 run 驗證 scoring.yml 的修改影響。
+
+從 runs.db 逐筆串流讀取每個 run 的 result_json（不一次載入全部歷史），
+分別以基準設定與候選設定執行 apply_scoring_to_posts + identify_big_fish，
+並以多個 process 平行處理，最後彙整：
+1. 哪些貼文在候選設定下「新成為」大魚、哪些「不再是」大魚
+2. 每條規則在兩種設定下的觸發率（觸發貼文數 / 總貼文數）
+
+用法：
+    python3 src/scoring_replay.py --candidate config/scoring.new.yml
+    python3 src/scoring_replay.py --candidate new.yml --baseline old.yml --workers 8 --json
+"""
+
+import logging
+import os
+import sqlite3
+import sys
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import fast_json
+from parallel import bounded_imap
+from report_generator import identify_big_fish
+from scoring import DEFAULT_SCORING_CONFIG_PATH, apply_scoring_to_posts, load_scoring_config
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RUNS_DB_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "data", "runs.db"
+)
+
+# 每個 worker 一次領取的 run 數
+DEFAULT_CHUNKSIZE = 4
+
+
+@dataclass
+class RunDiff:
+    """單一 run 的回放結果。"""
+
+    run_id: str
+    created_at: str
+    post_count: int
+    baseline_big_fish: int
+    candidate_big_fish: int
+    added: List[Dict] = field(default_factory=list)    # 候選設定下新成為大魚
+    removed: List[Dict] = field(default_factory=list)  # 候選設定下不再是大魚
+    baseline_rule_hits: Dict[str, int] = field(default_factory=dict)
+    candidate_rule_hits: Dict[str, int] = field(default_factory=dict)
+
+
+@dataclass
+class ReplaySummary:
+    """所有 run 的彙整結果。"""
+
+    runs: int = 0
+    posts: int = 0
+    baseline_big_fish: int = 0
+    candidate_big_fish: int = 0
+    added: List[Dict] = field(default_factory=list)
+    removed: List[Dict] = field(default_factory=list)
+    baseline_rule_hits: Dict[str, int] = field(default_factory=dict)
+    candidate_rule_hits: Dict[str, int] = field(default_factory=dict)
+
+    def add(self, diff: RunDiff) -> None:
+        """併入一個 run 的結果。"""
+        self.runs += 1
+        self.posts += diff.post_count
+        self.baseline_big_fish += diff.baseline_big_fish
+        self.candidate_big_fish += diff.candidate_big_fish
+        self.added.extend(diff.added)
+        self.removed.extend(diff.removed)
+        for name, count in diff.baseline_rule_hits.items():
+            self.baseline_rule_hits[name] = self.baseline_rule_hits.get(name, 0) + count
+        for name, count in diff.candidate_rule_hits.items():
+            self.candidate_rule_hits[name] = self.candidate_rule_hits.get(name, 0) + count
+
+    def rule_rates(self) -> List[Dict]:
+        """
+        每條規則的觸發率。
+
+        Returns:
+            List[Dict]: [{"rule_name", "baseline_hits", "candidate_hits",
+                          "baseline_rate", "candidate_rate"}, ...]，依規則名稱排序。
+        """
+        names = sorted(set(self.baseline_rule_hits) | set(self.candidate_rule_hits))
+        total = self.posts or 1
+        return [
+            {
+                "rule_name": name,
+                "baseline_hits": self.baseline_rule_hits.get(name, 0),
+                "candidate_hits": self.candidate_rule_hits.get(name, 0),
+                "baseline_rate": round(self.baseline_rule_hits.get(name, 0) / total, 4),
+                "candidate_rate": round(self.candidate_rule_hits.get(name, 0) / total, 4),
+            }
+            for name in names
+        ]
+
+    def to_dict(self) -> Dict:
+        """轉為可 JSON 序列化的字典。"""
+        return {
+            "runs": self.runs,
+            "posts": self.posts,
+            "baseline_big_fish": self.baseline_big_fish,
+            "candidate_big_fish": self.candidate_big_fish,
+            "added": self.added,
+            "removed": self.removed,
+            "rule_rates": self.rule_rates(),
+        }
+
+
+def iter_stored_runs(db_path: str = DEFAULT_RUNS_DB_PATH,
+                     since: Optional[str] = None) -> Iterator[Tuple[str, str, str]]:
+    """
+    依建立時間逐筆串流讀取有結果的 run。
+
+    Args:
+        db_path: runs.db 路徑。
+        since: 只讀取 created_at >= since 的 run（ISO 日期字串）。
+
+    Yields:
+        (run_id, created_at, result_json)
+    """
+    query = "SELECT id, created_at, result_json FROM runs WHERE result_json IS NOT NULL"
+    params: Tuple = ()
+    if since:
+        query += " AND created_at >= ?"
+        params = (since,)
+    query += " ORDER BY created_at"
+
+    # 產生器可能在 Pool 的 feeder 執行緒中被迭代
+    conn = sqlite3.connect(db_path, check_same_thread=False)
+    try:
+        for run_id, created_at, result_json in conn.execute(query, params):
+            yield run_id, str(created_at or ""), result_json
+    finally:
+        conn.close()
+
+
+def extract_posts(result_json: str) -> List[Dict]:
+    """從 result_json 取出 analyzed_posts（支援 list 或含 analyzed_posts 的 dict）。"""
+    try:
+        parsed = fast_json.loads(result_json)
+    except (fast_json.JSONDecodeError, TypeError):
+        return []
+    if isinstance(parsed, dict):
+        parsed = parsed.get("analyzed_posts", [])
+    if not isinstance(parsed, list):
+        return []
+    return [post for post in parsed if isinstance(post, dict)]
+
+
+def _rule_hits(scored_posts: List[Dict]) -> Dict[str, int]:
+    """統計每條規則觸發的貼文數（依 bonus_detail）。"""
+    hits: Dict[str, int] = {}
+    for post in scored_posts:
+        for detail in post.get("analysis", {}).get("bonus_detail", []):
+            name = detail.get("rule_name", "unknown")
+            hits[name] = hits.get(name, 0) + 1
+    return hits
+
+
+def _diff_entry(run_id: str, baseline_post: Dict, candidate_post: Dict) -> Dict:
+    """大魚變化的明細。"""
+    baseline_analysis = baseline_post.get("analysis", {})
+    candidate_analysis = candidate_post.get("analysis", {})
+    return {
+        "run_id": run_id,
+        "post_id": candidate_post.get("id", ""),
+        "summary": candidate_analysis.get("summary", ""),
+        "baseline_score": baseline_analysis.get("adjusted_importance"),
+        "candidate_score": candidate_analysis.get("adjusted_importance"),
+    }
+
+
+def replay_run(run_id: str, created_at: str, result_json: str,
+               baseline_config: Dict, candidate_config: Dict) -> RunDiff:
+    """
+    以兩種評分設定回放單一 run。
+
+    Returns:
+        RunDiff: 大魚差異與規則觸發數。
+    """
+    posts = extract_posts(result_json)
+    baseline_posts = apply_scoring_to_posts(posts, baseline_config)
+    candidate_posts = apply_scoring_to_posts(posts, candidate_config)
+
+    # 以物件身分比對，避免重複或缺少 id 的貼文互相混淆
+    baseline_ids = {id(p) for p in identify_big_fish(baseline_posts)}
+    candidate_ids = {id(p) for p in identify_big_fish(candidate_posts)}
+    baseline_flags = [id(p) in baseline_ids for p in baseline_posts]
+    candidate_flags = [id(p) in candidate_ids for p in candidate_posts]
+
+    diff = RunDiff(
+        run_id=run_id,
+        created_at=created_at,
+        post_count=len(posts),
+        baseline_big_fish=sum(baseline_flags),
+        candidate_big_fish=sum(candidate_flags),
+        baseline_rule_hits=_rule_hits(baseline_posts),
+        candidate_rule_hits=_rule_hits(candidate_posts),
+    )
+    for i, (was, now) in enumerate(zip(baseline_flags, candidate_flags)):
+        if now and not was:
+            diff.added.append(_diff_entry(run_id, baseline_posts[i], candidate_posts[i]))
+        elif was and not now:
+            diff.removed.append(_diff_entry(run_id, baseline_posts[i], candidate_posts[i]))
+    return diff
+
+
+# Worker process 內的設定（由 initializer 設定一次，避免每個 run 重新傳遞）
+_worker_configs: Tuple[Dict, Dict] = ({}, {})
+
+
+def _init_worker(baseline_config: Dict, candidate_config: Dict) -> None:
+    global _worker_configs
+    _worker_configs = (baseline_config, candidate_config)
+
+
+def _replay_row(row: Tuple[str, str, str]) -> RunDiff:
+    run_id, created_at, result_json = row
+    return replay_run(run_id, created_at, result_json, *_worker_configs)
+
+
+def replay(candidate_config: Dict, baseline_config: Optional[Dict] = None,
+           db_path: str = DEFAULT_RUNS_DB_PATH, since: Optional[str] = None,
+           workers: Optional[int] = None, chunksize: int = DEFAULT_CHUNKSIZE) -> ReplaySummary:
+    """
+    以候選評分設定回放所有歷史 run。
+
+    Args:
+        candidate_config: 候選評分設定（load_scoring_config 格式）。
+        baseline_config: 基準設定（None 則使用目前的 config/scoring.yml）。
+        db_path: runs.db 路徑。
+        since: 只回放 created_at >= since 的 run。
+        workers: process 數（None 為 CPU 數，1 則在目前 process 執行）。
+        chunksize: 每個 worker 一次領取的 run 數。
+
+    Returns:
+        ReplaySummary: 彙整結果。
+    """
+    if baseline_config is None:
+        baseline_config = load_scoring_config()
+    if not os.path.exists(db_path):
+        raise FileNotFoundError(f"找不到 runs 資料庫: {db_path}")
+
+    summary = ReplaySummary()
+    diffs = bounded_imap(
+        _replay_row,
+        iter_stored_runs(db_path, since=since),
+        workers=workers,
+        initializer=_init_worker,
+        initargs=(baseline_config, candidate_config),
+        chunksize=chunksize,
+    )
+    for diff in diffs:
+        summary.add(diff)
+    return summary
+
+
+def format_summary(summary: ReplaySummary, max_items: int = 20) -> str:
+    """將回放結果格式化為文字報告。"""
+    lines = [
+        f"回放 {summary.runs} 個 run，共 {summary.posts} 篇貼文",
+        f"大魚：基準 {summary.baseline_big_fish} → 候選 {summary.candidate_big_fish}"
+        f"（新增 {len(summary.added)}，移除 {len(summary.removed)}）",
+    ]
+
+    for title, entries in (("新成為大魚", summary.added), ("不再是大魚", summary.removed)):
+        if not entries:
+            continue
+        lines.append("")
+        lines.append(f"== {title} ==")
+        for entry in entries[:max_items]:
+            lines.append(
+                f"[{entry['baseline_score']}→{entry['candidate_score']}] "
+                f"{entry['run_id'][:8]} {entry['post_id']}  {entry['summary'][:40]}"
+            )
+        if len(entries) > max_items:
+            lines.append(f"...（另有 {len(entries) - max_items} 篇）")
+
+    lines.append("")
+    lines.append("== 規則觸發率（基準 → 候選）==")
+    for rate in summary.rule_rates():
+        lines.append(
+            f"{rate['rule_name']}: {rate['baseline_rate']:.1%} → {rate['candidate_rate']:.1%}"
+            f"（{rate['baseline_hits']} → {rate['candidate_hits']}）"
+        )
+    return "\n".join(lines)
+
+
+if __name__ == '__main__':
+    import argparse
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+    parser = argparse.ArgumentParser(
+        description="評分規則回放 - 以歷史 run 比較候選 scoring.yml 的大魚差異"
+    )
+    parser.add_argument("--candidate", required=True, help="候選評分設定檔路徑")
+    parser.add_argument("--baseline", default=DEFAULT_SCORING_CONFIG_PATH,
+                        help="基準評分設定檔路徑（預設為目前的 config/scoring.yml）")
+    parser.add_argument("--db", default=DEFAULT_RUNS_DB_PATH, help="runs.db 路徑")
+    parser.add_argument("--since", help="只回放此日期之後的 run（例如 2026-01-01）")
+    parser.add_argument("--workers", type=int, help="平行 process 數（預設為 CPU 數）")
+    parser.add_argument("--max-items", type=int, default=20, help="每類最多列出幾篇")
+    parser.add_argument("--json", action="store_true", help="以 JSON 輸出完整結果")
+
+    args = parser.parse_args()
+
+    if not os.path.exists(args.candidate):
+        print(f"錯誤: 找不到候選設定檔 {args.candidate}", file=sys.stderr)
+        sys.exit(2)
+
+    try:
+        result = replay(
+            candidate_config=load_scoring_config(args.candidate),
+            baseline_config=load_scoring_config(args.baseline),
+            db_path=args.db,
+            since=args.since,
+            workers=args.workers,
+        )
+    except FileNotFoundError as e:
+        print(f"錯誤: {e}", file=sys.stderr)
+        sys.exit(2)
+
+    if args.json:
+        print(fast_json.dumps(result.to_dict(), indent=True))
+    else:
+        print(format_summary(result, max_items=args.max_items))
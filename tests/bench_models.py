@@ -0,0 +1,76 @@
+"""
+Micro-benchmark for the trusted model fast paths.
+
+Compares full pydantic validation against the fast paths in utils for
+progress messages and history rows. Output equivalence is covered by
+tests/test_utils.py; this script is not collected by pytest. Run with:
+
+    python tests/bench_models.py [--number 20000]
+"""
+
+import argparse
+import os
+import sys
+import timeit
+
+_PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, _PROJECT_ROOT)
+sys.path.insert(0, os.path.join(_PROJECT_ROOT, 'src'))
+
+from web.backend.models import ProgressMessage
+from web.backend.utils import build_run_record, progress_payload, run_record_dict
+
+SAMPLE_PROGRESS = {
+    "type": "keyword_progress",
+    "data": {"keyword": "內湖", "index": 3, "total": 5, "message": "正在搜尋..."},
+}
+
+SAMPLE_RUN = {
+    "id": "3f0c2a64-1f3e-4c55-9a0b-7d1d2b0c9e11",
+    "status": "completed",
+    "keywords": ["內湖", "南港"],
+    "created_at": "2026-02-10 15:30:00",
+    "completed_at": "2026-02-10T15:42:17.123456+00:00",
+    "report_markdown": "# Threads 輿情戰報\n" + "內容\n" * 200,
+    "stats": {"total_searched": 120, "valid_count": 42},
+    "error_message": None,
+}
+
+
+def _per_call_us(func, number: int) -> float:
+    return min(timeit.repeat(func, number=number, repeat=3)) / number * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark model fast paths")
+    parser.add_argument("--number", type=int, default=20000, help="Calls per measurement")
+    args = parser.parse_args()
+
+    # Sanity check: both paths must produce identical output
+    assert progress_payload(SAMPLE_PROGRESS, 1) == ProgressMessage(
+        **SAMPLE_PROGRESS, id=1
+    ).model_dump()
+    assert run_record_dict(SAMPLE_RUN) == build_run_record(SAMPLE_RUN).model_dump(mode="json")
+
+    cases = [
+        (
+            "progress message",
+            lambda: ProgressMessage(**SAMPLE_PROGRESS, id=1).model_dump(),
+            lambda: progress_payload(SAMPLE_PROGRESS, 1),
+        ),
+        (
+            "history row",
+            lambda: build_run_record(SAMPLE_RUN).model_dump(mode="json"),
+            lambda: run_record_dict(SAMPLE_RUN),
+        ),
+    ]
+
+    print(f"{'case':<18}{'validated (us)':>16}{'fast path (us)':>16}{'speedup':>10}")
+    for name, validated, fast in cases:
+        before = _per_call_us(validated, args.number)
+        after = _per_call_us(fast, args.number)
+        print(f"{name:<18}{before:>16.2f}{after:>16.2f}{before / after:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
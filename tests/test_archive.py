@@ -0,0 +1,193 @@
+import gzip
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from archive import (
+    INDEX_FILENAME, PostArchive, iter_archive, iter_archived_posts, list_segments,
+    rebuild_index,
+)
+from filter_replay import replay_filters
+from pipeline import process_posts
+
+LONG_CONTENT = "內湖科技園區新增三條接駁巴士路線，方便上班族從捷運站轉乘直達辦公區域，即日起試營運"
+
+
+class TestPostArchive(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def _archive(self, **kwargs):
+        kwargs.setdefault("compression", "gzip")
+        kwargs.setdefault("flush_interval", 0.01)
+        return PostArchive(self.tmpdir, **kwargs)
+
+    def test_roundtrip_with_decision_and_reason(self):
+        """紀錄含判斷結果、原因與命中詞，可依序讀回"""
+        with self._archive(run_id="run-1") as archive:
+            archive.record({"content": "a", "link": "l1"}, "passed")
+            archive.record({"content": "b", "link": "l2"}, "filtered", "exclude", {"團購", "代購"})
+
+        records = list(iter_archive(self.tmpdir))
+        self.assertEqual(len(records), 2)
+        self.assertEqual(records[0]["post"], {"content": "a", "link": "l1"})
+        self.assertEqual(records[0]["decision"], "passed")
+        self.assertEqual(records[1]["reason"], "exclude")
+        self.assertEqual(records[1]["terms"], ["代購", "團購"])
+        self.assertEqual(records[1]["run_id"], "run-1")
+
+    def test_date_partition_and_index(self):
+        """區段放在日期目錄下，索引記錄筆數"""
+        with self._archive() as archive:
+            for i in range(5):
+                archive.record({"content": str(i)}, "passed")
+
+        segments = list_segments(self.tmpdir)
+        self.assertEqual(len(segments), 1)
+        self.assertEqual(segments[0]["records"], 5)
+        self.assertTrue(segments[0]["path"].startswith(segments[0]["date"] + "/"))
+        self.assertTrue(segments[0]["path"].endswith(".ndjson.gz"))
+        self.assertTrue(os.path.exists(os.path.join(self.tmpdir, INDEX_FILENAME)))
+
+    def test_segment_rotation(self):
+        """超過 segment_max_records 時換新區段"""
+        with self._archive(segment_max_records=3) as archive:
+            for i in range(7):
+                archive.record({"content": str(i)}, "passed")
+
+        segments = list_segments(self.tmpdir)
+        self.assertEqual(sorted(s["records"] for s in segments), [1, 3, 3])
+        self.assertEqual(len(list(iter_archive(self.tmpdir))), 7)
+
+    def test_append_only_multiple_flushes(self):
+        """多次寫入附加為多個壓縮區塊，全部可讀回"""
+        archive = self._archive()
+        archive.record({"content": "1"}, "passed")
+        archive.flush()
+        archive.record({"content": "2"}, "passed")
+        archive.close()
+
+        self.assertEqual([p["content"] for p in iter_archived_posts(self.tmpdir)], ["1", "2"])
+        self.assertEqual(len(list_segments(self.tmpdir)), 1)
+
+    def test_truncated_tail_keeps_earlier_batches(self):
+        """最後一個區塊寫到一半時，先前的紀錄仍可讀取"""
+        archive = self._archive()
+        archive.record({"content": "ok"}, "passed")
+        archive.close()
+        path = os.path.join(self.tmpdir, list_segments(self.tmpdir)[0]["path"])
+        with open(path, "ab") as f:
+            f.write(gzip.compress(b'{"decision": "passed", "post": {}}\n')[:12])
+
+        self.assertEqual([p["content"] for p in iter_archived_posts(self.tmpdir)], ["ok"])
+
+    def test_queue_full_drops_without_blocking(self):
+        """佇列滿時捨棄並計數，不阻塞呼叫端"""
+        archive = self._archive(max_queue=1, flush_interval=0.5)
+        results = [archive.record({"content": str(i)}, "passed") for i in range(50)]
+        archive.close()
+        self.assertIn(False, results)
+        self.assertEqual(archive.recorded + archive.dropped, 50)
+        self.assertEqual(len(list(iter_archive(self.tmpdir))), archive.recorded)
+
+    def test_record_after_close_is_ignored(self):
+        archive = self._archive()
+        archive.close()
+        self.assertFalse(archive.record({"content": "x"}, "passed"))
+        archive.close()
+
+    def test_filters_by_decision_and_date(self):
+        with self._archive() as archive:
+            archive.record({"content": "a"}, "passed")
+            archive.record({"content": "b"}, "duplicate", "seen_link")
+
+        dups = list(iter_archive(self.tmpdir, decisions=["duplicate"]))
+        self.assertEqual([r["post"]["content"] for r in dups], ["b"])
+        self.assertEqual(list(iter_archive(self.tmpdir, since="2999-01-01")), [])
+
+    def test_rebuild_index(self):
+        """索引遺失時可掃描重建"""
+        with self._archive() as archive:
+            archive.record({"content": "a"}, "passed")
+        os.unlink(os.path.join(self.tmpdir, INDEX_FILENAME))
+
+        self.assertEqual(list_segments(self.tmpdir)[0]["records"], None)
+        self.assertEqual(rebuild_index(self.tmpdir), 1)
+        self.assertEqual(list_segments(self.tmpdir)[0]["records"], 1)
+
+    def test_invalid_compression(self):
+        with self.assertRaises(ValueError):
+            PostArchive(self.tmpdir, compression="lz4")
+
+
+class TestPipelineArchive(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.tmpdir, "dedup.db")
+        self.archive_dir = os.path.join(self.tmpdir, "archive")
+        self.filter_config = os.path.join(self.tmpdir, "filters.yml")
+        with open(self.filter_config, "w", encoding="utf-8") as f:
+            f.write("hard_exclude:\n  - 團購\npriority_keep_keywords: []\nmin_content_length: 10\n")
+        self.scoring_config = os.path.join(self.tmpdir, "scoring.yml")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_records_every_input_with_reason(self):
+        """每篇輸入都記錄判斷結果與原因（含排除詞）"""
+        posts = [
+            {"content": LONG_CONTENT, "link": "l1"},
+            {"content": LONG_CONTENT, "link": "l1"},
+            {"content": LONG_CONTENT + "，歡迎團購", "link": "l2"},
+            {"content": "太短", "link": "l3"},
+            {"content": LONG_CONTENT},
+        ]
+        with PostArchive(self.archive_dir, compression="gzip", flush_interval=0.01) as archive:
+            result = process_posts(posts, self.filter_config, self.db_path,
+                                   self.scoring_config, min_valid_posts=1, archive=archive)
+
+        records = list(iter_archive(self.archive_dir))
+        self.assertEqual(len(records), result["total_input"])
+        self.assertEqual(
+            [(r["decision"], r["reason"], r["terms"]) for r in records],
+            [
+                ("passed", "no_match", None),
+                ("duplicate", "seen_link", None),
+                ("filtered", "exclude", ["團購"]),
+                ("filtered", "too_short", None),
+                ("invalid", "missing_fields", None),
+            ],
+        )
+        # 封存的是原始輸入（不含 pipeline 加上的欄位）
+        self.assertNotIn("bonus_applied", records[0]["post"])
+
+    def test_filter_replay_reads_archive(self):
+        """封存可直接作為 filter_replay 的輸入（目錄或 posts 參數）"""
+        posts = [
+            {"content": LONG_CONTENT, "link": "l1"},
+            {"content": LONG_CONTENT + "，歡迎團購", "link": "l2"},
+        ]
+        with PostArchive(self.archive_dir, compression="gzip", flush_interval=0.01) as archive:
+            process_posts(posts, self.filter_config, self.db_path,
+                          self.scoring_config, min_valid_posts=1, archive=archive)
+
+        config = {"hard_exclude": ["團購"], "priority_keep_keywords": [], "min_content_length": 10}
+        from_posts = replay_filters([], config, workers=1,
+                                    posts=iter_archived_posts(self.archive_dir))
+        from_dir = replay_filters([self.archive_dir], config, workers=1)
+        for stats in (from_posts, from_dir):
+            self.assertEqual(stats.total, 2)
+            self.assertEqual(stats.removed_terms, {"團購": 1})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,162 @@
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from authors import (
+    REASON_DENIED, REASON_RATE_LIMITED, AuthorRegistry, author_key, registry_from_config,
+)
+
+
+class TestAuthorKey(unittest.TestCase):
+
+    def test_normalizes_author(self):
+        self.assertEqual(author_key({"author": " @SomeOne "}), "someone")
+
+    def test_falls_back_to_link(self):
+        self.assertEqual(
+            author_key({"author": "", "link": "https://www.threads.net/@Foo.Bar/post/123"}),
+            "foo.bar",
+        )
+
+    def test_unknown(self):
+        self.assertIsNone(author_key({"link": "https://example.com/x"}))
+
+
+class TestAuthorRegistry(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.tmpdir, "authors.db")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_rate_limit_per_run(self):
+        """每次 run 超過上限的貼文被限制，新 run 重新計算"""
+        registry = AuthorRegistry(config={"max_posts_per_run": 2})
+        self.assertEqual([registry.check("a") for _ in range(3)], [None, None, REASON_RATE_LIMITED])
+        self.assertIsNone(registry.check("b"))
+        self.assertIsNone(AuthorRegistry(config={"max_posts_per_run": 2}).check("a"))
+
+    def test_allow_and_deny_lists(self):
+        registry = AuthorRegistry(config={"max_posts_per_run": 1, "allow": ["@VIP"], "deny": ["spam"]})
+        self.assertEqual(registry.check("spam"), REASON_DENIED)
+        self.assertEqual([registry.check("vip") for _ in range(3)], [None, None, None])
+
+    def test_stats_persisted_and_cached(self):
+        """統計寫回 SQLite，重新開啟時載入快取"""
+        with AuthorRegistry(self.db_path) as registry:
+            registry.check("a")
+            registry.record_passed("a", "l1")
+        with AuthorRegistry(self.db_path) as registry:
+            stats = registry.get("a")
+            self.assertEqual((stats.seen, stats.passed), (1, 1))
+            self.assertAlmostEqual(stats.recent, 1.0)
+            self.assertEqual(len(registry), 1)
+
+    def test_concurrent_registries_accumulate(self):
+        """同時開啟的兩個登記表各自寫回增量，不會互相覆蓋"""
+        first = AuthorRegistry(self.db_path, run_id="run-a")
+        second = AuthorRegistry(self.db_path, run_id="run-b")
+        for registry, link in ((first, "l1"), (second, "l2")):
+            registry.check("spam")
+            registry.record_passed("spam", link)
+        first.close()
+        second.close()
+
+        with AuthorRegistry(self.db_path) as registry:
+            stats = registry.get("spam")
+            self.assertEqual((stats.seen, stats.passed), (2, 2))
+            self.assertAlmostEqual(stats.recent, 2.0, places=3)
+
+        first = AuthorRegistry(self.db_path, run_id="run-a")
+        second = AuthorRegistry(self.db_path, run_id="run-b")
+        first.record_outcomes([])
+        second.record_outcomes([])
+        self.assertEqual(second.get("spam").irrelevant, 2)
+        first.close()
+        second.close()
+
+    def test_record_outcomes_settles_pending(self):
+        """出現在分析結果的貼文記為相關/大魚，其餘待定貼文記為無關"""
+        with AuthorRegistry(self.db_path) as registry:
+            for link, author in (("l1", "a"), ("l2", "a"), ("l3", "b")):
+                registry.check(author)
+                registry.record_passed(author, link)
+
+        with AuthorRegistry(self.db_path) as registry:
+            counts = registry.record_outcomes([({"author": "b", "link": "l3"}, True)])
+        self.assertEqual(counts, {"relevant": 0, "big_fish": 1, "irrelevant": 2})
+
+        with AuthorRegistry(self.db_path) as registry:
+            self.assertEqual(registry.get("a").irrelevant, 2)
+            self.assertEqual(registry.get("b").big_fish, 1)
+            # 待定貼文已結算，不會重複計入
+            self.assertEqual(registry.record_outcomes([])["irrelevant"], 0)
+
+    def test_record_outcomes_only_settles_own_run(self):
+        """平行 run 只結算自己的待定貼文，不會把其他 run 的貼文記為無關"""
+        for run_id, link, author in (("run-a", "l1", "a"), ("run-b", "l2", "b")):
+            with AuthorRegistry(self.db_path, run_id=run_id) as registry:
+                registry.record_passed(author, link)
+
+        with AuthorRegistry(self.db_path, run_id="run-a") as registry:
+            counts = registry.record_outcomes([({"author": "a", "link": "l1"}, False)])
+        self.assertEqual(counts, {"relevant": 1, "big_fish": 0, "irrelevant": 0})
+
+        with AuthorRegistry(self.db_path, run_id="run-b") as registry:
+            counts = registry.record_outcomes([])
+            self.assertEqual(counts, {"relevant": 0, "big_fish": 0, "irrelevant": 1})
+            self.assertEqual(registry.get("a").irrelevant, 0)
+
+    def test_record_outcomes_counts_only_pending_posts(self):
+        """未放行或已結算的貼文不計入，重複回報結果不變"""
+        outcomes = [({"author": "a", "link": "l1"}, True), ({"author": "c", "link": "x"}, False)]
+        with AuthorRegistry(self.db_path, run_id="run-a") as registry:
+            registry.record_passed("a", "l1")
+        with AuthorRegistry(self.db_path, run_id="run-a") as registry:
+            self.assertEqual(registry.record_outcomes(outcomes),
+                             {"relevant": 0, "big_fish": 1, "irrelevant": 0})
+            self.assertEqual(registry.record_outcomes(outcomes),
+                             {"relevant": 0, "big_fish": 0, "irrelevant": 0})
+            self.assertEqual(registry.get("a").big_fish, 1)
+            self.assertIsNone(registry.get("c"))
+
+    def test_pending_table_without_run_id_is_migrated(self):
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("CREATE TABLE pending_posts (link TEXT PRIMARY KEY, author TEXT NOT NULL, "
+                     "created_at REAL NOT NULL)")
+        conn.execute("INSERT INTO pending_posts VALUES ('l1', 'a', strftime('%s', 'now'))")
+        conn.commit()
+        conn.close()
+
+        with AuthorRegistry(self.db_path) as registry:
+            counts = registry.record_outcomes([({"author": "a", "link": "l1"}, False)])
+        self.assertEqual(counts["relevant"], 1)
+
+    def test_auto_deny_and_big_fish_exemption(self):
+        """全部無關的作者自動封鎖；出過大魚的作者不受上限限制"""
+        config = {"max_posts_per_run": 1, "auto_deny_after": 2}
+        with AuthorRegistry(self.db_path, config) as registry:
+            for i in range(2):
+                registry.record_passed("spammer", f"s{i}")
+            registry.record_passed("reporter", "r1")
+            registry.record_outcomes([({"author": "reporter", "link": "r1"}, True)])
+
+        with AuthorRegistry(self.db_path, config) as registry:
+            self.assertEqual(registry.check("spammer"), REASON_DENIED)
+            self.assertEqual([registry.check("reporter") for _ in range(3)], [None, None, None])
+
+    def test_registry_from_config(self):
+        self.assertIsNone(registry_from_config({}))
+        registry = registry_from_config({"authors": {"max_posts_per_run": 3}})
+        self.assertEqual(registry.max_posts_per_run, 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
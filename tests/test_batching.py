@@ -0,0 +1,71 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from batching import (
+    POST_OVERHEAD_TOKENS, estimate_post_tokens, estimate_tokens, plan_batches, post_priority,
+)
+
+
+def _post(content, **fields):
+    return {"content": content, **fields}
+
+
+class TestEstimateTokens(unittest.TestCase):
+
+    def test_cjk_one_token_per_char(self):
+        self.assertEqual(estimate_tokens("內湖捷運"), 4)
+
+    def test_ascii_four_chars_per_token(self):
+        self.assertEqual(estimate_tokens("abcdefgh"), 2)
+        self.assertEqual(estimate_tokens("abcde"), 2)
+
+    def test_mixed_and_empty(self):
+        self.assertEqual(estimate_tokens("買 iPhone"), 1 + 2)
+        self.assertEqual(estimate_tokens(None), 0)
+        self.assertEqual(estimate_tokens(""), 0)
+
+    def test_post_overhead(self):
+        self.assertEqual(estimate_post_tokens(_post("內湖")), 2 + POST_OVERHEAD_TOKENS)
+
+
+class TestPlanBatches(unittest.TestCase):
+
+    def test_priority_first_stable(self):
+        """白名單關鍵字最先，其次評分加成，同優先度維持原順序"""
+        posts = [
+            _post("a1"),
+            _post("b1", bonus_applied=["交通"]),
+            _post("c1", priority_keyword=True),
+            _post("a2"),
+            _post("b2", bonus_applied=["交通"]),
+        ]
+        ordered, batches = plan_batches(posts)
+        self.assertEqual([p["content"] for p in ordered], ["c1", "b1", "b2", "a1", "a2"])
+        self.assertEqual(len(batches), 1)
+        self.assertEqual(batches[0].priority_posts, 3)
+        self.assertEqual(post_priority(posts[0]), 0)
+
+    def test_token_limit_splits_batches(self):
+        posts = [_post("字" * 70) for _ in range(5)]  # 每篇 100 tokens
+        ordered, batches = plan_batches(posts, max_tokens=250)
+        self.assertEqual([(b.start, b.end) for b in batches], [(0, 2), (2, 4), (4, 5)])
+        self.assertEqual([b.estimated_tokens for b in batches], [200, 200, 100])
+
+    def test_post_limit_splits_batches(self):
+        _, batches = plan_batches([_post("x")] * 5, max_posts=2)
+        self.assertEqual([b.to_dict()["count"] for b in batches], [2, 2, 1])
+
+    def test_oversized_post_gets_own_batch(self):
+        posts = [_post("字" * 500), _post("字" * 10)]
+        _, batches = plan_batches(posts, max_tokens=100)
+        self.assertEqual([(b.start, b.end) for b in batches], [(0, 1), (1, 2)])
+
+    def test_empty(self):
+        self.assertEqual(plan_batches([]), ([], []))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -7,7 +7,7 @@ import sqlite3
 # 將 src 目錄添加到 Python 路徑中
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
 
-from dedup import DedupManager
+from dedup import DedupManager, content_fingerprint
 
 
 class TestDedup(unittest.TestCase):
@@ -152,6 +152,24 @@ class TestDedup(unittest.TestCase):
 
         self.assertTrue(result, "資料應該持久化到資料庫")
 
+    # ========== Content Fingerprint Tests ==========
+
+    def test_content_fingerprint_ignores_variants(self):
+        """全形/半形、零寬字元、空白與標點不同的內容指紋相同"""
+        base = content_fingerprint("內湖停電了！Line 通知")
+        self.assertEqual(content_fingerprint("內 湖\u200b停電了 ! ＬＩＮＥ 通知"), base)
+        self.assertNotEqual(content_fingerprint("南港停電了！Line 通知"), base)
+        self.assertIsNone(content_fingerprint("！！ 😀"))
+
+    def test_add_and_check_content(self):
+        fingerprint = content_fingerprint("內湖停電了")
+        self.assertFalse(self.dedup.is_content_processed(fingerprint))
+        self.assertTrue(self.dedup.add_content(fingerprint))
+        self.assertFalse(self.dedup.add_content(fingerprint))
+        self.assertTrue(self.dedup.is_content_processed(fingerprint))
+        self.assertFalse(self.dedup.add_content(None))
+        self.assertEqual(self.dedup.get_processed_count(), 0)
+
     # ========== Batch Operations Tests ==========
 
     def test_add_multiple_posts(self):
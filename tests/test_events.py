@@ -0,0 +1,90 @@
+import unittest
+import os
+import sys
+import json
+import tempfile
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from events import emit_event, EventFileReader, EVENTS_FILE_ENV
+
+
+class TestEvents(unittest.TestCase):
+
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix='.jsonl')
+        os.close(fd)
+
+    def tearDown(self):
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+    # ========== emit_event ==========
+
+    def test_emit_without_events_file_is_noop(self):
+        """未設定 MONITOR_EVENTS_FILE 時不寫入"""
+        with patch.dict(os.environ, {}, clear=True):
+            self.assertFalse(emit_event("status", {"message": "hi"}))
+
+    def test_emit_uses_env_path(self):
+        """從環境變數取得事件檔路徑並附加一行 JSON"""
+        with patch.dict(os.environ, {EVENTS_FILE_ENV: self.path}):
+            self.assertTrue(emit_event("keyword_progress", {"keyword": "內湖"}))
+        with open(self.path, 'r', encoding='utf-8') as f:
+            lines = f.read().splitlines()
+        self.assertEqual(len(lines), 1)
+        self.assertEqual(json.loads(lines[0]),
+                         {"type": "keyword_progress", "data": {"keyword": "內湖"}})
+
+    def test_emit_rejects_unknown_type(self):
+        """不明事件類型應拒絕"""
+        self.assertFalse(emit_event("bogus", {}, path=self.path))
+        self.assertEqual(os.path.getsize(self.path), 0)
+
+    # ========== EventFileReader ==========
+
+    def test_reader_is_incremental(self):
+        """每次只回傳新附加的事件"""
+        reader = EventFileReader(self.path)
+        emit_event("status", {"message": "1"}, path=self.path)
+        self.assertEqual([e["data"]["message"] for e in reader.read_new()], ["1"])
+        self.assertEqual(reader.read_new(), [])
+        emit_event("status", {"message": "2"}, path=self.path)
+        emit_event("result", {"analyzed_posts": []}, path=self.path)
+        events = reader.read_new()
+        self.assertEqual([e["type"] for e in events], ["status", "result"])
+
+    def test_reader_keeps_partial_line(self):
+        """未寫完的行保留到下次讀取"""
+        reader = EventFileReader(self.path)
+        line = json.dumps({"type": "status", "data": {"message": "完整"}}, ensure_ascii=False)
+        encoded = (line + "\n").encode("utf-8")
+        with open(self.path, 'ab') as f:
+            f.write(encoded[:10])
+        self.assertEqual(reader.read_new(), [])
+        with open(self.path, 'ab') as f:
+            f.write(encoded[10:])
+        events = reader.read_new()
+        self.assertEqual(len(events), 1)
+        self.assertEqual(events[0]["data"]["message"], "完整")
+
+    def test_reader_skips_malformed_lines(self):
+        """格式錯誤或類型不明的行應略過"""
+        with open(self.path, 'w', encoding='utf-8') as f:
+            f.write("not json\n")
+            f.write('{"type": "bogus", "data": {}}\n')
+            f.write('{"type": "status", "data": "x"}\n')
+            f.write('{"type": "status", "data": {"message": "ok"}}\n')
+        events = EventFileReader(self.path).read_new()
+        self.assertEqual(len(events), 1)
+        self.assertEqual(events[0]["data"]["message"], "ok")
+
+    def test_reader_missing_file(self):
+        """事件檔不存在時回傳空列表"""
+        reader = EventFileReader(self.path + ".missing")
+        self.assertEqual(reader.read_new(), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
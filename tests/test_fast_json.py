@@ -0,0 +1,76 @@
+import io
+import json
+import os
+import sys
+import unittest
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import fast_json
+
+
+SAMPLE = {
+    "keyword": "內湖",
+    "posts": [{"id": 1, "score": 4.5, "tags": ["房價", "交通"], "ok": True, "note": None}],
+}
+
+
+class _FastJSONCases:
+    """orjson 與標準庫兩種實作共用的測試"""
+
+    def test_roundtrip(self):
+        """序列化後可還原為相同物件"""
+        self.assertEqual(fast_json.loads(fast_json.dumps(SAMPLE)), SAMPLE)
+        self.assertEqual(fast_json.loads(fast_json.dumps_bytes(SAMPLE)), SAMPLE)
+
+    def test_non_ascii_not_escaped(self):
+        """中文不被跳脫為 \\uXXXX"""
+        self.assertIn("內湖", fast_json.dumps(SAMPLE))
+        self.assertIn("內湖".encode("utf-8"), fast_json.dumps_bytes(SAMPLE))
+
+    def test_compact_and_indent(self):
+        """預設緊湊輸出，indent=True 時以 2 格縮排且與標準庫一致"""
+        self.assertNotIn("\n", fast_json.dumps(SAMPLE))
+        self.assertNotIn(": ", fast_json.dumps(SAMPLE))
+        self.assertEqual(fast_json.dumps(SAMPLE, indent=True),
+                         json.dumps(SAMPLE, ensure_ascii=False, indent=2))
+
+    def test_load_and_dump_file_objects(self):
+        """load/dump 支援檔案物件"""
+        buffer = io.StringIO()
+        fast_json.dump(SAMPLE, buffer, indent=True)
+        buffer.seek(0)
+        self.assertEqual(fast_json.load(buffer), SAMPLE)
+        self.assertEqual(fast_json.load(io.BytesIO(fast_json.dumps_bytes(SAMPLE))), SAMPLE)
+
+    def test_invalid_input_raises(self):
+        """不合法的 JSON 拋出 JSONDecodeError，None 拋出 TypeError"""
+        with self.assertRaises(fast_json.JSONDecodeError):
+            fast_json.loads("{not json")
+        with self.assertRaises(TypeError):
+            fast_json.loads(None)
+
+
+@unittest.skipUnless(fast_json.has_orjson(), "orjson not installed")
+class TestFastJSONOrjson(_FastJSONCases, unittest.TestCase):
+
+    def test_non_str_keys(self):
+        """int key 與標準庫一樣轉為字串"""
+        self.assertEqual(fast_json.loads(fast_json.dumps({1: "a"})), {"1": "a"})
+
+
+class TestFastJSONFallback(_FastJSONCases, unittest.TestCase):
+
+    def setUp(self):
+        patcher = patch.object(fast_json, "orjson", None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_reports_fallback(self):
+        """未安裝 orjson 時 has_orjson 回傳 False"""
+        self.assertFalse(fast_json.has_orjson())
+
+
+if __name__ == '__main__':
+    unittest.main()
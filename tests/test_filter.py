@@ -1,12 +1,18 @@
 import unittest
 import os
+import random
 import sys
+import tempfile
+import threading
 from unittest.mock import patch, mock_open
 
 # 將 src 目錄添加到 Python 路徑中
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
 
-from filter import should_filter_content, load_filter_config
+from filter import (
+    should_filter_content, load_filter_config, compile_filter_config,
+    evaluate_content, FilterCounters, FilterDecision, FilterHitStats, update_hit_stats,
+)
 
 
 class TestFilter(unittest.TestCase):
@@ -158,5 +164,240 @@ min_exclude_word_length: 2
             load_filter_config('nonexistent.yml')
 
 
+class TestCompiledFilter(unittest.TestCase):
+
+    def setUp(self):
+        self.config = {
+            'hard_exclude': ['預售屋', '建案推薦', '限時特價', '車'],
+            'priority_keep_keywords': ['詐騙', '警方'],
+            'min_content_length': 10,
+            'min_exclude_word_length': 2,
+        }
+        self.compiled = compile_filter_config(self.config)
+
+    def test_same_decisions_as_should_filter_content(self):
+        """編譯後的判斷結果與 should_filter_content 相同"""
+        contents = [
+            None, "", "短",
+            "這是一篇關於預售屋的建案推薦文章內容",
+            "警方查獲預售屋詐騙集團，呼籲民眾注意",
+            "今天去買車，車況很好，整體來說很滿意",
+            "市議會今天討論捷運延伸的預算與進度",
+        ]
+        for content in contents:
+            self.assertEqual(self.compiled.should_filter(content),
+                             should_filter_content(content, self.config), content)
+
+    def test_short_exclude_words_skipped(self):
+        """短於 min_exclude_word_length 的排除詞在編譯時略過"""
+        self.assertEqual(self.compiled.skipped_exclude, ['車'])
+        self.assertNotIn('車', self.compiled.hard_exclude)
+
+    def test_hits(self):
+        """可取得命中的排除詞與白名單詞"""
+        content = "警方查獲預售屋建案推薦詐騙"
+        self.assertEqual(self.compiled.exclude_hits(content), {'預售屋', '建案推薦'})
+        self.assertEqual(self.compiled.priority_hits(content), {'警方', '詐騙'})
+
+    def test_empty_config(self):
+        """空設定只過濾空內容"""
+        compiled = compile_filter_config(None)
+        self.assertTrue(compiled.should_filter(""))
+        self.assertFalse(compiled.should_filter("任何內容"))
+
+    def test_evaluate_same_as_evaluate_content(self):
+        """編譯後的判斷說明與 evaluate_content 相同"""
+        contents = [
+            None, "", "短",
+            "這是一篇關於建案推薦與預售屋的文章內容",
+            "警方查獲預售屋詐騙集團，呼籲民眾注意",
+            "今天去買車，車況很好，整體來說很滿意",
+        ]
+        for content in contents:
+            decision = self.compiled.evaluate(content)
+            self.assertEqual(decision, evaluate_content(content, self.config), content)
+            self.assertEqual(decision.filtered, should_filter_content(content, self.config))
+
+
+class TestFilterDecision(unittest.TestCase):
+
+    def setUp(self):
+        self.config = {
+            'hard_exclude': ['預售屋', '建案推薦', '車'],
+            'priority_keep_keywords': ['詐騙', '警方'],
+            'min_content_length': 10,
+            'min_exclude_word_length': 2,
+        }
+
+    def test_reasons(self):
+        """各種情況的動作與原因代碼"""
+        cases = [
+            (None, 'filter', 'empty', ()),
+            ("短", 'filter', 'too_short', ()),
+            ("這是一篇關於建案推薦與預售屋的文章", 'filter', 'exclude', ('預售屋', '建案推薦')),
+            ("警方查獲預售屋詐騙集團，呼籲民眾注意", 'keep', 'priority_keep', ('詐騙', '警方')),
+            ("今天去買車，車況很好，整體來說很滿意", 'keep', 'no_match', ()),
+        ]
+        for content, action, reason, terms in cases:
+            self.assertEqual(evaluate_content(content, self.config),
+                             FilterDecision(action, reason, terms), content)
+
+    def test_counters(self):
+        """彙總計數累加原因與命中詞"""
+        counters = FilterCounters()
+        for content in ["建案推薦預售屋的相關文章內容", "預售屋限時優惠文章的內容",
+                        "今天去買車，車況很好，很滿意"]:
+            counters.add(evaluate_content(content, self.config))
+        self.assertEqual(counters.reasons, {'exclude': 2, 'no_match': 1})
+        self.assertEqual(counters.terms, {'預售屋': 2, '建案推薦': 1})
+        self.assertIn('exclude=2', counters.summary())
+
+
+class TestNormalizedFilter(unittest.TestCase):
+
+    def setUp(self):
+        self.config = {
+            'hard_exclude': ['限時特價', '加LINE'],
+            'priority_keep_keywords': ['詐騙'],
+            'min_content_length': 10,
+            'normalize_text': True,
+            'fold_script': True,
+        }
+        self.compiled = compile_filter_config(self.config)
+
+    def test_variants_are_caught(self):
+        """空白、零寬字元、全形與簡體變體都會命中排除詞，並回報原始詞"""
+        for content in ["今天 限 時 特 價 只有這一波，快來看看喔",
+                        "今天限\u200b時特價只有這一波，快來看看喔",
+                        "今天限时特价只有这一波，快来看看喔",
+                        "有興趣請加ＬＩＮＥ私訊詢問更多細節"]:
+            decision = self.compiled.evaluate(content)
+            self.assertTrue(decision.filtered, content)
+            self.assertEqual(decision, evaluate_content(content, self.config), content)
+        self.assertEqual(self.compiled.evaluate("今天 限 時 特 價 只有這一波").matched_terms,
+                         ('限時特價',))
+
+    def test_simplified_priority_keyword_keeps(self):
+        """簡體的白名單詞也能保留貼文"""
+        decision = self.compiled.evaluate("限时特价其实是诈骗，大家要小心")
+        self.assertEqual(decision.reason, 'priority_keep')
+        self.assertEqual(decision.matched_terms, ('詐騙',))
+
+    def test_disabled_by_default(self):
+        """未啟用時維持原本的精確比對"""
+        config = dict(self.config, normalize_text=False)
+        self.assertFalse(should_filter_content("今天 限 時 特 價 只有這一波，快來看看", config))
+        self.assertFalse(compile_filter_config(config).should_filter("今天 限 時 特 價 只有這一波，快來看看"))
+
+    def test_length_uses_original_content(self):
+        """長度檢查以原始內容為準（正規化移除的空白仍計入）"""
+        content = "今 天 天 氣 很 好"
+        self.assertEqual(len(content), 11)
+        self.assertEqual(self.compiled.evaluate(content).reason, 'no_match')
+
+
+class TestAdaptiveOrdering(unittest.TestCase):
+
+    def setUp(self):
+        self.config = {
+            'hard_exclude': ['預售屋', '建案推薦', '限時特價', '免運費', '買一送一', '現貨供應'],
+            'priority_keep_keywords': ['詐騙', '警方'],
+            'min_content_length': 6,
+            'min_exclude_word_length': 2,
+            'exclude_rules': [{'name': '預購匯款', 'near': '預購 NEAR/5 匯款'}],
+        }
+
+    def _counters(self, reasons, terms):
+        counters = FilterCounters()
+        counters.reasons.update(reasons)
+        counters.terms.update(terms)
+        return counters
+
+    def test_hot_terms_ranked_by_rate(self):
+        stats = FilterHitStats()
+        stats.add(self._counters({'exclude': 60, 'no_match': 940},
+                                 {'限時特價': 50, '預售屋': 10, '詐騙': 0}))
+        self.assertEqual(stats.evaluated, 1000)
+        self.assertEqual(stats.hot_terms(), ['限時特價', '預售屋'])
+        self.assertEqual(stats.hot_terms(limit=1), ['限時特價'])
+        self.assertEqual(stats.hot_terms(min_rate=0.02), ['限時特價'])
+
+    def test_decay_and_persistence(self):
+        """統計跨 run 累積並衰減，檔案損毀時視為空統計"""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'stats.json')
+            update_hit_stats(path, self._counters({'exclude': 10}, {'預售屋': 10}))
+            stats = update_hit_stats(path, self._counters({'exclude': 10}, {'免運費': 10}),
+                                     decay=0.5)
+            self.assertEqual(stats.terms, {'預售屋': 5.0, '免運費': 10.0})
+            self.assertEqual(FilterHitStats.load(path), stats)
+
+            with open(path, 'w') as f:
+                f.write('{broken')
+            self.assertEqual(FilterHitStats.load(path), FilterHitStats())
+        self.assertEqual(FilterHitStats.load(None), FilterHitStats())
+
+    def test_concurrent_updates_are_not_lost(self):
+        """多個 agent 同時更新統計檔時，每次的計數都會併入"""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'stats.json')
+            threads = [
+                threading.Thread(target=update_hit_stats,
+                                 args=(path, self._counters({'exclude': 1}, {'預售屋': 1})),
+                                 kwargs={'decay': 1.0})
+                for _ in range(20)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            self.assertEqual(FilterHitStats.load(path).terms, {'預售屋': 20.0})
+
+    def test_hot_terms_limited_to_valid_excludes(self):
+        stats = FilterHitStats(evaluated=100, excluded=50,
+                               terms={'免運費': 40, '詐騙': 30, '預購匯款': 20, '車': 10})
+        compiled = compile_filter_config(self.config, stats)
+        self.assertEqual(compiled.hot_terms, ['免運費'])
+
+    def test_identical_decisions_with_any_ordering(self):
+        """無論統計如何，判斷結果都與白名單優先的原始邏輯相同"""
+        pieces = ['預售屋', '建案推薦', '限時特價', '免運費', '詐騙', '警方', '預購', '匯款',
+                  '今天', '天氣', '捷運', '，', '買一', '送一', '現貨']
+        rng = random.Random(47)
+        contents = [None, '', '短'] + [
+            ''.join(rng.choice(pieces) for _ in range(rng.randint(1, 8))) for _ in range(500)
+        ]
+        plain = compile_filter_config(self.config)
+        hot = compile_filter_config(self.config, FilterHitStats(
+            evaluated=10, terms={'現貨供應': 5, '免運費': 4, '預售屋': 3}))
+        for content in contents:
+            expected = should_filter_content(content, self.config)
+            self.assertEqual(plain.should_filter(content), expected, content)
+            self.assertEqual(hot.should_filter(content), expected, content)
+            self.assertEqual(hot.evaluate(content), evaluate_content(content, self.config), content)
+            self.assertEqual(hot.evaluate(content).filtered, expected, content)
+
+    def test_evaluate_stops_at_hot_term(self):
+        """evaluate 命中 hot_terms 即不再檢查其餘排除詞，只有確定過濾時才收集說明用的詞"""
+        compiled = compile_filter_config(self.config, FilterHitStats(
+            evaluated=10, terms={'免運費': 5}))
+        with patch.object(compiled._cold, 'matches_any') as cold, \
+                patch.object(compiled._exclude, 'find_indices',
+                             wraps=compiled._exclude.find_indices) as full:
+            decision = compiled.evaluate('限時特價免運費買一送一')
+            cold.assert_not_called()
+            self.assertEqual(decision.matched_terms, ('限時特價', '免運費', '買一送一'))
+            self.assertEqual(full.call_count, 1)
+
+            compiled.evaluate('警方破獲免運費詐騙')
+            self.assertEqual(full.call_count, 1)
+
+    def test_whitelist_only_matters_when_excluded(self):
+        """沒有命中排除條件時不需比對白名單（原因為 no_match）"""
+        compiled = compile_filter_config(self.config)
+        self.assertEqual(compiled.evaluate('警方今天在捷運站宣導').reason, 'no_match')
+        self.assertEqual(compiled.evaluate('警方破獲預售屋詐騙').reason, 'priority_keep')
+
+
 if __name__ == '__main__':
     unittest.main()
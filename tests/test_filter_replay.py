@@ -0,0 +1,117 @@
+import gzip
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from filter import compile_filter_config
+from filter_replay import (
+    ANALYSIS_OVERHEAD_TOKENS,
+    evaluate_batch,
+    format_stats,
+    iter_archive_posts,
+    replay_filters,
+)
+
+CANDIDATE = {
+    'hard_exclude': ['預售屋', '限時特價'],
+    'priority_keep_keywords': ['詐騙'],
+    'min_content_length': 10,
+    'min_exclude_word_length': 2,
+}
+
+BASELINE = {
+    'hard_exclude': ['預售屋'],
+    'priority_keep_keywords': [],
+    'min_content_length': 10,
+    'min_exclude_word_length': 2,
+}
+
+POSTS = [
+    {"content": "這是預售屋的廣告文章，歡迎洽詢"},        # 排除
+    {"content": "限時特價中，所有商品都打八折喔"},        # 排除（候選新增）
+    {"content": "預售屋詐騙手法曝光，請大家小心"},        # 白名單救回（基準會過濾）
+    {"content": "短"},                                    # 過短
+    {"content": "市議會今天討論捷運延伸的預算"},          # 保留
+    {"id": "no-content"},                                 # 無內容視為過短
+]
+
+
+class TestFilterReplay(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        root = self.tmpdir.name
+        with open(os.path.join(root, "a.ndjson"), "w", encoding="utf-8") as f:
+            for post in POSTS[:3]:
+                f.write(json.dumps(post, ensure_ascii=False) + "\n")
+            f.write("{broken\n")
+        os.makedirs(os.path.join(root, "sub"))
+        with gzip.open(os.path.join(root, "sub", "b.json.gz"), "wt", encoding="utf-8") as f:
+            json.dump({"posts": POSTS[3:]}, f, ensure_ascii=False)
+        with open(os.path.join(root, "notes.txt"), "w") as f:
+            f.write("ignored")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_iter_archive_posts_reads_ndjson_and_gzip_json(self):
+        """遞迴讀取 NDJSON 與 gzip JSON，略過壞行與其他檔案"""
+        posts = list(iter_archive_posts([self.tmpdir.name]))
+        self.assertEqual(len(posts), len(POSTS))
+
+    def test_evaluate_batch_counts(self):
+        """統計排除、救回、過短與各詞命中數"""
+        stats = evaluate_batch([p.get("content") for p in POSTS],
+                               compile_filter_config(CANDIDATE),
+                               compile_filter_config(BASELINE))
+        self.assertEqual((stats.total, stats.too_short, stats.removed, stats.rescued, stats.passed),
+                         (6, 2, 2, 1, 2))
+        self.assertEqual(stats.removed_terms, {'預售屋': 1, '限時特價': 1})
+        self.assertEqual(stats.rescued_terms, {'詐騙': 1})
+        self.assertEqual((stats.newly_filtered, stats.newly_passed), (1, 1))
+
+    def test_exclude_rules_counted_by_name(self):
+        """exclude_rules 依規則名稱統計，未命中的規則也列出"""
+        config = dict(BASELINE, exclude_rules=[
+            {'name': '打折', 'regex': '打[一二三四五六七八九]折'},
+            {'name': '徵才', 'all': ['徵才', '履歷']},
+        ])
+        stats = evaluate_batch([p.get("content") for p in POSTS], compile_filter_config(config))
+        self.assertEqual(stats.removed_terms, {'預售屋': 2, '打折': 1})
+        self.assertEqual(stats.to_dict(config)['removed_terms']['徵才'], 0)
+
+    def test_replay_sequential_and_parallel_match(self):
+        """單一 process 與多 process 結果相同"""
+        sequential = replay_filters([self.tmpdir.name], CANDIDATE, BASELINE, workers=1)
+        parallel = replay_filters([self.tmpdir.name], CANDIDATE, BASELINE, workers=2, batch_size=2)
+        self.assertEqual(sequential.to_dict(CANDIDATE), parallel.to_dict(CANDIDATE))
+
+    def test_preclassify_counted_when_enabled(self):
+        """候選設定啟用預分類時統計垃圾篇數，白名單救回的貼文不判斷"""
+        posts = POSTS + [{"content": "哈" * 40},
+                         {"content": "內湖 traffic so bad today, stuck on Chenggong Rd for 40 minutes"}]
+        config = dict(CANDIDATE, preclassify={"enabled": True})
+        stats = replay_filters([], config, CANDIDATE, posts=posts, workers=1, keywords=["內湖"])
+        self.assertEqual((stats.junk, stats.junk_reasons), (1, {"repetitive": 1}))
+        self.assertEqual((stats.rescued, stats.passed), (1, 3))
+        self.assertEqual((stats.newly_filtered, stats.newly_passed), (1, 0))
+        self.assertIn("repetitive: 1", format_stats(stats, config))
+        self.assertEqual(replay_filters([], CANDIDATE, posts=posts, workers=1).junk, 0)
+
+    def test_cost_estimate_and_report(self):
+        """估計省下的 token 含每篇開銷，報告列出未命中的詞"""
+        stats = replay_filters([], CANDIDATE, posts=POSTS, workers=1)
+        expected_chars = sum(len(p.get("content") or "") for p in
+                             (POSTS[0], POSTS[1], POSTS[3], POSTS[5]))
+        self.assertEqual(stats.estimated_tokens_saved(),
+                         expected_chars + 4 * ANALYSIS_OVERHEAD_TOKENS)
+        config = dict(CANDIDATE, hard_exclude=CANDIDATE['hard_exclude'] + ['徵才啟事'])
+        self.assertIn("未命中：徵才啟事", format_stats(stats, config))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,124 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from filter import compile_filter_config, evaluate_content
+from filter_rules import compile_rule, compile_rules
+from normalize import normalizer_from_config
+
+
+class TestRuleEngine(unittest.TestCase):
+
+    def setUp(self):
+        self.engine = compile_rules([
+            {"name": "加LINE", "regex": r"加\s*(line|賴)\s*(好友|私訊)", "ignore_case": True},
+            {"name": "預購匯款", "near": "預購 NEAR/5 匯款"},
+            {"name": "代購非新聞", "all": ["代購", "私訊"], "none": ["新聞"]},
+            {"name": "優惠任一", "any": ["跳樓價", "清倉價"]},
+        ])
+
+    def test_regex(self):
+        self.assertEqual(self.engine.match("歡迎加 LINE 好友詢問"), ("加LINE",))
+        self.assertEqual(self.engine.match("加賴私訊"), ("加LINE",))
+        self.assertEqual(self.engine.match("LINE 很好用"), ())
+
+    def test_near_within_distance_either_order(self):
+        """NEAR/n：兩詞間隔不超過 n 字，不分先後"""
+        self.assertEqual(self.engine.match("開放預購，請先匯款"), ("預購匯款",))
+        self.assertEqual(self.engine.match("匯款後即完成預購"), ("預購匯款",))
+        self.assertEqual(self.engine.match("開放預購，名額有限，售完為止，請先匯款"), ())
+
+    def test_near_uses_any_occurrence_pair(self):
+        text = "預購" + "。" * 20 + "匯款與預購"
+        self.assertEqual(self.engine.match(text), ("預購匯款",))
+
+    def test_all_and_none(self):
+        self.assertEqual(self.engine.match("日本代購請私訊"), ("代購非新聞",))
+        self.assertEqual(self.engine.match("代購詐騙新聞，受害者私訊記者"), ())
+        self.assertEqual(self.engine.match("日本代購"), ())
+
+    def test_any(self):
+        self.assertEqual(self.engine.match("全面清倉價"), ("優惠任一",))
+
+    def test_multiple_rules_in_config_order(self):
+        self.assertEqual(self.engine.match("清倉價！代購請私訊，加line好友"),
+                         ("加LINE", "代購非新聞", "優惠任一"))
+        self.assertTrue(self.engine.matches_any("清倉價"))
+        self.assertFalse(self.engine.matches_any("今天天氣很好"))
+
+    def test_uncombinable_regex_still_matches(self):
+        """含反向參照等無法合併的 regex 仍逐條比對"""
+        engine = compile_rules([
+            {"name": "重複字", "regex": r"(.)\1\1"},
+            {"name": "網址", "regex": r"https?://"},
+        ])
+        self.assertEqual(engine.match("哈哈哈"), ("重複字",))
+        self.assertEqual(engine.match("http://x"), ("網址",))
+        self.assertEqual(engine.match("一般內容"), ())
+
+    def test_normalized_terms(self):
+        normalize = normalizer_from_config({"normalize_text": True, "fold_script": True})
+        engine = compile_rules([{"name": "n", "near": "預 購 NEAR/3 匯款"}], normalize)
+        self.assertEqual(engine.match(normalize("预购请匯款")), ("n",))
+
+    def test_invalid_rules(self):
+        for spec in [
+            {"name": "bad", "regex": "("},
+            {"name": "bad", "near": "預購 NEAR 匯款"},
+            {"name": "bad", "none": ["新聞"]},
+            {"name": "bad", "all": [""]},
+            {"name": "bad", "regexp": "x"},
+            "預購",
+        ]:
+            with self.assertRaises(ValueError, msg=spec):
+                compile_rule(spec)
+        with self.assertRaises(ValueError):
+            compile_rules({"name": "x"})
+
+    def test_empty(self):
+        engine = compile_rules(None)
+        self.assertEqual(len(engine), 0)
+        self.assertEqual(engine.match("任何內容"), ())
+
+
+class TestFilterWithRules(unittest.TestCase):
+
+    def setUp(self):
+        self.config = {
+            'hard_exclude': ['限時特價'],
+            'priority_keep_keywords': ['詐騙'],
+            'min_content_length': 5,
+            'exclude_rules': [
+                {'name': '預購匯款', 'near': '預購 NEAR/10 匯款'},
+            ],
+        }
+        self.compiled = compile_filter_config(self.config)
+
+    def test_rule_decision(self):
+        """組合規則命中時原因為 exclude_rule，matched_terms 為規則名稱"""
+        content = "限量商品開放預購，請於三日內匯款"
+        decision = self.compiled.evaluate(content)
+        self.assertEqual((decision.action, decision.reason, decision.matched_terms),
+                         ('filter', 'exclude_rule', ('預購匯款',)))
+        self.assertEqual(decision, evaluate_content(content, self.config))
+        self.assertTrue(self.compiled.should_filter(content))
+
+    def test_priority_keyword_overrides_rule(self):
+        content = "假預購真詐騙，千萬不要匯款"
+        self.assertEqual(self.compiled.evaluate(content).reason, 'priority_keep')
+        self.assertFalse(self.compiled.should_filter(content))
+
+    def test_hard_exclude_reported_first(self):
+        content = "限時特價開放預購，請匯款"
+        self.assertEqual(self.compiled.evaluate(content).matched_terms, ('限時特價',))
+        self.assertEqual(self.compiled.rule_hits(content), ('預購匯款',))
+
+    def test_invalid_rule_fails_at_compile(self):
+        with self.assertRaises(ValueError):
+            compile_filter_config({'exclude_rules': [{'name': 'x', 'regex': '['}]})
+
+
+if __name__ == '__main__':
+    unittest.main()
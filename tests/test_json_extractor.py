@@ -0,0 +1,104 @@
+import json
+import os
+import sys
+import unittest
+
+_PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, _PROJECT_ROOT)
+sys.path.insert(0, os.path.join(_PROJECT_ROOT, 'src'))
+
+from web.backend.services.json_extractor import StreamingJsonExtractor
+
+RESULT = {
+    "timestamp": "2026-01-01T00:00:00",
+    "keywords": ["內湖"],
+    "analyzed_posts": [
+        {"id": "p1", "content": "內湖 {大括號} 與 \"引號\" 和 \\ 反斜線",
+         "link": "l1", "analysis": {"categories": ["交通"], "importance": 9, "summary": "}{"}},
+        {"id": "p2", "content": "", "link": "l2", "analysis": {}},
+    ],
+    "stats": {"valid_count": 2, "ratio": -1.5e3, "partial": False, "note": None},
+}
+
+
+def _extract(text, **kwargs):
+    extractor = StreamingJsonExtractor(**kwargs)
+    for line in text.split("\n"):
+        extractor.feed(line)
+    extractor.close()
+    return extractor.result
+
+
+class TestStreamingJsonExtractor(unittest.TestCase):
+
+    def test_compact_pretty_and_indent_zero(self):
+        for indent in (None, 2, 0):
+            with self.subTest(indent=indent):
+                text = json.dumps(RESULT, ensure_ascii=False, indent=indent)
+                self.assertEqual(_extract(text), RESULT)
+
+    def test_surrounding_chatter_and_prefix(self):
+        text = "\n".join([
+            "正在生成戰報...",
+            "Result: " + json.dumps(RESULT, ensure_ascii=False) + " 完成",
+            "結束",
+        ])
+        self.assertEqual(_extract(text), RESULT)
+
+    def test_braces_inside_strings(self):
+        result = {**RESULT, "keywords": ["{", "}", "\"{\""]}
+        self.assertEqual(_extract(json.dumps(result, indent=2)), result)
+
+    def test_stray_brace_in_chatter_does_not_swallow_result(self):
+        for chatter in ("處理中 { 請稍候", "{", "{ 還沒好"):
+            with self.subTest(chatter=chatter):
+                text = chatter + "\n" + json.dumps(RESULT, ensure_ascii=False, indent=2) + "\n完成"
+                self.assertEqual(_extract(text), RESULT)
+
+    def test_stray_brace_at_end_of_stream(self):
+        """未閉合的大括號直到輸出結束，仍可取回其中完整的結果"""
+        text = "{\n" + json.dumps(RESULT, ensure_ascii=False, indent=0)
+        self.assertEqual(_extract(text), RESULT)
+
+    def test_multiple_candidates_keeps_last_result(self):
+        first = {**RESULT, "keywords": ["first"]}
+        second = {**RESULT, "keywords": ["second"]}
+        text = "\n".join([
+            json.dumps(first),
+            json.dumps({"status": "ok"}),
+            json.dumps(second, indent=2),
+            json.dumps({"other": [1, 2]}),
+        ])
+        self.assertEqual(_extract(text), second)
+
+    def test_two_objects_on_one_line(self):
+        text = json.dumps({"a": 1}) + " " + json.dumps(RESULT)
+        self.assertEqual(_extract(text), RESULT)
+
+    def test_objects_without_marker_are_ignored(self):
+        self.assertIsNone(_extract(json.dumps({"stats": {}}, indent=2)))
+
+    def test_invalid_json_with_marker_is_ignored(self):
+        self.assertIsNone(_extract('{"analyzed_posts": [1, 2}'))
+        self.assertIsNone(_extract('{"analyzed_posts": "未結束\n"}'))
+
+    def test_spill_threshold(self):
+        """超過門檻時改寫入暫存檔，結果不變"""
+        big = {**RESULT, "analyzed_posts": RESULT["analyzed_posts"] * 50}
+        extractor = StreamingJsonExtractor(spill_threshold=256)
+        rolled = False
+        for line in json.dumps(big, ensure_ascii=False, indent=2).split("\n"):
+            extractor.feed(line)
+            if extractor._buffer is not None and extractor._buffer._rolled:
+                rolled = True
+        extractor.close()
+        self.assertTrue(rolled)
+        self.assertEqual(extractor.result, big)
+
+    def test_spilled_stray_brace_recovers_nested_result(self):
+        text = "{\n" + json.dumps(RESULT, ensure_ascii=False, indent=2) + "\n處理完成"
+        self.assertEqual(_extract(text, spill_threshold=64), RESULT)
+
+
+if __name__ == '__main__':
+    unittest.main()
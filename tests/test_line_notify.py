@@ -1,6 +1,7 @@
 import unittest
 import os
 import sys
+import tempfile
 from unittest.mock import patch, Mock
 import requests
 
@@ -9,25 +10,52 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..',
 
 from line_notify import (
     send_line_message, send_line_broadcast, send_notification_message,
-    MAX_MESSAGE_LENGTH, LINE_BROADCAST_API_URL
+    send_line_multicast, split_message_bubbles, close_dispatchers,
+    MAX_MESSAGE_LENGTH, LINE_BROADCAST_API_URL, LINE_MULTICAST_API_URL,
+    MAX_MULTICAST_RECIPIENTS, MAX_MESSAGES_PER_REQUEST,
 )
+from notify_dispatcher import NotificationDispatcher
 
+# 發送經由 NotificationDispatcher 的連線池
+SESSION_POST = 'notify_dispatcher.requests.Session.post'
 
-class TestLineMessaging(unittest.TestCase):
+
+def _response(status_code):
+    return Mock(status_code=status_code, headers={}, text="")
+
+
+class _OutboxTestCase(unittest.TestCase):
+    """outbox 寫入暫存目錄，重試不等待；每個測試結束時關閉共用派送器。"""
 
     def setUp(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.addCleanup(close_dispatchers)
+        self.outbox_db = os.path.join(tmpdir.name, "outbox.db")
+        for patcher in (patch.dict(os.environ, {"NOTIFY_OUTBOX_DB": self.outbox_db}),
+                        patch.object(NotificationDispatcher, '_backoff', return_value=0)):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def pending_count(self):
+        with NotificationDispatcher("mock_token", db_path=self.outbox_db) as dispatcher:
+            return dispatcher.pending_count()
+
+
+class TestLineMessaging(_OutboxTestCase):
+
+    def setUp(self):
+        super().setUp()
         self.mock_token = "mock_channel_access_token"
         self.mock_user_id = "U1234567890abcdef1234567890abcdef"
         self.mock_message = "Test message from Claude Code."
 
     # ========== Success Cases ==========
 
-    @patch('line_notify.requests.post')
+    @patch(SESSION_POST, autospec=True)
     def test_send_success(self, mock_post):
         """測試成功發送 LINE 訊息"""
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_response.raise_for_status.return_value = None
+        mock_response = _response(200)
         mock_post.return_value = mock_response
 
         success = send_line_message(self.mock_token, self.mock_user_id, self.mock_message)
@@ -38,7 +66,6 @@ class TestLineMessaging(unittest.TestCase):
         # 檢查呼叫參數
         call_kwargs = mock_post.call_args.kwargs
         self.assertEqual(call_kwargs['timeout'], 10)
-        self.assertEqual(call_kwargs['verify'], True)
 
         # 檢查 JSON payload 格式
         json_payload = call_kwargs['json']
@@ -49,57 +76,62 @@ class TestLineMessaging(unittest.TestCase):
 
     # ========== Input Validation Tests ==========
 
-    @patch('line_notify.requests.post')
+    @patch(SESSION_POST, autospec=True)
     def test_empty_token(self, mock_post):
         """測試空 token"""
         success = send_line_message("", self.mock_user_id, self.mock_message)
         self.assertFalse(success, "空 token 應該失敗")
         mock_post.assert_not_called()
 
-    @patch('line_notify.requests.post')
+    @patch(SESSION_POST, autospec=True)
     def test_none_token(self, mock_post):
         """測試 None token"""
         success = send_line_message(None, self.mock_user_id, self.mock_message)
         self.assertFalse(success, "None token 應該失敗")
         mock_post.assert_not_called()
 
-    @patch('line_notify.requests.post')
+    @patch(SESSION_POST, autospec=True)
     def test_empty_user_id(self, mock_post):
         """測試空 user_id"""
         success = send_line_message(self.mock_token, "", self.mock_message)
         self.assertFalse(success, "空 user_id 應該失敗")
         mock_post.assert_not_called()
 
-    @patch('line_notify.requests.post')
+    @patch(SESSION_POST, autospec=True)
     def test_none_user_id(self, mock_post):
         """測試 None user_id"""
         success = send_line_message(self.mock_token, None, self.mock_message)
         self.assertFalse(success, "None user_id 應該失敗")
         mock_post.assert_not_called()
 
-    @patch('line_notify.requests.post')
+    @patch(SESSION_POST, autospec=True)
     def test_empty_message(self, mock_post):
         """測試空訊息"""
         success = send_line_message(self.mock_token, self.mock_user_id, "")
         self.assertFalse(success, "空訊息應該失敗")
         mock_post.assert_not_called()
 
-    @patch('line_notify.requests.post')
+    @patch(SESSION_POST, autospec=True)
     def test_none_message(self, mock_post):
         """測試 None 訊息"""
         success = send_line_message(self.mock_token, self.mock_user_id, None)
         self.assertFalse(success, "None 訊息應該失敗")
         mock_post.assert_not_called()
 
-    @patch('line_notify.requests.post')
-    def test_message_too_long(self, mock_post):
-        """測試超長訊息（超過 5000 字元）"""
+    @patch(SESSION_POST, autospec=True)
+    def test_message_too_long_split(self, mock_post):
+        """超長訊息（超過 5000 字元）拆成多個泡泡發送"""
+        mock_post.return_value = _response(200)
         long_message = "x" * (MAX_MESSAGE_LENGTH + 1)
+
         success = send_line_message(self.mock_token, self.mock_user_id, long_message)
-        self.assertFalse(success, "超長訊息應該失敗")
-        mock_post.assert_not_called()
 
-    @patch('line_notify.requests.post')
+        self.assertTrue(success)
+        mock_post.assert_called_once()
+        bubbles = [m['text'] for m in mock_post.call_args.kwargs['json']['messages']]
+        self.assertEqual(bubbles, ["x" * MAX_MESSAGE_LENGTH, "x"])
+
+    @patch(SESSION_POST, autospec=True)
     def test_token_with_newline(self, mock_post):
         """測試包含換行符的 token（header injection 風險）"""
         malicious_token = "token\r\nX-Evil: header"
@@ -107,7 +139,7 @@ class TestLineMessaging(unittest.TestCase):
         self.assertFalse(success, "包含換行符的 token 應該失敗")
         mock_post.assert_not_called()
 
-    @patch('line_notify.requests.post')
+    @patch(SESSION_POST, autospec=True)
     def test_token_with_tab(self, mock_post):
         """測試包含 tab 的 token"""
         malicious_token = "token\tspace"
@@ -115,7 +147,7 @@ class TestLineMessaging(unittest.TestCase):
         self.assertFalse(success, "包含 tab 的 token 應該失敗")
         mock_post.assert_not_called()
 
-    @patch('line_notify.requests.post')
+    @patch(SESSION_POST, autospec=True)
     def test_invalid_user_id_format(self, mock_post):
         """測試無效的 user_id 格式（包含空白）"""
         invalid_user_id = "U123 456"
@@ -125,17 +157,16 @@ class TestLineMessaging(unittest.TestCase):
 
     # ========== Exception Tests ==========
 
-    @patch('line_notify.requests.post')
+    @patch(SESSION_POST, autospec=True)
     def test_http_error(self, mock_post):
-        """測試 HTTP 錯誤（raise_for_status 拋出異常）"""
-        mock_response = Mock()
-        mock_response.raise_for_status.side_effect = requests.exceptions.HTTPError("401 Unauthorized")
+        """測試 HTTP 錯誤（不重試的 4xx）"""
+        mock_response = _response(401)
         mock_post.return_value = mock_response
 
         success = send_line_message(self.mock_token, self.mock_user_id, self.mock_message)
         self.assertFalse(success, "HTTP 錯誤應該失敗")
 
-    @patch('line_notify.requests.post')
+    @patch(SESSION_POST, autospec=True)
     def test_connection_error(self, mock_post):
         """測試網路連接錯誤"""
         mock_post.side_effect = requests.exceptions.ConnectionError("Connection refused")
@@ -143,7 +174,7 @@ class TestLineMessaging(unittest.TestCase):
         success = send_line_message(self.mock_token, self.mock_user_id, self.mock_message)
         self.assertFalse(success, "連接錯誤應該失敗")
 
-    @patch('line_notify.requests.post')
+    @patch(SESSION_POST, autospec=True)
     def test_timeout_error(self, mock_post):
         """測試 timeout 錯誤"""
         mock_post.side_effect = requests.exceptions.Timeout("Connection timed out")
@@ -151,7 +182,7 @@ class TestLineMessaging(unittest.TestCase):
         success = send_line_message(self.mock_token, self.mock_user_id, self.mock_message)
         self.assertFalse(success, "Timeout 應該失敗")
 
-    @patch('line_notify.requests.post')
+    @patch(SESSION_POST, autospec=True)
     def test_generic_request_exception(self, mock_post):
         """測試一般 requests 異常"""
         mock_post.side_effect = requests.exceptions.RequestException("Unknown error")
@@ -159,14 +190,38 @@ class TestLineMessaging(unittest.TestCase):
         success = send_line_message(self.mock_token, self.mock_user_id, self.mock_message)
         self.assertFalse(success, "一般 request 異常應該失敗")
 
+    @patch(SESSION_POST, autospec=True)
+    def test_failed_send_kept_for_flush(self, mock_post):
+        """暫時性錯誤重試用盡後訊息留在 outbox，flush 可補送"""
+        mock_post.side_effect = requests.exceptions.Timeout("Connection timed out")
+
+        success = send_line_message(self.mock_token, self.mock_user_id, self.mock_message)
+        self.assertFalse(success)
+        self.assertEqual(self.pending_count(), 1)
+
+        mock_post.side_effect = None
+        mock_post.return_value = _response(200)
+        with NotificationDispatcher(self.mock_token, db_path=self.outbox_db) as dispatcher:
+            self.assertEqual(dispatcher.flush(), (1, 0))
+        self.assertEqual(mock_post.call_args.kwargs['json']['messages'][0]['text'],
+                         self.mock_message)
+        self.assertEqual(self.pending_count(), 0)
+
+    @patch(SESSION_POST, autospec=True)
+    def test_rejected_send_not_kept(self, mock_post):
+        """不可重試的錯誤不留待補送"""
+        mock_post.return_value = _response(400)
+
+        self.assertFalse(send_line_message(self.mock_token, self.mock_user_id, self.mock_message))
+        mock_post.assert_called_once()
+        self.assertEqual(self.pending_count(), 0)
+
     # ========== Notification Message Tests ==========
 
-    @patch('line_notify.requests.post')
+    @patch(SESSION_POST, autospec=True)
     def test_send_notification_with_list_keywords(self, mock_post):
         """測試發送格式化通知（使用關鍵字列表）"""
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_response.raise_for_status.return_value = None
+        mock_response = _response(200)
         mock_post.return_value = mock_response
 
         keywords = ["政治", "選舉", "投票"]
@@ -195,12 +250,10 @@ class TestLineMessaging(unittest.TestCase):
         self.assertIn("完整報告:", message_text)
         self.assertIn(report_url, message_text)
 
-    @patch('line_notify.requests.post')
+    @patch(SESSION_POST, autospec=True)
     def test_send_notification_with_string_keyword(self, mock_post):
         """測試發送格式化通知（使用單一關鍵字字串）"""
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_response.raise_for_status.return_value = None
+        mock_response = _response(200)
         mock_post.return_value = mock_response
 
         keyword = "緊急通知"
@@ -225,7 +278,7 @@ class TestLineMessaging(unittest.TestCase):
         self.assertIn(summary, message_text)
         self.assertIn(report_url, message_text)
 
-    @patch('line_notify.requests.post')
+    @patch(SESSION_POST, autospec=True)
     def test_send_notification_empty_keywords(self, mock_post):
         """測試空關鍵字應該失敗"""
         summary = "這是摘要"
@@ -242,7 +295,7 @@ class TestLineMessaging(unittest.TestCase):
         self.assertFalse(success, "空關鍵字應該失敗")
         mock_post.assert_not_called()
 
-    @patch('line_notify.requests.post')
+    @patch(SESSION_POST, autospec=True)
     def test_send_notification_empty_summary(self, mock_post):
         """測試空摘要應該失敗"""
         keywords = ["測試"]
@@ -259,7 +312,7 @@ class TestLineMessaging(unittest.TestCase):
         self.assertFalse(success, "空摘要應該失敗")
         mock_post.assert_not_called()
 
-    @patch('line_notify.requests.post')
+    @patch(SESSION_POST, autospec=True)
     def test_send_notification_empty_url(self, mock_post):
         """測試空 URL 應該失敗"""
         keywords = ["測試"]
@@ -277,20 +330,19 @@ class TestLineMessaging(unittest.TestCase):
         mock_post.assert_not_called()
 
 
-class TestLineBroadcast(unittest.TestCase):
+class TestLineBroadcast(_OutboxTestCase):
 
     def setUp(self):
+        super().setUp()
         self.mock_token = "mock_channel_access_token"
         self.mock_message = "Broadcast test message."
 
     # ========== Success Cases ==========
 
-    @patch('line_notify.requests.post')
+    @patch(SESSION_POST, autospec=True)
     def test_broadcast_success(self, mock_post):
         """測試成功廣播 LINE 訊息"""
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_response.raise_for_status.return_value = None
+        mock_response = _response(200)
         mock_post.return_value = mock_response
 
         success = send_line_broadcast(self.mock_token, self.mock_message)
@@ -300,7 +352,7 @@ class TestLineBroadcast(unittest.TestCase):
 
         # 檢查 API endpoint 是 broadcast
         call_args = mock_post.call_args
-        self.assertEqual(call_args.args[0], LINE_BROADCAST_API_URL)
+        self.assertEqual(call_args.args[1], LINE_BROADCAST_API_URL)
 
         # 檢查 payload 不含 'to' 欄位
         json_payload = call_args.kwargs['json']
@@ -311,70 +363,123 @@ class TestLineBroadcast(unittest.TestCase):
         self.assertEqual(json_payload['messages'][0]['type'], 'text')
         self.assertEqual(json_payload['messages'][0]['text'], self.mock_message)
 
-    @patch('line_notify.requests.post')
+    @patch(SESSION_POST, autospec=True)
+    def test_broadcast_message_list_packed(self, mock_post):
+        """多則訊息每 5 則打包成一次請求"""
+        mock_response = _response(200)
+        mock_post.return_value = mock_response
+
+        messages = [f"第 {i} 則" for i in range(7)]
+        success = send_line_broadcast(self.mock_token, messages, ordered=True)
+
+        self.assertTrue(success)
+        self.assertEqual(mock_post.call_count, 2)
+        sent = [m['text'] for c in mock_post.call_args_list for m in c.kwargs['json']['messages']]
+        self.assertEqual(sent, messages)
+
+    @patch(SESSION_POST, autospec=True)
+    def test_broadcast_pages_stop_after_failure(self, mock_post):
+        """分頁依序發送：前一批未送達時後續不發送，全部留在 outbox"""
+        mock_post.return_value = _response(503)
+
+        messages = [f"第 {i} 則" for i in range(7)]
+        self.assertFalse(send_line_broadcast(self.mock_token, messages, ordered=True))
+        sent = {m['text'] for c in mock_post.call_args_list for m in c.kwargs['json']['messages']}
+        self.assertEqual(sent, set(messages[:MAX_MESSAGES_PER_REQUEST]))
+        self.assertEqual(self.pending_count(), 2)
+
+    @patch(SESSION_POST, autospec=True)
+    def test_broadcast_unordered_sends_every_request(self, mock_post):
+        """未要求依序時每個請求都會發送，失敗的各自留在 outbox"""
+        mock_post.return_value = _response(503)
+
+        messages = [f"第 {i} 則" for i in range(7)]
+        self.assertFalse(send_line_broadcast(self.mock_token, messages))
+        sent = {m['text'] for c in mock_post.call_args_list for m in c.kwargs['json']['messages']}
+        self.assertEqual(sent, set(messages))
+        self.assertEqual(self.pending_count(), 2)
+
+    @patch(SESSION_POST, autospec=True)
+    def test_dispatcher_reused_across_calls(self, mock_post):
+        """同一 token 與 outbox 的多次發送共用同一個連線池"""
+        mock_post.return_value = _response(200)
+
+        self.assertTrue(send_line_broadcast(self.mock_token, self.mock_message))
+        self.assertTrue(send_line_broadcast(self.mock_token, self.mock_message))
+        sessions = [c.args[0] for c in mock_post.call_args_list]
+        self.assertIs(sessions[0], sessions[1])
+
+    @patch(SESSION_POST, autospec=True)
     def test_broadcast_headers(self, mock_post):
         """測試 broadcast 使用正確的 headers"""
-        mock_response = Mock()
-        mock_response.raise_for_status.return_value = None
+        mock_response = _response(200)
         mock_post.return_value = mock_response
 
         send_line_broadcast(self.mock_token, self.mock_message)
 
-        call_kwargs = mock_post.call_args.kwargs
-        self.assertEqual(call_kwargs['headers']['Authorization'], f'Bearer {self.mock_token}')
-        self.assertEqual(call_kwargs['headers']['Content-Type'], 'application/json')
+        session = mock_post.call_args.args[0]
+        self.assertEqual(session.headers['Authorization'], f'Bearer {self.mock_token}')
+        self.assertEqual(session.headers['Content-Type'], 'application/json')
 
     # ========== Input Validation Tests ==========
 
-    @patch('line_notify.requests.post')
+    @patch(SESSION_POST, autospec=True)
     def test_broadcast_empty_token(self, mock_post):
         """測試空 token 廣播應該失敗"""
         success = send_line_broadcast("", self.mock_message)
         self.assertFalse(success)
         mock_post.assert_not_called()
 
-    @patch('line_notify.requests.post')
+    @patch(SESSION_POST, autospec=True)
     def test_broadcast_none_token(self, mock_post):
         """測試 None token 廣播應該失敗"""
         success = send_line_broadcast(None, self.mock_message)
         self.assertFalse(success)
         mock_post.assert_not_called()
 
-    @patch('line_notify.requests.post')
+    @patch(SESSION_POST, autospec=True)
     def test_broadcast_token_with_newline(self, mock_post):
         """測試包含換行符的 token（header injection 風險）"""
         success = send_line_broadcast("token\r\nX-Evil: header", self.mock_message)
         self.assertFalse(success)
         mock_post.assert_not_called()
 
-    @patch('line_notify.requests.post')
+    @patch(SESSION_POST, autospec=True)
     def test_broadcast_empty_message(self, mock_post):
         """測試空訊息廣播應該失敗"""
         success = send_line_broadcast(self.mock_token, "")
         self.assertFalse(success)
         mock_post.assert_not_called()
 
-    @patch('line_notify.requests.post')
-    def test_broadcast_message_too_long(self, mock_post):
-        """測試超長訊息廣播應該失敗"""
-        long_message = "x" * (MAX_MESSAGE_LENGTH + 1)
-        success = send_line_broadcast(self.mock_token, long_message)
-        self.assertFalse(success)
-        mock_post.assert_not_called()
+    @patch(SESSION_POST, autospec=True)
+    def test_broadcast_long_messages_split_in_order(self, mock_post):
+        """多則超長訊息拆成泡泡後依序每 5 個一次請求"""
+        mock_post.return_value = _response(200)
+        line = "y" * 999
+        pages = ["\n".join([f"{i}" + line] * 8) for i in range(3)]
+
+        success = send_line_broadcast(self.mock_token, pages, ordered=True)
+
+        self.assertTrue(success)
+        calls = mock_post.call_args_list
+        self.assertTrue(all(len(c.kwargs['json']['messages']) <= MAX_MESSAGES_PER_REQUEST
+                            for c in calls))
+        bubbles = [m['text'] for c in calls for m in c.kwargs['json']['messages']]
+        self.assertTrue(all(len(b) <= MAX_MESSAGE_LENGTH for b in bubbles))
+        self.assertEqual("\n".join(bubbles), "\n".join(pages))
 
     # ========== Exception Tests ==========
 
-    @patch('line_notify.requests.post')
+    @patch(SESSION_POST, autospec=True)
     def test_broadcast_http_error(self, mock_post):
         """測試 broadcast HTTP 錯誤"""
-        mock_response = Mock()
-        mock_response.raise_for_status.side_effect = requests.exceptions.HTTPError("403 Forbidden")
+        mock_response = _response(403)
         mock_post.return_value = mock_response
 
         success = send_line_broadcast(self.mock_token, self.mock_message)
         self.assertFalse(success)
 
-    @patch('line_notify.requests.post')
+    @patch(SESSION_POST, autospec=True)
     def test_broadcast_timeout(self, mock_post):
         """測試 broadcast timeout"""
         mock_post.side_effect = requests.exceptions.Timeout("Timed out")
@@ -382,7 +487,7 @@ class TestLineBroadcast(unittest.TestCase):
         success = send_line_broadcast(self.mock_token, self.mock_message)
         self.assertFalse(success)
 
-    @patch('line_notify.requests.post')
+    @patch(SESSION_POST, autospec=True)
     def test_broadcast_connection_error(self, mock_post):
         """測試 broadcast 連線錯誤"""
         mock_post.side_effect = requests.exceptions.ConnectionError("Refused")
@@ -391,5 +496,85 @@ class TestLineBroadcast(unittest.TestCase):
         self.assertFalse(success)
 
 
+class TestLineMulticast(_OutboxTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.mock_token = "mock_channel_access_token"
+        self.user_ids = [f"U{i:032x}" for i in range(3)]
+
+    def _ok(self, mock_post):
+        mock_response = _response(200)
+        mock_post.return_value = mock_response
+
+    @patch(SESSION_POST, autospec=True)
+    def test_multicast_single_request(self, mock_post):
+        """多位收件人只需一次請求"""
+        self._ok(mock_post)
+
+        success = send_line_multicast(self.mock_token, self.user_ids, "群發訊息")
+
+        self.assertTrue(success)
+        mock_post.assert_called_once()
+        self.assertEqual(mock_post.call_args.args[1], LINE_MULTICAST_API_URL)
+        json_payload = mock_post.call_args.kwargs['json']
+        self.assertEqual(json_payload['to'], self.user_ids)
+        self.assertEqual(json_payload['messages'], [{'type': 'text', 'text': "群發訊息"}])
+
+    @patch(SESSION_POST, autospec=True)
+    def test_multicast_chunks_recipients(self, mock_post):
+        """收件人超過上限時分組，重複 ID 只發一次"""
+        self._ok(mock_post)
+        user_ids = [f"U{i:032x}" for i in range(MAX_MULTICAST_RECIPIENTS + 10)]
+
+        success = send_line_multicast(self.mock_token, user_ids + user_ids[:5], "訊息")
+
+        self.assertTrue(success)
+        self.assertEqual(mock_post.call_count, 2)
+        sizes = [len(c.kwargs['json']['to']) for c in mock_post.call_args_list]
+        self.assertEqual(sorted(sizes), [10, MAX_MULTICAST_RECIPIENTS])
+
+    @patch(SESSION_POST, autospec=True)
+    def test_multicast_splits_long_message(self, mock_post):
+        """過長訊息拆成多個泡泡，每次請求最多 5 個"""
+        self._ok(mock_post)
+        line = "x" * 999
+        long_message = "\n".join([line] * 30)
+
+        success = send_line_multicast(self.mock_token, self.user_ids, long_message,
+                                      ordered=True)
+
+        self.assertTrue(success)
+        bubbles = [m['text'] for c in mock_post.call_args_list
+                   for m in c.kwargs['json']['messages']]
+        self.assertTrue(all(len(b) <= MAX_MESSAGE_LENGTH for b in bubbles))
+        self.assertEqual("\n".join(bubbles), long_message)
+        self.assertTrue(all(len(c.kwargs['json']['messages']) <= MAX_MESSAGES_PER_REQUEST
+                            for c in mock_post.call_args_list))
+
+    @patch(SESSION_POST, autospec=True)
+    def test_multicast_invalid_user_id(self, mock_post):
+        """收件人含無效 ID 時不發送"""
+        success = send_line_multicast(self.mock_token, self.user_ids + ["bad\nid"], "訊息")
+        self.assertFalse(success)
+        mock_post.assert_not_called()
+
+    @patch(SESSION_POST, autospec=True)
+    def test_multicast_http_error(self, mock_post):
+        """multicast HTTP 錯誤回傳 False"""
+        mock_response = _response(429)
+        mock_post.return_value = mock_response
+
+        self.assertFalse(send_line_multicast(self.mock_token, self.user_ids, "訊息"))
+
+    def test_split_message_bubbles(self):
+        """短訊息不拆；超長單行硬切"""
+        self.assertEqual(split_message_bubbles("短訊息"), ["短訊息"])
+        bubbles = split_message_bubbles("a" * 25, max_length=10)
+        self.assertEqual(bubbles, ["a" * 10, "a" * 10, "a" * 5])
+        bubbles = split_message_bubbles("aaaa\nbbbb\ncccc", max_length=9)
+        self.assertEqual(bubbles, ["aaaa\nbbbb", "cccc"])
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,54 @@
+import os
+import random
+import sys
+import unittest
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import matcher
+from matcher import KeywordMatcher
+
+
+class TestKeywordMatcher(unittest.TestCase):
+
+    def test_overlapping_and_prefix_keywords(self):
+        """重疊、互為前綴的關鍵字都要找到"""
+        m = KeywordMatcher(["內湖", "內湖區", "湖區", "南港"])
+        self.assertEqual(m.find("內湖區塞車"), {"內湖", "內湖區", "湖區"})
+
+    def test_find_indices_with_duplicates(self):
+        """重複的關鍵字回傳所有索引"""
+        m = KeywordMatcher(["馬路", "議員", "馬路"])
+        self.assertEqual(m.find_indices("馬路坑洞"), {0, 2})
+
+    def test_empty_keyword_always_matches(self):
+        """空字串關鍵字與 "" in text 一致，永遠成立"""
+        m = KeywordMatcher(["", "議員"])
+        self.assertEqual(m.find("無關內容"), {""})
+        self.assertTrue(m.matches_any(""))
+
+    def test_matches_any(self):
+        """matches_any 判斷是否有任一命中"""
+        m = KeywordMatcher(["颱風", "地震"])
+        self.assertTrue(m.matches_any("今天颱風天"))
+        self.assertFalse(m.matches_any("天氣很好"))
+        self.assertFalse(KeywordMatcher([]).matches_any("任何內容"))
+
+    def test_same_as_substring_check(self):
+        """隨機輸入下與逐一 in 比對結果相同（逐一與索引兩種模式）"""
+        rng = random.Random(42)
+        alphabet = "內湖區路ab"
+        for threshold in (matcher.INDEX_THRESHOLD, 0):
+            with patch.object(matcher, "INDEX_THRESHOLD", threshold):
+                for _ in range(500):
+                    keywords = ["".join(rng.choice(alphabet) for _ in range(rng.randint(0, 3)))
+                                for _ in range(rng.randint(0, 8))]
+                    text = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 20)))
+                    m = KeywordMatcher(keywords)
+                    self.assertEqual(m.find(text), {kw for kw in keywords if kw in text})
+                    self.assertEqual(m.matches_any(text), any(kw in text for kw in keywords))
+
+
+if __name__ == '__main__':
+    unittest.main()
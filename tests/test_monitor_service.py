@@ -0,0 +1,219 @@
+import asyncio
+import os
+import sys
+import unittest
+from unittest import mock
+
+_PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, _PROJECT_ROOT)
+sys.path.insert(0, os.path.join(_PROJECT_ROOT, 'src'))
+
+from web.backend.services import monitor_service
+from web.backend.services.monitor_service import AgentOutcome, _merge_results
+from report_generator import ReportBuilder
+
+
+def _post(post_id, link, importance=5):
+    return {
+        "id": post_id, "content": f"內容 {post_id}", "link": link,
+        "analysis": {"categories": ["社會"], "importance": importance, "summary": "摘要"},
+    }
+
+
+def _result(keyword, posts, timestamp="2026-01-01T00:00:00", **stats):
+    return {
+        "timestamp": timestamp,
+        "keywords": [keyword],
+        "analyzed_posts": posts,
+        "stats": {"valid_count": len(posts), **stats},
+    }
+
+
+class TestMergeResults(unittest.TestCase):
+
+    def test_dedups_posts_by_link(self):
+        merged, _ = _merge_results([
+            _result("內湖", [_post("p1", "l1"), _post("p2", "l2")]),
+            _result("南港", [_post("p3", "l2"), _post("p4", "l3")]),
+        ])
+        self.assertEqual([p["link"] for p in merged["analyzed_posts"]], ["l1", "l2", "l3"])
+        self.assertEqual(merged["analyzed_posts"][1]["id"], "p2")
+
+    def test_posts_without_link_are_kept(self):
+        merged, _ = _merge_results([
+            _result("內湖", [_post("p1", None)]),
+            _result("南港", [_post("p2", None)]),
+        ])
+        self.assertEqual(len(merged["analyzed_posts"]), 2)
+
+    def test_colliding_ids_are_suffixed_with_agent_index(self):
+        merged, _ = _merge_results([
+            _result("內湖", [_post("post_001", "l1")]),
+            _result("南港", [_post("post_001", "l2")]),
+        ])
+        self.assertEqual([p["id"] for p in merged["analyzed_posts"]], ["post_001", "post_001_2"])
+
+    def test_sums_numeric_stats_and_recomputes_valid_count(self):
+        merged, _ = _merge_results([
+            _result("內湖", [_post("p1", "l1")], total_searched=20, filtered_by_dedup=3),
+            _result("南港", [_post("p2", "l1")], total_searched=15, filtered_by_dedup=1,
+                    partial=True, note="x"),
+        ])
+        stats = merged["stats"]
+        self.assertEqual(stats["total_searched"], 35)
+        self.assertEqual(stats["filtered_by_dedup"], 4)
+        self.assertEqual(stats["valid_count"], 1)
+        self.assertNotIn("partial", stats)
+        self.assertNotIn("note", stats)
+
+    def test_keywords_and_latest_timestamp(self):
+        merged, _ = _merge_results([
+            _result("內湖", [], timestamp="2026-01-01T10:00:00"),
+            _result("南港", [], timestamp="2026-01-01T12:00:00"),
+            _result("內湖", [], timestamp="2026-01-01T11:00:00"),
+        ])
+        self.assertEqual(merged["keywords"], ["內湖", "南港"])
+        self.assertEqual(merged["timestamp"], "2026-01-01T12:00:00")
+
+    def test_post_keys_let_streamed_builder_be_reused(self):
+        results = [
+            _result("內湖", [_post("post_001", "l1"), _post("post_002", "l2")]),
+            _result("南港", [_post("post_001", "l3"), _post("post_009", "l2")]),
+        ]
+        builder = ReportBuilder()
+        for keyword, result in zip(["南港", "內湖"], reversed(results)):
+            for post in result["analyzed_posts"]:
+                builder.add_post(post, source=keyword)
+
+        merged, keys = _merge_results(results, ["內湖", "南港"])
+        self.assertEqual(keys, [("內湖", "post_001"), ("內湖", "post_002"),
+                                ("南港", "post_001")])
+        self.assertTrue(builder.adopt(merged["analyzed_posts"], keys))
+        self.assertEqual([p["id"] for p in builder.posts],
+                         ["post_001", "post_002", "post_001_2"])
+
+
+class _FakeHistory:
+
+    def __init__(self):
+        self.updates = []
+
+    def update_status(self, run_id, status, **kwargs):
+        self.updates.append((run_id, status, kwargs))
+
+
+class TestRunMonitorParallel(unittest.TestCase):
+
+    def _run(self, outcomes):
+        """以假的 _run_agent 執行平行模式，回傳 (寫入的合併結果, history, 進度訊息)。"""
+        async def fake_run_agent(keywords, progress_queue, **kwargs):
+            outcome = outcomes[keywords[0]]
+            if isinstance(outcome, Exception):
+                raise outcome
+            return outcome
+
+        stored = []
+
+        async def fake_store_result(run_id, merged, history, progress_queue, *args):
+            stored.append(merged)
+
+        async def run():
+            queue = asyncio.Queue()
+            history = _FakeHistory()
+            with mock.patch.object(monitor_service, "_run_agent", fake_run_agent), \
+                    mock.patch.object(monitor_service, "_store_result", fake_store_result), \
+                    mock.patch.object(monitor_service, "PARALLEL_LAUNCH_STAGGER_SECONDS", 0):
+                await monitor_service._run_monitor_parallel(
+                    "run-1", list(outcomes), history, queue, builder=None,
+                )
+            messages = []
+            while not queue.empty():
+                messages.append(queue.get_nowait())
+            return stored, history, messages
+
+        return asyncio.run(run())
+
+    def test_one_failed_agent_is_reported_and_others_merged(self):
+        stored, history, messages = self._run({
+            "內湖": AgentOutcome(0, [], False, _result("內湖", [_post("p1", "l1")])),
+            "南港": AgentOutcome(1, ["boom"], False, None),
+            "松山": AgentOutcome(0, [], False, _result("松山", [_post("p2", "l2")])),
+        })
+        self.assertEqual(len(stored), 1)
+        merged = stored[0]
+        self.assertEqual(merged["keywords"], ["內湖", "松山"])
+        self.assertEqual(len(merged["analyzed_posts"]), 2)
+        self.assertEqual(merged["failed_keywords"], ["南港"])
+        self.assertEqual(history.updates, [])
+        self.assertFalse(any(m["type"] == "error" for m in messages))
+
+    def test_all_agents_failed_fails_run(self):
+        stored, history, messages = self._run({
+            "內湖": AgentOutcome(None, [], True, None),
+            "南港": RuntimeError("spawn failed"),
+        })
+        self.assertEqual(stored, [])
+        self.assertEqual(history.updates[-1][1], "failed")
+        self.assertEqual(messages[-1]["type"], "error")
+
+
+class TestStoreResult(unittest.TestCase):
+
+    def test_missing_report_modules_complete_without_report(self):
+        """無法載入 report_generator 時仍保存結果，只是沒有戰報"""
+        result = _result("內湖", [_post("p1", "l1")])
+
+        async def run():
+            history = _FakeHistory()
+            with mock.patch.dict(sys.modules, {"report_generator": None}):
+                self.assertIsNone(monitor_service._new_builder(["內湖"]))
+                await monitor_service._store_result("run-1", result, history, asyncio.Queue())
+            return history
+
+        history = asyncio.run(run())
+        run_id, status, kwargs = history.updates[-1]
+        self.assertEqual(status, "completed")
+        self.assertIn('"p1"', kwargs["result_json"])
+        self.assertNotIn("report_markdown", kwargs)
+
+
+_AGENT_SCRIPT = """
+import json, sys, time
+sys.path.insert(0, "src")
+from events import emit_event
+emit_event("pipeline_stats", {"scanned": 3, "filtered": 1, "duplicated": 0, "valid": 2})
+time.sleep(0.3)
+print("分析完成，結果如下：")
+print(json.dumps(%s, ensure_ascii=False, indent=2))
+"""
+
+
+class TestRunAgentFallback(unittest.TestCase):
+
+    def _run_agent(self, result):
+        script = _AGENT_SCRIPT % repr(result)
+
+        async def run():
+            queue = asyncio.Queue()
+            with mock.patch.object(monitor_service, "_build_agent_command",
+                                   lambda keywords, session_id=None: [sys.executable, "-c", script]), \
+                    mock.patch.object(monitor_service, "EVENT_POLL_INTERVAL_SECONDS", 0.01):
+                outcome = await monitor_service._run_agent(["內湖"], queue)
+            messages = []
+            while not queue.empty():
+                messages.append(queue.get_nowait())
+            return outcome, messages
+
+        return asyncio.run(run())
+
+    def test_stdout_result_used_after_progress_events(self):
+        """只收到進度事件、沒有 result 事件時，仍從 stdout 取得結果"""
+        result = _result("內湖", [_post("p1", "l1")])
+        outcome, messages = self._run_agent(result)
+        self.assertEqual(outcome.exit_code, 0)
+        self.assertEqual(outcome.result, result)
+        self.assertIn("pipeline_stats", [m["type"] for m in messages])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import os
+import sys
+import unittest
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import normalize
+from normalize import normalize_terms, normalize_text, normalizer_from_config
+
+
+class TestNormalizeText(unittest.TestCase):
+
+    def test_full_width_to_half_width(self):
+        """全形英數與標點轉為半形"""
+        self.assertEqual(normalize_text("加ＬＩＮＥ：ａｂｃ１２３"), "加LINE:abc123")
+
+    def test_zero_width_removed(self):
+        """零寬字元被移除"""
+        self.assertEqual(normalize_text("限\u200b時\u200d特\ufeff價"), "限時特價")
+
+    def test_spaces_between_cjk_removed(self):
+        """中文字之間插入的空白（含全形空白）被移除"""
+        self.assertEqual(normalize_text("限 時\u3000特  價"), "限時特價")
+
+    def test_spaces_around_latin_kept(self):
+        """中英文之間與英文單字間的空白保留"""
+        self.assertEqual(normalize_text("加 LINE 好友 on sale"), "加 LINE 好友 on sale")
+
+    def test_fold_script(self):
+        """fold_script 時簡體轉繁體"""
+        self.assertEqual(normalize_text("限时特价", fold_script=True), "限時特價")
+        self.assertEqual(normalize_text("限时特价"), "限时特价")
+
+    def test_builtin_table_without_opencc(self):
+        """未安裝 opencc 時使用內建對照表"""
+        normalize._normalize.cache_clear()
+        with patch.object(normalize, "opencc", None):
+            self.assertEqual(normalize_text("诈骗集团", fold_script=True), "詐騙集團")
+        normalize._normalize.cache_clear()
+
+    def test_none_and_ascii(self):
+        self.assertEqual(normalize_text(None), "")
+        self.assertEqual(normalize_text("plain ascii  text"), "plain ascii  text")
+
+    def test_cached(self):
+        """同一內容重複正規化使用快取"""
+        normalize._normalize.cache_clear()
+        normalize_text("內湖 科技園區")
+        normalize_text("內湖 科技園區")
+        self.assertEqual(normalize._normalize.cache_info().hits, 1)
+
+    def test_terms_keep_order_and_length(self):
+        self.assertEqual(normalize_terms(["限 時", "ＡＢ", "限 時"]), ["限時", "AB", "限時"])
+
+    def test_normalizer_from_config(self):
+        self.assertIsNone(normalizer_from_config(None))
+        self.assertIsNone(normalizer_from_config({"normalize_text": False}))
+        fold = normalizer_from_config({"normalize_text": True, "fold_script": True})
+        self.assertEqual(fold("限 时"), "限時")
+        plain = normalizer_from_config({"normalize_text": True})
+        self.assertEqual(plain("限 时"), "限时")
+
+
+if __name__ == '__main__':
+    unittest.main()
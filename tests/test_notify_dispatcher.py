@@ -0,0 +1,173 @@
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# 將 src 目錄添加到 Python 路徑中
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from notify_dispatcher import NotificationDispatcher, parse_retry_after
+
+
+class _StubLineHandler(BaseHTTPRequestHandler):
+    """本機 LINE API stub：依 server.responses 依序回應，記錄收到的請求。"""
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        body = json.loads(self.rfile.read(length) or b"{}")
+        server = self.server
+        with server.lock:
+            server.requests.append({
+                'path': self.path,
+                'auth': self.headers.get('Authorization'),
+                'body': body,
+                'time': time.monotonic(),
+            })
+            status, headers = server.responses.pop(0) if server.responses else (200, {})
+        self.send_response(status)
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.send_header('Content-Length', '2')
+        self.end_headers()
+        self.wfile.write(b"{}")
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestNotificationDispatcher(unittest.TestCase):
+
+    def setUp(self):
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), _StubLineHandler)
+        self.server.lock = threading.Lock()
+        self.server.requests = []
+        self.server.responses = []
+        self.thread = threading.Thread(target=self.server.serve_forever,
+                                       kwargs={"poll_interval": 0.05}, daemon=True)
+        self.thread.start()
+        base = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.push_url = f"{base}/v2/bot/message/push"
+        self.broadcast_url = f"{base}/v2/bot/message/broadcast"
+        self.multicast_url = f"{base}/v2/bot/message/multicast"
+
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmpdir.name, "outbox.db")
+        self.user_id = "U1234567890abcdef1234567890abcdef"
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.tmpdir.cleanup()
+
+    def _dispatcher(self, **kwargs):
+        options = dict(db_path=self.db_path, push_url=self.push_url,
+                       broadcast_url=self.broadcast_url,
+                       multicast_url=self.multicast_url, backoff_base=0.01,
+                       max_retries=2)
+        options.update(kwargs)
+        return NotificationDispatcher("mock_token", **options)
+
+    def test_concurrent_push_success(self):
+        """並行發送多則 push，全部送達後 outbox 清空"""
+        with self._dispatcher() as dispatcher:
+            futures = [dispatcher.send_push(self.user_id, f"訊息 {i}") for i in range(10)]
+            self.assertTrue(all(f.result(timeout=10) for f in futures))
+            self.assertEqual(dispatcher.pending_count(), 0)
+
+        self.assertEqual(len(self.server.requests), 10)
+        first = self.server.requests[0]
+        self.assertEqual(first['auth'], "Bearer mock_token")
+        self.assertEqual(first['body']['to'], self.user_id)
+        self.assertEqual(first['body']['messages'][0]['type'], 'text')
+
+    def test_broadcast_has_no_recipient(self):
+        """broadcast 不帶 to 欄位並送到 broadcast 網址"""
+        with self._dispatcher() as dispatcher:
+            self.assertTrue(dispatcher.send_broadcast("廣播").result(timeout=10))
+        request = self.server.requests[0]
+        self.assertEqual(request['path'], "/v2/bot/message/broadcast")
+        self.assertNotIn('to', request['body'])
+
+    def test_multicast_packs_bubbles(self):
+        """multicast 將過長訊息拆成泡泡，每次請求最多 5 個"""
+        users = [f"U{i:032x}" for i in range(3)]
+        message = "\n".join(["x" * 4000] * 7)
+        with self._dispatcher() as dispatcher:
+            futures = dispatcher.send_multicast(users, message)
+            self.assertTrue(all(f.result(timeout=10) for f in futures))
+        self.assertEqual(len(self.server.requests), 2)
+        for request in self.server.requests:
+            self.assertEqual(request['path'], "/v2/bot/message/multicast")
+            self.assertEqual(request['body']['to'], users)
+        counts = sorted(len(r['body']['messages']) for r in self.server.requests)
+        self.assertEqual(counts, [2, 5])
+
+    def test_retry_on_server_error(self):
+        """5xx 時以退避重試，最終送達"""
+        self.server.responses = [(503, {}), (502, {})]
+        with self._dispatcher() as dispatcher:
+            self.assertTrue(dispatcher.send_push(self.user_id, "重試").result(timeout=10))
+        self.assertEqual(len(self.server.requests), 3)
+
+    def test_retry_after_honored_on_429(self):
+        """429 時依 Retry-After 等待後再重試"""
+        self.server.responses = [(429, {'Retry-After': '1'})]
+        with self._dispatcher() as dispatcher:
+            self.assertTrue(dispatcher.send_push(self.user_id, "限流").result(timeout=10))
+        first, second = self.server.requests
+        self.assertGreaterEqual(second['time'] - first['time'], 0.9)
+
+    def test_client_error_not_retried(self):
+        """4xx（非 429）不重試，標記為失敗並保留記錄"""
+        self.server.responses = [(400, {})]
+        with self._dispatcher() as dispatcher:
+            self.assertFalse(dispatcher.send_push(self.user_id, "錯誤").result(timeout=10))
+            self.assertEqual(dispatcher.pending_count(), 0)
+        self.assertEqual(len(self.server.requests), 1)
+
+    def test_outbox_survives_restart(self):
+        """重試用盡的訊息保留在 outbox，重新啟動後 flush 可補送"""
+        self.server.responses = [(503, {})] * 3
+        with self._dispatcher() as dispatcher:
+            self.assertFalse(dispatcher.send_push(self.user_id, "補送").result(timeout=10))
+            self.assertEqual(dispatcher.pending_count(), 1)
+
+        with self._dispatcher() as restarted:
+            self.assertEqual(restarted.flush(), (1, 0))
+            self.assertEqual(restarted.pending_count(), 0)
+        self.assertEqual(self.server.requests[-1]['body']['messages'][0]['text'], "補送")
+
+    def test_invalid_input(self):
+        """無效 token 拋出 ValueError，無效訊息或用戶 ID 直接失敗"""
+        with self.assertRaises(ValueError):
+            NotificationDispatcher("bad token", db_path=self.db_path)
+        with self._dispatcher() as dispatcher:
+            self.assertFalse(dispatcher.send_push(self.user_id, "").result())
+            self.assertFalse(dispatcher.send_push("bad\nid", "訊息").result())
+            self.assertFalse(dispatcher.send_push(self.user_id, ["訊息", None]).result())
+        self.assertEqual(self.server.requests, [])
+
+    def test_long_push_split_into_bubbles(self):
+        """push / broadcast 的過長訊息拆成泡泡而不是被拒絕"""
+        with self._dispatcher() as dispatcher:
+            self.assertTrue(dispatcher.send_push(self.user_id, "a" * 5001).result(timeout=10))
+            self.assertTrue(dispatcher.send_broadcast("b" * 5001).result(timeout=10))
+        for request in self.server.requests:
+            self.assertEqual([len(m['text']) for m in request['body']['messages']], [5000, 1])
+
+    def test_parse_retry_after(self):
+        """Retry-After 支援秒數與 HTTP 日期"""
+        self.assertEqual(parse_retry_after("5"), 5.0)
+        self.assertIsNone(parse_retry_after(None))
+        self.assertIsNone(parse_retry_after("soon"))
+        delay = parse_retry_after(formatdate(time.time() + 30, usegmt=True))
+        self.assertTrue(25 <= delay <= 31)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -4,9 +4,12 @@ import sys
 import json
 import tempfile
 
+import yaml
+
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
 
 from pipeline import process_posts
+from scoring import apply_scoring_to_posts, load_scoring_config
 
 # 測試用長內容（>30 字元以通過 min_content_length）
 VALID_CONTENT_1 = "台北市長今天視察交通建設，宣布內湖地區的通勤改善方案即日起開始執行，預計惠及十萬名居民"
@@ -31,6 +34,17 @@ class TestProcessPosts(unittest.TestCase):
         if os.path.exists(self.db_path):
             os.unlink(self.db_path)
 
+    def _config_with(self, base_path, **overrides):
+        """複製設定檔並覆寫部分設定，回傳暫存檔路徑"""
+        with open(base_path, encoding="utf-8") as f:
+            config = yaml.safe_load(f)
+        config.update(overrides)
+        fd, path = tempfile.mkstemp(suffix=".yml")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            yaml.safe_dump(config, f, allow_unicode=True)
+        self.addCleanup(os.unlink, path)
+        return path
+
     def _make_post(self, content, author="user1", link=None):
         if link is None:
             link = f"https://www.threads.net/@{author}/post/{abs(hash(content)) % 100000}"
@@ -145,6 +159,115 @@ class TestProcessPosts(unittest.TestCase):
         self.assertEqual(result2["new_count"], 1)
         self.assertEqual(result2["duplicate_count"], 0)
 
+    def test_spaced_exclude_word_is_filtered(self):
+        """插入空白或使用簡體的排除詞也會被過濾（啟用正規化時）；預設設定不正規化"""
+        posts = [
+            self._make_post("週年慶 限 時 特 價 全館商品通通五折起，數量有限要買要快喔", link="l1"),
+            self._make_post("周年庆限时特价全馆商品通通五折起，数量有限要买要快喔，错过再等一年", link="l2"),
+        ]
+        filter_config = self._config_with(self.filter_config, normalize_text=True, fold_script=True)
+        result = process_posts(posts, filter_config, self.db_path, self.scoring_config)
+        self.assertEqual(result["filtered_count"], 2)
+        self.assertEqual(result["filter_reasons"], {"exclude": 2})
+
+        os.unlink(self.db_path)
+        result = process_posts(posts, self.filter_config, self.db_path, self.scoring_config)
+        self.assertNotIn("exclude", result["filter_reasons"])
+
+    def test_filter_stats_persisted_across_runs(self):
+        """提供統計檔時累積排除詞命中數，下次 run 的判斷結果不變"""
+        stats_path = self.db_path + ".stats.json"
+        posts = [
+            self._make_post("週年慶限時特價全館商品通通五折起，數量有限要買要快喔，錯過再等一年", link="s1"),
+            self._make_post(VALID_CONTENT_1, link="s2"),
+        ]
+        try:
+            first = process_posts(posts, self.filter_config, self.db_path, self.scoring_config,
+                                  filter_stats_path=stats_path)
+            with open(stats_path, encoding="utf-8") as f:
+                stats = json.load(f)
+            self.assertEqual(stats["terms"], {"限時特價": 1})
+            self.assertEqual(stats["evaluated"], 2)
+
+            os.unlink(self.db_path)
+            second = process_posts(posts, self.filter_config, self.db_path, self.scoring_config,
+                                   filter_stats_path=stats_path)
+            self.assertEqual(second["filtered_count"], first["filtered_count"])
+            self.assertEqual(second["new_count"], first["new_count"])
+        finally:
+            if os.path.exists(stats_path):
+                os.unlink(stats_path)
+
+    def test_junk_posts_counted_separately(self):
+        """通過排除詞過濾的垃圾貼文由預分類排除，有獨立計數且不寫入去重資料庫"""
+        posts = [
+            self._make_post("哈" * 40, link="j1"),
+            self._make_post("Check out my new profile for amazing daily giveaways and deals", link="j2"),
+            self._make_post(VALID_CONTENT_1, link="j3"),
+            self._make_post("內湖 traffic so bad today, stuck on Chenggong Rd for 40 minutes", link="j4"),
+        ]
+        filter_config = self._config_with(self.filter_config, preclassify={"enabled": True})
+        result = process_posts(posts, filter_config, self.db_path, self.scoring_config)
+        self.assertEqual(result["junk_count"], 2)
+        self.assertEqual(result["junk_reasons"], {"repetitive": 1, "foreign_language": 1})
+        self.assertEqual(result["filtered_count"], 0)
+        self.assertEqual(result["new_count"], 2)
+        self.assertIn("垃圾 2 篇", result["summary"])
+
+        again = process_posts(posts[:1], filter_config, self.db_path, self.scoring_config)
+        self.assertEqual(again["junk_count"], 1)
+        self.assertEqual(again["duplicate_count"], 0)
+
+    def test_author_rate_limit(self):
+        """同一作者超過每次 run 上限的貼文不送分析，也不寫入去重資料庫"""
+        posts = [self._make_post(f"{VALID_CONTENT_1}，第{i}則更新", author="spammer", link=f"a{i}")
+                 for i in range(7)]
+        posts.append(self._make_post(VALID_CONTENT_2, author="other", link="b1"))
+        author_db = self.db_path + ".authors.db"
+        filter_config = self._config_with(self.filter_config, authors={"max_posts_per_run": 5})
+        try:
+            result = process_posts(posts, filter_config, self.db_path, self.scoring_config,
+                                   author_db_path=author_db)
+            self.assertEqual(result["author_count"], 2)
+            self.assertEqual(result["author_reasons"], {"rate_limited": 2})
+            self.assertEqual(result["new_count"], 6)
+            self.assertIn("作者限制 2 篇", result["summary"])
+
+            again = process_posts(posts, filter_config, self.db_path, self.scoring_config,
+                                  author_db_path=author_db)
+            self.assertEqual(again["duplicate_count"], 6)
+            self.assertEqual(again["new_count"], 2)
+        finally:
+            if os.path.exists(author_db):
+                os.unlink(author_db)
+
+    def test_authors_disabled_by_default(self):
+        """預設 filters.yml 不啟用作者限制，也不建立作者資料庫"""
+        posts = [self._make_post(f"{VALID_CONTENT_1}，第{i}則更新", author="spammer", link=f"d{i}")
+                 for i in range(7)]
+        author_db = self.db_path + ".authors.db"
+        result = process_posts(posts, self.filter_config, self.db_path, self.scoring_config,
+                               author_db_path=author_db)
+        self.assertEqual(result["author_count"], 0)
+        self.assertEqual(result["new_count"], 7)
+        self.assertFalse(os.path.exists(author_db))
+
+    def test_batches_put_priority_posts_first(self):
+        """含白名單關鍵字的貼文排在最前面，批次區間涵蓋所有 passed_posts"""
+        posts = [
+            self._make_post(VALID_CONTENT_3, link="p1"),
+            self._make_post(VALID_CONTENT_2, link="p2"),
+            self._make_post("內湖警方今天破獲一起跨國詐騙集團，逮捕多名嫌犯並查扣大量現金與人頭帳戶", link="p3"),
+        ]
+        result = process_posts(posts, self.filter_config, self.db_path, self.scoring_config,
+                               batch_max_posts=2)
+        self.assertEqual([p["link"] for p in result["passed_posts"]][0], "p3")
+        self.assertTrue(result["passed_posts"][0]["priority_keyword"])
+        batches = result["batches"]
+        self.assertEqual([(b["start"], b["end"]) for b in batches], [(0, 2), (2, 3)])
+        self.assertGreaterEqual(batches[0]["priority_posts"], 1)
+        self.assertTrue(all(b["estimated_tokens"] > 0 for b in batches))
+
     # ========== Output Structure ==========
 
     def test_output_has_required_keys(self):
@@ -152,8 +275,8 @@ class TestProcessPosts(unittest.TestCase):
         posts = [self._make_post(VALID_CONTENT_1)]
         result = process_posts(posts, self.filter_config, self.db_path, self.scoring_config)
 
-        required_keys = ["passed_posts", "filtered_count", "duplicate_count",
-                         "new_count", "total_input", "summary"]
+        required_keys = ["passed_posts", "filtered_count", "junk_count", "author_count",
+                         "duplicate_count", "new_count", "total_input", "summary", "batches"]
         for key in required_keys:
             self.assertIn(key, result)
 
@@ -187,6 +310,34 @@ class TestProcessPosts(unittest.TestCase):
         passed = result["passed_posts"][0]
         self.assertIn("bonus_applied", passed)
 
+    def test_bonus_normalization_follows_scoring_config(self):
+        """pipeline 的 bonus_applied 與戰報的 bonus_detail 使用同一份 scoring.yml 正規化設定"""
+        content = "內湖成功路今天 塞 車 超過一小時，下班通勤的民眾都在抱怨，希望市府趕快改善這個問題"
+        for enabled in (False, True):
+            with self.subTest(normalize_text=enabled):
+                scoring_config = self._config_with(self.scoring_config, normalize_text=enabled)
+                os.unlink(self.db_path)
+                result = process_posts([self._make_post(content)], self.filter_config,
+                                       self.db_path, scoring_config)
+                passed = result["passed_posts"][0]
+                scored = apply_scoring_to_posts([passed], load_scoring_config(scoring_config))[0]
+                detail = [d["rule_name"] for d in scored["analysis"]["bonus_detail"]]
+                self.assertEqual(passed["bonus_applied"], detail)
+                self.assertEqual("道路/交通/災害" in detail, enabled)
+
+    def test_content_dedup_catches_reposted_variants(self):
+        """啟用 content_dedup 時，換連結重發且只差全形/空白的內容視為重複"""
+        filter_config = self._config_with(self.filter_config, content_dedup=True)
+        variant = VALID_CONTENT_2.replace("，", " , ").replace("三", "三 ")
+        posts = [self._make_post(VALID_CONTENT_2, link="c1"), self._make_post(variant, link="c2")]
+        result = process_posts(posts, filter_config, self.db_path, self.scoring_config)
+        self.assertEqual(result["new_count"], 1)
+        self.assertEqual(result["duplicate_count"], 1)
+
+        os.unlink(self.db_path)
+        result = process_posts(posts, self.filter_config, self.db_path, self.scoring_config)
+        self.assertEqual(result["new_count"], 2)
+
     # ========== Immutability ==========
 
     def test_original_posts_not_mutated(self):
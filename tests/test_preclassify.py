@@ -0,0 +1,110 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from preclassify import (
+    JUNK_FOREIGN, JUNK_LINK_ONLY, JUNK_LOW_ENTROPY, JUNK_REPETITIVE, JUNK_SYMBOLS,
+    JunkClassifier, classifier_from_config, extract_features, load_monitored_keywords,
+)
+
+NORMAL = "內湖科技園區新增三條接駁巴士路線，方便上班族從捷運站轉乘直達辦公區域，即日起試營運"
+
+
+class TestExtractFeatures(unittest.TestCase):
+
+    def test_normal_chinese(self):
+        features = extract_features(NORMAL)
+        self.assertEqual(features.url_ratio, 0.0)
+        self.assertGreater(features.cjk_ratio, 0.99)
+        self.assertLess(features.symbol_ratio, 0.2)
+        self.assertGreater(features.entropy, 4.0)
+
+    def test_url_chars_excluded_from_counts(self):
+        features = extract_features("看這裡 https://example.com/abcdef")
+        self.assertGreater(features.url_ratio, 0.7)
+        self.assertEqual(features.chars, 3)
+
+    def test_whitespace_only(self):
+        features = extract_features("   \n  ")
+        self.assertEqual(features.chars, 0)
+
+
+class TestJunkClassifier(unittest.TestCase):
+
+    def setUp(self):
+        self.classifier = JunkClassifier()
+
+    def test_normal_post_passes(self):
+        self.assertIsNone(self.classifier.classify(NORMAL))
+        self.assertIsNone(self.classifier.classify("今天去 Costco 買了 iPhone 16，內湖店的停車場又大排長龍"))
+
+    def test_link_only(self):
+        self.assertEqual(
+            self.classifier.classify("https://example.com/some/very/long/path?utm_source=threads"),
+            JUNK_LINK_ONLY,
+        )
+
+    def test_link_with_short_comment_passes(self):
+        """新聞或社團連結加一句說明不是只有連結（網址佔比高也一樣）"""
+        for text in (
+            "內湖科技園區停電了！ https://news.ltn.com.tw/news/life/breakingnews/4812345",
+            "大家快來看內湖社團的討論 https://www.facebook.com/groups/123456789012345/permalink/987654321",
+        ):
+            with self.subTest(text=text):
+                self.assertIsNone(self.classifier.classify(text))
+        self.assertEqual(self.classifier.classify("看這裡 https://example.com/abcdef"), JUNK_LINK_ONLY)
+
+    def test_symbols(self):
+        self.assertEqual(self.classifier.classify("😂😂😂🤣🤣🤣👍👍👍🔥🔥🔥❤️❤️！！！～～～"), JUNK_SYMBOLS)
+
+    def test_foreign_language(self):
+        self.assertEqual(
+            self.classifier.classify("Check out my new profile for amazing daily giveaways and deals"),
+            JUNK_FOREIGN,
+        )
+
+    def test_mixed_language_with_keyword_passes(self):
+        """中英夾雜但含監控關鍵字的貼文不判斷外語"""
+        text = "內湖 traffic so bad today, stuck on Chenggong Rd for 40 minutes"
+        self.assertEqual(self.classifier.classify(text), JUNK_FOREIGN)
+        self.assertIsNone(JunkClassifier(keywords=["內湖"]).classify(text))
+        self.assertIsNone(classifier_from_config({"preclassify": {}}, ["內湖"]).classify(text))
+
+    def test_load_monitored_keywords(self):
+        keywords = load_monitored_keywords()
+        self.assertIn("內湖", keywords)
+        self.assertEqual(load_monitored_keywords("/nonexistent/keywords.yml"), [])
+
+    def test_short_latin_does_not_trigger_language(self):
+        """文字字元少於 min_letters_for_language 時不判斷語言"""
+        classifier = JunkClassifier({"min_letters_for_language": 100})
+        self.assertIsNone(classifier.classify("Check out my new profile for amazing daily deals"))
+
+    def test_repetitive(self):
+        self.assertEqual(self.classifier.classify("哈" * 40), JUNK_REPETITIVE)
+
+    def test_low_entropy(self):
+        self.assertEqual(self.classifier.classify("好棒喔" * 15), JUNK_LOW_ENTROPY)
+
+    def test_thresholds_configurable(self):
+        classifier = JunkClassifier({"min_entropy": 0, "max_repeat_ratio": 1.1})
+        self.assertIsNone(classifier.classify("好棒喔" * 15))
+
+    def test_disabled(self):
+        self.assertIsNone(JunkClassifier({"enabled": False}).classify("哈" * 40))
+        self.assertIsNone(classifier_from_config({"preclassify": {"enabled": False}}))
+        self.assertIsNone(classifier_from_config({}))
+        self.assertIsNotNone(classifier_from_config({"preclassify": {}}))
+
+    def test_shipped_config_disabled(self):
+        """filters.yml 預設停用預分類"""
+        import yaml
+        path = os.path.join(os.path.dirname(__file__), '..', 'config', 'filters.yml')
+        with open(path, encoding='utf-8') as f:
+            self.assertIsNone(classifier_from_config(yaml.safe_load(f)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,9 +1,14 @@
 import unittest
+import copy
 import os
 import sys
 import json
 import tempfile
 import shutil
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
 
@@ -15,8 +20,15 @@ from report_generator import (
     generate_markdown_report,
     generate_line_summary,
     generate_telegram_summary,
+    generate_line_messages,
+    generate_telegram_messages,
     save_report,
     generate_all_outputs,
+    ReportBuilder,
+    GistPublisher,
+    GIST_CACHE_FILENAME,
+    build_report_model,
+    render_markdown_report,
     MAX_LINE_MESSAGE_LENGTH,
     MAX_TELEGRAM_MESSAGE_LENGTH,
 )
@@ -292,6 +304,67 @@ class TestReportGenerator(unittest.TestCase):
         # Telegram Markdown link: [text](url)
         self.assertIn("](https://www.threads.net/", summary)
 
+    # ========== Paged Message Tests ==========
+
+    def _many_posts_data(self, count=300):
+        posts = []
+        for i in range(count):
+            posts.append({
+                "id": f"post_{i:04d}",
+                "content": "內容" * 20,
+                "link": f"https://www.threads.net/@user/post/{i}",
+                "analysis": {"categories": ["交通"], "importance": 5,
+                             "summary": f"第 {i} 篇貼文摘要" + "。" * 30},
+            })
+        return {**self.sample_data, "analyzed_posts": posts}
+
+    def test_short_messages_match_summary(self):
+        """未超過上限時只有一則，內容與摘要相同"""
+        url = "https://gist.github.com/x"
+        self.assertEqual(generate_line_messages(self.sample_data, url),
+                         [generate_line_summary(self.sample_data, url)])
+        self.assertEqual(generate_telegram_messages(self.sample_data, url),
+                         [generate_telegram_summary(self.sample_data, url)])
+
+    def test_line_messages_deliver_all_posts(self):
+        """LINE 分頁訊息包含所有貼文，每則不超過上限，連結不與摘要分開"""
+        data = self._many_posts_data()
+        messages = generate_line_messages(data, "https://gist.github.com/x")
+        self.assertGreater(len(messages), 1)
+        self.assertTrue(all(len(m) <= MAX_LINE_MESSAGE_LENGTH for m in messages))
+        for post in data["analyzed_posts"]:
+            link = post["link"]
+            holder = [m for m in messages if f"→ {link}\n" in m + "\n"]
+            self.assertEqual(len(holder), 1)
+            self.assertIn(post["analysis"]["summary"], holder[0])
+        self.assertIn("https://gist.github.com/x", messages[-1])
+        self.assertTrue(messages[-1].endswith(f"（{len(messages)}/{len(messages)}）"))
+
+    def test_telegram_messages_deliver_all_posts(self):
+        """Telegram 分頁訊息包含所有貼文且每則不超過上限"""
+        data = self._many_posts_data()
+        messages = generate_telegram_messages(data)
+        self.assertGreater(len(messages), 1)
+        self.assertTrue(all(len(m) <= MAX_TELEGRAM_MESSAGE_LENGTH for m in messages))
+        joined = "\n".join(messages)
+        for post in data["analyzed_posts"]:
+            self.assertIn(f"[原文]({post['link']})", joined)
+
+    def test_oversized_block_split_across_messages(self):
+        """單篇摘要超過一則上限時在行或字元邊界切開，每則仍不超過上限"""
+        data = self._many_posts_data(3)
+        long_line = "長" * (MAX_LINE_MESSAGE_LENGTH + 500)
+        data["analyzed_posts"][1]["analysis"]["summary"] = long_line + "\n" + "短行"
+        for generate, limit in ((generate_line_messages, MAX_LINE_MESSAGE_LENGTH),
+                                (generate_telegram_messages, MAX_TELEGRAM_MESSAGE_LENGTH)):
+            with self.subTest(generate=generate.__name__):
+                messages = generate(data, "https://gist.github.com/x")
+                self.assertGreater(len(messages), 1)
+                self.assertTrue(all(len(m) <= limit for m in messages))
+                self.assertTrue(all("（續）" in m.split("\n")[0] for m in messages[1:]))
+                self.assertEqual(sum(m.count("長") for m in messages), len(long_line))
+                self.assertIn(data["analyzed_posts"][2]["link"], messages[-1])
+
     # ========== Save Report Tests ==========
 
     def test_save_report_creates_file(self):
@@ -339,6 +412,312 @@ class TestReportGenerator(unittest.TestCase):
         result = generate_all_outputs(invalid_data)
         self.assertIsNone(result)
 
+    # ========== ReportModel Tests ==========
+
+    def test_report_model_matches_helpers(self):
+        """ReportModel 的大魚與類別統計應與個別函式一致"""
+        posts = self.sample_data["analyzed_posts"]
+        model = build_report_model(self.sample_data)
+        self.assertEqual(model.big_fish_posts(), identify_big_fish(posts))
+        self.assertEqual(model.big_fish_ids(),
+                         [p["id"] for p in identify_big_fish(posts)])
+        self.assertEqual(model.category_stats,
+                         compute_category_stats(classify_posts_by_category(posts)))
+        self.assertEqual(render_markdown_report(model),
+                         generate_markdown_report(self.sample_data))
+
+    def test_report_model_sorted_indices(self):
+        """類別索引依有效分數降序，其他貼文排除大魚"""
+        model = build_report_model(self.sample_data)
+        for indices in model.categorized.values():
+            scores = [model.importance[i] for i in indices]
+            self.assertEqual(scores, sorted(scores, reverse=True))
+        self.assertFalse(set(model.big_fish) & set(model.other_posts))
+        self.assertEqual(len(model.big_fish) + len(model.other_posts),
+                         len(model.posts))
+
+    def test_builder_model_matches_batch_model(self):
+        """ReportBuilder 累積出的模型應與一次建立的模型相同"""
+        builder = ReportBuilder.from_data(self.sample_data)
+        self.assertEqual(builder.model(), build_report_model(self.sample_data))
+
+    # ========== ReportBuilder Tests ==========
+
+    def test_builder_matches_batch_outputs(self):
+        """逐篇加入後的輸出應與一次性生成完全相同"""
+        builder = ReportBuilder(
+            keywords=self.sample_data["keywords"],
+            stats=self.sample_data["stats"],
+            timestamp=self.sample_data["timestamp"],
+        )
+        for post in self.sample_data["analyzed_posts"]:
+            builder.add_post(post)
+
+        posts = self.sample_data["analyzed_posts"]
+        self.assertEqual(builder.big_fish(), identify_big_fish(posts))
+        self.assertEqual(builder.category_stats(),
+                         compute_category_stats(classify_posts_by_category(posts)))
+        self.assertEqual(builder.render_markdown(),
+                         generate_markdown_report(self.sample_data))
+        self.assertEqual(builder.render_line_summary("https://gist.github.com/x"),
+                         generate_line_summary(self.sample_data, "https://gist.github.com/x"))
+        self.assertEqual(builder.render_telegram_summary(),
+                         generate_telegram_summary(self.sample_data))
+
+    def test_builder_add_post_reports_big_fish(self):
+        """加入大魚時立即回傳該貼文，一般貼文回傳 None"""
+        builder = ReportBuilder()
+        self.assertIsNone(builder.add_post(self.post_normal))
+        fish = builder.add_post(self.post_big_fish_importance)
+        self.assertEqual(fish["id"], "post_001")
+        self.assertEqual([p["id"] for p in builder.big_fish()], ["post_001"])
+
+    def test_builder_partial_report_updates(self):
+        """部分戰報應反映目前為止加入的貼文"""
+        builder = ReportBuilder(keywords=["交通建設"])
+        builder.add_post(self.post_normal)
+        first = builder.render_markdown()
+        self.assertNotIn("大魚警報", first)
+        builder.add_post(self.post_big_fish_importance)
+        self.assertIn("大魚警報", builder.render_markdown())
+
+    def test_builder_applies_scoring(self):
+        """設定 scoring_config 時逐篇套用加分"""
+        config = {"bonus_rules": [{"name": "交通", "keywords": ["環狀線"], "bonus": 3}],
+                  "max_score": 15}
+        builder = ReportBuilder(scoring_config=config)
+        fish = builder.add_post(self.post_normal)
+        self.assertIsNotNone(fish)
+        self.assertEqual(fish["analysis"]["adjusted_importance"], 9)
+
+    def test_generate_all_outputs_reuses_builder(self):
+        """builder 貼文與資料一致時沿用累積狀態"""
+        builder = ReportBuilder.from_data(self.sample_data)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            outputs = generate_all_outputs(self.sample_data, reports_dir=tmpdir,
+                                           builder=builder)
+        self.assertEqual(outputs["markdown_report"], builder.render_markdown())
+
+    def test_builder_matches_detects_changed_posts(self):
+        """連結相同但分析欄位不同、或沒有連結的貼文不同時，不沿用 builder"""
+        builder = ReportBuilder.from_data(self.sample_data)
+        posts = self.sample_data["analyzed_posts"]
+        self.assertTrue(builder.matches(posts))
+
+        changed = copy.deepcopy(posts)
+        changed[0]["analysis"]["importance"] = 1
+        self.assertFalse(builder.matches(changed))
+
+        no_link = copy.deepcopy(posts)
+        for post in no_link:
+            post.pop("link")
+        builder = ReportBuilder.from_data({**self.sample_data, "analyzed_posts": no_link})
+        other = copy.deepcopy(no_link)
+        other[-1]["content"] = "完全不同的內容"
+        self.assertFalse(builder.matches(other))
+
+    def test_generate_all_outputs_rebuilds_stale_builder(self):
+        """builder 內容過時時以最終資料重新生成"""
+        builder = ReportBuilder.from_data(self.sample_data)
+        data = copy.deepcopy(self.sample_data)
+        data["analyzed_posts"][0]["analysis"]["summary"] = "更新後的摘要內容"
+        with tempfile.TemporaryDirectory() as tmpdir:
+            outputs = generate_all_outputs(data, reports_dir=tmpdir, builder=builder)
+        self.assertIn("更新後的摘要內容", outputs["markdown_report"])
+        self.assertEqual(outputs["markdown_report"], generate_markdown_report(data))
+
+    def test_generate_all_outputs_reuses_builder_in_other_order(self):
+        """同一組貼文以不同順序抵達（平行模式）時沿用 builder，輸出依最終順序"""
+        posts = self.sample_data["analyzed_posts"]
+        builder = ReportBuilder(keywords=self.sample_data["keywords"])
+        for post in reversed(posts):
+            builder.add_post(post)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            outputs = generate_all_outputs(self.sample_data, reports_dir=tmpdir,
+                                           builder=builder)
+        self.assertEqual([p["id"] for p in builder.posts], [p["id"] for p in posts])
+        self.assertEqual(outputs["markdown_report"],
+                         generate_markdown_report(self.sample_data))
+
+    def test_builder_adopts_merged_subset_with_renamed_ids(self):
+        """平行合併剔除重複、改名 id 後，依加入時的鍵沿用 builder"""
+        posts = self.sample_data["analyzed_posts"]
+        builder = ReportBuilder(keywords=self.sample_data["keywords"],
+                                stats=self.sample_data["stats"],
+                                timestamp=self.sample_data["timestamp"])
+        for post in posts:
+            builder.add_post(post, source="內湖")
+        builder.add_post(posts[0], source="南港")
+        renamed = {**posts[1], "id": posts[1]["id"] + "_2"}
+        final = [renamed, posts[0]]
+        keys = [("內湖", posts[1]["id"]), ("南港", posts[0]["id"])]
+
+        self.assertFalse(builder.matches(final))
+        self.assertTrue(builder.adopt(final, keys))
+        self.assertEqual([p["id"] for p in builder.posts], [p["id"] for p in final])
+        data = {**self.sample_data, "analyzed_posts": final}
+        self.assertEqual(builder.render_markdown(), generate_markdown_report(data))
+
+
+class _StubGistHandler(BaseHTTPRequestHandler):
+    """本機 Gist API stub：POST /gists 建立、PATCH /gists/<id> 更新。"""
+
+    def _respond(self, status, body):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _read(self):
+        length = int(self.headers.get("Content-Length", 0))
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def do_POST(self):
+        body = self._read()
+        server = self.server
+        server.calls.append(("POST", self.path, body))
+        if server.on_request:
+            server.on_request()
+        time.sleep(server.delay)
+        server.next_id += 1
+        gist_id = f"g{server.next_id}"
+        server.gists[gist_id] = body["files"]
+        self._respond(201, {"id": gist_id, "html_url": f"https://gist.example/{gist_id}"})
+
+    def do_PATCH(self):
+        body = self._read()
+        server = self.server
+        server.calls.append(("PATCH", self.path, body))
+        gist_id = self.path.rsplit("/", 1)[-1]
+        if gist_id not in server.gists:
+            self._respond(404, {"message": "Not Found"})
+            return
+        self._respond(200, {"id": gist_id, "html_url": f"https://gist.example/{gist_id}"})
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestGistPublisher(unittest.TestCase):
+
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _StubGistHandler)
+        self.server.calls = []
+        self.server.gists = {}
+        self.server.next_id = 0
+        self.server.delay = 0
+        self.server.on_request = None
+        threading.Thread(target=self.server.serve_forever,
+                         kwargs={"poll_interval": 0.05}, daemon=True).start()
+        self.api_base = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.tmpdir = tempfile.mkdtemp()
+        self.cache_path = os.path.join(self.tmpdir, GIST_CACHE_FILENAME)
+        env = patch.dict(os.environ, {"GITHUB_GIST_TOKEN": "test-token",
+                                      "GITHUB_API_URL": self.api_base})
+        env.start()
+        self.addCleanup(env.stop)
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        shutil.rmtree(self.tmpdir)
+
+    def test_unchanged_content_reuses_url(self):
+        """內容相同時沿用既有 URL，不再呼叫 API"""
+        publisher = GistPublisher(cache_path=self.cache_path)
+        key = GistPublisher.cache_key(["內湖", "南港"])
+        first = publisher.publish("# 戰報", "a.md", "desc", key)
+        second = publisher.publish("# 戰報", "a.md", "desc", key)
+        self.assertEqual(first, "https://gist.example/g1")
+        self.assertEqual(second, first)
+        self.assertEqual(len(self.server.calls), 1)
+
+    def test_changed_content_patches_rolling_gist(self):
+        """同一組關鍵字的新內容以 PATCH 更新同一個 Gist 並改名檔案"""
+        publisher = GistPublisher(cache_path=self.cache_path)
+        key = GistPublisher.cache_key(["南港", "內湖"])
+        publisher.publish("# v1", "report_1.md", "desc", key)
+        url = publisher.publish("# v2", "report_2.md", "desc", key)
+
+        self.assertEqual(url, "https://gist.example/g1")
+        method, path, body = self.server.calls[-1]
+        self.assertEqual((method, path), ("PATCH", "/gists/g1"))
+        self.assertEqual(body["files"], {"report_1.md": {"filename": "report_2.md",
+                                                         "content": "# v2"}})
+
+    def test_generation_time_ignored_in_hash(self):
+        """只有生成時間不同時視為內容未變"""
+        publisher = GistPublisher(cache_path=self.cache_path)
+        first = publisher.publish("# 戰報\n**生成時間**: 2026-01-01T10:00:00\n內容", "a.md", "d", "k")
+        second = publisher.publish("# 戰報\n**生成時間**: 2026-01-01T11:00:00\n內容", "b.md", "d", "k")
+        self.assertEqual(second, first)
+        self.assertEqual(len(self.server.calls), 1)
+
+    def test_lock_released_during_upload(self):
+        """上傳請求進行中不持有快取鎖"""
+        publisher = GistPublisher(cache_path=self.cache_path)
+        held = []
+        self.server.on_request = lambda: held.append(publisher._lock.locked())
+        publisher.publish("# 戰報", "a.md", "d", "k")
+        self.assertEqual(held, [False])
+
+    def test_missing_gist_recreated(self):
+        """快取中的 Gist 已不存在時改為建立新 Gist"""
+        with open(self.cache_path, "w", encoding="utf-8") as f:
+            json.dump({"k": {"gist_id": "gone", "url": "u", "filename": "a.md",
+                             "hash": "old"}}, f)
+        url = GistPublisher(cache_path=self.cache_path).publish("# new", "a.md", "d", "k")
+        self.assertEqual(url, "https://gist.example/g1")
+        self.assertEqual([c[0] for c in self.server.calls], ["PATCH", "POST"])
+
+    def test_generate_all_outputs_uploads_in_background(self):
+        """generate_all_outputs 上傳 Gist 並在摘要附上連結"""
+        data = {
+            "timestamp": "2026-02-10T15:00:00Z",
+            "keywords": ["內湖"],
+            "stats": {"total_searched": 1, "valid_count": 1},
+            "analyzed_posts": [{
+                "id": "p1", "content": "內容", "link": "https://www.threads.net/@u/post/1",
+                "analysis": {"categories": ["交通"], "importance": 5, "summary": "摘要"},
+            }],
+        }
+        outputs = generate_all_outputs(data, reports_dir=self.tmpdir, upload_gist=True)
+        self.assertEqual(outputs["gist_url"], "https://gist.example/g1")
+        self.assertIn("https://gist.example/g1", outputs["line_summary"])
+        self.assertIn("https://gist.example/g1", outputs["line_messages"][-1])
+        self.assertIn("https://gist.example/g1", outputs["telegram_messages"][-1])
+        self.assertTrue(os.path.exists(self.cache_path))
+
+        # 同內容再次產生（生成時間不同）沿用既有 Gist
+        outputs = generate_all_outputs({**data, "timestamp": "2026-02-10T16:00:00Z"},
+                                       reports_dir=self.tmpdir, upload_gist=True)
+        self.assertEqual(outputs["gist_url"], "https://gist.example/g1")
+        self.assertEqual(len(self.server.calls), 1)
+
+    def test_generate_all_outputs_slow_upload_returns_without_link(self):
+        """上傳逾時時不附連結直接回傳，上傳仍在背景完成並寫入快取"""
+        data = {
+            "timestamp": "2026-02-10T15:00:00Z",
+            "keywords": ["內湖"],
+            "stats": {"total_searched": 1, "valid_count": 1},
+            "analyzed_posts": [{
+                "id": "p1", "content": "內容", "link": "https://www.threads.net/@u/post/1",
+                "analysis": {"categories": ["交通"], "importance": 5, "summary": "摘要"},
+            }],
+        }
+        self.server.delay = 0.5
+        with patch("report_generator.GIST_WAIT_SECONDS", 0.05):
+            outputs = generate_all_outputs(data, reports_dir=self.tmpdir, upload_gist=True)
+        self.assertIsNone(outputs["gist_url"])
+        self.assertNotIn("gist.example", outputs["line_messages"][-1])
+
+        deadline = time.monotonic() + 5
+        while not os.path.exists(self.cache_path) and time.monotonic() < deadline:
+            time.sleep(0.05)
+        self.assertTrue(os.path.exists(self.cache_path))
+
 
 if __name__ == '__main__':
     unittest.main()
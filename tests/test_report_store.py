@@ -0,0 +1,104 @@
+import os
+import sys
+import tempfile
+import shutil
+import threading
+import time
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from report_store import ReportStore, INDEX_FILENAME
+
+
+class TestReportStore(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_same_second_runs_do_not_collide(self):
+        """同一秒內不同 run 的報告不會互相覆蓋"""
+        store = ReportStore(self.tmpdir)
+        ts = "2026-02-10T15:30:00Z"
+        a = store.save("# A", run_id="run-a", timestamp=ts)
+        b = store.save("# B", run_id="run-b", timestamp=ts)
+        self.assertNotEqual(a, b)
+        self.assertEqual(store.load(os.path.basename(a)), "# A")
+        self.assertEqual(store.load(os.path.basename(b)), "# B")
+
+    def test_atomic_write_leaves_no_temp_files(self):
+        """寫入後目錄中沒有暫存檔"""
+        ReportStore(self.tmpdir).save("# Report", run_id="r1")
+        leftovers = [n for n in os.listdir(self.tmpdir) if n.startswith(".tmp_")]
+        self.assertEqual(leftovers, [])
+
+    def test_gzip_roundtrip(self):
+        """gzip 壓縮的報告可正確讀回"""
+        store = ReportStore(self.tmpdir, compression="gzip")
+        content = "# 戰報\n" + "內容" * 1000
+        path = store.save(content, run_id="r1")
+        self.assertTrue(path.endswith(".md.gz"))
+        self.assertLess(os.path.getsize(path), len(content.encode("utf-8")))
+        self.assertEqual(store.load(os.path.basename(path)), content)
+
+    def test_index_lists_newest_first(self):
+        """索引列出所有報告，最新在前，含關鍵字"""
+        store = ReportStore(self.tmpdir)
+        store.save("# 1", run_id="r1", keywords=["內湖"])
+        store.save("# 2", run_id="r2", keywords=["南港"])
+        reports = store.list_reports()
+        self.assertEqual([r["run_id"] for r in reports], ["r2", "r1"])
+        self.assertEqual(reports[0]["keywords"], ["南港"])
+        self.assertTrue(os.path.exists(os.path.join(self.tmpdir, INDEX_FILENAME)))
+
+    def test_evict_by_total_size(self):
+        """超過總大小上限時由舊到新刪除"""
+        store = ReportStore(self.tmpdir, max_total_bytes=250, max_age_days=None)
+        paths = [store.save("x" * 100, run_id=f"r{i}") for i in range(4)]
+        self.assertFalse(os.path.exists(paths[0]))
+        self.assertFalse(os.path.exists(paths[1]))
+        self.assertTrue(os.path.exists(paths[3]))
+        self.assertEqual([r["run_id"] for r in store.list_reports()], ["r3", "r2"])
+
+    def test_evict_by_age(self):
+        """超過保存天數的報告被清理"""
+        store = ReportStore(self.tmpdir, max_age_days=1, max_total_bytes=None)
+        old = store.save("# old", run_id="old")
+        past = time.time() - 3 * 86400
+        os.utime(old, (past, past))
+        os.unlink(os.path.join(self.tmpdir, INDEX_FILENAME))  # 由目錄重建（使用 mtime）
+        self.assertEqual(store.evict(), [os.path.basename(old)])
+        self.assertFalse(os.path.exists(old))
+
+    def test_concurrent_saves_keep_all_index_entries(self):
+        """多個執行緒同時儲存時索引不會遺失紀錄"""
+        store = ReportStore(self.tmpdir)
+        threads = [
+            threading.Thread(target=store.save, args=(f"# {i}",), kwargs={"run_id": f"r{i}"})
+            for i in range(20)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(len(store.list_reports()), 20)
+
+    def test_rebuild_index(self):
+        """索引遺失時可由目錄重建"""
+        store = ReportStore(self.tmpdir)
+        store.save("# 1", run_id="r1")
+        os.unlink(os.path.join(self.tmpdir, INDEX_FILENAME))
+        self.assertEqual(store.rebuild_index(), 1)
+        self.assertEqual(store.list_reports()[0]["run_id"], "r1")
+
+    def test_load_rejects_path_traversal(self):
+        """讀取時拒絕含路徑的檔名"""
+        with self.assertRaises(ValueError):
+            ReportStore(self.tmpdir).load("../secrets.md")
+
+
+if __name__ == '__main__':
+    unittest.main()
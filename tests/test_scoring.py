@@ -9,6 +9,7 @@ from scoring import (
     load_scoring_config,
     apply_scoring_bonus,
     apply_scoring_to_posts,
+    score_batch,
     DEFAULT_SCORING_CONFIG_PATH,
 )
 
@@ -40,6 +41,19 @@ class TestLoadScoringConfig(unittest.TestCase):
         self.assertEqual(config["bonus_rules"], [])
         self.assertEqual(config["max_score"], 15)
 
+    def test_load_normalization_options(self):
+        """scoring.yml 的 normalize_text / fold_script 會傳給評分"""
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.yml', delete=False, encoding='utf-8') as f:
+            f.write("bonus_rules:\n  - name: 交通\n    keywords: [\"交通\"]\n    bonus: 2\n"
+                    "normalize_text: true\nfold_script: true\n")
+        self.addCleanup(os.unlink, f.name)
+        config = load_scoring_config(f.name)
+        self.assertTrue(config["normalize_text"])
+        self.assertTrue(config["fold_script"])
+        post = {"content": "今天 交 通 很亂", "analysis": {"importance": 5, "summary": ""}}
+        self.assertEqual(apply_scoring_to_posts([post], config)[0]["analysis"]["adjusted_importance"], 7)
+        self.assertFalse(load_scoring_config("/nonexistent/path/scoring.yml")["normalize_text"])
+
     def test_config_rule_structure(self):
         """測試每條規則都有 name, keywords, bonus"""
         config = load_scoring_config()
@@ -274,5 +288,54 @@ class TestApplyScoringToPosts(unittest.TestCase):
             )
 
 
+
+class TestScoreBatch(unittest.TestCase):
+
+    def setUp(self):
+        self.config = load_scoring_config()
+        contents = ["馬路坑洞", "議員質詢交通", "颱風停電", "今天天氣很好", "立委說淹水"]
+        self.posts = [
+            {"id": str(i), "content": content,
+             "analysis": {"importance": importance, "summary": "摘要"}}
+            for i, (content, importance) in enumerate(zip(contents, [5, 9.5, 14, 3, 1]))
+        ]
+
+    def test_batch_matches_single_post_scoring(self):
+        """批次結果與逐篇 apply_scoring_bonus 完全相同（含型別）"""
+        expected = [apply_scoring_bonus(p, self.config) for p in self.posts]
+        self.assertEqual(apply_scoring_to_posts(self.posts, self.config), expected)
+        for post, want in zip(apply_scoring_to_posts(self.posts, self.config), expected):
+            self.assertIs(type(post["analysis"]["adjusted_importance"]),
+                          type(want["analysis"]["adjusted_importance"]))
+
+    def test_rule_hit_counts(self):
+        """每條規則的命中篇數"""
+        config = {"bonus_rules": [
+            {"name": "交通", "keywords": ["馬路", "交通"], "bonus": 2},
+            {"name": "民代", "keywords": ["議員", "立委"], "bonus": 1},
+        ], "max_score": 10}
+        scores = score_batch(self.posts, config)
+        self.assertEqual(scores.rule_hit_counts(), [2, 2])
+        self.assertEqual(scores.hits[1], [0, 1])
+        self.assertEqual(scores.adjusted[1], 10)  # 9.5 + 3 受 max_score 限制
+        self.assertEqual(scores.bonus_detail(0), [{"rule_name": "交通", "bonus": 2}])
+
+    def test_normalized_matching(self):
+        """啟用 normalize_text 時，空白與簡體變體也能命中，批次與逐篇結果相同"""
+        config = {"bonus_rules": [
+            {"name": "交通", "keywords": ["塞車"], "bonus": 2},
+        ], "max_score": 10, "normalize_text": True, "fold_script": True}
+        posts = [
+            {"content": "下班 塞 車 好嚴重", "analysis": {"importance": 3, "summary": ""}},
+            {"content": "又在塞车了", "analysis": {"importance": 3, "summary": ""}},
+            {"content": "今天很順", "analysis": {"importance": 3, "summary": "塞"}},
+        ]
+        scores = score_batch(posts, config)
+        self.assertEqual(scores.adjusted, [5, 5, 3])
+        self.assertEqual(apply_scoring_to_posts(posts, config),
+                         [apply_scoring_bonus(p, config) for p in posts])
+        self.assertEqual(score_batch(posts, dict(config, normalize_text=False)).adjusted, [3, 3, 3])
+
+
 if __name__ == '__main__':
     unittest.main()
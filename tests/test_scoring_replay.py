@@ -0,0 +1,100 @@
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from scoring_replay import extract_posts, format_summary, iter_stored_runs, replay, replay_run
+
+
+def _post(post_id, content, importance, categories=None):
+    return {
+        "id": post_id,
+        "content": content,
+        "link": f"https://threads.net/{post_id}",
+        "analysis": {"categories": categories or ["民生"], "importance": importance,
+                     "summary": f"摘要 {post_id}"},
+    }
+
+
+BASELINE = {"bonus_rules": [
+    {"name": "交通", "keywords": ["馬路"], "bonus": 2},
+], "max_score": 15}
+
+CANDIDATE = {"bonus_rules": [
+    {"name": "交通", "keywords": ["馬路"], "bonus": 1},
+    {"name": "災害", "keywords": ["淹水"], "bonus": 3},
+], "max_score": 15}
+
+
+class TestScoringReplay(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmpdir.name, "runs.db")
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("CREATE TABLE runs (id TEXT PRIMARY KEY, created_at TIMESTAMP, result_json TEXT)")
+        runs = [
+            ("run-1", "2026-01-01 10:00:00", {"analyzed_posts": [
+                _post("a", "馬路坑洞", 7),     # 基準 9 → 候選 8：不再是大魚
+                _post("b", "淹水了", 6),       # 基準 6 → 候選 9：新成為大魚
+            ]}),
+            ("run-2", "2026-02-01 10:00:00", [_post("c", "馬路淹水", 9)]),
+            ("run-3", "2026-03-01 10:00:00", None),
+        ]
+        for run_id, created_at, result in runs:
+            conn.execute("INSERT INTO runs VALUES (?, ?, ?)",
+                         (run_id, created_at, json.dumps(result) if result else None))
+        conn.commit()
+        conn.close()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_iter_stored_runs_skips_empty_and_filters_since(self):
+        """只讀取有結果的 run，並支援 since 篩選"""
+        self.assertEqual([r[0] for r in iter_stored_runs(self.db_path)], ["run-1", "run-2"])
+        self.assertEqual([r[0] for r in iter_stored_runs(self.db_path, since="2026-01-15")],
+                         ["run-2"])
+
+    def test_extract_posts_formats(self):
+        """result_json 可為 list 或 dict，無效內容回傳空列表"""
+        self.assertEqual(len(extract_posts(json.dumps([_post("x", "", 1)]))), 1)
+        self.assertEqual(extract_posts("not json"), [])
+        self.assertEqual(extract_posts(json.dumps({"other": 1})), [])
+
+    def test_replay_run_diff(self):
+        """回放單一 run 得到新增/移除的大魚與規則觸發數"""
+        _, created_at, result_json = next(iter_stored_runs(self.db_path))
+        diff = replay_run("run-1", created_at, result_json, BASELINE, CANDIDATE)
+        self.assertEqual([e["post_id"] for e in diff.added], ["b"])
+        self.assertEqual([e["post_id"] for e in diff.removed], ["a"])
+        self.assertEqual(diff.removed[0]["baseline_score"], 9)
+        self.assertEqual(diff.removed[0]["candidate_score"], 8)
+        self.assertEqual(diff.candidate_rule_hits, {"交通": 1, "災害": 1})
+
+    def test_replay_summary_sequential_and_parallel(self):
+        """單一 process 與多 process 回放結果相同"""
+        sequential = replay(CANDIDATE, BASELINE, db_path=self.db_path, workers=1)
+        parallel = replay(CANDIDATE, BASELINE, db_path=self.db_path, workers=2, chunksize=1)
+        self.assertEqual(sequential.to_dict(), parallel.to_dict())
+        self.assertEqual(sequential.runs, 2)
+        self.assertEqual(sequential.posts, 3)
+        self.assertEqual(sequential.baseline_big_fish, 2)
+        self.assertEqual(sequential.candidate_big_fish, 2)
+        rates = {r["rule_name"]: r for r in sequential.rule_rates()}
+        self.assertEqual(rates["災害"]["baseline_hits"], 0)
+        self.assertEqual(rates["災害"]["candidate_hits"], 2)
+        self.assertIn("新成為大魚", format_summary(sequential))
+
+    def test_missing_db_raises(self):
+        """資料庫不存在時拋出 FileNotFoundError"""
+        with self.assertRaises(FileNotFoundError):
+            replay(CANDIDATE, BASELINE, db_path=os.path.join(self.tmpdir.name, "none.db"))
+
+
+if __name__ == '__main__':
+    unittest.main()
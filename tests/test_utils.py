@@ -0,0 +1,80 @@
+import os
+import sys
+import unittest
+
+_PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, _PROJECT_ROOT)
+sys.path.insert(0, os.path.join(_PROJECT_ROOT, 'src'))
+
+from web.backend.models import PROGRESS_MESSAGE_TYPES, ProgressMessage, RunStatus
+from web.backend.utils import build_run_record, progress_payload, run_record_dict
+
+RUN = {
+    "id": "3f0c2a64-1f3e-4c55-9a0b-7d1d2b0c9e11",
+    "status": "completed",
+    "keywords": ["內湖", "南港"],
+    "created_at": "2026-02-10 15:30:00",
+    "completed_at": "2026-02-10T15:42:17.123456+00:00",
+    "report_markdown": "# Threads 輿情戰報\n內容",
+    "stats": {"total_searched": 120, "valid_count": 42},
+    "error_message": None,
+}
+
+
+class TestRunRecordDict(unittest.TestCase):
+    """run_record_dict 與 build_run_record(...).model_dump(mode="json") 輸出相同"""
+
+    def assertSameAsModel(self, row):
+        self.assertEqual(run_record_dict(row), build_run_record(row).model_dump(mode="json"))
+
+    def test_timestamp_shapes(self):
+        for created_at in ("2026-02-10 15:30:00", "2026-02-10T15:30:00",
+                           "2026-02-10T15:30:00.000001", "2026-02-10T15:30:00+00:00",
+                           "2026-02-10T15:30:00.123456Z"):
+            for completed_at in (None, created_at):
+                with self.subTest(created_at=created_at, completed_at=completed_at):
+                    self.assertSameAsModel({**RUN, "created_at": created_at,
+                                            "completed_at": completed_at})
+
+    def test_statuses_and_optional_fields(self):
+        for status in RunStatus:
+            with self.subTest(status=status.value):
+                self.assertSameAsModel({**RUN, "status": status.value, "stats": None,
+                                        "report_markdown": None,
+                                        "error_message": "失敗" if status.value == "failed" else None})
+
+    def test_missing_fields_use_defaults(self):
+        self.assertSameAsModel({"id": RUN["id"], "created_at": RUN["created_at"]})
+
+    def test_untrusted_rows_fall_back_to_model(self):
+        for row in ({**RUN, "created_at": "2026-02-10T15:30:00+08:00"},
+                    {**RUN, "completed_at": "2026-02-10"},
+                    {**RUN, "keywords": ("內湖",)}):
+            with self.subTest(row=row):
+                self.assertSameAsModel(row)
+
+
+class TestProgressPayload(unittest.TestCase):
+    """progress_payload 與 ProgressMessage(...).model_dump() 輸出相同"""
+
+    def test_known_types(self):
+        for msg_type in sorted(PROGRESS_MESSAGE_TYPES):
+            for event_id in (None, 0, 7):
+                message = {"type": msg_type, "data": {"keyword": "內湖", "index": 1,
+                                                      "nested": {"a": [1, 2]}}}
+                with self.subTest(type=msg_type, id=event_id):
+                    self.assertEqual(progress_payload(message, event_id),
+                                     ProgressMessage(**message, id=event_id).model_dump())
+
+    def test_missing_data(self):
+        message = {"type": "completed"}
+        self.assertEqual(progress_payload(message, 3),
+                         ProgressMessage(**message, id=3).model_dump())
+
+    def test_invalid_message_passed_through(self):
+        message = {"type": "unknown", "data": {"x": 1}}
+        self.assertEqual(progress_payload(message, 1), {**message, "id": 1})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -11,11 +11,19 @@ PROJECT_ROOT = os.path.dirname(
 # Database
 DB_PATH = os.path.join(PROJECT_ROOT, "data", "runs.db")
 
+# Report files (written by report_generator.save_report via ReportStore)
+REPORTS_DIR = os.path.join(PROJECT_ROOT, "data", "reports")
+
 # Add src/ to sys.path so we can import report_generator, pipeline, etc.
 SRC_DIR = os.path.join(PROJECT_ROOT, "src")
 if SRC_DIR not in sys.path:
     sys.path.append(SRC_DIR)
 
+# Response compression: bodies smaller than this are sent uncompressed.
+# Level 6 keeps CPU cost reasonable on multi-megabyte report payloads.
+COMPRESSION_MIN_SIZE = int(os.environ.get("COMPRESSION_MIN_SIZE", "1024"))
+COMPRESSION_LEVEL = int(os.environ.get("COMPRESSION_LEVEL", "6"))
+
 # CORS -- read from environment, default to localhost dev servers
 ALLOWED_ORIGINS = os.environ.get(
     "CORS_ALLOWED_ORIGINS", "http://localhost:5173,http://localhost:3000"
@@ -10,8 +10,19 @@ from datetime import datetime
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 
-from web.backend.config import ALLOWED_ORIGINS, PROJECT_ROOT
+from web.backend.config import (
+    ALLOWED_ORIGINS,
+    COMPRESSION_LEVEL,
+    COMPRESSION_MIN_SIZE,
+    PROJECT_ROOT,
+)
+
+try:
+    from brotli_asgi import BrotliMiddleware
+except ImportError:
+    BrotliMiddleware = None
 
 logger = logging.getLogger(__name__)
 
@@ -43,6 +54,22 @@ app.add_middleware(
     allow_headers=["Content-Type"],
 )
 
+# Response compression -- Brotli when brotli-asgi is installed (falls back to
+# gzip for clients that do not accept br), plain gzip otherwise.
+if BrotliMiddleware is not None:
+    app.add_middleware(
+        BrotliMiddleware,
+        quality=4,
+        minimum_size=COMPRESSION_MIN_SIZE,
+        gzip_fallback=True,
+    )
+else:
+    app.add_middleware(
+        GZipMiddleware,
+        minimum_size=COMPRESSION_MIN_SIZE,
+        compresslevel=COMPRESSION_LEVEL,
+    )
+
 
 # --- Health Check ---
 
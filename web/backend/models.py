@@ -3,7 +3,7 @@
 import enum
 import re
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, TypedDict
 
 from pydantic import BaseModel, Field, field_validator
 
@@ -24,6 +24,10 @@ class MonitorRequest(BaseModel):
         max_length=10,
         description="Keywords to monitor (1-10 items)",
     )
+    parallel: bool = Field(
+        False,
+        description="Run one agent per keyword concurrently and merge the results",
+    )
 
     @field_validator("keywords")
     @classmethod
@@ -64,18 +68,40 @@ class RunStatus(str, enum.Enum):
     FAILED = "failed"
 
 
+PROGRESS_MESSAGE_TYPES = frozenset(
+    ("status", "keyword_progress", "pipeline_stats", "big_fish", "completed", "error")
+)
+
+
 class ProgressMessage(BaseModel):
-    """WebSocket progress message sent during a monitoring run."""
+    """Progress message sent during a monitoring run (WebSocket, SSE, long-poll)."""
 
     type: str = Field(
         ...,
-        pattern=r"^(status|keyword_progress|pipeline_stats|completed|error)$",
+        pattern=rf"^({'|'.join(sorted(PROGRESS_MESSAGE_TYPES))})$",
         description="Message type",
     )
     data: Dict[str, Any] = Field(
         default_factory=dict,
         description="Payload data for this progress update",
     )
+    id: Optional[int] = Field(
+        None, description="Event ID within the run, usable as a resume cursor"
+    )
+
+
+class ProgressEventsResponse(BaseModel):
+    """Long-poll response: progress events newer than the requested cursor."""
+
+    events: List[ProgressMessage] = Field(
+        default_factory=list, description="Events in order, each with its id"
+    )
+    last_event_id: int = Field(
+        ..., description="Cursor to pass as ?after= on the next poll"
+    )
+    done: bool = Field(
+        ..., description="True once the run has sent its completed/error event"
+    )
 
 
 class RunRecord(BaseModel):
@@ -99,6 +125,24 @@ class RunRecord(BaseModel):
     )
 
 
+class RunRecordDict(TypedDict):
+    """
+    JSON-ready RunRecord, as produced by ``RunRecord.model_dump(mode="json")``.
+
+    Used by the trusted fast path for rows the backend wrote itself
+    (see ``utils.run_record_dict``).
+    """
+
+    id: str
+    status: str
+    keywords: List[str]
+    created_at: str
+    completed_at: Optional[str]
+    report_markdown: Optional[str]
+    stats: Optional[Dict[str, Any]]
+    error_message: Optional[str]
+
+
 class RunListResponse(BaseModel):
     """Paginated list of monitoring run records."""
 
@@ -115,9 +159,21 @@ class ReportResponse(BaseModel):
     analyzed_posts: Optional[List[Dict[str, Any]]] = Field(
         None, description="List of analyzed posts with AI annotations"
     )
-    big_fish: Optional[List[Dict[str, Any]]] = Field(
-        None, description="High-importance posts flagged as big fish"
+    big_fish_ids: Optional[List[str]] = Field(
+        None, description="IDs of analyzed posts flagged as big fish"
     )
     category_stats: Optional[List[Dict[str, Any]]] = Field(
         None, description="Statistics per category"
     )
+
+
+class StoredReportFile(BaseModel):
+    """A report file recorded in the report store index."""
+
+    filename: str = Field(..., description="Report file name inside data/reports")
+    run_id: Optional[str] = Field(None, description="Run that produced the report")
+    timestamp: str = Field(..., description="Report timestamp (ISO 8601)")
+    created_at: float = Field(..., description="When the file was written (epoch seconds)")
+    size: int = Field(..., ge=0, description="File size in bytes")
+    compression: Optional[str] = Field(None, description="None, 'gzip' or 'zstd'")
+    keywords: List[str] = Field(default_factory=list, description="Keywords monitored")
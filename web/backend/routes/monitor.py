@@ -1,36 +1,57 @@
 """
 FastAPI routes for monitoring operations.
 
-Provides endpoints to start new monitoring runs and stream progress via WebSocket.
+Provides endpoints to start new monitoring runs and follow their progress
+via WebSocket, Server-Sent Events, or long-polling. All three read the same
+replayable per-run progress log, so clients can disconnect and resume from
+the last event ID they saw without affecting the run.
 """
 
 import asyncio
 import logging
 import uuid
+from collections.abc import AsyncIterator
 
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+from fastapi import APIRouter, Header, HTTPException, Query, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
 from starlette.websockets import WebSocketState
 
 from web.backend.config import DB_PATH
-from web.backend.models import MonitorRequest, MonitorResponse, ProgressMessage
+from web.backend.models import (
+    MonitorRequest,
+    MonitorResponse,
+    ProgressEventsResponse,
+)
+from web.backend.services.progress_hub import ProgressLog, active_run_count, progress_logs
 from web.backend.services.run_history import RunHistoryManager
-from web.backend.utils import validate_run_id
+from web.backend.utils import progress_payload, validate_run_id
+
+import fast_json
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/monitor", tags=["monitor"])
 
-# Module-level shared state: run_id -> asyncio.Queue[ProgressMessage dict]
-active_monitors: dict[str, asyncio.Queue] = {}
-
 MAX_CONCURRENT_RUNS = 5
 
+# Idle interval before a heartbeat is sent on WebSocket / SSE streams.
+# Heartbeats are never written to the ProgressLog, so replays don't include them.
+HEARTBEAT_SECONDS = 15.0
+# WebSocket heartbeat frame; clients drop it instead of treating it as progress
+HEARTBEAT_MESSAGE = {"type": "ping"}
+
+# Upper bound for a single long-poll request
+MAX_POLL_SECONDS = 30.0
+
+# How long a finished run's progress log stays available for late clients
+LOG_RETENTION_SECONDS = 300
+
 
 @router.post("/start", response_model=MonitorResponse)
 async def start_monitor(request: MonitorRequest) -> MonitorResponse:
     """Start a new monitoring run and return run_id immediately."""
     # Enforce concurrent run limit
-    if len(active_monitors) >= MAX_CONCURRENT_RUNS:
+    if active_run_count() >= MAX_CONCURRENT_RUNS:
         return MonitorResponse(
             run_id="",
             status="failed",
@@ -58,14 +79,19 @@ async def start_monitor(request: MonitorRequest) -> MonitorResponse:
             message="Internal server error. Please try again later.",
         )
 
-    # Create the progress queue for this run
-    queue: asyncio.Queue = asyncio.Queue()
-    active_monitors[run_id] = queue
+    # Create the progress log for this run (queue-compatible put())
+    progress_log = ProgressLog()
+    progress_logs[run_id] = progress_log
 
     # Launch background task
-    asyncio.create_task(_run_monitor_background(run_id, keywords, queue))
+    asyncio.create_task(
+        _run_monitor_background(run_id, keywords, progress_log, parallel=request.parallel)
+    )
 
-    logger.info("Monitor started: run_id=%s, keyword_count=%d", run_id, len(keywords))
+    logger.info(
+        "Monitor started: run_id=%s, keyword_count=%d, parallel=%s",
+        run_id, len(keywords), request.parallel,
+    )
 
     return MonitorResponse(
         run_id=run_id,
@@ -77,13 +103,14 @@ async def start_monitor(request: MonitorRequest) -> MonitorResponse:
 async def _run_monitor_background(
     run_id: str,
     keywords: list[str],
-    queue: asyncio.Queue,
+    queue: ProgressLog,
+    parallel: bool = False,
 ) -> None:
-    """Background task: run the monitor and push progress to the queue."""
+    """Background task: run the monitor and append progress to the run's log."""
     try:
         from web.backend.services import monitor_service
 
-        await monitor_service.run_monitor(run_id, keywords, queue)
+        await monitor_service.run_monitor(run_id, keywords, queue, parallel=parallel)
     except ImportError:
         logger.warning(
             "monitor_service not available; sending placeholder completion for %s",
@@ -98,14 +125,138 @@ async def _run_monitor_background(
             {"type": "error", "data": {"message": "Monitoring failed unexpectedly."}}
         )
     finally:
-        # Grace period for late WebSocket connections, then clean up
-        await asyncio.sleep(300)
-        active_monitors.pop(run_id, None)
+        # Keep the log replayable for late or reconnecting clients, then clean up
+        await asyncio.sleep(LOG_RETENTION_SECONDS)
+        progress_logs.pop(run_id, None)
+
+
+def _get_progress_log(run_id: str) -> ProgressLog:
+    """
+    Look up the progress log for a run.
+
+    Raises:
+        HTTPException 404: If the run is unknown or its log has expired.
+        HTTPException 500: If the run lookup fails.
+    """
+    progress_log = progress_logs.get(run_id)
+    if progress_log is not None:
+        return progress_log
+
+    try:
+        run = RunHistoryManager(db_path=DB_PATH).get_run(run_id)
+    except Exception as e:
+        logger.error("Database error checking run %s: %s", run_id, e)
+        raise HTTPException(status_code=500, detail="Database error") from e
+
+    if run is None:
+        raise HTTPException(status_code=404, detail="Run not found")
+    raise HTTPException(status_code=404, detail="No active monitor for this run")
+
+
+@router.get("/{run_id}/events", response_model=ProgressEventsResponse)
+async def poll_progress_events(
+    run_id: str,
+    after: int = Query(0, ge=0, description="Return events with an ID greater than this"),
+    timeout: float = Query(
+        25.0, ge=0, le=MAX_POLL_SECONDS, description="Seconds to wait for new events"
+    ),
+) -> ProgressEventsResponse:
+    """
+    Long-poll for progress events newer than ``after``.
+
+    Returns as soon as at least one new event exists, or with an empty list
+    after ``timeout`` seconds. Pass the returned ``last_event_id`` as the
+    next ``after``; stop polling once ``done`` is true.
+
+    Raises:
+        HTTPException 400: If run_id is not a valid UUID.
+        HTTPException 404: If the run does not exist or its log has expired.
+    """
+    validate_run_id(run_id)
+    progress_log = _get_progress_log(run_id)
+
+    events = await progress_log.wait_for(after, timeout=timeout)
+    payloads = [progress_payload(message, event_id) for event_id, message in events]
+    last_event_id = events[-1][0] if events else max(after, 0)
+    return ProgressEventsResponse(
+        events=payloads,
+        last_event_id=last_event_id,
+        done=progress_log.closed and last_event_id >= progress_log.last_id,
+    )
+
+
+@router.get(
+    "/{run_id}/stream",
+    response_class=StreamingResponse,
+    responses={200: {"content": {"text/event-stream": {}}}},
+)
+async def stream_progress_events(
+    run_id: str,
+    after: int = Query(0, ge=0, description="Resume after this event ID"),
+    last_event_id: str | None = Header(None, alias="Last-Event-ID"),
+) -> StreamingResponse:
+    """
+    Stream progress as Server-Sent Events.
+
+    Each event carries its ID, so ``EventSource`` resumes automatically via
+    the ``Last-Event-ID`` header after a dropped connection; ``?after=`` does
+    the same for clients that manage the cursor themselves. The stream ends
+    after the 'completed' or 'error' event.
+
+    Raises:
+        HTTPException 400: If run_id is not a valid UUID.
+        HTTPException 404: If the run does not exist or its log has expired.
+    """
+    validate_run_id(run_id)
+    progress_log = _get_progress_log(run_id)
+
+    cursor = after
+    if last_event_id and last_event_id.strip().isdigit():
+        cursor = max(cursor, int(last_event_id.strip()))
+
+    return StreamingResponse(
+        _sse_events(progress_log, cursor),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            # Stop proxies (and the compression middleware, which skips
+            # responses that already declare an encoding) from buffering.
+            "Content-Encoding": "identity",
+            "X-Accel-Buffering": "no",
+        },
+    )
+
+
+async def _sse_events(progress_log: ProgressLog, cursor: int) -> AsyncIterator[bytes]:
+    """Yield SSE frames from the log, with comment heartbeats while idle."""
+    yield f"retry: {int(HEARTBEAT_SECONDS * 1000)}\n\n".encode()
+    while True:
+        events = await progress_log.wait_for(cursor, timeout=HEARTBEAT_SECONDS)
+        if not events:
+            if progress_log.closed:
+                return
+            yield b": ping\n\n"
+            continue
+
+        for event_id, message in events:
+            payload = progress_payload(message, event_id)
+            yield (
+                f"id: {event_id}\nevent: {payload.get('type', 'message')}\n".encode()
+                + b"data: " + fast_json.dumps_bytes(payload) + b"\n\n"
+            )
+            cursor = event_id
+            if message.get("type") in ("completed", "error"):
+                return
 
 
 @router.websocket("/ws/{run_id}")
-async def monitor_websocket(websocket: WebSocket, run_id: str) -> None:
-    """Stream monitoring progress via WebSocket. Closes on 'completed' or 'error'."""
+async def monitor_websocket(websocket: WebSocket, run_id: str, after: int = 0) -> None:
+    """
+    Stream monitoring progress via WebSocket. Closes on 'completed' or 'error'.
+
+    Messages carry their event ID; reconnect with ``?after=<id>`` to resume.
+    Disconnecting does not affect the run or other clients.
+    """
     validate_run_id(run_id)
     await websocket.accept()
 
@@ -123,44 +274,42 @@ async def monitor_websocket(websocket: WebSocket, run_id: str) -> None:
         await websocket.close(code=4004, reason="Run not found")
         return
 
-    queue = active_monitors.get(run_id)
-    if queue is None:
+    progress_log = progress_logs.get(run_id)
+    if progress_log is None:
         logger.info("WebSocket: no active monitor for run %s (may be completed)", run_id)
         await websocket.close(
             code=4004, reason="No active monitor for this run"
         )
         return
 
-    logger.info("WebSocket connected for run %s", run_id)
+    logger.info("WebSocket connected for run %s (after=%d)", run_id, after)
 
+    cursor = max(after, 0)
     try:
         while True:
-            try:
-                message = await asyncio.wait_for(queue.get(), timeout=60.0)
-            except asyncio.TimeoutError:
+            events = await progress_log.wait_for(cursor, timeout=HEARTBEAT_SECONDS)
+            if not events:
+                if progress_log.closed:
+                    break
                 if websocket.client_state == WebSocketState.CONNECTED:
-                    await websocket.send_json(
-                        {"type": "status", "data": {"message": "waiting for progress..."}}
-                    )
+                    await websocket.send_json(HEARTBEAT_MESSAGE)
                 continue
 
-            try:
-                progress = ProgressMessage(**message)
-            except Exception:
-                progress = None
-
-            payload = progress.model_dump() if progress else message
-
-            if websocket.client_state == WebSocketState.CONNECTED:
-                await websocket.send_json(payload)
-
-            msg_type = message.get("type", "")
-            if msg_type in ("completed", "error"):
-                logger.info(
-                    "WebSocket: terminal message received for run %s (type=%s)",
-                    run_id,
-                    msg_type,
-                )
+            terminal = False
+            for event_id, message in events:
+                if websocket.client_state == WebSocketState.CONNECTED:
+                    await websocket.send_json(progress_payload(message, event_id))
+                cursor = event_id
+                msg_type = message.get("type", "")
+                if msg_type in ("completed", "error"):
+                    logger.info(
+                        "WebSocket: terminal message received for run %s (type=%s)",
+                        run_id,
+                        msg_type,
+                    )
+                    terminal = True
+                    break
+            if terminal:
                 break
 
     except WebSocketDisconnect:
@@ -168,8 +317,6 @@ async def monitor_websocket(websocket: WebSocket, run_id: str) -> None:
     except Exception as e:
         logger.error("WebSocket error for run %s: %s", run_id, e)
     finally:
-        active_monitors.pop(run_id, None)
-
         if websocket.client_state == WebSocketState.CONNECTED:
             try:
                 await websocket.close()
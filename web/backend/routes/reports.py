@@ -4,37 +4,119 @@ FastAPI routes for report retrieval.
 Provides endpoints to fetch detailed reports for completed monitoring runs.
 """
 
-import json
 import logging
+from collections.abc import Iterable, Iterator
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
 
-from web.backend.config import DB_PATH
-from web.backend.models import ReportResponse
+from web.backend.config import DB_PATH, REPORTS_DIR
+from web.backend.models import ReportResponse, StoredReportFile
+from web.backend.services.monitor_service import live_reports
 from web.backend.services.run_history import RunHistoryManager
-from web.backend.utils import build_run_record, validate_run_id
+from web.backend.utils import FastJSONResponse, run_record_dict, validate_run_id
 
-from report_generator import (
-    classify_posts_by_category,
-    compute_category_stats,
-    identify_big_fish,
-)
+import fast_json
+from report_generator import build_report_model
+from report_store import ReportStore
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/reports", tags=["reports"])
 
+# Top-level ReportResponse fields selectable via ?fields=
+REPORT_FIELDS = ("run", "analyzed_posts", "big_fish_ids", "category_stats")
+
+# Posts per chunk written to the NDJSON stream
+NDJSON_BATCH_SIZE = 200
+
+FIELDS_QUERY = Query(
+    None,
+    description="Comma-separated subset of: " + ", ".join(REPORT_FIELDS),
+)
+
+
+@router.get("", response_model=list[StoredReportFile], response_class=FastJSONResponse)
+async def list_report_files() -> list[StoredReportFile]:
+    """
+    List saved report files, newest first.
+
+    Served from the report store's index file, so no directory scan is
+    needed per request.
+
+    Raises:
+        HTTPException 500: If the index cannot be read.
+    """
+    try:
+        entries = ReportStore(REPORTS_DIR).list_reports()
+    except Exception as e:
+        logger.error("Failed to list report files: %s", e)
+        raise HTTPException(status_code=500, detail="Report index error") from e
+    return [StoredReportFile(**entry) for entry in entries]
+
 
-@router.get("/{run_id}", response_model=ReportResponse)
-async def get_report(run_id: str) -> ReportResponse:
+@router.get("/{run_id}", response_model=ReportResponse, response_class=FastJSONResponse)
+async def get_report(run_id: str, fields: str | None = FIELDS_QUERY) -> FastJSONResponse:
     """
     Retrieve the detailed report for a specific monitoring run.
 
+    Big fish are returned as post IDs referencing ``analyzed_posts`` rather
+    than embedded a second time. Use ``?fields=`` to fetch only part of the
+    payload, e.g. ``?fields=run,big_fish_ids,category_stats`` followed by
+    ``GET /reports/{run_id}/posts`` to stream the posts.
+
     Args:
         run_id: The unique identifier of the monitoring run.
+        fields: Optional comma-separated list of top-level fields to include.
 
     Returns:
-        ReportResponse with run record, analyzed posts, big fish, and category stats.
+        ReportResponse with run record, analyzed posts, big fish IDs, and category stats.
+
+    Raises:
+        HTTPException 400: If run_id is not a valid UUID or fields is invalid.
+        HTTPException 404: If the run_id does not exist.
+        HTTPException 500: If an unexpected error occurs.
+    """
+    validate_run_id(run_id)
+    selected = _parse_fields(fields)
+
+    run_data = _get_run_or_404(run_id)
+    run_record = run_record_dict(run_data) if "run" in selected else None
+
+    analyzed_posts = None
+    big_fish_ids = None
+    category_stats = None
+
+    if selected - {"run"}:
+        analyzed_posts = _parse_result_json(run_data.get("result_json"))
+
+    if analyzed_posts and selected & {"big_fish_ids", "category_stats"}:
+        try:
+            model = build_report_model({"analyzed_posts": analyzed_posts})
+            big_fish_ids = model.big_fish_ids()
+            category_stats = model.category_stats
+        except Exception as e:
+            logger.warning(
+                "Failed to compute report analytics for run %s: %s", run_id, e
+            )
+
+    return _report_response(
+        selected, run_record, analyzed_posts, big_fish_ids, category_stats
+    )
+
+
+@router.get(
+    "/{run_id}/posts",
+    response_class=StreamingResponse,
+    responses={200: {"content": {"application/x-ndjson": {}}}},
+)
+async def stream_report_posts(run_id: str) -> StreamingResponse:
+    """
+    Stream the analyzed posts of a run as NDJSON, one post per line.
+
+    Lets the dashboard render posts as they arrive instead of waiting for
+    the whole report body. For runs still in progress, the posts received
+    so far are streamed.
 
     Raises:
         HTTPException 400: If run_id is not a valid UUID.
@@ -43,6 +125,53 @@ async def get_report(run_id: str) -> ReportResponse:
     """
     validate_run_id(run_id)
 
+    run_data = _get_run_or_404(run_id)
+    posts = _parse_result_json(run_data.get("result_json"))
+    if posts is None:
+        builder = live_reports.get(run_id)
+        posts = list(builder.model().posts) if builder is not None else []
+
+    return StreamingResponse(_ndjson_lines(posts), media_type="application/x-ndjson")
+
+
+@router.get("/{run_id}/partial", response_model=ReportResponse, response_class=FastJSONResponse)
+async def get_partial_report(
+    run_id: str, fields: str | None = FIELDS_QUERY
+) -> FastJSONResponse:
+    """
+    Retrieve the report built so far for a monitoring run still in progress.
+
+    Posts are accumulated as the agent streams them, so big fish and
+    category stats are available before the run completes.
+
+    Raises:
+        HTTPException 400: If run_id is not a valid UUID or fields is invalid.
+        HTTPException 404: If the run does not exist or is not in progress.
+        HTTPException 500: If an unexpected error occurs.
+    """
+    validate_run_id(run_id)
+    selected = _parse_fields(fields)
+
+    builder = live_reports.get(run_id)
+    if builder is None:
+        raise HTTPException(status_code=404, detail="No report in progress for this run")
+
+    run_data = _get_run_or_404(run_id)
+
+    model = builder.model()
+    run_record = None
+    if "run" in selected:
+        run_record = run_record_dict(
+            {**run_data, "report_markdown": builder.render_markdown()}
+        )
+
+    return _report_response(
+        selected, run_record, list(model.posts), model.big_fish_ids(), model.category_stats
+    )
+
+
+def _get_run_or_404(run_id: str) -> dict:
+    """Fetch a run row from history, mapping failures to HTTP errors."""
     try:
         history = RunHistoryManager(db_path=DB_PATH)
         run_data = history.get_run(run_id)
@@ -52,32 +181,62 @@ async def get_report(run_id: str) -> ReportResponse:
 
     if run_data is None:
         raise HTTPException(status_code=404, detail="Run not found")
+    return run_data
 
-    run_record = build_run_record(run_data)
 
-    analyzed_posts = _parse_result_json(run_data.get("result_json"))
+def _parse_fields(fields: str | None) -> set[str]:
+    """
+    Parse the ``fields`` query parameter into a set of field names.
 
-    big_fish = None
-    category_stats = None
+    Raises:
+        HTTPException 400: If an unknown field is requested.
+    """
+    if not fields:
+        return set(REPORT_FIELDS)
 
-    if analyzed_posts:
-        try:
-            big_fish = identify_big_fish(analyzed_posts)
-            categorized = classify_posts_by_category(analyzed_posts)
-            category_stats = compute_category_stats(categorized)
-        except Exception as e:
-            logger.warning(
-                "Failed to compute report analytics for run %s: %s", run_id, e
-            )
+    selected = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = selected - set(REPORT_FIELDS)
+    if unknown or not selected:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid fields; choose from: {', '.join(REPORT_FIELDS)}",
+        )
+    return selected
+
+
+def _report_response(
+    selected: set[str], run_record, analyzed_posts, big_fish_ids, category_stats
+) -> FastJSONResponse:
+    """
+    Serialize the selected ReportResponse fields directly.
 
-    return ReportResponse(
-        run=run_record,
-        analyzed_posts=analyzed_posts,
-        big_fish=big_fish,
-        category_stats=category_stats,
+    Everything here was written by the backend itself (posts straight from
+    the stored JSON, the run record via run_record_dict), so nothing is
+    re-validated through pydantic.
+    """
+    payload = {
+        "run": run_record,
+        "analyzed_posts": analyzed_posts,
+        "big_fish_ids": big_fish_ids,
+        "category_stats": category_stats,
+    }
+    return FastJSONResponse(
+        content={name: payload[name] for name in REPORT_FIELDS if name in selected}
     )
 
 
+def _ndjson_lines(posts: Iterable[dict]) -> Iterator[bytes]:
+    """Yield posts as NDJSON, batching lines to keep the chunk count low."""
+    batch: list[bytes] = []
+    for post in posts:
+        batch.append(fast_json.dumps_bytes(post))
+        if len(batch) >= NDJSON_BATCH_SIZE:
+            yield b"\n".join(batch) + b"\n"
+            batch = []
+    if batch:
+        yield b"\n".join(batch) + b"\n"
+
+
 def _parse_result_json(result_json_str: str | None) -> list[dict] | None:
     """
     Parse the result_json column into a list of analyzed post dicts.
@@ -92,8 +251,8 @@ def _parse_result_json(result_json_str: str | None) -> list[dict] | None:
         return None
 
     try:
-        parsed = json.loads(result_json_str)
-    except (json.JSONDecodeError, TypeError) as e:
+        parsed = fast_json.loads(result_json_str)
+    except (fast_json.JSONDecodeError, TypeError) as e:
         logger.warning("Failed to parse result_json: %s", e)
         return None
 
@@ -0,0 +1,206 @@
+"""
+Streaming extraction of the agent's result JSON from stdout.
+
+Used as the fallback when an agent does not write the structured event
+channel. Lines are fed one at a time; bracket nesting is tracked (string-
+and escape-aware) so each top-level JSON object is recognised in a single
+pass, and only objects that mention ``analyzed_posts`` are ever parsed.
+Buffered object text spills to a temporary file above a size threshold.
+"""
+
+import logging
+import re
+import tempfile
+from typing import List, Optional, Tuple
+
+from web.backend import config  # noqa: F401 -- puts src/ on sys.path
+
+import fast_json
+
+logger = logging.getLogger(__name__)
+
+RESULT_MARKER = '"analyzed_posts"'
+SPILL_THRESHOLD_BYTES = 1024 * 1024
+
+# Outside a string literal: a bracket or quote, or any character that can
+# never appear between JSON tokens (which makes the candidate invalid).
+_STRUCTURE_RE = re.compile(r'[{}\[\]"]|[^\s:,+\-.0-9eEtrufalsn]')
+# Inside a string literal: the characters that end or escape it
+_STRING_RE = re.compile(r'["\\]')
+
+_OPEN = 0       # the candidate continues on the next line
+_CLOSED = 1     # the top-level object ended on this line
+_INVALID = 2    # the candidate cannot be JSON
+
+_CLOSERS = {"}": "{", "]": "["}
+
+
+class StreamingJsonExtractor:
+    """
+    Incremental scanner that keeps the last JSON object containing
+    ``analyzed_posts`` seen on a line stream.
+
+    A candidate object starts at any ``{`` outside an open candidate, so
+    JSON printed after a prefix on the same line (``Result: {...}``) is
+    found too. A candidate is abandoned only when it cannot be JSON: a
+    character that is not valid between tokens, a mismatched bracket, or
+    a string literal left open at the end of a line. When a stray ``{`` in
+    agent chatter swallows the real result, the result is recovered from
+    the complete objects nested directly inside the abandoned candidate.
+    """
+
+    def __init__(self, spill_threshold: int = SPILL_THRESHOLD_BYTES):
+        """
+        Initialize the extractor.
+
+        Args:
+            spill_threshold: Buffered object size (chars) above which the
+                candidate text is moved from memory to a temporary file.
+        """
+        self.spill_threshold = spill_threshold
+        self.result: Optional[dict] = None
+        self._buffer = None
+        self._reset()
+
+    def _reset(self) -> None:
+        self._stack: List[str] = []
+        self._in_string = False
+        self._escaped = False
+        self._has_marker = False
+        self._offset = 0                            # chars written to the buffer
+        self._child_start = 0
+        self._children: List[Tuple[int, int]] = []  # complete depth-2 objects
+
+    def feed(self, line: str) -> None:
+        """Consume one stdout line (without its trailing newline)."""
+        pos = 0
+        if self._buffer is not None:
+            self._write("\n")
+        while pos < len(line) or self._buffer is not None:
+            if self._buffer is None:
+                pos = line.find("{", pos)
+                if pos == -1:
+                    return
+                self._buffer = tempfile.SpooledTemporaryFile(
+                    max_size=self.spill_threshold, mode="w+", encoding="utf-8",
+                )
+
+            state, end = self._scan(line, pos)
+            self._write(line[pos:end])
+            pos = end
+            if state == _OPEN:
+                if self._in_string:
+                    # JSON strings cannot contain a raw line break
+                    self._abandon()
+                return
+            if state == _CLOSED:
+                self._finish()
+            else:
+                self._abandon()
+
+    def close(self) -> None:
+        """
+        End the stream: an unfinished candidate is abandoned (recovering a
+        complete nested result if there is one) and its buffer released.
+        """
+        if self._buffer is not None:
+            self._abandon()
+
+    def _write(self, text: str) -> None:
+        if not self._has_marker and RESULT_MARKER in text:
+            self._has_marker = True
+        self._buffer.write(text)
+        self._offset += len(text)
+
+    def _scan(self, line: str, pos: int) -> Tuple[int, int]:
+        """
+        Advance the nesting state over ``line[pos:]``.
+
+        Returns:
+            (state, end): ``_CLOSED`` with the index just past the closing
+            brace of the top-level object, ``_INVALID`` with the index just
+            past the offending character, or ``_OPEN`` with ``len(line)``.
+        """
+        base = self._offset - pos   # buffer offset of line[0]
+        length = len(line)
+        while pos < length:
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                    pos += 1
+                    continue
+                match = _STRING_RE.search(line, pos)
+                if match is None:
+                    return _OPEN, length
+                if match.group() == "\\":
+                    self._escaped = True
+                else:
+                    self._in_string = False
+                pos = match.end()
+                continue
+
+            match = _STRUCTURE_RE.search(line, pos)
+            if match is None:
+                return _OPEN, length
+            char = match.group()
+            pos = match.end()
+            if char == '"':
+                self._in_string = True
+            elif char in "{[":
+                self._stack.append(char)
+                if char == "{" and len(self._stack) == 2:
+                    self._child_start = base + pos - 1
+            elif char in _CLOSERS:
+                if not self._stack or self._stack.pop() != _CLOSERS[char]:
+                    return _INVALID, pos
+                if not self._stack:
+                    return _CLOSED, pos
+                if char == "}" and len(self._stack) == 1:
+                    self._children.append((self._child_start, base + pos))
+            else:
+                return _INVALID, pos
+        return _OPEN, length
+
+    def _parse(self, text_or_file) -> bool:
+        """Keep the parsed object as the result if it is one; True on success."""
+        try:
+            if isinstance(text_or_file, str):
+                data = fast_json.loads(text_or_file)
+            else:
+                data = fast_json.load(text_or_file)
+        except (fast_json.JSONDecodeError, UnicodeDecodeError) as e:
+            logger.debug("Discarding unparseable JSON candidate: %s", e)
+            return False
+        if isinstance(data, dict) and "analyzed_posts" in data:
+            self.result = data
+            return True
+        return False
+
+    def _finish(self) -> None:
+        """Parse the completed candidate if it can be the result object."""
+        if self._has_marker:
+            self._buffer.seek(0)
+            if not self._parse(self._buffer):
+                self._recover_children()
+        self._discard()
+
+    def _abandon(self) -> None:
+        """Drop an invalid candidate, keeping a complete nested result if any."""
+        if self._has_marker:
+            self._recover_children()
+        self._discard()
+
+    def _recover_children(self) -> None:
+        """Try the complete objects nested directly inside the candidate, last first."""
+        for start, end in reversed(self._children):
+            self._buffer.seek(0)
+            self._buffer.read(start)
+            text = self._buffer.read(end - start)
+            if RESULT_MARKER in text and self._parse(text):
+                return
+
+    def _discard(self) -> None:
+        if self._buffer is not None:
+            self._buffer.close()
+        self._buffer = None
+        self._reset()
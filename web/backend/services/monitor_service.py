@@ -1,17 +1,24 @@
 """Monitor service -- orchestrates OpenClaw agent execution and progress tracking."""
 
 import asyncio
-import json
 import logging
 import os
 import re
 import shutil
+import tempfile
+import uuid
 from datetime import datetime, timezone
-from typing import Optional
+from typing import TYPE_CHECKING, NamedTuple, Optional
 
 from web.backend.config import DB_PATH, PROJECT_ROOT
+from web.backend.services.json_extractor import StreamingJsonExtractor
 from web.backend.services.run_history import RunHistoryManager
 
+import fast_json
+
+if TYPE_CHECKING:
+    from report_generator import ReportBuilder
+
 logger = logging.getLogger(__name__)
 
 KEYWORD_PROGRESS_RE = re.compile(
@@ -23,7 +30,25 @@ PIPELINE_STATS_RE = re.compile(
 EXTRACTION_RE = re.compile(r"(?:JS 抽取完成|抽取到\s*(\d+)\s*篇)")
 
 SUBPROCESS_TIMEOUT_SECONDS = 600
-MAX_CAPTURED_LINES = 5000
+EVENT_POLL_INTERVAL_SECONDS = 0.5
+
+# run_id -> ReportBuilder fed post by post while the run streams results.
+# Entries exist only while the run is in progress (see GET /reports/{id}/partial).
+live_reports: dict[str, "ReportBuilder"] = {}
+
+# Parallel mode: one agent subprocess per keyword, at most this many at once.
+MAX_PARALLEL_AGENTS = max(1, int(os.environ.get("MAX_PARALLEL_AGENTS", "4")))
+# Delay between agent launches so concurrent agents don't hit Threads in one burst.
+PARALLEL_LAUNCH_STAGGER_SECONDS = 3.0
+
+
+class AgentOutcome(NamedTuple):
+    """Result of a single OpenClaw agent subprocess."""
+
+    exit_code: Optional[int]
+    stderr_lines: list[str]
+    timed_out: bool
+    result: Optional[dict] = None
 
 
 def _parse_progress_line(line: str) -> Optional[dict]:
@@ -60,45 +85,6 @@ def _parse_progress_line(line: str) -> Optional[dict]:
     return None
 
 
-def _find_json_output(lines: list[str]) -> Optional[dict]:
-    """Scan captured stdout (backwards) for a JSON object with 'analyzed_posts'."""
-    json_candidates: list[str] = []
-    accumulating = False
-    buffer: list[str] = []
-    for line in reversed(lines):
-        stripped = line.strip()
-        if not accumulating and (stripped.endswith("}") or stripped == "}"):
-            accumulating = True
-            buffer = [stripped]
-        elif accumulating:
-            buffer.append(stripped)
-            if stripped.startswith("{"):
-                buffer.reverse()
-                json_candidates.append("\n".join(buffer))
-                accumulating = False
-                buffer = []
-
-    for candidate in json_candidates:
-        try:
-            data = json.loads(candidate)
-            if isinstance(data, dict) and "analyzed_posts" in data:
-                return data
-        except (json.JSONDecodeError, TypeError):
-            continue
-
-    for line in reversed(lines):
-        stripped = line.strip()
-        if stripped.startswith("{"):
-            try:
-                data = json.loads(stripped)
-                if isinstance(data, dict) and "analyzed_posts" in data:
-                    return data
-            except (json.JSONDecodeError, TypeError):
-                continue
-
-    return None
-
-
 async def _fail_run(
     run_id: str,
     error_msg: str,
@@ -138,40 +124,108 @@ async def _complete_run(
     })
 
 
-async def run_monitor(
-    run_id: str,
-    keywords: list[str],
-    progress_queue: asyncio.Queue,
-) -> None:
-    """Execute the OpenClaw agent subprocess, stream progress, generate report."""
-    history = RunHistoryManager(db_path=DB_PATH)
-
-    history.update_status(run_id, "running")
-    await progress_queue.put({
-        "type": "status",
-        "data": {"status": "running", "message": "正在啟動 OpenClaw agent..."},
-    })
-
-    if not shutil.which("openclaw"):
-        await _fail_run(run_id, "openclaw command not found in PATH", history, progress_queue)
-        return
-
+def _big_fish_message(post: dict) -> dict:
+    """Build the progress message announcing a newly detected big fish."""
+    analysis = post.get("analysis", {})
+    return {
+        "type": "big_fish",
+        "data": {
+            "id": post.get("id", ""),
+            "summary": analysis.get("summary", ""),
+            "importance": analysis.get(
+                "adjusted_importance", analysis.get("importance", 0)
+            ),
+            "categories": analysis.get("categories", []),
+            "author": post.get("author", ""),
+            "link": post.get("link", ""),
+        },
+    }
+
+
+def _build_agent_command(keywords: list[str], session_id: Optional[str] = None) -> list[str]:
+    """Build the openclaw CLI invocation for the given keywords."""
     keywords_joined = ",".join(keywords)
     cmd = [
         "openclaw", "agent",
         "--message", f"執行 threads-monitor 監控 關鍵字:{keywords_joined}",
         "--local", "--agent", "main",
     ]
-    logger.info("Launching OpenClaw: run_id=%s, keyword_count=%d", run_id, len(keywords))
+    if session_id:
+        cmd.extend(["--session-id", session_id])
+    return cmd
+
 
-    captured_lines: list[str] = []
+async def _run_agent(
+    keywords: list[str],
+    progress_queue: asyncio.Queue,
+    session_id: Optional[str] = None,
+    agent_tag: Optional[str] = None,
+    builder: Optional["ReportBuilder"] = None,
+) -> AgentOutcome:
+    """
+    Run one OpenClaw agent subprocess and stream its progress to the queue.
+
+    The agent and the src/ CLIs it invokes write typed events to a JSONL
+    side channel (MONITOR_EVENTS_FILE), which is tailed incrementally.
+    Once the first structured event arrives, stdout is no longer regex-parsed
+    for progress. Stdout keeps streaming through a StreamingJsonExtractor as
+    the fallback result source until a ``result`` event is received, so a
+    run whose report step fails (or whose agent prints the JSON itself)
+    still yields its result.
+
+    When ``agent_tag`` is set (parallel mode) every progress message carries
+    ``data["agent"]`` so the client can tell the concurrent agents apart.
+    Analyzed posts streamed as ``post`` events are added to ``builder`` and
+    newly detected big fish are pushed to the queue immediately.
+    """
+    from authors import RUN_ID_ENV
+    from events import EVENTS_FILE_ENV, POST_EVENT_TYPE, RESULT_EVENT_TYPE, EventFileReader
+
+    cmd = _build_agent_command(keywords, session_id)
+    extractor = StreamingJsonExtractor()
     stderr_lines: list[str] = []
+    structured = False
+    result: Optional[dict] = None
+
+    fd, events_path = tempfile.mkstemp(prefix="openclaw_events_", suffix=".jsonl")
+    os.close(fd)
+    reader = EventFileReader(events_path)
+    # Each agent settles only the author outcomes of the posts its own
+    # pipeline passed, so concurrent agents get distinct run IDs.
+    env = {**os.environ, EVENTS_FILE_ENV: events_path, RUN_ID_ENV: uuid.uuid4().hex[:12]}
+
+    async def _emit(message: dict) -> None:
+        if agent_tag is not None:
+            # The orchestrator reports run-wide keyword progress itself;
+            # a single-keyword agent's "1/1" would only confuse the client.
+            if message["type"] == "keyword_progress":
+                return
+            message["data"]["agent"] = agent_tag
+        await progress_queue.put(message)
+
+    async def _drain_events() -> None:
+        nonlocal structured, result
+        for event in await asyncio.to_thread(reader.read_new):
+            structured = True
+            if event["type"] == RESULT_EVENT_TYPE:
+                result = event["data"]
+                extractor.close()
+            elif event["type"] == POST_EVENT_TYPE:
+                if builder is None:
+                    continue
+                fish = builder.add_post(event["data"], source=agent_tag)
+                if fish is not None:
+                    await _emit(_big_fish_message(fish))
+            else:
+                await _emit(event)
+
     try:
         process = await asyncio.create_subprocess_exec(
             *cmd,
             stdout=asyncio.subprocess.PIPE,
             stderr=asyncio.subprocess.PIPE,
             cwd=PROJECT_ROOT,
+            env=env,
         )
 
         async def _read_stdout():
@@ -182,14 +236,21 @@ async def run_monitor(
                 if not raw:
                     break
                 line = raw.decode("utf-8", errors="replace").rstrip()
-                if len(captured_lines) < MAX_CAPTURED_LINES:
-                    captured_lines.append(line)
                 logger.debug("openclaw stdout: %s", line)
+                if result is None:
+                    extractor.feed(line)
+                if structured:
+                    if line.strip():
+                        await _emit({
+                            "type": "status",
+                            "data": {"status": "running", "message": line.strip()},
+                        })
+                    continue
                 progress = _parse_progress_line(line)
                 if progress is not None:
-                    await progress_queue.put(progress)
+                    await _emit(progress)
                 elif line.strip():
-                    await progress_queue.put({
+                    await _emit({
                         "type": "status",
                         "data": {"status": "running", "message": line.strip()},
                     })
@@ -205,27 +266,107 @@ async def run_monitor(
                 stderr_lines.append(line)
                 logger.debug("openclaw stderr: %s", line)
 
+        async def _tail_events():
+            while process.returncode is None:
+                await _drain_events()
+                await asyncio.sleep(EVENT_POLL_INTERVAL_SECONDS)
+
         try:
             await asyncio.wait_for(
-                asyncio.gather(_read_stdout(), _read_stderr(), process.wait()),
+                asyncio.gather(
+                    _read_stdout(), _read_stderr(), _tail_events(), process.wait(),
+                ),
                 timeout=SUBPROCESS_TIMEOUT_SECONDS,
             )
         except asyncio.TimeoutError:
             process.kill()
             await process.wait()
+            return AgentOutcome(process.returncode, stderr_lines, True, result)
+
+        # Pick up anything written between the last poll and process exit
+        await _drain_events()
+        if result is None:
+            extractor.close()
+            result = extractor.result
+        return AgentOutcome(process.returncode, stderr_lines, False, result)
+
+    finally:
+        extractor.close()
+        try:
+            os.unlink(events_path)
+        except OSError:
+            pass
+
+
+def _new_builder(keywords: list[str]) -> Optional["ReportBuilder"]:
+    """Create the live ReportBuilder for a run, or None if src/ is unavailable."""
+    try:
+        from report_generator import ReportBuilder
+        from scoring import load_scoring_config
+    except ImportError as e:
+        logger.error("Failed to import report_generator: %s", e)
+        return None
+    return ReportBuilder(keywords=keywords, scoring_config=load_scoring_config())
+
+
+async def run_monitor(
+    run_id: str,
+    keywords: list[str],
+    progress_queue: asyncio.Queue,
+    parallel: bool = False,
+) -> None:
+    """Execute the OpenClaw agent subprocess, stream progress, generate report."""
+    history = RunHistoryManager(db_path=DB_PATH)
+
+    history.update_status(run_id, "running")
+    await progress_queue.put({
+        "type": "status",
+        "data": {"status": "running", "message": "正在啟動 OpenClaw agent..."},
+    })
+
+    if not shutil.which("openclaw"):
+        await _fail_run(run_id, "openclaw command not found in PATH", history, progress_queue)
+        return
+
+    builder = _new_builder(keywords)
+    if builder is not None:
+        live_reports[run_id] = builder
+    try:
+        if parallel and len(keywords) > 1:
+            await _run_monitor_parallel(run_id, keywords, history, progress_queue, builder)
+        else:
+            await _run_monitor_single(run_id, keywords, history, progress_queue, builder)
+    finally:
+        live_reports.pop(run_id, None)
+
+
+async def _run_monitor_single(
+    run_id: str,
+    keywords: list[str],
+    history: RunHistoryManager,
+    progress_queue: asyncio.Queue,
+    builder: Optional["ReportBuilder"],
+) -> None:
+    """Run a single agent that processes all keywords sequentially."""
+    logger.info("Launching OpenClaw: run_id=%s, keyword_count=%d", run_id, len(keywords))
+
+    try:
+        outcome = await _run_agent(keywords, progress_queue, builder=builder)
+
+        if outcome.timed_out:
             await _fail_run(
                 run_id, f"監控超時（超過 {SUBPROCESS_TIMEOUT_SECONDS} 秒）",
                 history, progress_queue,
             )
             return
 
-        exit_code = process.returncode
+        exit_code = outcome.exit_code
         logger.info("OpenClaw exited with code: %s", exit_code)
 
         if exit_code == 0:
-            await _handle_success(run_id, captured_lines, history, progress_queue)
+            await _handle_success(run_id, outcome, history, progress_queue, builder)
         else:
-            stderr_tail = "\n".join(stderr_lines[-20:]) if stderr_lines else ""
+            stderr_tail = "\n".join(outcome.stderr_lines[-20:]) if outcome.stderr_lines else ""
             logger.error(
                 "OpenClaw failed for run %s (exit %s): %s",
                 run_id, exit_code, stderr_tail,
@@ -245,11 +386,170 @@ async def run_monitor(
         )
 
 
+async def _run_monitor_parallel(
+    run_id: str,
+    keywords: list[str],
+    history: RunHistoryManager,
+    progress_queue: asyncio.Queue,
+    builder: Optional["ReportBuilder"],
+) -> None:
+    """
+    Run one agent per keyword concurrently and merge their results.
+
+    Each agent gets its own OpenClaw session (and therefore its own
+    per-keyword rate limiting); launches are staggered and capped at
+    MAX_PARALLEL_AGENTS so the agents don't hit Threads in a single burst.
+    """
+    logger.info(
+        "Launching %d parallel OpenClaw agents: run_id=%s (max %d concurrent)",
+        len(keywords), run_id, MAX_PARALLEL_AGENTS,
+    )
+    semaphore = asyncio.Semaphore(MAX_PARALLEL_AGENTS)
+    total = len(keywords)
+    finished = 0
+
+    async def _run_one(index: int, keyword: str) -> Optional[dict]:
+        nonlocal finished
+        await asyncio.sleep(index * PARALLEL_LAUNCH_STAGGER_SECONDS)
+        async with semaphore:
+            await progress_queue.put({
+                "type": "keyword_progress",
+                "data": {"keyword": keyword, "current": index + 1, "total": total,
+                         "agent": keyword},
+            })
+            session_id = f"threads-monitor-{run_id[:8]}-{index + 1}"
+            try:
+                outcome = await _run_agent(
+                    [keyword], progress_queue,
+                    session_id=session_id, agent_tag=keyword, builder=builder,
+                )
+            except Exception as e:
+                logger.error("Parallel agent for run %s failed to start: %s", run_id, e)
+                return None
+
+        finished += 1
+        if outcome.timed_out or outcome.exit_code != 0:
+            logger.error(
+                "Parallel agent failed for run %s (exit %s, timed_out=%s): %s",
+                run_id, outcome.exit_code, outcome.timed_out,
+                "\n".join(outcome.stderr_lines[-20:]),
+            )
+            result = None
+        else:
+            result = outcome.result
+            if result is None:
+                logger.warning("Parallel agent produced no JSON output for run %s", run_id)
+
+        await progress_queue.put({
+            "type": "status",
+            "data": {
+                "status": "running",
+                "message": f"關鍵字 {keyword} 完成（{finished}/{total}）",
+                "agent": keyword,
+            },
+        })
+        return result
+
+    try:
+        results = await asyncio.gather(
+            *(_run_one(i, kw) for i, kw in enumerate(keywords))
+        )
+    except Exception as e:
+        logger.exception("Unexpected error in parallel run_monitor for %s", run_id)
+        await _fail_run(
+            run_id, f"監控過程中發生未預期錯誤: {type(e).__name__}", history, progress_queue,
+        )
+        return
+
+    succeeded = [r for r in results if r is not None]
+    failed_keywords = [kw for kw, r in zip(keywords, results) if r is None]
+
+    if not succeeded:
+        await _fail_run(
+            run_id, f"所有 {total} 個平行 agent 皆執行失敗", history, progress_queue,
+        )
+        return
+
+    sources = [kw for kw, r in zip(keywords, results) if r is not None]
+    merged, post_keys = _merge_results(succeeded, sources)
+    if failed_keywords:
+        merged["failed_keywords"] = failed_keywords
+        logger.warning("Run %s: agents failed for keywords %s", run_id, failed_keywords)
+
+    await progress_queue.put({
+        "type": "status",
+        "data": {"status": "running", "message": "正在解析結果並生成戰報..."},
+    })
+    await _store_result(run_id, merged, history, progress_queue, builder, post_keys)
+
+
+def _merge_results(
+    results: list[dict], sources: Optional[list[str]] = None,
+) -> tuple[dict, list[tuple]]:
+    """
+    Merge the JSON outputs of several agents into one monitoring result.
+
+    Posts are de-duplicated by link, colliding post IDs are suffixed with
+    the agent index, numeric stats are summed and ``valid_count`` is
+    recomputed from the merged post list.
+
+    Also returns, for each merged post, the ``(source, original id)`` key it
+    was streamed into the ReportBuilder under, so the final render can reuse
+    the builder despite the dedup and renames.
+    """
+    merged_posts: list[dict] = []
+    post_keys: list[tuple] = []
+    seen_links: set[str] = set()
+    seen_ids: set[str] = set()
+    keywords: list[str] = []
+    stats: dict = {}
+    timestamp = ""
+
+    for index, result in enumerate(results, 1):
+        source = sources[index - 1] if sources else None
+        for keyword in result.get("keywords", []):
+            if keyword not in keywords:
+                keywords.append(keyword)
+
+        result_ts = result.get("timestamp") or ""
+        if result_ts > timestamp:
+            timestamp = result_ts
+
+        for key, value in (result.get("stats") or {}).items():
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                stats[key] = stats.get(key, 0) + value
+
+        for post in result.get("analyzed_posts", []):
+            link = post.get("link")
+            if link and link in seen_links:
+                continue
+            if link:
+                seen_links.add(link)
+
+            post_id = post.get("id", "")
+            post_keys.append((source, post_id))
+            if post_id in seen_ids:
+                post = {**post, "id": f"{post_id}_{index}"}
+            seen_ids.add(post["id"])
+            merged_posts.append(post)
+
+    if "valid_count" in stats:
+        stats["valid_count"] = len(merged_posts)
+
+    return {
+        "timestamp": timestamp or datetime.now(timezone.utc).isoformat(),
+        "keywords": keywords,
+        "analyzed_posts": merged_posts,
+        "stats": stats,
+    }, post_keys
+
+
 async def _handle_success(
     run_id: str,
-    captured_lines: list[str],
+    outcome: AgentOutcome,
     history: RunHistoryManager,
     progress_queue: asyncio.Queue,
+    builder: Optional["ReportBuilder"] = None,
 ) -> None:
     """Handle successful subprocess completion: parse output, generate report."""
     await progress_queue.put({
@@ -257,21 +557,42 @@ async def _handle_success(
         "data": {"status": "running", "message": "正在解析結果並生成戰報..."},
     })
 
-    json_output = _find_json_output(captured_lines)
+    json_output = outcome.result
     if json_output is None:
-        logger.warning("No valid JSON output found in OpenClaw stdout for run %s", run_id)
+        logger.warning("No valid JSON output found in OpenClaw output for run %s", run_id)
         await _complete_run(run_id, history, progress_queue, report_available=False)
         return
 
-    result_json_str = json.dumps(json_output, ensure_ascii=False)
+    await _store_result(run_id, json_output, history, progress_queue, builder)
+
+
+async def _store_result(
+    run_id: str,
+    json_output: dict,
+    history: RunHistoryManager,
+    progress_queue: asyncio.Queue,
+    builder: Optional["ReportBuilder"] = None,
+    post_keys: Optional[list[tuple]] = None,
+) -> None:
+    """
+    Generate the report for a parsed agent result and mark the run completed.
+
+    If ``builder`` already holds every one of the result's posts (streamed as
+    ``post`` events, looked up by ``post_keys``), the final render reuses its
+    accumulated state.
+    """
+    result_json_str = fast_json.dumps(json_output)
     try:
         from report_generator import generate_all_outputs
 
         reports_dir = os.path.join(PROJECT_ROOT, "data", "reports")
-        outputs = generate_all_outputs(json_output, reports_dir=reports_dir)
+        outputs = generate_all_outputs(
+            json_output, reports_dir=reports_dir, builder=builder, run_id=run_id,
+            post_keys=post_keys,
+        )
 
         if outputs is not None:
-            stats_json_str = json.dumps(json_output.get("stats", {}), ensure_ascii=False)
+            stats_json_str = fast_json.dumps(json_output.get("stats", {}))
             await _complete_run(
                 run_id, history, progress_queue,
                 report_available=True,
@@ -0,0 +1,101 @@
+"""
+Replayable progress logs for monitoring runs.
+
+Each run gets a ProgressLog: an append-only, numbered list of progress
+messages. Producers call ``await log.put(message)`` exactly as they would
+on an ``asyncio.Queue``; consumers (WebSocket, SSE, long-poll) keep their
+own cursor and read with ``wait_for(after)``. Reading never consumes
+messages, so any number of clients can follow the same run, and a client
+that reconnects resumes from the last event ID it saw.
+"""
+
+import asyncio
+from typing import Any
+
+# Message types that end a run's progress stream
+TERMINAL_TYPES = ("completed", "error")
+
+# Oldest events are dropped beyond this many; progress messages are small,
+# so this only guards against a runaway producer.
+MAX_EVENTS_PER_RUN = 5000
+
+
+class ProgressLog:
+    """Append-only progress log for one run with cursor-based reads."""
+
+    def __init__(self, max_events: int = MAX_EVENTS_PER_RUN) -> None:
+        self.max_events = max_events
+        self._events: list[dict[str, Any]] = []
+        self._first_id = 1
+        self._changed = asyncio.Condition()
+        self.closed = False
+
+    @property
+    def last_id(self) -> int:
+        """ID of the newest event, or 0 if nothing has been logged yet."""
+        return self._first_id + len(self._events) - 1
+
+    async def put(self, message: dict[str, Any]) -> int:
+        """
+        Append a progress message (``asyncio.Queue.put`` compatible).
+
+        Returns:
+            The event ID assigned to the message (IDs start at 1).
+        """
+        async with self._changed:
+            event_id = self._append(message)
+            self._changed.notify_all()
+        return event_id
+
+    def _append(self, message: dict[str, Any]) -> int:
+        self._events.append(message)
+        if len(self._events) > self.max_events:
+            overflow = len(self._events) - self.max_events
+            del self._events[:overflow]
+            self._first_id += overflow
+        if message.get("type") in TERMINAL_TYPES:
+            self.closed = True
+        return self.last_id
+
+    def since(self, after: int) -> list[tuple[int, dict[str, Any]]]:
+        """
+        Return ``(event_id, message)`` pairs with an ID greater than ``after``.
+
+        If events before ``after`` have been trimmed, replay starts from the
+        oldest event still held.
+        """
+        start = max(after + 1, self._first_id) - self._first_id
+        return [
+            (self._first_id + offset, message)
+            for offset, message in enumerate(self._events[start:], start)
+        ]
+
+    async def wait_for(
+        self, after: int, timeout: float | None = None
+    ) -> list[tuple[int, dict[str, Any]]]:
+        """
+        Wait until events newer than ``after`` exist, then return them.
+
+        Returns an empty list if ``timeout`` seconds pass with nothing new, or
+        immediately if the log is closed and fully read.
+        """
+        async with self._changed:
+            try:
+                await asyncio.wait_for(
+                    self._changed.wait_for(
+                        lambda: self.last_id > after or self.closed
+                    ),
+                    timeout,
+                )
+            except asyncio.TimeoutError:
+                return []
+            return self.since(after)
+
+
+# Module-level shared state: run_id -> ProgressLog
+progress_logs: dict[str, ProgressLog] = {}
+
+
+def active_run_count() -> int:
+    """Number of runs whose progress log has not reached a terminal message."""
+    return sum(1 for log in progress_logs.values() if not log.closed)
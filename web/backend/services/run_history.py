@@ -5,14 +5,24 @@ Stores monitoring run records (status, keywords, results, reports).
 Follows the same per-operation connect/close pattern as src/dedup.py.
 """
 
-import json
 import logging
 import os
 import sqlite3
 from typing import Dict, List, Optional
 
+from web.backend import config  # noqa: F401 -- puts src/ on sys.path
+
+import fast_json
+
 logger = logging.getLogger(__name__)
 
+# Columns returned by list_runs -- everything except result_json, which can
+# be megabytes per run and is only needed by the report endpoint.
+LIST_COLUMNS = (
+    "id, status, keywords, created_at, completed_at, "
+    "report_markdown, stats_json, error_message"
+)
+
 
 class RunHistoryManager:
     """
@@ -91,7 +101,7 @@ class RunHistoryManager:
             conn = sqlite3.connect(self.db_path)
             cursor = conn.cursor()
 
-            keywords_json = json.dumps(keywords, ensure_ascii=False)
+            keywords_json = fast_json.dumps(keywords)
             cursor.execute(
                 "INSERT INTO runs (id, status, keywords) VALUES (?, 'pending', ?)",
                 (run_id, keywords_json),
@@ -249,7 +259,8 @@ class RunHistoryManager:
 
             # Get paginated results
             cursor.execute(
-                "SELECT * FROM runs ORDER BY created_at DESC LIMIT ? OFFSET ?",
+                f"SELECT {LIST_COLUMNS} FROM runs "
+                "ORDER BY created_at DESC LIMIT ? OFFSET ?",
                 (limit, offset),
             )
             rows = cursor.fetchall()
@@ -294,16 +305,16 @@ def _row_to_dict(row: sqlite3.Row) -> Dict:
     # Parse keywords from JSON string to list
     keywords_raw = record.get("keywords", "[]")
     try:
-        record["keywords"] = json.loads(keywords_raw)
-    except (json.JSONDecodeError, TypeError):
+        record["keywords"] = fast_json.loads(keywords_raw)
+    except (fast_json.JSONDecodeError, TypeError):
         record["keywords"] = []
 
     # Parse stats_json to dict if present
     stats_raw = record.get("stats_json")
     if stats_raw:
         try:
-            record["stats"] = json.loads(stats_raw)
-        except (json.JSONDecodeError, TypeError):
+            record["stats"] = fast_json.loads(stats_raw)
+        except (fast_json.JSONDecodeError, TypeError):
             record["stats"] = None
     else:
         record["stats"] = None
@@ -3,13 +3,34 @@
 import re
 
 from fastapi import HTTPException
+from fastapi.responses import JSONResponse, ORJSONResponse
 
-from web.backend.models import RunRecord
+from web.backend import config  # noqa: F401 -- puts src/ on sys.path
+from web.backend.models import (
+    PROGRESS_MESSAGE_TYPES,
+    ProgressMessage,
+    RunRecord,
+    RunRecordDict,
+    RunStatus,
+)
+
+from fast_json import has_orjson
+
+# Response class for large payloads: orjson when installed, stdlib otherwise
+FastJSONResponse = ORJSONResponse if has_orjson() else JSONResponse
 
 UUID_PATTERN = re.compile(
     r"^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$"
 )
 
+# Timestamp shapes the backend writes itself: SQLite CURRENT_TIMESTAMP
+# ("YYYY-MM-DD HH:MM:SS") and datetime.isoformat(), naive or UTC.
+TRUSTED_TIMESTAMP_PATTERN = re.compile(
+    r"^(\d{4}-\d{2}-\d{2})[ T](\d{2}:\d{2}:\d{2}(?:\.\d{6})?)(\+00:00|Z)?$"
+)
+
+_RUN_STATUSES = frozenset(status.value for status in RunStatus)
+
 
 def validate_run_id(run_id: str) -> str:
     """Validate that run_id is a valid UUID format. Raises HTTPException 400 if not."""
@@ -38,3 +59,80 @@ def build_run_record(run_data: dict) -> RunRecord:
         stats=run_data.get("stats"),
         error_message=run_data.get("error_message"),
     )
+
+
+def _trusted_timestamp(value: object) -> str | None:
+    """
+    Render a stored timestamp the way pydantic's JSON mode would.
+
+    Returns None if the value is not one of the known shapes, in which case
+    the caller must fall back to full validation.
+    """
+    if not isinstance(value, str):
+        return None
+    match = TRUSTED_TIMESTAMP_PATTERN.match(value)
+    if match is None:
+        return None
+    date, time, tz = match.groups()
+    return f"{date}T{time}{'Z' if tz else ''}"
+
+
+def run_record_dict(run_data: dict) -> RunRecordDict:
+    """
+    Build a JSON-ready run record from a row the backend wrote itself.
+
+    Produces the same output as ``build_run_record(run_data).model_dump(mode="json")``
+    without constructing and validating a model. Rows that do not match
+    the shapes RunHistoryManager writes fall back to the validated path.
+
+    Args:
+        run_data: Dictionary from RunHistoryManager.get_run() or list_runs().
+
+    Returns:
+        RunRecordDict: Plain dict ready for JSON serialization.
+    """
+    created_at = _trusted_timestamp(run_data.get("created_at", ""))
+    completed_raw = run_data.get("completed_at")
+    completed_at = None if completed_raw is None else _trusted_timestamp(completed_raw)
+    status = run_data.get("status", "pending")
+    keywords = run_data.get("keywords", [])
+    stats = run_data.get("stats")
+
+    if (
+        created_at is None
+        or (completed_raw is not None and completed_at is None)
+        or status not in _RUN_STATUSES
+        or not isinstance(keywords, list)
+        or not (stats is None or isinstance(stats, dict))
+    ):
+        return build_run_record(run_data).model_dump(mode="json")
+
+    return {
+        "id": str(run_data.get("id", "")),
+        "status": status,
+        "keywords": keywords,
+        "created_at": created_at,
+        "completed_at": completed_at,
+        "report_markdown": run_data.get("report_markdown"),
+        "stats": stats,
+        "error_message": run_data.get("error_message"),
+    }
+
+
+def progress_payload(message: dict, event_id: int | None = None) -> dict:
+    """
+    Build the wire form of a progress message produced by monitor_service.
+
+    Known message types with a dict payload are passed through as-is, which
+    is what ``ProgressMessage(**message).model_dump()`` returns for them;
+    anything else goes through model validation (or is sent unchanged if it
+    does not validate).
+    """
+    msg_type = message.get("type")
+    data = message.get("data", {})
+    if msg_type in PROGRESS_MESSAGE_TYPES and isinstance(data, dict):
+        return {"type": msg_type, "data": data, "id": event_id}
+    try:
+        return ProgressMessage(**message, id=event_id).model_dump()
+    except Exception:
+        return {**message, "id": event_id}
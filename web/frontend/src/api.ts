@@ -1,4 +1,4 @@
-import type { ReportData } from './types'
+import type { AnalyzedPost, ReportData, ReportField } from './types'
 
 const API_BASE = '/api'
 
@@ -10,23 +10,59 @@ function validateRunId(runId: string): void {
   }
 }
 
-export async function startMonitor(keywords: string[]): Promise<{ run_id: string }> {
+export async function startMonitor(
+  keywords: string[],
+  parallel = false,
+): Promise<{ run_id: string }> {
   const res = await fetch(`${API_BASE}/monitor/start`, {
     method: 'POST',
     headers: { 'Content-Type': 'application/json' },
-    body: JSON.stringify({ keywords }),
+    body: JSON.stringify({ keywords, parallel }),
   })
   if (!res.ok) throw new Error(`Failed to start monitor: ${res.statusText}`)
   return res.json()
 }
 
-export async function getReport(runId: string): Promise<ReportData> {
+export async function getReport<K extends ReportField = ReportField>(
+  runId: string,
+  fields?: K[],
+): Promise<Pick<ReportData, K>> {
   validateRunId(runId)
-  const res = await fetch(`${API_BASE}/reports/${encodeURIComponent(runId)}`)
+  const query = fields ? `?fields=${fields.map(encodeURIComponent).join(',')}` : ''
+  const res = await fetch(`${API_BASE}/reports/${encodeURIComponent(runId)}${query}`)
   if (!res.ok) throw new Error(`Failed to get report: ${res.statusText}`)
   return res.json()
 }
 
+/**
+ * Stream a run's analyzed posts (NDJSON), calling onPosts with each batch
+ * of fully received lines so the page can render progressively.
+ */
+export async function streamReportPosts(
+  runId: string,
+  onPosts: (posts: AnalyzedPost[]) => void,
+  signal?: AbortSignal,
+): Promise<void> {
+  validateRunId(runId)
+  const res = await fetch(`${API_BASE}/reports/${encodeURIComponent(runId)}/posts`, {
+    signal,
+  })
+  if (!res.ok || !res.body) throw new Error(`Failed to get posts: ${res.statusText}`)
+
+  const reader = res.body.pipeThrough(new TextDecoderStream()).getReader()
+  let buffer = ''
+  for (;;) {
+    const { done, value } = await reader.read()
+    if (done) break
+    buffer += value
+    const lines = buffer.split('\n')
+    buffer = lines.pop() ?? ''
+    const posts = lines.filter((line) => line.trim()).map((line) => JSON.parse(line))
+    if (posts.length > 0) onPosts(posts)
+  }
+  if (buffer.trim()) onPosts([JSON.parse(buffer)])
+}
+
 export async function getHistory(page = 1, limit = 20): Promise<{
   runs: Array<{
     id: string
@@ -47,9 +83,12 @@ export async function getHistory(page = 1, limit = 20): Promise<{
   return res.json()
 }
 
-export function connectWebSocket(runId: string): WebSocket {
+export function connectWebSocket(runId: string, after = 0): WebSocket {
   validateRunId(runId)
   const protocol = window.location.protocol === 'https:' ? 'wss:' : 'ws:'
   const host = window.location.host
-  return new WebSocket(`${protocol}//${host}/api/monitor/ws/${encodeURIComponent(runId)}`)
+  const cursor = Math.max(0, Math.floor(after))
+  return new WebSocket(
+    `${protocol}//${host}/api/monitor/ws/${encodeURIComponent(runId)}?after=${cursor}`,
+  )
 }
@@ -1,6 +1,9 @@
 import { useState, useRef, useCallback, useEffect } from 'react'
 import { startMonitor, connectWebSocket } from '../api'
-import type { ProgressMessage } from '../types'
+import type { HeartbeatMessage, ProgressMessage } from '../types'
+
+const MAX_RECONNECTS = 5
+const RECONNECT_DELAY_MS = 1000
 
 type MonitorStatus = 'idle' | 'connecting' | 'running' | 'completed' | 'failed'
 
@@ -20,6 +23,7 @@ export function useMonitor(): UseMonitorReturn {
   const [error, setError] = useState<string | null>(null)
   const wsRef = useRef<WebSocket | null>(null)
   const statusRef = useRef<MonitorStatus>('idle')
+  const reconnectTimerRef = useRef<ReturnType<typeof setTimeout> | null>(null)
 
   // Keep the ref in sync with state
   useEffect(() => {
@@ -27,6 +31,10 @@ export function useMonitor(): UseMonitorReturn {
   }, [status])
 
   const cleanup = useCallback(() => {
+    if (reconnectTimerRef.current) {
+      clearTimeout(reconnectTimerRef.current)
+      reconnectTimerRef.current = null
+    }
     if (wsRef.current) {
       wsRef.current.close()
       wsRef.current = null
@@ -55,42 +63,58 @@ export function useMonitor(): UseMonitorReturn {
       const { run_id } = await startMonitor(keywords)
       setRunId(run_id)
 
-      const ws = connectWebSocket(run_id)
-      wsRef.current = ws
+      // The server keeps a replayable log per run; on an unexpected drop we
+      // reconnect with the last event ID seen and continue where we left off.
+      let lastEventId = 0
+      let reconnects = 0
 
-      ws.onopen = () => {
-        setStatus('running')
-      }
+      const connect = () => {
+        const ws = connectWebSocket(run_id, lastEventId)
+        wsRef.current = ws
 
-      ws.onmessage = (event) => {
-        try {
-          const msg: ProgressMessage = JSON.parse(event.data)
-          setProgress((prev) => [...prev, msg])
+        ws.onopen = () => {
+          setStatus('running')
+        }
 
-          if (msg.type === 'completed') {
-            setStatus('completed')
-          } else if (msg.type === 'error') {
-            setStatus('failed')
-            setError(String(msg.data.message ?? 'Unknown error'))
+        ws.onmessage = (event) => {
+          try {
+            const msg: ProgressMessage | HeartbeatMessage = JSON.parse(event.data)
+            if (msg.type === 'ping') return
+            if (msg.id !== undefined) {
+              if (msg.id <= lastEventId) return
+              lastEventId = msg.id
+              reconnects = 0
+            }
+            setProgress((prev) => [...prev, msg])
+
+            if (msg.type === 'completed') {
+              setStatus('completed')
+            } else if (msg.type === 'error') {
+              setStatus('failed')
+              setError(String(msg.data.message ?? 'Unknown error'))
+            }
+          } catch {
+            // Ignore non-JSON messages
           }
-        } catch {
-          // Ignore non-JSON messages
         }
-      }
-
-      ws.onerror = () => {
-        setStatus('failed')
-        setError('WebSocket connection error')
-      }
 
-      ws.onclose = (event) => {
-        if (statusRef.current !== 'completed' && statusRef.current !== 'failed') {
-          if (!event.wasClean) {
-            setStatus('failed')
-            setError('WebSocket connection closed unexpectedly')
+        ws.onclose = (event) => {
+          if (wsRef.current !== ws) return
+          if (statusRef.current !== 'completed' && statusRef.current !== 'failed') {
+            if (!event.wasClean) {
+              if (reconnects < MAX_RECONNECTS) {
+                reconnects += 1
+                reconnectTimerRef.current = setTimeout(connect, RECONNECT_DELAY_MS)
+                return
+              }
+              setStatus('failed')
+              setError('WebSocket connection closed unexpectedly')
+            }
           }
         }
       }
+
+      connect()
     } catch (err) {
       setStatus('failed')
       setError(err instanceof Error ? err.message : 'Failed to start monitor')
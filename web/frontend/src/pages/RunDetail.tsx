@@ -1,4 +1,4 @@
-import { useEffect, useState } from 'react'
+import { useEffect, useMemo, useState } from 'react'
 import { useParams, Link } from 'react-router-dom'
 import ReactMarkdown from 'react-markdown'
 import rehypeSanitize from 'rehype-sanitize'
@@ -14,7 +14,7 @@ import {
   Pie,
   Cell,
 } from 'recharts'
-import { getReport } from '../api'
+import { getReport, streamReportPosts } from '../api'
 import type { ReportData, AnalyzedPost } from '../types'
 
 const PIE_COLORS = [
@@ -39,7 +39,10 @@ function isSafeUrl(url: string): boolean {
 
 export default function RunDetail() {
   const { runId } = useParams<{ runId: string }>()
-  const [report, setReport] = useState<ReportData | null>(null)
+  const [report, setReport] = useState<Omit<ReportData, 'analyzed_posts'> | null>(
+    null,
+  )
+  const [analyzedPosts, setAnalyzedPosts] = useState<AnalyzedPost[]>([])
   const [loading, setLoading] = useState(true)
   const [error, setError] = useState<string | null>(null)
   const [activeTab, setActiveTab] = useState<'report' | 'posts' | 'stats'>(
@@ -49,13 +52,28 @@ export default function RunDetail() {
   useEffect(() => {
     if (!runId) return
 
+    const controller = new AbortController()
+
     const fetchReport = async () => {
       setLoading(true)
       setError(null)
+      setAnalyzedPosts([])
       try {
-        const data = await getReport(runId)
+        // Small summary first, then stream the (possibly large) post list
+        const data = await getReport(runId, [
+          'run',
+          'big_fish_ids',
+          'category_stats',
+        ])
         setReport(data)
+        setLoading(false)
+        await streamReportPosts(
+          runId,
+          (batch) => setAnalyzedPosts((prev) => [...prev, ...batch]),
+          controller.signal,
+        )
       } catch (err) {
+        if (controller.signal.aborted) return
         setError(err instanceof Error ? err.message : 'Failed to load report')
       } finally {
         setLoading(false)
@@ -63,8 +81,16 @@ export default function RunDetail() {
     }
 
     fetchReport()
+    return () => controller.abort()
   }, [runId])
 
+  const bigFish = useMemo(() => {
+    const byId = new Map(analyzedPosts.map((post) => [post.id, post]))
+    return (report?.big_fish_ids ?? [])
+      .map((id) => byId.get(id))
+      .filter((post): post is AnalyzedPost => post !== undefined)
+  }, [analyzedPosts, report])
+
   if (loading) {
     return (
       <div className="flex items-center justify-center py-20">
@@ -92,7 +118,10 @@ export default function RunDetail() {
 
   if (!report) return null
 
-  const { run, analyzed_posts, big_fish, category_stats } = report
+  const { run } = report
+  const category_stats = report.category_stats ?? []
+  const analyzed_posts = analyzedPosts
+  const big_fish = bigFish
 
   // Use spread to avoid mutating the original array (immutability)
   const importanceData = [...analyzed_posts]
@@ -51,13 +51,21 @@ export interface CategoryStat {
 }
 
 export interface ProgressMessage {
-  type: 'status' | 'keyword_progress' | 'pipeline_stats' | 'completed' | 'error'
+  type: 'status' | 'keyword_progress' | 'pipeline_stats' | 'big_fish' | 'completed' | 'error'
   data: Record<string, unknown>
+  id?: number
+}
+
+/** Idle keep-alive frame on the progress WebSocket; not part of the run's progress. */
+export interface HeartbeatMessage {
+  type: 'ping'
 }
 
 export interface ReportData {
   run: RunRecord
   analyzed_posts: AnalyzedPost[]
-  big_fish: AnalyzedPost[]
+  big_fish_ids: string[]
   category_stats: CategoryStat[]
 }
+
+export type ReportField = keyof ReportData